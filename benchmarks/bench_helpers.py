@@ -0,0 +1,161 @@
+import contextlib
+import io
+import sys
+
+import matplotlib
+
+matplotlib.use("Agg")
+import matplotlib.pyplot as plt
+from scipy.stats import loguniform
+from sklearn.linear_model import Ridge
+from sklearn.model_selection import RandomizedSearchCV, train_test_split
+from sklearn.pipeline import make_pipeline
+
+sys.path.append("src")
+sys.path.append("src/scripts")
+from english_score_eda import build_preprocessor
+from helper.bin_counts import BinCounts
+from helper.correlation_matrix import pearson_correlation_matrix
+from helper.load_survey_data import (
+    MODEL_COLUMNS,
+    TARGET,
+    is_item_column,
+)
+from helper.plot_histogram_with_exclusions import plot_histogram_with_exclusions
+from helper.plt_regr_pred import plt_regr_pred
+from helper.search_top_models import fit_and_return_top_models
+from helper.show_feat_coeff import show_feat_coeff
+
+from synthetic_survey import make_survey_data
+
+# Benchmark name -> function taking a `SurveyBenchData` and returning the callable to time
+BENCHMARKS = {}
+
+# Columns the EDA script leaves out of the numeric histograms
+HISTOGRAM_EXCLUDED = [
+    "id", "date", "time", "Unnamed: 0", "tests", "elogit", "dyslexia",
+    "dictionary", "already_participated", "natlangs", "primelangs",
+    "Can_region", "Ir_region", "US_region", "UK_region", "UK_constituency",
+    "gender", "type", "currcountry", "countries",
+]
+
+
+def benchmark(name):
+    """Register a benchmark under `name`."""
+
+    def register(make_case):
+        BENCHMARKS[name] = make_case
+        return make_case
+
+    return register
+
+
+class SurveyBenchData:
+    """
+    Synthetic survey data of a given size and the objects the benchmarks share.
+
+    The fitted pipeline is built on first use, outside the timed calls.
+    """
+
+    def __init__(self, n_rows, random_state=123):
+        self.n_rows = n_rows
+        self.survey_df = make_survey_data(n_rows, random_state)
+        model_df = self.survey_df[MODEL_COLUMNS]
+        train_df, test_df = train_test_split(
+            model_df, test_size=0.3, random_state=random_state
+        )
+        self.X_train, self.y_train = train_df.drop(columns=TARGET), train_df[TARGET]
+        self.X_test, self.y_test = test_df.drop(columns=TARGET), test_df[TARGET]
+        self._pipeline = None
+
+    @property
+    def eda_df(self):
+        """The columns the EDA script loads, without the `q*` items."""
+        return self.survey_df.loc[
+            :, [column for column in self.survey_df if not is_item_column(column)]
+        ]
+
+    @property
+    def pipeline(self):
+        """A Ridge pipeline fitted on the training split."""
+        if self._pipeline is None:
+            self._pipeline = make_pipeline(build_preprocessor(), Ridge()).fit(
+                self.X_train, self.y_train
+            )
+        return self._pipeline
+
+
+@benchmark("pearson_correlation_matrix")
+def bench_correlation(data):
+    df = data.eda_df.drop(columns=["Unnamed: 0", "date", "time", "id"])
+
+    def run():
+        # The helper prints the excluded columns, keep the benchmark output clean
+        with contextlib.redirect_stdout(io.StringIO()):
+            pearson_correlation_matrix(df, "viridis")
+
+    return run
+
+
+@benchmark("plot_histogram_with_exclusions")
+def bench_histograms(data):
+    df = data.eda_df
+
+    def run():
+        plot_histogram_with_exclusions(df, columns_to_exclude=HISTOGRAM_EXCLUDED)
+        plt.close("all")
+
+    return run
+
+
+@benchmark("bin_counts")
+def bench_bin_counts(data):
+    df = data.eda_df
+    columns = [
+        column
+        for column in df.select_dtypes(include="number").columns
+        if column not in HISTOGRAM_EXCLUDED
+    ]
+    return lambda: BinCounts.from_frame(df, columns, bins=50, bins_2d=30, pairs=True)
+
+
+@benchmark("preprocessor_fit_transform")
+def bench_preprocessor(data):
+    return lambda: build_preprocessor().fit_transform(data.X_train)
+
+
+@benchmark("fit_and_return_top_models")
+def bench_search(data):
+    def run():
+        search = RandomizedSearchCV(
+            make_pipeline(build_preprocessor(), Ridge()),
+            {"ridge__alpha": loguniform(1e-3, 1e3)},
+            n_iter=5,
+            cv=5,
+            scoring={"RMSE": "neg_root_mean_squared_error", "R squared": "r2"},
+            refit="RMSE",
+            random_state=123,
+        )
+        fit_and_return_top_models(
+            search, 5, data.X_train, data.y_train, ["param_ridge__alpha"], scoring="RMSE"
+        )
+
+    return run
+
+
+@benchmark("show_feat_coeff")
+def bench_coefficients(data):
+    pipeline = data.pipeline
+    preprocessor = pipeline.named_steps["columntransformer"]
+    return lambda: show_feat_coeff(pipeline, "ridge", preprocessor)
+
+
+@benchmark("plt_regr_pred")
+def bench_actual_vs_predicted(data):
+    pipeline = data.pipeline
+
+    def run():
+        plt_regr_pred(data.X_test, data.y_test, pipeline)
+        plt.close("all")
+
+    return run
@@ -0,0 +1,120 @@
+import sys
+import time
+import tracemalloc
+
+import click
+import numpy as np
+import scipy.sparse as sp
+
+sys.path.append("src")
+sys.path.append("src/scripts")
+from english_score_eda import build_preprocessor
+from helper.design_matrix import linear_models
+from helper.load_survey_data import (
+    TARGET,
+    WIDE_CATEGORICAL_FEATURES,
+    load_survey_data,
+    model_columns,
+)
+
+from synthetic_survey import make_survey_data
+
+
+@click.command()
+@click.option("--rows", type=int, default=100_000, help="Number of synthetic survey rows (default: 100000)")
+@click.option(
+    "--levels",
+    type=int,
+    default=2_000,
+    help="Distinct values of each synthetic wide categorical feature (default: 2000)",
+)
+@click.option(
+    "--data",
+    type=str,
+    default=None,
+    help="Measure on this survey CSV instead of synthetic data, ex: data/raw/full_dataset.csv",
+)
+@click.option(
+    "--dense-limit-mb",
+    type=float,
+    default=2_000,
+    help="Skip the dense design matrix when it would use more than this (default: 2000 MB)",
+)
+def main(rows, levels, data, dense_limit_mb):
+    """
+    Measures the memory of the design matrix with the wide categorical features one-hot encoded.
+
+    The preprocessor of `english_score_eda.py --wide-categoricals` is fitted
+    with its sparse float32 output, then with the same blocks densified, and
+    Ridge and Lasso are fitted on each design matrix with the solvers chosen
+    by `linear_models`. For each, the size of the design matrix, the peak
+    memory traced while building it and fitting the models, and the fit times
+    are reported.
+    """
+    if data is None:
+        click.echo(f"Generating {rows} synthetic survey rows with {levels} levels per wide feature...")
+        df = with_wide_levels(make_survey_data(rows), levels)[model_columns(wide_categoricals=True)]
+    else:
+        click.echo(f"Loading {data}...")
+        df = load_survey_data(data, columns=model_columns(wide_categoricals=True))
+    X, y = df.drop(columns=TARGET), df[TARGET]
+
+    sparse_measures = measure(X, y, sparse=True)
+    n_features = sparse_measures.pop()
+    dense_mb = len(X) * n_features * np.dtype(np.float32).itemsize / 1e6
+    click.echo(f"{len(X)} rows, {n_features} features, {dense_mb:.0f} MB as a dense float32 matrix")
+
+    click.echo(f"{'design matrix':<16} {'size MB':>10} {'peak MB':>10} {'ridge s':>10} {'lasso s':>10}")
+    report("sparse float32", sparse_measures)
+    if dense_mb > dense_limit_mb:
+        click.echo(f"{'dense float32':<16} skipped, over --dense-limit-mb")
+    else:
+        report("dense float32", measure(X, y, sparse=False)[:-1])
+
+
+def with_wide_levels(df, levels, random_state=123):
+    """Return `df` with each wide categorical feature drawn from `levels` values, 5% missing."""
+    rng = np.random.default_rng(random_state)
+    df = df.copy()
+    for column in WIDE_CATEGORICAL_FEATURES:
+        values = rng.integers(0, levels, len(df))
+        df[column] = np.array([f"{column} {value}" for value in values], dtype=object)
+        df.loc[rng.random(len(df)) < 0.05, column] = np.nan
+    return df
+
+
+def measure(X, y, sparse):
+    """Return the design matrix size and traced peak memory (MB), the Ridge and Lasso fit times (s) and the number of features."""
+    preprocessor = build_preprocessor(wide_categoricals=True)
+    if not sparse:
+        # The same float32 blocks, stacked as a dense array
+        preprocessor.set_params(sparse_threshold=0.0)
+    ridge, lasso = linear_models(sparse_input=sparse)
+    lasso.set_params(alpha=1e-3)
+
+    tracemalloc.start()
+    design = preprocessor.fit_transform(X)
+    times = []
+    for model in (ridge, lasso):
+        start = time.perf_counter()
+        model.fit(design, y)
+        times.append(time.perf_counter() - start)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return [design_nbytes(design) / 1e6, peak / 1e6, *times, design.shape[1]]
+
+
+def design_nbytes(design):
+    """Return the memory used by a dense or CSR design matrix, in bytes."""
+    if sp.issparse(design):
+        return design.data.nbytes + design.indices.nbytes + design.indptr.nbytes
+    return design.nbytes
+
+
+def report(name, measures):
+    size, peak, ridge_seconds, lasso_seconds = measures
+    click.echo(f"{name:<16} {size:10.1f} {peak:10.1f} {ridge_seconds:10.2f} {lasso_seconds:10.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+import multiprocessing
+import os
+import sys
+import tempfile
+
+import click
+import pandas as pd
+
+sys.path.append("src")
+from helper.load_survey_data import (
+    frame_memory_mb,
+    is_item_column,
+    load_survey_data,
+    model_columns,
+    peak_rss_mb,
+)
+
+from synthetic_survey import write_survey_csv
+
+# The frames each script loads, as `load_survey_data` columns; None reads the
+# CSV the way the scripts did before, with `pd.read_csv(low_memory=False)`
+LOADS = {
+    "read_csv": None,
+    "eda": lambda column: not is_item_column(column),
+    "tuning": model_columns(),
+    "tuning --item-columns": model_columns(item_columns=True),
+}
+
+
+@click.command()
+@click.option("--rows", type=int, default=200_000, help="Number of synthetic survey rows (default: 200000)")
+@click.option(
+    "--data",
+    type=str,
+    default=None,
+    help="Measure on this survey CSV instead of synthetic data, ex: data/raw/full_dataset.csv",
+)
+def main(rows, data):
+    """
+    Measures the peak RSS saved by `load_survey_data` over the plain `pd.read_csv` load.
+
+    Each load runs in a fresh process, whose peak RSS covers only its imports
+    and that load: first the `pd.read_csv(low_memory=False)` of every column
+    the scripts used to do, then `load_survey_data` with the columns read by
+    `english_score_eda.py` and `english_score_tuning.py`. The Parquet cache is
+    not used. For each load, the frame size, the peak RSS and the peak RSS
+    saved over `read_csv` are reported.
+    """
+    with tempfile.TemporaryDirectory() as tmp:
+        if data is None:
+            click.echo(f"Writing {rows} synthetic survey rows...")
+            data = write_survey_csv(os.path.join(tmp, "survey.csv"), rows)
+        measures = measure_loads(data)
+
+    baseline_peak = measures["read_csv"][1]
+    click.echo(f"{'load':<24} {'frame MB':>10} {'peak MB':>10} {'saved MB':>10}")
+    for name, (frame_mb, peak_mb) in measures.items():
+        click.echo(f"{name:<24} {frame_mb:10.1f} {peak_mb:10.1f} {baseline_peak - peak_mb:10.1f}")
+
+
+def measure_loads(path):
+    """Return the frame size and peak RSS (MB) of each load of `LOADS`, each measured in a new process."""
+    context = multiprocessing.get_context("spawn")
+    measures = {}
+    for name in LOADS:
+        # One process per load, so that ru_maxrss is the peak of this load only
+        with context.Pool(1) as pool:
+            measures[name] = pool.apply(measure_load, (path, name))
+    return measures
+
+
+def measure_load(path, name):
+    """Load `path` as `name` of `LOADS`, returning the frame size and the peak RSS of the process (MB)."""
+    columns = LOADS[name]
+    if columns is None:
+        df = pd.read_csv(path, sep=",", on_bad_lines="skip", low_memory=False)
+    else:
+        df = load_survey_data(path, columns=columns, use_cache=False)
+    return frame_memory_mb(df), peak_rss_mb()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,147 @@
+import json
+import os
+import platform
+import sys
+import timeit
+
+import click
+
+from bench_helpers import BENCHMARKS, SurveyBenchData
+
+
+@click.command()
+@click.option(
+    "--rows",
+    type=int,
+    multiple=True,
+    default=[10_000],
+    help="Number of synthetic survey rows, repeatable, ex: --rows 10000 --rows 5000000",
+)
+@click.option(
+    "--only",
+    type=click.Choice(sorted(BENCHMARKS)),
+    multiple=True,
+    help="Run only this benchmark (repeatable). Default: all benchmarks",
+)
+@click.option("--repeat", type=int, default=3, help="Timed runs per benchmark; the fastest is kept.")
+@click.option(
+    "--baseline",
+    type=str,
+    default="benchmarks/baselines.json",
+    help="Path of the stored baseline timings (default: benchmarks/baselines.json)",
+)
+@click.option(
+    "--save-baseline",
+    is_flag=True,
+    help="Store the timings of this run in the baseline file instead of comparing.",
+)
+@click.option(
+    "--tolerance",
+    type=float,
+    default=0.25,
+    help="Allowed slowdown over the baseline before a benchmark fails (default: 0.25 = 25%)",
+)
+@click.option(
+    "--allow-missing",
+    is_flag=True,
+    help="Pass benchmarks that have no stored baseline instead of failing.",
+)
+def main(rows, only, repeat, baseline, save_baseline, tolerance, allow_missing):
+    """
+    Times the helper functions on synthetic survey data and compares them to baselines.
+
+    Each benchmark is run `repeat` times per data size and its fastest time is
+    kept. Baselines are stored per machine (architecture, CPU count and Python
+    version). Without --save-baseline, the run exits with status 1 if any
+    benchmark is slower than its baseline by more than the tolerance, or has no
+    baseline unless --allow-missing is given. The comparison is skipped on a
+    machine that has no baselines while others do.
+    """
+    names = only or sorted(BENCHMARKS)
+    timings = {}
+    for n_rows in rows:
+        click.echo(f"Generating {n_rows} synthetic survey rows...")
+        data = SurveyBenchData(n_rows)
+        for name in names:
+            run = BENCHMARKS[name](data)
+            seconds = min(timeit.repeat(run, number=1, repeat=repeat))
+            timings[benchmark_key(name, n_rows)] = seconds
+            click.echo(f"  {name:<32} {seconds:10.4f} s")
+
+    stored = load_baseline(baseline)
+    machine = machine_key()
+    if save_baseline:
+        entry = stored["machines"].setdefault(machine, {"machine": machine_info(), "timings": {}})
+        entry["timings"].update(timings)
+        with open(baseline, "w") as f:
+            json.dump(stored, f, indent=2, sort_keys=True)
+        click.echo(f"Saved {len(timings)} baseline timings of {machine} to {baseline}")
+        return
+
+    # Timings only compare on the hardware they were recorded on
+    if machine not in stored["machines"] and stored["machines"]:
+        click.echo(
+            f"No baselines for this machine ({machine}), only for "
+            f"{', '.join(sorted(stored['machines']))}: skipping the comparison. "
+            "Record them with --save-baseline."
+        )
+        return
+    baseline_timings = stored["machines"].get(machine, {"timings": {}})["timings"]
+    regressions = compare_to_baseline(timings, baseline_timings, tolerance)
+    for key, seconds, reference in regressions:
+        click.echo(
+            f"Regression: {key} took {seconds:.4f} s, baseline {reference:.4f} s "
+            f"(+{seconds / reference - 1:.0%})"
+        )
+    missing = missing_baselines(timings, baseline_timings)
+    if missing:
+        click.echo(f"No baseline for: {', '.join(missing)}")
+    if regressions or (missing and not allow_missing):
+        sys.exit(1)
+    click.echo("No regressions.")
+
+
+def benchmark_key(name, n_rows):
+    """Return the key of a benchmark timing, ex: `plt_regr_pred[10000]`."""
+    return f"{name}[{n_rows}]"
+
+
+def compare_to_baseline(timings, baseline_timings, tolerance):
+    """Return (key, seconds, baseline seconds) for timings slower than their baseline allows."""
+    return [
+        (key, seconds, baseline_timings[key])
+        for key, seconds in sorted(timings.items())
+        if key in baseline_timings and seconds > baseline_timings[key] * (1 + tolerance)
+    ]
+
+
+def missing_baselines(timings, baseline_timings):
+    """Return the sorted keys of timings that have no baseline."""
+    return sorted(set(timings) - set(baseline_timings))
+
+
+def load_baseline(path):
+    """Return the stored baselines by machine key, or none if the file does not exist."""
+    if not os.path.exists(path):
+        return {"machines": {}}
+    with open(path) as f:
+        return json.load(f)
+
+
+def machine_info():
+    """Describe the machine so baselines from other hardware can be recognised."""
+    return {
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "cpu_count": os.cpu_count(),
+    }
+
+
+def machine_key(info=None):
+    """Return the key of the baselines of a machine, ex: `x86_64-8cpu-py3.11.7`."""
+    info = info or machine_info()
+    return f"{info['machine']}-{info['cpu_count']}cpu-py{info['python']}"
+
+
+if __name__ == "__main__":
+    main()
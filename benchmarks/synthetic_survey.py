@@ -0,0 +1,139 @@
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+sys.path.append("src")
+from helper.load_survey_data import survey_dtype
+
+EDUCATION_LEVELS = [
+    "Graduate Degree",
+    "Some Graduate School",
+    "Undergraduate Degree (3-5 years higher ed)",
+    "Some Undergrad (higher ed)",
+    "High School Degree (12-13 years)",
+    "Haven't Finished High School (less than 13 years ed)",
+    "Didn't Finish High School (less than 13 years ed)",
+    "Middle School",
+]
+EDUCATION_WEIGHTS = [0.2, 0.1, 0.22, 0.15, 0.15, 0.08, 0.05, 0.05]
+
+# The test has 35 question blocks with 2 or 3 items each, 95 `q*` items in total
+ITEM_COLUMNS = [
+    f"q{block}_{item}"
+    for block in range(1, 36)
+    for item in range(1, 4 if block <= 25 else 3)
+]
+
+
+def make_survey_data(n_rows, random_state=123):
+    """
+    Generate a synthetic data frame with the columns and dtypes of the survey data.
+
+    The demographic columns follow rough marginals of the real data, including
+    missing values in `education`, `Eng_little`, `house_Eng`, `Eng_country_yrs`
+    and `Lived_Eng_per`. The `q*` items are 0/1 answers whose success rate
+    depends on the respondent, and `correct` is the fraction answered correctly.
+
+    Parameters
+    ----------
+    n_rows : int
+        Number of respondents.
+    random_state : int, optional
+        Seed of the generator. Defaults to 123.
+
+    Returns
+    -------
+    pandas.DataFrame
+        The survey frame, with the dtypes of `load_survey_data`.
+
+    Examples
+    --------
+    >>> train_df = make_survey_data(10_000)
+    >>> X, y = train_df.drop(columns="correct"), train_df["correct"]
+    """
+    rng = np.random.default_rng(random_state)
+    df = pd.DataFrame(
+        {
+            "Unnamed: 0": np.arange(n_rows, dtype=float),
+            "id": np.arange(n_rows, dtype=float),
+            "date": "2014-05-29",
+            "time": "01:00:55",
+            "gender": rng.choice(["male", "female", "other"], n_rows, p=[0.45, 0.53, 0.02]),
+            "age": rng.integers(7, 90, n_rows),
+            "natlangs": rng.choice(["English", "German", "Finnish", "Russian"], n_rows),
+            "primelangs": rng.choice(["English", "German", "Finnish", "Russian"], n_rows),
+            "dyslexia": rng.integers(0, 2, n_rows),
+            "psychiatric": rng.integers(0, 2, n_rows),
+            "education": _with_missing(
+                rng, rng.choice(EDUCATION_LEVELS, n_rows, p=EDUCATION_WEIGHTS), 0.03
+            ),
+            "Eng_start": rng.integers(0, 30, n_rows),
+            "Eng_little": _with_missing(
+                rng, rng.choice(["little", "lot", "none"], n_rows), 0.1
+            ),
+            "speaker_cat": rng.choice(
+                ["monoeng", "bieng", "multieng", "noneng"], n_rows, p=[0.3, 0.1, 0.1, 0.5]
+            ),
+            "house_Eng": _with_missing(rng, rng.integers(0, 2, n_rows).astype(float), 0.2),
+            "nat_Eng": rng.integers(0, 2, n_rows),
+            "prime_Eng": rng.integers(0, 2, n_rows),
+            "Eng_country_yrs": _with_missing(rng, rng.random(n_rows) * 40, 0.3),
+            "Lived_Eng_per": _with_missing(rng, rng.random(n_rows), 0.3),
+            "currcountry": rng.choice(["United States", "United Kingdom", "Finland"], n_rows),
+            "countries": rng.choice(["United States", "United Kingdom", "Finland"], n_rows),
+            "already_participated": rng.integers(0, 2, n_rows),
+            "dictionary": rng.integers(0, 2, n_rows),
+            "tests": rng.integers(1, 4, n_rows),
+            "type": rng.choice(["a", "b"], n_rows),
+            "Can_region": None,
+            "Ir_region": None,
+            "US_region": _with_missing(rng, rng.choice(["California", "New York"], n_rows), 0.7),
+            "UK_region": _with_missing(rng, rng.choice(["London", "Scotland"], n_rows), 0.8),
+            "UK_constituency": None,
+        }
+    )
+
+    # Each respondent answers an item correctly with a probability driven by
+    # their English background, so the features carry signal about `correct`
+    # (items are drawn one column at a time to keep millions of rows cheap)
+    ability = (
+        0.75 + 0.1 * df["nat_Eng"] - 0.001 * df["age"] + rng.normal(0, 0.05, n_rows)
+    ).to_numpy(dtype=np.float32)
+    difficulty = rng.normal(0, 0.05, len(ITEM_COLUMNS)).astype(np.float32)
+    items = np.empty((n_rows, len(ITEM_COLUMNS)), dtype=np.int8)
+    for j in range(len(ITEM_COLUMNS)):
+        items[:, j] = rng.random(n_rows, dtype=np.float32) < ability - difficulty[j]
+    item_df = pd.DataFrame(items, columns=ITEM_COLUMNS, index=df.index)
+
+    df["correct"] = items.mean(axis=1)
+    df["elogit"] = np.log(df["correct"] / (1.0001 - df["correct"]))
+    df = pd.concat([df, item_df], axis=1)
+
+    return df.astype(
+        {column: survey_dtype(column) for column in df.columns if survey_dtype(column)}
+    )
+
+
+def write_survey_csv(path, n_rows, chunksize=100_000, random_state=123):
+    """
+    Write a synthetic survey CSV of `n_rows` rows, generated `chunksize` rows at a time.
+
+    Large files (millions of rows) can be written without holding them in memory.
+    Returns the path.
+    """
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    for i, start in enumerate(range(0, n_rows, chunksize)):
+        chunk = make_survey_data(min(chunksize, n_rows - start), random_state + i)
+        chunk["Unnamed: 0"] += start
+        chunk["id"] += start
+        chunk.to_csv(path, mode="w" if i == 0 else "a", header=i == 0, index=False)
+    return path
+
+
+def _with_missing(rng, values, fraction):
+    """Return `values` as an object or float array with about `fraction` of them missing."""
+    values = values.astype(object) if values.dtype.kind in "OU" else values
+    values[rng.random(len(values)) < fraction] = np.nan
+    return values
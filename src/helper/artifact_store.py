@@ -0,0 +1,287 @@
+import json
+import os
+import pickle
+import platform
+import shutil
+import uuid
+import warnings
+from datetime import datetime, timezone
+
+import joblib
+import numpy as np
+import sklearn
+
+from .columnar_cache import file_sha256
+
+MANIFEST_NAME = "manifest.json"
+OBJECT_NAME = "object.joblib"
+LATEST_NAME = "LATEST"
+ARTIFACT_FORMAT = "artifact/1"
+
+
+class Artifact:
+    """
+    One stored version of a model artifact, loaded lazily.
+
+    Reading `manifest` only parses the small JSON file; the object itself is
+    loaded on the first `load()` and then kept. Uncompressed artifacts are
+    loaded with their NumPy arrays memory-mapped, so several processes scoring
+    with the same artifact share one copy of the arrays in the page cache.
+
+    Parameters
+    ----------
+    path : str
+        The artifact version directory, holding the manifest and the object.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._manifest = None
+        self._object = None
+
+    def __repr__(self):
+        return f"Artifact({self.path!r})"
+
+    @property
+    def manifest(self):
+        """The artifact manifest: name, version, data hash, params, metrics and versions."""
+        if self._manifest is None:
+            with open(os.path.join(self.path, MANIFEST_NAME)) as f:
+                self._manifest = json.load(f)
+        return self._manifest
+
+    @property
+    def name(self):
+        return self.manifest["name"]
+
+    @property
+    def version(self):
+        return self.manifest["version"]
+
+    @property
+    def object_path(self):
+        return os.path.join(self.path, OBJECT_NAME)
+
+    def load(self, mmap_mode="r"):
+        """
+        Return the stored object, loading it on the first call.
+
+        Parameters
+        ----------
+        mmap_mode : {"r", "c", None}, optional
+            How joblib memory-maps the NumPy arrays of uncompressed artifacts.
+            Compressed artifacts cannot be mapped and are read into memory.
+            Defaults to "r" (read-only, shared between processes).
+
+        Returns
+        -------
+        object
+            The stored object, ex: a fitted pipeline.
+        """
+        if self._object is None:
+            if self.manifest["sklearn_version"] != sklearn.__version__:
+                warnings.warn(
+                    f"{self.name} {self.version} was saved with scikit-learn "
+                    f"{self.manifest['sklearn_version']} and is loaded with "
+                    f"{sklearn.__version__}"
+                )
+            if self.manifest["compress"]:
+                mmap_mode = None
+            self._object = joblib.load(self.object_path, mmap_mode=mmap_mode)
+        return self._object
+
+    def verify(self):
+        """Raise ValueError if the stored object file changed after it was written."""
+        if file_sha256(self.object_path) != self.manifest["object_sha256"]:
+            raise ValueError(f"{self.object_path} does not match its manifest")
+        return True
+
+
+class ArtifactStore:
+    """
+    A content-addressed, versioned store of fitted models under one directory.
+
+    Each artifact name (ex: "ridge_best_model") is a directory holding one
+    sub-directory per version and a `LATEST` file with the current version. A
+    version directory holds the joblib dump and a `manifest.json` recording
+    the training data hash, the parameters, the metrics and the library
+    versions. The version is the `joblib.hash` of the object together with the
+    recorded training data, parameters and metrics, so an identical model
+    fitted on other data gets its own version and manifest. Versions are
+    written to a temporary directory and renamed into place, so readers never
+    see a partial artifact, and saving the same object and record twice
+    reuses its version.
+
+    Parameters
+    ----------
+    root : str
+        The store directory, ex: "results/models/".
+
+    Examples
+    --------
+    >>> store = ArtifactStore("results/models/")
+    >>> artifact = store.save(
+    ...     "ridge_best_model", best_model, data_path="data/raw/train_data.csv",
+    ...     metrics={"cv_RMSE": -0.0531},
+    ... )
+    >>> store.load("ridge_best_model").predict(X_test)
+    """
+
+    def __init__(self, root):
+        self.root = root
+
+    def save(self, name, obj, data_path=None, params=None, metrics=None, compress=0):
+        """
+        Store a new version of an artifact and make it the latest.
+
+        Parameters
+        ----------
+        name : str
+            The artifact name.
+        obj : object
+            The object to store, ex: a fitted pipeline.
+        data_path : str, optional
+            The training data file the object was fitted on; its SHA-256 is
+            recorded in the manifest. Defaults to None.
+        params : dict, optional
+            Parameters to record. Defaults to the JSON-serialisable values of
+            `obj.get_params()` when the object has it.
+        metrics : dict, optional
+            Metrics to record, ex: cross-validation scores. Defaults to None.
+        compress : int, optional
+            The joblib compression level (0-9). Compressed artifacts are
+            smaller on disk but cannot be memory-mapped. Defaults to 0.
+
+        Returns
+        -------
+        Artifact
+            The stored version.
+        """
+        data_sha256 = file_sha256(data_path) if data_path else None
+        metrics = metrics or {}
+        version = joblib.hash(
+            {
+                "object": obj,
+                "data_path": data_path,
+                "data_sha256": data_sha256,
+                "params": params,
+                "metrics": metrics,
+            }
+        )
+        name_dir = os.path.join(self.root, name)
+        path = os.path.join(name_dir, version)
+        os.makedirs(name_dir, exist_ok=True)
+
+        if not os.path.isdir(path):
+            # Created with the umask permissions (mkdtemp would make it private)
+            tmp_dir = os.path.join(name_dir, f".tmp-{uuid.uuid4().hex}")
+            os.mkdir(tmp_dir)
+            try:
+                object_path = os.path.join(tmp_dir, OBJECT_NAME)
+                joblib.dump(obj, object_path, compress=compress)
+                manifest = {
+                    "format": ARTIFACT_FORMAT,
+                    "name": name,
+                    "version": version,
+                    "created": datetime.now(timezone.utc).isoformat(),
+                    "object_sha256": file_sha256(object_path),
+                    "compress": compress,
+                    "data_path": data_path,
+                    "data_sha256": data_sha256,
+                    "params": _json_params(obj) if params is None else params,
+                    "metrics": metrics,
+                    "sklearn_version": sklearn.__version__,
+                    "numpy_version": np.__version__,
+                    "python_version": platform.python_version(),
+                }
+                with open(os.path.join(tmp_dir, MANIFEST_NAME), "w") as f:
+                    json.dump(manifest, f, indent=1)
+                os.rename(tmp_dir, path)
+            except OSError:
+                # Another writer stored the same version first
+                shutil.rmtree(tmp_dir, ignore_errors=True)
+                if not os.path.isdir(path):
+                    raise
+            except BaseException:
+                shutil.rmtree(tmp_dir, ignore_errors=True)
+                raise
+
+        _write_atomic(os.path.join(name_dir, LATEST_NAME), version)
+        return Artifact(path)
+
+    def get(self, name, version=None):
+        """Return an artifact version without loading it (the latest if not given)."""
+        name_dir = os.path.join(self.root, name)
+        if version is None:
+            with open(os.path.join(name_dir, LATEST_NAME)) as f:
+                version = f.read().strip()
+        path = os.path.join(name_dir, version)
+        if not os.path.isfile(os.path.join(path, MANIFEST_NAME)):
+            raise FileNotFoundError(f"No artifact {name} version {version} in {self.root}")
+        return Artifact(path)
+
+    def load(self, name, version=None, mmap_mode="r"):
+        """Return the stored object of an artifact version (the latest if not given)."""
+        return self.get(name, version).load(mmap_mode=mmap_mode)
+
+    def versions(self, name):
+        """Return every stored version of an artifact, oldest first."""
+        name_dir = os.path.join(self.root, name)
+        if not os.path.isdir(name_dir):
+            return []
+        artifacts = [
+            Artifact(os.path.join(name_dir, entry))
+            for entry in os.listdir(name_dir)
+            if os.path.isfile(os.path.join(name_dir, entry, MANIFEST_NAME))
+        ]
+        return sorted(artifacts, key=lambda artifact: artifact.manifest["created"])
+
+
+def open_artifact(path):
+    """
+    Return the artifact at a path without loading it.
+
+    Parameters
+    ----------
+    path : str
+        Either an artifact name directory (its latest version is used) or a
+        version directory, ex: "results/models/ridge_best_model".
+
+    Returns
+    -------
+    Artifact
+        The artifact version.
+    """
+    path = path.rstrip("/")
+    if os.path.isfile(os.path.join(path, MANIFEST_NAME)):
+        return Artifact(path)
+    root, name = os.path.split(path)
+    return ArtifactStore(root).get(name)
+
+
+def load_model(path, mmap_mode="r"):
+    """Return the object stored at an artifact directory, or in a legacy pickle file."""
+    if os.path.isdir(path):
+        return open_artifact(path).load(mmap_mode=mmap_mode)
+    with open(path, "rb") as f:
+        return pickle.load(f)
+
+
+def _json_params(obj):
+    """Return the parameters of an estimator that can be written to JSON."""
+    if not hasattr(obj, "get_params"):
+        return {}
+    params = {}
+    for key, value in obj.get_params(deep=True).items():
+        if value is None or isinstance(value, (str, bool, int, float, np.number)):
+            value = value.item() if isinstance(value, np.generic) else value
+            # NaN (ex: SimpleImputer.missing_values) is not valid JSON
+            params[key] = "nan" if isinstance(value, float) and np.isnan(value) else value
+    return params
+
+
+def _write_atomic(path, text):
+    tmp_path = f"{path}.tmp-{os.getpid()}"
+    with open(tmp_path, "w") as f:
+        f.write(text)
+    os.replace(tmp_path, path)
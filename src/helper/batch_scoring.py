@@ -0,0 +1,295 @@
+import json
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+import pandas as pd
+
+from .load_survey_data import (
+    MODEL_COLUMNS,
+    TARGET,
+    WIDE_CATEGORICAL_FEATURES,
+    is_item_column,
+    survey_dtype,
+)
+from .scoring_stats import ScoringStats
+
+FEATURE_COLUMNS = [column for column in MODEL_COLUMNS if column != TARGET]
+
+
+def records_to_frame(records):
+    """
+    Build the model input frame from raw survey records.
+
+    Missing feature columns are filled with NA (the preprocessor imputes them),
+    extra columns other than the wide categorical features and q* items
+    (used by some preprocessors) are dropped and the survey dtypes are applied.
+
+    Parameters
+    ----------
+    records : list of dict or pandas.DataFrame
+        The respondents to score.
+
+    Returns
+    -------
+    pandas.DataFrame
+        A frame with the model's feature columns.
+    """
+    df = records if isinstance(records, pd.DataFrame) else pd.DataFrame.from_records(records)
+    columns = FEATURE_COLUMNS + [
+        column
+        for column in df.columns
+        if column in WIDE_CATEGORICAL_FEATURES or is_item_column(column)
+    ]
+    df = df.reindex(columns=columns)
+    return df.astype({column: survey_dtype(column) for column in columns})
+
+
+def iter_record_batches(stream, input_format="ndjson", batch_size=1000):
+    """
+    Read raw survey records from a text stream in batches.
+
+    Parameters
+    ----------
+    stream : file-like
+        A text stream, ex: `sys.stdin` or an open file.
+    input_format : {"ndjson", "csv"}, optional
+        One JSON object per line, or CSV with a header row. Defaults to "ndjson".
+    batch_size : int, optional
+        Maximum number of records per batch. Defaults to 1000.
+
+    Yields
+    ------
+    pandas.DataFrame
+        The raw records of each batch, with every column they contain.
+
+    Examples
+    --------
+    >>> with open("data/raw/test_data.csv") as f:
+    ...     for batch in iter_record_batches(f, "csv", batch_size=5000):
+    ...         predictions = model.predict(records_to_frame(batch))
+    """
+    if input_format == "csv":
+        yield from pd.read_csv(stream, chunksize=batch_size, low_memory=False)
+        return
+    if input_format != "ndjson":
+        raise ValueError(f"Unknown input format: {input_format}")
+
+    records = []
+    for line in stream:
+        if not line.strip():
+            continue
+        records.append(json.loads(line))
+        if len(records) == batch_size:
+            yield pd.DataFrame.from_records(records)
+            records = []
+    if records:
+        yield pd.DataFrame.from_records(records)
+
+
+def score_batch(model, records, stats=None):
+    """
+    Predict one batch of raw records and time it.
+
+    Returns the predictions and the batch latency in seconds.
+    """
+    return _timed_predict(model, records_to_frame(records), stats)
+
+
+def _timed_predict(model, frame, stats=None):
+    """Predict a model input frame and return the predictions and seconds taken."""
+    start = time.perf_counter()
+    predictions = model.predict(frame)
+    seconds = time.perf_counter() - start
+    if stats is not None:
+        stats.record(len(predictions), seconds)
+    return predictions, seconds
+
+
+class MicroBatcher:
+    """
+    Coalesce concurrent scoring requests into batched `predict` calls.
+
+    Requests submitted from any thread are queued; a worker thread takes the
+    first waiting request, waits at most `max_wait_ms` for more, and scores up
+    to `max_batch_size` rows in a single `predict` call. Per-call overhead of the
+    pipeline (validation, column selection) is then paid once per batch
+    instead of once per request.
+
+    Records are converted to the model input frame on `submit`, so a request
+    with invalid values fails on its own before it is queued. If a batched
+    `predict` still raises, each request of the batch is scored separately and
+    only the requests that fail again receive the error.
+
+    Parameters
+    ----------
+    model : estimator
+        The fitted pipeline.
+    max_batch_size : int, optional
+        Maximum number of rows per `predict` call. Defaults to 256.
+    max_wait_ms : float, optional
+        How long the first request of a batch waits for others. Defaults to 5.
+
+    Examples
+    --------
+    >>> with MicroBatcher(model) as batcher:
+    ...     predictions = batcher.submit(records).result()
+    """
+
+    def __init__(self, model, max_batch_size=256, max_wait_ms=5):
+        self.model = model
+        self.max_batch_size = max_batch_size
+        self.max_wait_ms = max_wait_ms
+        self.stats = ScoringStats()
+        self._queue = queue.Queue()
+        self._thread = None
+
+    def start(self):
+        """Start the worker thread."""
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """Score the queued requests and stop the worker thread."""
+        self._queue.put(None)
+        self._thread.join()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    def submit(self, records):
+        """Queue raw records for scoring and return a Future of their predictions."""
+        future = Future()
+        try:
+            frame = records_to_frame(records)
+        except Exception as error:
+            future.set_exception(error)
+            return future
+        if len(frame) == 0:
+            future.set_result(np.empty(0))
+        else:
+            self._queue.put((frame, future))
+        return future
+
+    def _run(self):
+        stopping = False
+        while not stopping:
+            first = self._queue.get()
+            if first is None:
+                break
+            batch, rows = [first], len(first[0])
+            deadline = time.perf_counter() + self.max_wait_ms / 1000
+            while rows < self.max_batch_size:
+                try:
+                    item = self._queue.get(timeout=max(deadline - time.perf_counter(), 0))
+                except queue.Empty:
+                    break
+                if item is None:
+                    stopping = True
+                    break
+                batch.append(item)
+                rows += len(item[0])
+            self._score(batch)
+
+    def _score(self, batch):
+        frames = [frame for frame, _ in batch]
+        try:
+            predictions, _ = _timed_predict(
+                self.model, pd.concat(frames, ignore_index=True), self.stats
+            )
+        except Exception as error:
+            if len(batch) == 1:
+                batch[0][1].set_exception(error)
+                return
+            # Find the failing requests rather than failing the whole batch
+            for frame, future in batch:
+                try:
+                    future.set_result(_timed_predict(self.model, frame, self.stats)[0])
+                except Exception as error:
+                    future.set_exception(error)
+            return
+        bounds = np.cumsum([0] + [len(frame) for frame in frames])
+        for (_, future), start, end in zip(batch, bounds[:-1], bounds[1:]):
+            future.set_result(predictions[start:end])
+
+
+def make_scoring_server(batcher, host="127.0.0.1", port=8000):
+    """
+    Create an HTTP server that scores respondents through a `MicroBatcher`.
+
+    Endpoints:
+
+    - `POST /predict` with a JSON record or list of records returns
+      `{"predictions": [...]}`, status 400 for invalid records and 500 when
+      the model fails.
+    - `GET /stats` returns the batcher's latency and throughput counters.
+    - `GET /health` returns `{"status": "ok"}`.
+
+    Parameters
+    ----------
+    batcher : MicroBatcher
+        The started batcher scoring the requests.
+    host : str, optional
+        Interface to listen on. Defaults to "127.0.0.1".
+    port : int, optional
+        Port to listen on, 0 for any free port. Defaults to 8000.
+
+    Returns
+    -------
+    http.server.ThreadingHTTPServer
+        The server; call `serve_forever` to run it.
+    """
+
+    class ScoringHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path == "/stats":
+                self._reply(200, batcher.stats.as_dict())
+            elif self.path == "/health":
+                self._reply(200, {"status": "ok"})
+            else:
+                self._reply(404, {"error": f"Unknown path {self.path}"})
+
+        def do_POST(self):
+            if self.path != "/predict":
+                self._reply(404, {"error": f"Unknown path {self.path}"})
+                return
+            try:
+                body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+            except (TypeError, ValueError) as error:
+                self._reply(400, {"error": f"Invalid JSON: {error}"})
+                return
+            records = body if isinstance(body, list) else [body]
+            if not all(isinstance(record, dict) for record in records):
+                self._reply(400, {"error": "Each record must be a JSON object"})
+                return
+            try:
+                predictions = batcher.submit(records).result()
+            except (ValueError, KeyError) as error:
+                # Invalid record values, ex: a string where a number is expected
+                self._reply(400, {"error": str(error)})
+                return
+            except Exception as error:
+                self._reply(500, {"error": f"Scoring failed: {error}"})
+                return
+            self._reply(200, {"predictions": predictions.tolist()})
+
+        def _reply(self, status, payload):
+            body = json.dumps(payload).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            # Request logging per prediction would dominate the latency
+            pass
+
+    return ThreadingHTTPServer((host, port), ScoringHandler)
@@ -0,0 +1,159 @@
+import itertools
+
+import numpy as np
+import pandas as pd
+
+
+class BinCounts:
+    """
+    Histogram and 2D bin counts of numeric columns, computed in one vectorized pass.
+
+    Each column is cut into `bins` equal-width bins over its range, and each
+    pair of columns in `pairs` into a `bins_2d` x `bins_2d` grid. The counts
+    of every column and pair are added with a single `numpy.bincount` per
+    chunk, so the data is read once whatever the number of plots. Missing
+    values and values outside a column's range are not counted.
+
+    Since the bin edges are fixed up front, counts of separate chunks can be
+    added with `update` or `merge`, so a file can be binned chunk by chunk
+    with flat memory. The bins match those of `numpy.histogram` and
+    `numpy.histogram2d` (the last bin includes its right edge).
+
+    Parameters
+    ----------
+    ranges : dict
+        The (min, max) range of each column to count, in order.
+    bins : int, optional
+        Number of bins of the 1D histograms. Defaults to 50.
+    bins_2d : int, optional
+        Number of bins along each axis of the 2D counts. Defaults to `bins`.
+    pairs : list of tuple of str or bool, optional
+        The (x, y) column pairs to count in 2D, or True for every pair of
+        columns. Defaults to None, in which case no 2D counts are kept.
+
+    Examples
+    --------
+    >>> counts = BinCounts.from_frame(df, ["age", "Eng_start"], bins=30, pairs=True)
+    >>> hist, edges = counts.histogram("age")
+    >>> grid, x_edges, y_edges = counts.histogram2d("Eng_start", "age")
+
+    Streaming a file with known ranges:
+
+    >>> counts = BinCounts({"age": (0, 100), "Eng_start": (0, 80)})
+    >>> for chunk in load_survey_data("data/raw/full_dataset.csv", chunksize=100_000):
+    ...     counts.update(chunk)
+    """
+
+    def __init__(self, ranges, bins=50, bins_2d=None, pairs=None):
+        self.columns = list(ranges)
+        self.ranges = np.array([_bin_range(*ranges[column]) for column in self.columns], dtype=float)
+        self.bins = bins
+        self.bins_2d = bins_2d or bins
+        if pairs is True:
+            pairs = list(itertools.combinations(self.columns, 2))
+        self.pairs = [tuple(pair) for pair in pairs or []]
+        for column in itertools.chain.from_iterable(self.pairs):
+            if column not in ranges:
+                raise ValueError(f"Column {column} of pairs has no range")
+
+        self.edges_1d = _edges(self.ranges, self.bins)
+        self.edges_2d = _edges(self.ranges, self.bins_2d)
+        self.counts = np.zeros((len(self.columns), self.bins), dtype=np.int64)
+        self.counts_2d = np.zeros((len(self.pairs), self.bins_2d, self.bins_2d), dtype=np.int64)
+
+    @classmethod
+    def from_frame(cls, df, columns=None, bins=50, bins_2d=None, pairs=None, chunksize=1_000_000):
+        """
+        Return the bin counts of columns of a DataFrame, over their min-max range.
+
+        The rows are counted `chunksize` at a time to bound the temporary
+        arrays. `columns` defaults to the numeric columns of `df`.
+        """
+        if not isinstance(df, pd.DataFrame):
+            raise TypeError("Input must be a pandas DataFrame")
+        if columns is None:
+            columns = df.select_dtypes(include="number").columns.tolist()
+        ranges = {column: (df[column].min(), df[column].max()) for column in columns}
+        counts = cls(ranges, bins=bins, bins_2d=bins_2d, pairs=pairs)
+        for start in range(0, len(df), chunksize):
+            counts.update(df.iloc[start:start + chunksize])
+        return counts
+
+    def update(self, df):
+        """Add the counts of the rows of a DataFrame chunk, and return self."""
+        values = df[self.columns].to_numpy(dtype=float, na_value=np.nan)
+        n_columns = len(self.columns)
+
+        index, valid = _bin_index(values, self.ranges, self.edges_1d, self.bins)
+        offsets = np.arange(n_columns) * self.bins
+        self.counts += np.bincount(
+            (index + offsets)[valid], minlength=n_columns * self.bins
+        ).reshape(n_columns, self.bins)
+
+        if self.pairs:
+            index, valid = _bin_index(values, self.ranges, self.edges_2d, self.bins_2d)
+            x = [self.columns.index(x) for x, _ in self.pairs]
+            y = [self.columns.index(y) for _, y in self.pairs]
+            cells = self.bins_2d * self.bins_2d
+            codes = index[:, x] * self.bins_2d + index[:, y] + np.arange(len(self.pairs)) * cells
+            self.counts_2d += np.bincount(
+                codes[valid[:, x] & valid[:, y]], minlength=len(self.pairs) * cells
+            ).reshape(len(self.pairs), self.bins_2d, self.bins_2d)
+        return self
+
+    def merge(self, other):
+        """Add the counts of another `BinCounts` with the same bins, and return self."""
+        if (
+            self.columns != other.columns
+            or self.pairs != other.pairs
+            or (self.bins, self.bins_2d) != (other.bins, other.bins_2d)
+            or not np.array_equal(self.ranges, other.ranges)
+        ):
+            raise ValueError("Only counts with the same columns, pairs and bins can be merged")
+        self.counts += other.counts
+        self.counts_2d += other.counts_2d
+        return self
+
+    def histogram(self, column):
+        """Return the counts and bin edges of a column, like `numpy.histogram`."""
+        i = self.columns.index(column)
+        return self.counts[i], self.edges_1d[i]
+
+    def histogram2d(self, x, y):
+        """Return the counts (indexed [x bin, y bin]) and bin edges of a pair of columns."""
+        if (x, y) in self.pairs:
+            counts = self.counts_2d[self.pairs.index((x, y))]
+        elif (y, x) in self.pairs:
+            counts = self.counts_2d[self.pairs.index((y, x))].T
+        else:
+            raise KeyError(f"The pair ({x}, {y}) was not counted")
+        return counts, self.edges_2d[self.columns.index(x)], self.edges_2d[self.columns.index(y)]
+
+
+def _bin_range(low, high):
+    """Return the range of a column's bins, widened as numpy does when it is empty."""
+    if not (np.isfinite(low) and np.isfinite(high)):
+        return 0.0, 1.0
+    if low == high:
+        return low - 0.5, high + 0.5
+    return low, high
+
+
+def _edges(ranges, bins):
+    """Return the equal-width bin edges of each range, one row per column."""
+    return np.array([np.linspace(low, high, bins + 1) for low, high in ranges]).reshape(len(ranges), bins + 1)
+
+
+def _bin_index(values, ranges, edges, bins):
+    """Return the bin of each value and whether it is counted, as `numpy.histogram` bins it."""
+    low, high = ranges[:, 0], ranges[:, 1]
+    with np.errstate(invalid="ignore"):
+        valid = (values >= low) & (values <= high)
+    index = np.where(valid, (values - low) * (bins / (high - low)), 0).astype(np.intp)
+    index[index == bins] -= 1
+
+    # The scaled values can land one bin off an edge through rounding
+    columns = np.arange(values.shape[1])
+    index[valid & (values < edges[columns, index])] -= 1
+    index[valid & (values >= edges[columns, index + 1]) & (index != bins - 1)] += 1
+    return index, valid
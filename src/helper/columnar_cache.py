@@ -0,0 +1,230 @@
+import hashlib
+import os
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from .load_survey_data import load_survey_data, survey_dtype
+
+SOURCE_HASH_KEY = b"source_sha256"
+SOURCE_SIZE_KEY = b"source_size"
+SOURCE_MTIME_KEY = b"source_mtime_ns"
+
+# Arrow types an inferred column is widened to when a later chunk does not fit
+_WIDER_TYPES = {pa.int64(): pa.float64(), pa.float64(): pa.string(), pa.bool_(): pa.string()}
+
+
+def file_sha256(path, chunk_size=1024 * 1024):
+    """Return the SHA-256 hex digest of a file, read in chunks."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(chunk_size), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def cache_path_for(csv_path):
+    """Return the Parquet cache path that sits next to a CSV file."""
+    return os.path.splitext(csv_path)[0] + ".parquet"
+
+
+def write_parquet_cache(csv_path, chunksize=100_000):
+    """
+    Write a typed Parquet copy of a survey CSV, keyed on the CSV content hash.
+
+    The CSV is streamed in chunks, so memory use is bounded by `chunksize`
+    rather than the file size. The size, modification time and SHA-256 of the
+    CSV are stored in the Parquet schema metadata and checked by
+    `read_parquet_cache`, so the cache is ignored once the CSV changes. The
+    file is written to a temporary path and renamed into place, so readers
+    never see a partial cache.
+
+    Columns without a survey dtype keep the dtype pandas infers for the whole
+    file: they are typed from the first chunk, and if a later chunk does not
+    fit (ex: a fractional value in an integer column) the column is widened
+    and the cache written again.
+
+    Parameters
+    ----------
+    csv_path : str
+        Path to the survey CSV file.
+    chunksize : int, optional
+        Number of rows converted per chunk. Defaults to 100,000.
+
+    Returns
+    -------
+    str
+        Path of the written Parquet file.
+
+    Examples
+    --------
+    >>> write_parquet_cache("data/raw/train_data.csv")
+    'data/raw/train_data.parquet'
+    """
+    parquet_path = cache_path_for(csv_path)
+    tmp_path = parquet_path + ".tmp"
+    metadata = _source_metadata(csv_path)
+    metadata[SOURCE_HASH_KEY] = file_sha256(csv_path).encode()
+
+    widened = {}
+    while True:
+        try:
+            written = _write_chunks(csv_path, tmp_path, chunksize, metadata, widened)
+            break
+        except _ColumnMismatch as e:
+            widened[e.column] = _WIDER_TYPES[e.arrow_type]
+
+    if not written:
+        # An empty CSV has no chunks; there is nothing worth caching
+        return None
+    os.replace(tmp_path, parquet_path)
+    return parquet_path
+
+
+def read_parquet_cache(csv_path, columns=None, chunksize=None, verify=False):
+    """
+    Read the Parquet cache of a survey CSV if it exists and is up to date.
+
+    The CSV is only hashed when its size matches the one recorded in the cache
+    but its modification time does not (ex: a fresh copy of the same file), or
+    when `verify` is True; otherwise reading the cache never reads the CSV.
+
+    Parameters
+    ----------
+    csv_path : str
+        Path to the survey CSV file the cache was built from.
+    columns : list of str or callable, optional
+        The columns to read, as in `load_survey_data`. Defaults to None.
+    chunksize : int, optional
+        If given, return an iterator of DataFrames with at most `chunksize` rows.
+    verify : bool, optional
+        Whether to always compare the SHA-256 of the CSV with the cache.
+        Defaults to False.
+
+    Returns
+    -------
+    pandas.DataFrame, iterator of pandas.DataFrame or None
+        The cached data with survey dtypes restored, or None when there is no
+        cache or it was not built from the current CSV.
+    """
+    parquet_path = cache_path_for(csv_path)
+    if not (os.path.exists(parquet_path) and os.path.exists(csv_path)):
+        return None
+
+    parquet_file = pq.ParquetFile(parquet_path, memory_map=True)
+    metadata = parquet_file.schema_arrow.metadata or {}
+    source = _source_metadata(csv_path)
+    if metadata.get(SOURCE_SIZE_KEY) != source[SOURCE_SIZE_KEY]:
+        return None
+    if verify or metadata.get(SOURCE_MTIME_KEY) != source[SOURCE_MTIME_KEY]:
+        if metadata.get(SOURCE_HASH_KEY) != file_sha256(csv_path).encode():
+            return None
+
+    names = parquet_file.schema_arrow.names
+    if columns is None:
+        selected = names
+    elif callable(columns):
+        selected = [column for column in names if columns(column)]
+    else:
+        wanted = set(columns)
+        selected = [column for column in names if column in wanted]
+
+    if chunksize is None:
+        table = pq.read_table(parquet_path, columns=selected, memory_map=True)
+        return _restore_dtypes(table)
+    return (
+        _restore_dtypes(pa.Table.from_batches([batch]))
+        for batch in parquet_file.iter_batches(batch_size=chunksize, columns=selected)
+    )
+
+
+class _ColumnMismatch(Exception):
+    """A chunk column that does not fit the Arrow type chosen from earlier chunks."""
+
+    def __init__(self, column, arrow_type):
+        super().__init__(f"Column {column!r} does not fit {arrow_type}")
+        self.column = column
+        self.arrow_type = arrow_type
+
+
+def _source_metadata(csv_path):
+    """Return the size and modification time of the CSV as Parquet metadata."""
+    stat = os.stat(csv_path)
+    return {
+        SOURCE_SIZE_KEY: str(stat.st_size).encode(),
+        SOURCE_MTIME_KEY: str(stat.st_mtime_ns).encode(),
+    }
+
+
+def _write_chunks(csv_path, tmp_path, chunksize, metadata, widened):
+    """Write the CSV chunks to `tmp_path`; return False if there were none."""
+    writer = None
+    try:
+        for chunk in load_survey_data(csv_path, chunksize=chunksize, use_cache=False):
+            if writer is None:
+                schema = _arrow_schema(chunk, widened).with_metadata(metadata)
+                writer = pq.ParquetWriter(tmp_path, schema)
+            writer.write_table(_to_arrow(chunk, schema))
+    finally:
+        if writer is not None:
+            writer.close()
+    return writer is not None
+
+
+def _arrow_schema(chunk, widened=None):
+    """Build a chunk-independent Arrow schema for a survey DataFrame."""
+    widened = widened or {}
+    fields = []
+    for column, dtype in chunk.dtypes.items():
+        if column in widened:
+            arrow_type = widened[column]
+        elif isinstance(dtype, pd.CategoricalDtype) or dtype == object:
+            arrow_type = pa.string()
+        elif dtype.name == "Int8":
+            arrow_type = pa.int8()
+        elif dtype.name == "float32":
+            arrow_type = pa.float32()
+        elif dtype.kind in "iu":
+            # Nullable in Arrow, so later chunks with NAs still fit; it reads
+            # back as float64 when there are NAs, like pandas infers it
+            arrow_type = pa.int64()
+        elif dtype.kind == "b":
+            arrow_type = pa.bool_()
+        else:
+            arrow_type = pa.float64()
+        fields.append(pa.field(column, arrow_type))
+    return pa.schema(fields)
+
+
+def _to_arrow(chunk, schema):
+    """Convert a chunk to an Arrow table of `schema`, categoricals as plain strings."""
+    arrays = []
+    for field in schema:
+        column = chunk[field.name]
+        if isinstance(column.dtype, pd.CategoricalDtype):
+            column = column.astype(object)
+        if field.type == pa.string() and column.dtype != object:
+            column = column.map(str, na_action="ignore").astype(object)
+        try:
+            arrays.append(pa.array(column, type=field.type, from_pandas=True))
+        except (pa.ArrowInvalid, pa.ArrowTypeError):
+            if field.type not in _WIDER_TYPES:
+                raise
+            raise _ColumnMismatch(field.name, field.type)
+    return pa.Table.from_arrays(arrays, schema=schema)
+
+
+def _restore_dtypes(table):
+    """Convert an Arrow table back to a DataFrame with the survey dtypes."""
+    df = table.to_pandas(types_mapper={pa.int8(): pd.Int8Dtype()}.get)
+    for column in df.columns[df.dtypes == object]:
+        # Arrow nulls come back as None; read_csv gives NaN
+        df[column] = df[column].where(df[column].notna(), np.nan)
+    dtypes = {
+        column: survey_dtype(column)
+        for column in df.columns
+        if survey_dtype(column) == "category"
+    }
+    return df.astype(dtypes)
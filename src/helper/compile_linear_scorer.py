@@ -0,0 +1,212 @@
+import numbers
+
+import numpy as np
+from sklearn.compose import ColumnTransformer
+from sklearn.impute import SimpleImputer
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import OneHotEncoder, OrdinalEncoder, StandardScaler
+
+from .education_bucketer import EducationBucketer
+from .linear_scorer import LinearScorer
+from .precision import Float32
+
+
+def compile_linear_pipeline(pipe):
+    """
+    Fold a fitted preprocessing + linear model pipeline into a `LinearScorer`.
+
+    The scaler means and scales and the imputation fill values of numeric
+    columns are folded into one weight per column and the intercept. Each
+    categorical column becomes a table of the summed model coefficients of its
+    one-hot or ordinal outputs per category. The scorer then predicts exactly
+    what `pipe.predict` does (up to floating point rounding) with a handful
+    of NumPy operations.
+
+    Supported steps are those of the preprocessor built in `english_score_eda.py`:
+    `SimpleImputer`, `StandardScaler`, `OneHotEncoder`, `OrdinalEncoder`,
+    `EducationBucketer`, "passthrough", a dropped remainder and the `Float32`
+    cast (dense or sparse), followed by a linear model with
+    `coef_` and `intercept_` such as Ridge or Lasso.
+
+    Parameters
+    ----------
+    pipe : Pipeline
+        The fitted pipeline of a ColumnTransformer and a linear regression model.
+
+    Returns
+    -------
+    LinearScorer
+        The NumPy-only scorer.
+
+    Raises
+    ------
+    ValueError
+        If the pipeline contains a step that cannot be folded.
+
+    Examples
+    --------
+    >>> scorer = compile_linear_pipeline(ridge_best_model)
+    >>> scorer.save("results/models/ridge_best_model.json")
+    """
+    if not isinstance(pipe, Pipeline) or len(pipe.steps) != 2:
+        raise ValueError("Expected a fitted pipeline of a ColumnTransformer and a linear model")
+    preprocessor, model = pipe.steps[0][1], pipe.steps[-1][1]
+    if not isinstance(preprocessor, ColumnTransformer):
+        raise ValueError(f"Cannot compile preprocessor {type(preprocessor).__name__}")
+    if np.ndim(model.coef_) > 1 and np.shape(model.coef_)[0] > 1:
+        raise ValueError("Only single-output linear models can be compiled")
+    coef = np.ravel(model.coef_).astype(np.float64)
+
+    intercept = float(model.intercept_)
+    numeric, lookup = [], []
+    for name, transformer, columns in preprocessor.transformers_:
+        if transformer == "drop" or len(columns) == 0:
+            continue
+        out = preprocessor.output_indices_[name]
+        steps = _steps(transformer)
+        group_coef = coef[out]
+        if steps and isinstance(steps[-1], (OneHotEncoder, OrdinalEncoder)):
+            lookup.extend(_compile_categorical(steps, columns, group_coef, preprocessor))
+        else:
+            group_numeric, offset = _compile_numeric(steps, columns, group_coef, preprocessor)
+            numeric.extend(group_numeric)
+            intercept += offset
+    return LinearScorer(intercept, numeric, lookup)
+
+
+def _steps(transformer):
+    """Return the steps of a ColumnTransformer entry as a list of estimators, without no-op steps."""
+    if transformer == "passthrough":
+        return []
+    steps = [step for _, step in transformer.steps] if isinstance(transformer, Pipeline) else [transformer]
+    # Float32 only changes the matrix format and dtype
+    return [step for step in steps if step != "passthrough" and not isinstance(step, Float32)]
+
+
+def _column_names(columns, preprocessor):
+    """Return the input column names of a ColumnTransformer entry."""
+    names = np.asarray(getattr(preprocessor, "feature_names_in_", []))
+    return [names[c] if isinstance(c, numbers.Integral) else c for c in columns]
+
+
+def _compile_numeric(steps, columns, coef, preprocessor):
+    """Fold imputation and scaling of numeric columns into weights and an offset."""
+    n_columns = len(columns)
+    fill = np.full(n_columns, np.nan)
+    mean, scale = np.zeros(n_columns), np.ones(n_columns)
+    for i, step in enumerate(steps):
+        if isinstance(step, SimpleImputer) and _is_nan_imputer(step) and i == 0:
+            fill = np.asarray(step.statistics_, dtype=np.float64)
+        elif isinstance(step, StandardScaler):
+            if step.with_mean:
+                mean = step.mean_
+            if step.with_std:
+                scale = step.scale_
+        else:
+            raise ValueError(f"Cannot compile numeric step {type(step).__name__}")
+
+    weight = coef / scale
+    offset = -float(np.sum(weight * mean))
+    numeric = [
+        {"column": column, "weight": w, "fill": None if np.isnan(f) else f}
+        for column, w, f in zip(_column_names(columns, preprocessor), weight, fill)
+    ]
+    return numeric, offset
+
+
+def _compile_categorical(steps, columns, coef, preprocessor):
+    """Build one lookup table of model contributions per categorical column."""
+    *prefix, encoder = steps
+    fill, bucketer = [None] * len(columns), None
+    for step in prefix:
+        if isinstance(step, SimpleImputer) and _is_nan_imputer(step):
+            fill = list(step.statistics_)
+        elif isinstance(step, EducationBucketer) and len(columns) == 1:
+            bucketer = step
+        else:
+            raise ValueError(f"Cannot compile categorical step {type(step).__name__}")
+
+    if isinstance(encoder, OneHotEncoder):
+        if getattr(encoder, "_infrequent_enabled", False):
+            raise ValueError("Cannot compile OneHotEncoder with infrequent categories")
+        tables = _one_hot_tables(encoder, coef)
+    else:
+        tables = _ordinal_tables(encoder, coef)
+
+    lookup = []
+    for column, (categories, values, unknown), fill_value in zip(
+        _column_names(columns, preprocessor), tables, fill
+    ):
+        table = dict(zip(categories, values))
+        if bucketer is not None:
+            # Each level maps to its bucket code; anything else, missing included,
+            # to the "Others" code
+            codes = range(len(bucketer.categories))
+            other = table.get(len(bucketer.categories), unknown)
+            keys, key_values = list(bucketer.categories), [table.get(code, unknown) for code in codes]
+            missing = unknown = other
+        else:
+            keys = [key for key in categories if not _is_missing(key)]
+            key_values = [table[key] for key in keys]
+            if fill_value is not None:
+                missing = table.get(fill_value, unknown)
+            else:
+                missing = next(
+                    (value for key, value in table.items() if _is_missing(key)), unknown
+                )
+        key_type = "float" if all(isinstance(k, numbers.Number) for k in keys) else "str"
+        lookup.append(
+            {
+                "column": column,
+                "key_type": key_type,
+                "keys": [float(k) if key_type == "float" else str(k) for k in keys],
+                "values": [float(v) for v in key_values],
+                "missing": _as_optional(missing),
+                "unknown": _as_optional(unknown),
+            }
+        )
+    return lookup
+
+
+def _one_hot_tables(encoder, coef):
+    """Return (categories, contributions, unknown contribution) for each one-hot encoded column."""
+    tables, start = [], 0
+    drop_idx = encoder.drop_idx_
+    if drop_idx is None:
+        drop_idx = [None] * len(encoder.categories_)
+    for categories, dropped in zip(encoder.categories_, drop_idx):
+        values = np.zeros(len(categories))
+        kept = [k for k in range(len(categories)) if k != dropped]
+        values[kept] = coef[start : start + len(kept)]
+        start += len(kept)
+        unknown = 0.0 if encoder.handle_unknown != "error" else np.nan
+        tables.append((list(categories), values, unknown))
+    return tables
+
+
+def _ordinal_tables(encoder, coef):
+    """Return (categories, contributions, unknown contribution) for each ordinal encoded column."""
+    tables = []
+    for j, categories in enumerate(encoder.categories_):
+        values = coef[j] * np.arange(len(categories), dtype=np.float64)
+        unknown = np.nan
+        if encoder.handle_unknown == "use_encoded_value":
+            unknown = coef[j] * encoder.unknown_value
+        tables.append((list(categories), values, unknown))
+    return tables
+
+
+def _is_nan_imputer(imputer):
+    if imputer.add_indicator:
+        raise ValueError("Cannot compile SimpleImputer with add_indicator=True")
+    if not _is_missing(imputer.missing_values):
+        raise ValueError("Cannot compile SimpleImputer with non-NaN missing_values")
+    return True
+
+
+def _is_missing(value):
+    return value is None or (isinstance(value, float) and np.isnan(value))
+
+
+def _as_optional(value):
+    return None if _is_missing(float(value)) else float(value)
@@ -0,0 +1,219 @@
+import os
+import time
+
+import numpy as np
+from joblib import Parallel, cpu_count, delayed
+from sklearn.base import clone, is_classifier
+from sklearn.model_selection import ParameterGrid, ParameterSampler, check_cv
+
+from .cv_results import build_cv_results, fit_and_score, resolve_scorers
+from .load_survey_data import frame_memory_mb
+from .shared_frame import SharedFrame
+
+# Rough peak memory of one fold task relative to the size of the training data:
+# the row copies of the split plus the preprocessed matrix and model
+TASK_MEMORY_FACTOR = 4
+
+
+def fit_searches_concurrently(
+    searches, X, y, n_jobs=-1, max_memory_gb=None, verbose=0
+):
+    """
+    Fit several searches with one shared worker pool.
+
+    Every (search, candidate, fold) fit of all searches is submitted to a single
+    joblib pool, so workers stay busy until the very last fit instead of idling
+    at the tail of each search. The refits of the best candidates then run
+    together in the same pool. Each search is left fitted with `cv_results_`,
+    `best_index_`, `best_params_`, `best_score_`, `best_estimator_`,
+    `n_splits_` and `refit_time_`, as if its own `fit` had been called.
+
+    A DataFrame `X` is sent whole to every (search, candidate, fold) task.
+    joblib memory-maps its large numeric blocks for the workers instead of
+    copying them, but categorical and object columns are pickled again for
+    every task. The data can instead be given as `SharedFrame` handles: each
+    task is then sent the handle and the split indices, and the workers
+    attach to the memory-mapped files.
+
+    Parameters
+    ----------
+    searches : list of RandomizedSearchCV or GridSearchCV
+        The unfitted searches. Their estimator, parameter space, cv, scoring,
+        refit, random_state and return_train_score settings are used; their own
+        `n_jobs` is ignored.
+    X : pandas.DataFrame or SharedFrame
+        The training data.
+    y : pandas.Series or SharedFrame
+        The training target.
+    n_jobs : int, optional
+        Number of workers in the shared pool, -1 for all cores. Defaults to -1.
+    max_memory_gb : float, optional
+        Memory budget for the workers. The number of workers is lowered so the
+        estimated footprint of the running fits stays within this budget and the
+        memory currently available. Defaults to None (no limit).
+    verbose : int, optional
+        Verbosity of the joblib pool. Defaults to 0.
+
+    Returns
+    -------
+    list
+        The fitted searches.
+
+    Examples
+    --------
+    >>> fit_searches_concurrently([ridge_search, lasso_search], X_train, y_train, n_jobs=32)
+    >>> top_models_table(ridge_search, 5, scoring="RMSE")
+    >>> with SharedFrame.dump(X_train) as shared_X, SharedFrame.dump(y_train) as shared_y:
+    ...     fit_searches_concurrently([ridge_search], shared_X, shared_y)
+    """
+    if max_memory_gb is not None:
+        n_jobs = memory_limited_n_jobs(
+            n_jobs, TASK_MEMORY_FACTOR * _data_memory_mb(X), max_memory_gb * 1024
+        )
+
+    plans = [_plan_search(search, _attach(X), _attach(y)) for search in searches]
+    tasks = [
+        (s, i, k)
+        for s, plan in enumerate(plans)
+        for i in range(len(plan["candidates"]))
+        for k in range(len(plan["splits"]))
+    ]
+
+    with Parallel(n_jobs=n_jobs, verbose=verbose) as parallel:
+        results = parallel(
+            delayed(_fit_and_score)(
+                searches[s].estimator,
+                X,
+                y,
+                *plans[s]["splits"][k],
+                plans[s]["candidates"][i],
+                plans[s]["scorers"],
+                searches[s].return_train_score,
+            )
+            for s, i, k in tasks
+        )
+
+        for (s, i, k), result in zip(tasks, results):
+            _store_result(plans[s], i, k, result)
+        for search, plan in zip(searches, plans):
+            _set_cv_results(search, plan)
+
+        refitted = [search for search in searches if search.refit]
+        best_estimators = parallel(
+            delayed(_refit)(search.estimator, search.best_params_, X, y)
+            for search in refitted
+        )
+        for search, (estimator, refit_time) in zip(refitted, best_estimators):
+            search.best_estimator_ = estimator
+            search.refit_time_ = refit_time
+
+    return searches
+
+
+def memory_limited_n_jobs(n_jobs, task_memory_mb, max_memory_mb):
+    """
+    Return the number of workers whose fits fit in the memory budget.
+
+    Parameters
+    ----------
+    n_jobs : int
+        The requested number of workers, -1 for all cores.
+    task_memory_mb : float
+        Estimated peak memory of one fit in megabytes.
+    max_memory_mb : float
+        The memory budget in megabytes. It is further capped by the memory
+        currently available on the machine.
+
+    Returns
+    -------
+    int
+        At least 1 and at most the requested number of workers.
+    """
+    n_jobs = cpu_count() if n_jobs is None or n_jobs < 0 else n_jobs
+    available = available_memory_mb()
+    if available is not None:
+        max_memory_mb = min(max_memory_mb, available)
+    return int(max(1, min(n_jobs, max_memory_mb // max(task_memory_mb, 1))))
+
+
+def available_memory_mb():
+    """Return the physical memory currently available in megabytes, or None if unknown."""
+    try:
+        return os.sysconf("SC_AVPHYS_PAGES") * os.sysconf("SC_PAGE_SIZE") / 1024**2
+    except (ValueError, OSError, AttributeError):
+        return None
+
+
+def _attach(data):
+    """Return the data of a `SharedFrame` handle, or `data` itself."""
+    return data.load() if isinstance(data, SharedFrame) else data
+
+
+def _data_memory_mb(X):
+    """Return the size of the training data in MB."""
+    return X.nbytes / 1024**2 if isinstance(X, SharedFrame) else frame_memory_mb(X)
+
+
+def _fit_and_score(estimator, X, y, *args):
+    """`fit_and_score`, attaching to shared data first."""
+    return fit_and_score(estimator, _attach(X), _attach(y), *args)
+
+
+def _plan_search(search, X, y):
+    """Collect the candidates, splits, scorers and score arrays of one search."""
+    if hasattr(search, "param_grid"):
+        candidates = list(ParameterGrid(search.param_grid))
+    else:
+        candidates = list(
+            ParameterSampler(
+                search.param_distributions, search.n_iter, random_state=search.random_state
+            )
+        )
+    cv = check_cv(search.cv, y, classifier=is_classifier(search.estimator))
+    splits = list(cv.split(X, y))
+    scorers = resolve_scorers(search.scoring)
+    shape = (len(candidates), len(splits))
+    return {
+        "candidates": candidates,
+        "splits": splits,
+        "scorers": scorers,
+        "test": {name: np.full(shape, np.nan) for name in scorers},
+        "train": {name: np.full(shape, np.nan) for name in scorers},
+        "fit_time": np.full(shape, np.nan),
+        "score_time": np.full(shape, np.nan),
+    }
+
+
+def _store_result(plan, i, k, result):
+    """Store the scores and times of candidate `i` on split `k`."""
+    for name in plan["scorers"]:
+        plan["test"][name][i, k] = result["test"][name]
+        if result["train"]:
+            plan["train"][name][i, k] = result["train"][name]
+    plan["fit_time"][i, k] = result["fit_time"]
+    plan["score_time"][i, k] = result["score_time"]
+
+
+def _set_cv_results(search, plan):
+    """Set the fitted search attributes from the collected scores."""
+    search.cv_results_ = build_cv_results(
+        plan["candidates"],
+        plan["test"],
+        plan["fit_time"],
+        plan["score_time"],
+        plan["train"] if search.return_train_score else None,
+    )
+    search.n_splits_ = len(plan["splits"])
+    search.multimetric_ = isinstance(search.scoring, dict)
+    if search.refit:
+        metric = search.refit if isinstance(search.refit, str) else "score"
+        search.best_index_ = int(np.argmin(search.cv_results_["rank_test_" + metric]))
+        search.best_params_ = plan["candidates"][search.best_index_]
+        search.best_score_ = search.cv_results_["mean_test_" + metric][search.best_index_]
+
+
+def _refit(estimator, params, X, y):
+    """Fit a clone of `estimator` with `params` on all rows and time it."""
+    start = time.time()
+    estimator = clone(estimator).set_params(**params).fit(_attach(X), _attach(y))
+    return estimator, time.time() - start
@@ -1,15 +1,178 @@
+import numpy as np
 import pandas as pd
 
-def pearson_correlation_matrix(df, colormap='seismic'):
+
+class CorrelationAccumulator:
+    """
+    Pearson correlations of numeric columns, accumulated chunk by chunk in one pass.
+
+    For every pair of columns the accumulator keeps the number of rows where
+    both are present, the mean of each over those rows and their co-moment,
+    in float64. Each chunk is centered on its own means and combined with the
+    running totals by the pairwise update of Chan et al. (Welford's method
+    for batches), so the result does not lose precision on large offsets.
+    Partial accumulators, e.g. built by parallel workers on separate chunks,
+    are combined with `merge`.
+
+    Parameters
+    ----------
+    columns : list of str, optional
+        The columns to correlate. Defaults to None, in which case the numeric
+        columns of the first chunk are used.
+
+    Examples
+    --------
+    >>> accumulator = CorrelationAccumulator()
+    >>> for chunk in load_survey_data("data/raw/train_data.csv", chunksize=100_000):
+    ...     accumulator.update(chunk)
+    >>> accumulator.correlation()
+    """
+
+    def __init__(self, columns=None):
+        self.columns = None
+        if columns is not None:
+            self._start(list(columns))
+
+    def _start(self, columns):
+        k = len(columns)
+        self.columns = columns
+        self.n_rows = 0
+        self.n_missing = np.zeros(k, dtype=np.int64)
+        self.minimum = np.full(k, np.inf)
+        self.maximum = np.full(k, -np.inf)
+        # [i, j]: rows where columns i and j are both present, mean of column i
+        # over them, sum of squared deviations of i and co-moment of i and j
+        self.count = np.zeros((k, k), dtype=np.int64)
+        self.mean = np.zeros((k, k))
+        self.sum_squares = np.zeros((k, k))
+        self.comoment = np.zeros((k, k))
+
+    def update(self, df):
+        """Add the rows of a DataFrame chunk, and return self."""
+        if self.columns is None:
+            self._start(df.select_dtypes(include="number").columns.tolist())
+        values = df[self.columns].to_numpy(dtype=float, na_value=np.nan)
+        present = ~np.isnan(values)
+        self.n_rows += len(values)
+        self.n_missing += len(values) - present.sum(axis=0)
+        if len(values):
+            with np.errstate(invalid="ignore"):
+                self.minimum = np.fmin(self.minimum, np.nanmin(values, axis=0, initial=np.inf))
+                self.maximum = np.fmax(self.maximum, np.nanmax(values, axis=0, initial=-np.inf))
+
+        # Center the chunk on its column means to keep the sums small
+        with np.errstate(invalid="ignore", divide="ignore"):
+            shift = np.nan_to_num(np.nansum(values, axis=0) / present.sum(axis=0))
+        centered = np.where(present, values - shift, 0.0)
+        mask = present.astype(float)
+
+        count = (mask.T @ mask).round().astype(np.int64)
+        sums = centered.T @ mask
+        squares = (centered ** 2).T @ mask
+        products = centered.T @ centered
+        with np.errstate(invalid="ignore", divide="ignore"):
+            mean = np.where(count > 0, sums / count, 0.0)
+        chunk = {
+            "count": count,
+            "mean": mean + shift[:, None],
+            "sum_squares": squares - mean * sums,
+            "comoment": products - mean * sums.T,
+        }
+        return self._combine(chunk)
+
+    def merge(self, other):
+        """Add the rows accumulated by another accumulator of the same columns, and return self."""
+        if other.columns is None:
+            return self
+        if self.columns is None:
+            self._start(other.columns)
+        if self.columns != other.columns:
+            raise ValueError("Only accumulators of the same columns can be merged")
+        self.n_rows += other.n_rows
+        self.n_missing += other.n_missing
+        self.minimum = np.fmin(self.minimum, other.minimum)
+        self.maximum = np.fmax(self.maximum, other.maximum)
+        return self._combine(
+            {
+                "count": other.count,
+                "mean": other.mean,
+                "sum_squares": other.sum_squares,
+                "comoment": other.comoment,
+            }
+        )
+
+    def _combine(self, chunk):
+        total = self.count + chunk["count"]
+        with np.errstate(invalid="ignore", divide="ignore"):
+            weight = np.where(total > 0, self.count * chunk["count"] / total, 0.0)
+            share = np.where(total > 0, chunk["count"] / total, 0.0)
+        delta = chunk["mean"] - self.mean
+        self.sum_squares = self.sum_squares + chunk["sum_squares"] + weight * delta ** 2
+        self.comoment = self.comoment + chunk["comoment"] + weight * delta * delta.T
+        self.mean = self.mean + share * delta
+        self.count = total
+        return self
+
+    def selected_columns(self, pairwise=False):
+        """Return the non-constant columns, without those with missing values unless `pairwise`."""
+        if self.columns is None:
+            return []
+        varying = self.minimum < self.maximum
+        if not pairwise:
+            varying &= self.n_missing == 0
+        return [column for column, keep in zip(self.columns, varying) if keep]
+
+    def constant_columns(self, pairwise=False):
+        """Return the constant columns, among those without missing values unless `pairwise`."""
+        if self.columns is None:
+            return []
+        constant = self.minimum >= self.maximum
+        if not pairwise:
+            constant &= self.n_missing == 0
+        return [column for column, drop in zip(self.columns, constant) if drop]
+
+    def correlation(self, pairwise=False):
+        """
+        Return the Pearson correlation matrix of the non-constant columns.
+
+        By default the columns with missing values are left out, as with
+        `df.dropna(axis=1).corr()`. With `pairwise=True` they are kept and
+        each pair is correlated over the rows where both are present, as
+        with `df.corr()`.
+        """
+        columns = self.selected_columns(pairwise)
+        index = [self.columns.index(column) for column in columns] if columns else []
+        index = np.array(index, dtype=np.intp)
+        comoment = self.comoment[np.ix_(index, index)]
+        sum_squares = self.sum_squares[np.ix_(index, index)]
+        with np.errstate(invalid="ignore", divide="ignore"):
+            correlation = comoment / np.sqrt(sum_squares * sum_squares.T)
+        correlation = np.clip(correlation, -1.0, 1.0)
+        np.fill_diagonal(correlation, 1.0)
+        return pd.DataFrame(correlation, index=columns, columns=columns)
+
+
+def pearson_correlation_matrix(df, colormap='seismic', pairwise=False, chunksize=100_000):
     """Generate a styled Pearson correlation matrix plot for selected features.
 
+    The correlations are accumulated in one pass over the rows, `chunksize`
+    at a time (see `CorrelationAccumulator`), so the data is never copied
+    whole. `df` can also be an iterable of DataFrame chunks, such as
+    `load_survey_data(path, chunksize=...)`, or an accumulator already filled
+    (e.g. merged from parallel workers).
+
     Parameters
     ----------
-    df : pandas.DataFrame
+    df : pandas.DataFrame, iterable of pandas.DataFrame or CorrelationAccumulator
         The input DataFrame containing numeric columns for correlation analysis.
     colormap : str, optional
         The colormap for the background gradient styling of the correlation matrix.
         Defaults to 'seismic'.
+    pairwise : bool, optional
+        Whether to keep columns with null values, correlating each pair over the rows
+        where both are present. Defaults to False.
+    chunksize : int, optional
+        The number of rows of a DataFrame accumulated at a time. Defaults to 100000.
 
     Returns
     -------
@@ -34,21 +197,24 @@ def pearson_correlation_matrix(df, colormap='seismic'):
     >>> pearson_matrix = pearson_correlation_matrix(train_df, colormap='viridis')
     >>> display(pearson_matrix)
     """
-    # Select numeric columns without null values
-    df = df.dropna(axis=1)
-    selected_features = df.select_dtypes(include='number').loc[
-        :, df.select_dtypes(include='number').nunique() > 1
-    ]
+    if isinstance(df, CorrelationAccumulator):
+        accumulator = df
+    else:
+        chunks = df
+        if isinstance(df, pd.DataFrame):
+            chunks = (df.iloc[start:start + chunksize] for start in range(0, max(len(df), 1), chunksize))
+        accumulator = CorrelationAccumulator()
+        for chunk in chunks:
+            accumulator.update(chunk)
 
-     # Identify excluded columns
-    all_columns = set(df.select_dtypes(include='number').columns)
-    excluded_columns = list(all_columns - set(selected_features.columns))
+    # Identify excluded columns
+    excluded_columns = accumulator.constant_columns(pairwise)
 
     # Print excluded columns
     print("Excluded columns:\n", excluded_columns)
 
     # Calculate the Pearson correlation matrix
-    correlation_matrix = selected_features.corr()
+    correlation_matrix = accumulator.correlation(pairwise)
 
     # Apply background gradient styling
     correlation_matrix_style = correlation_matrix.style.background_gradient(
@@ -0,0 +1,158 @@
+import time
+
+import numpy as np
+from scipy.stats import rankdata
+from sklearn.base import clone
+from sklearn.metrics import get_scorer
+
+
+def build_cv_results(
+    candidate_params,
+    test_scores,
+    fit_times,
+    score_times,
+    train_scores=None,
+):
+    """
+    Assemble a `cv_results_` dictionary in the layout used by scikit-learn searches.
+
+    This lets custom search strategies produce results that can be passed to
+    `pandas.DataFrame` and `fit_and_return_top_models` exactly like those of
+    `RandomizedSearchCV` or `GridSearchCV`.
+
+    Parameters
+    ----------
+    candidate_params : list of dict
+        The parameter settings, one dict per candidate.
+    test_scores : dict of str to numpy.ndarray
+        For each scorer name, an array of shape (n_candidates, n_splits) with
+        the held-out scores. Splits a candidate was not evaluated on are NaN.
+    fit_times : numpy.ndarray
+        Fit times in seconds, of shape (n_candidates, n_splits).
+    score_times : numpy.ndarray
+        Scoring times in seconds, of shape (n_candidates, n_splits).
+    train_scores : dict of str to numpy.ndarray, optional
+        Training scores with the same layout as `test_scores`. Defaults to None.
+
+    Returns
+    -------
+    dict
+        Keys such as "params", "param_<name>", "split<k>_test_<scorer>",
+        "mean_test_<scorer>", "std_test_<scorer>", "rank_test_<scorer>",
+        "mean_fit_time" and, if given, the matching "train" entries.
+
+    Examples
+    --------
+    >>> results = build_cv_results(params, {"score": test}, fit_times, score_times)
+    >>> pd.DataFrame(results).sort_values("rank_test_score")
+    """
+    n_candidates = len(candidate_params)
+    results = {"params": list(candidate_params)}
+
+    param_names = sorted({name for params in candidate_params for name in params})
+    for name in param_names:
+        column = np.ma.MaskedArray(np.empty(n_candidates, dtype=object), mask=True)
+        for i, params in enumerate(candidate_params):
+            if name in params:
+                column[i] = params[name]
+        results["param_" + name] = column
+
+    for key, times in [("fit_time", fit_times), ("score_time", score_times)]:
+        times = np.asarray(times, dtype=float)
+        results["mean_" + key] = np.nanmean(times, axis=1)
+        results["std_" + key] = np.nanstd(times, axis=1)
+
+    sets = [("test", test_scores)]
+    if train_scores is not None:
+        sets.append(("train", train_scores))
+    for split_set, scores in sets:
+        for scorer, values in scores.items():
+            values = np.asarray(values, dtype=float)
+            for k in range(values.shape[1]):
+                results[f"split{k}_{split_set}_{scorer}"] = values[:, k]
+            means = np.nanmean(values, axis=1)
+            results[f"mean_{split_set}_{scorer}"] = means
+            results[f"std_{split_set}_{scorer}"] = np.nanstd(values, axis=1)
+            if split_set == "test":
+                results[f"rank_test_{scorer}"] = rank_scores(means)
+
+    return results
+
+
+def rank_scores(means):
+    """Rank mean scores from best (1) to worst, with NaN scores ranked last."""
+    means = np.asarray(means, dtype=float)
+    if np.isnan(means).all():
+        return np.ones(len(means), dtype=np.int32)
+    filled = np.where(np.isnan(means), np.nanmin(means) - 1, means)
+    return rankdata(-filled, method="min").astype(np.int32)
+
+
+def resolve_scorers(scoring):
+    """
+    Return a dict of scorer callables for a `scoring` argument of a search.
+
+    None uses the estimator's `score` method and a string a single scorer, both
+    reported as "score"; a dict maps display names to scorer names.
+    """
+    if scoring is None:
+        return {"score": lambda estimator, X, y: estimator.score(X, y)}
+    if isinstance(scoring, str):
+        return {"score": get_scorer(scoring)}
+    return {name: get_scorer(value) for name, value in scoring.items()}
+
+
+def fit_and_score(estimator, X, y, train, test, params, scorers, return_train_score):
+    """
+    Fit one candidate on one CV split and score it.
+
+    Parameters
+    ----------
+    estimator : estimator object
+        The unfitted estimator; a clone is fitted.
+    X : pandas.DataFrame or array-like
+        The full data the split indices refer to.
+    y : array-like
+        The full target.
+    train, test : numpy.ndarray
+        Row indices of the split.
+    params : dict
+        The candidate parameters to set before fitting.
+    scorers : dict
+        Scorer callables, as returned by `resolve_scorers`.
+    return_train_score : bool
+        Whether to also score the training rows.
+
+    Returns
+    -------
+    dict
+        "test" and "train" score dicts, "fit_time" and "score_time".
+    """
+    X_train, X_test = _take_rows(X, train), _take_rows(X, test)
+    y_train, y_test = _take_rows(y, train), _take_rows(y, test)
+
+    start = time.time()
+    estimator = clone(estimator).set_params(**params).fit(X_train, y_train)
+    fit_time = time.time() - start
+
+    start = time.time()
+    test_scores = {
+        name: scorer(estimator, X_test, y_test) for name, scorer in scorers.items()
+    }
+    score_time = time.time() - start
+
+    train_scores = {}
+    if return_train_score:
+        train_scores = {
+            name: scorer(estimator, X_train, y_train) for name, scorer in scorers.items()
+        }
+    return {
+        "test": test_scores,
+        "train": train_scores,
+        "fit_time": fit_time,
+        "score_time": score_time,
+    }
+
+
+def _take_rows(data, indices):
+    return data.iloc[indices] if hasattr(data, "iloc") else np.asarray(data)[indices]
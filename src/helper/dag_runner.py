@@ -0,0 +1,345 @@
+import ast
+import hashlib
+import json
+import os
+import subprocess
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from .columnar_cache import file_sha256
+
+
+class Stage:
+    """
+    One step of a pipeline: commands with the files they read and write.
+
+    Parameters
+    ----------
+    name : str
+        Unique name of the stage.
+    commands : list of list of str
+        The commands to run, in order, each as an argument list.
+    inputs : list of str, optional
+        Data files or directories the stage reads. Their content is hashed.
+    outputs : list of str, optional
+        Files the stage writes. The stage reruns if any of them is missing.
+    deps : list of str, optional
+        Names of the stages that must run first.
+    code : list of str, optional
+        Source files or directories of the stage. Their content is hashed, so
+        editing them reruns the stage. See `script_sources`.
+    params : dict, optional
+        Extra JSON-serialisable settings that change the stage's result.
+    """
+
+    def __init__(self, name, commands, inputs=(), outputs=(), deps=(), code=(), params=None):
+        self.name = name
+        self.commands = [list(command) for command in commands]
+        self.inputs = list(inputs)
+        self.outputs = list(outputs)
+        self.deps = list(deps)
+        self.code = list(code)
+        self.params = params or {}
+
+    def __repr__(self):
+        return f"Stage({self.name!r})"
+
+
+def content_hash(path):
+    """Return the SHA-256 of a file, or of the files under a directory, or "missing"."""
+    if os.path.isfile(path):
+        return file_sha256(path)
+    if not os.path.isdir(path):
+        return "missing"
+    digest = hashlib.sha256()
+    for root, dirs, files in os.walk(path):
+        dirs[:] = sorted(d for d in dirs if d != "__pycache__" and not d.startswith("."))
+        for name in sorted(files):
+            file_path = os.path.join(root, name)
+            digest.update(os.path.relpath(file_path, path).encode())
+            digest.update(file_sha256(file_path).encode())
+    return digest.hexdigest()
+
+
+def stage_key(stage):
+    """Return the hash of a stage's commands, parameters, code and input content."""
+    spec = {
+        "commands": stage.commands,
+        "params": stage.params,
+        "code": {path: content_hash(path) for path in sorted(stage.code)},
+        "inputs": {path: content_hash(path) for path in sorted(stage.inputs)},
+    }
+    return hashlib.sha256(json.dumps(spec, sort_keys=True).encode()).hexdigest()
+
+
+def script_sources(script, src_dir="src"):
+    """
+    Return a script and the local modules it imports, directly or indirectly.
+
+    Absolute imports are resolved against `src_dir` (ex: `helper.load_survey_data`
+    is `src/helper/load_survey_data.py`) and relative imports against the
+    importing module's package. Third-party imports are ignored.
+
+    Parameters
+    ----------
+    script : str
+        Path of the Python script.
+    src_dir : str, optional
+        The directory added to `sys.path` by the scripts. Defaults to "src".
+
+    Returns
+    -------
+    list of str
+        The sorted source file paths, `script` included.
+
+    Examples
+    --------
+    >>> script_sources("src/scripts/english_score_results.py")
+    ['src/helper/__init__.py', 'src/helper/artifact_store.py', ...]
+    """
+    seen, todo = set(), [script]
+    while todo:
+        path = todo.pop()
+        if path in seen:
+            continue
+        seen.add(path)
+        with open(path) as f:
+            tree = ast.parse(f.read(), filename=path)
+        for node in ast.walk(tree):
+            if isinstance(node, ast.ImportFrom):
+                if node.level:
+                    base = os.path.dirname(path)
+                    for _ in range(node.level - 1):
+                        base = os.path.dirname(base)
+                    module_parts = node.module.split(".") if node.module else []
+                    names = [
+                        os.path.join(base, *module_parts, alias.name) for alias in node.names
+                    ] + [os.path.join(base, *module_parts)]
+                else:
+                    names = [os.path.join(src_dir, *node.module.split("."))] if node.module else []
+            elif isinstance(node, ast.Import):
+                names = [os.path.join(src_dir, *alias.name.split(".")) for alias in node.names]
+            else:
+                continue
+            for name in names:
+                for candidate in (name + ".py", os.path.join(name, "__init__.py")):
+                    if os.path.isfile(candidate):
+                        todo.append(os.path.normpath(candidate))
+                # Importing a package module also runs the package's __init__
+                package_init = os.path.join(os.path.dirname(name), "__init__.py")
+                if os.path.isfile(name + ".py") and os.path.isfile(package_init):
+                    todo.append(os.path.normpath(package_init))
+    return sorted(seen)
+
+
+def plan_stages(stages, targets=None):
+    """
+    Return the stages in dependency order, limited to those `targets` need.
+
+    Raises
+    ------
+    ValueError
+        If stage names repeat, a dependency or target is unknown, or the
+        dependencies form a cycle.
+    """
+    by_name = {}
+    for stage in stages:
+        if stage.name in by_name:
+            raise ValueError(f"Duplicate stage name: {stage.name}")
+        by_name[stage.name] = stage
+    for stage in stages:
+        for dep in stage.deps:
+            if dep not in by_name:
+                raise ValueError(f"Stage {stage.name} depends on unknown stage {dep}")
+
+    wanted = set(by_name) if not targets else set()
+    todo = list(targets or [])
+    while todo:
+        name = todo.pop()
+        if name not in by_name:
+            raise ValueError(f"Unknown stage: {name}")
+        if name not in wanted:
+            wanted.add(name)
+            todo.extend(by_name[name].deps)
+
+    order, state = [], {}
+
+    def visit(name, path):
+        if state.get(name) == "done":
+            return
+        if state.get(name) == "visiting":
+            raise ValueError("Stage dependencies form a cycle: " + " -> ".join(path + [name]))
+        state[name] = "visiting"
+        for dep in by_name[name].deps:
+            visit(dep, path + [name])
+        state[name] = "done"
+        order.append(by_name[name])
+
+    for stage in stages:
+        if stage.name in wanted:
+            visit(stage.name, [])
+    return order
+
+
+class DagRunner:
+    """
+    Run pipeline stages in dependency order, skipping those whose hash is unchanged.
+
+    A stage's key hashes its commands, parameters, code and input file
+    content (`stage_key`). After a stage succeeds, its key is saved in the
+    state file; a later run skips the stage while its key is unchanged and
+    its outputs exist. Touching a file without changing it therefore reruns
+    nothing. Stages whose dependencies are done run in parallel, up to `jobs`
+    at a time, each in its own subprocess.
+
+    Parameters
+    ----------
+    stages : list of Stage
+        The pipeline stages.
+    state_path : str, optional
+        The JSON file of the stage keys of the last successful runs. Defaults
+        to "results/.pipeline-state.json".
+    jobs : int, optional
+        The maximum number of stages run at the same time. Defaults to 1.
+    log : callable, optional
+        Called with each progress message. Defaults to `print`.
+    show_output : bool, optional
+        Whether to log the output of the stage commands; the output of a
+        failed command is always logged. Defaults to True.
+
+    Examples
+    --------
+    >>> runner = DagRunner(stages, jobs=2)
+    >>> runner.run(targets=["results"])
+    {'get_data': 'skipped', 'preprocessor': 'skipped', 'tuning': 'ran', 'results': 'ran'}
+    """
+
+    def __init__(
+        self,
+        stages,
+        state_path="results/.pipeline-state.json",
+        jobs=1,
+        log=print,
+        show_output=True,
+    ):
+        self.stages = list(stages)
+        self.state_path = state_path
+        self.jobs = max(1, jobs)
+        self.log = log
+        self.show_output = show_output
+        self._lock = threading.Lock()
+
+    def load_state(self):
+        """Return the saved stage keys, or an empty dict."""
+        if not os.path.exists(self.state_path):
+            return {}
+        with open(self.state_path) as f:
+            return json.load(f)
+
+    def _save_state(self, state):
+        directory = os.path.dirname(self.state_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = f"{self.state_path}.tmp-{os.getpid()}"
+        with open(tmp_path, "w") as f:
+            json.dump(state, f, indent=1, sort_keys=True)
+        os.replace(tmp_path, self.state_path)
+
+    def is_up_to_date(self, stage, state):
+        """Return whether a stage can be skipped, with its current key."""
+        key = stage_key(stage)
+        saved = state.get(stage.name, {})
+        up_to_date = saved.get("key") == key and all(os.path.exists(p) for p in stage.outputs)
+        return up_to_date, key
+
+    def run(self, targets=None, force=(), dry_run=False):
+        """
+        Run the stages `targets` need (all by default).
+
+        Parameters
+        ----------
+        targets : list of str, optional
+            The stages to bring up to date, with their dependencies.
+        force : iterable of str, optional
+            Names of stages to rerun even if up to date.
+        dry_run : bool, optional
+            Only report which stages would run ("outdated"). Stages after one
+            that would run are reported as "pending", since their inputs may
+            change.
+
+        Returns
+        -------
+        dict
+            The status of each stage, in dependency order: "ran", "skipped",
+            "failed", "blocked" (a dependency failed), or "outdated" and
+            "pending" in a dry run.
+        """
+        order = plan_stages(self.stages, targets)
+        force = set(force)
+        state = self.load_state()
+        status = {stage.name: None for stage in order}
+
+        if dry_run:
+            for stage in order:
+                if any(status[dep] in ("outdated", "pending") for dep in stage.deps):
+                    status[stage.name] = "pending"
+                    continue
+                up_to_date, _ = self.is_up_to_date(stage, state)
+                if up_to_date and stage.name not in force:
+                    status[stage.name] = "skipped"
+                    self.log(f"[{stage.name}] up to date")
+                else:
+                    status[stage.name] = "outdated"
+                    self.log(f"[{stage.name}] would run")
+            return status
+
+        remaining = list(order)
+        running = {}
+        with ThreadPoolExecutor(max_workers=self.jobs) as pool:
+            while remaining or running:
+                for stage in list(remaining):
+                    dep_status = [status[dep] for dep in stage.deps]
+                    if any(s in ("failed", "blocked") for s in dep_status):
+                        status[stage.name] = "blocked"
+                        remaining.remove(stage)
+                        self.log(f"[{stage.name}] blocked by a failed dependency")
+                    elif all(s in ("ran", "skipped") for s in dep_status):
+                        if len(running) >= self.jobs:
+                            break
+                        remaining.remove(stage)
+                        running[pool.submit(self._run_stage, stage, state, force)] = stage
+                if not running:
+                    continue
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    stage = running.pop(future)
+                    status[stage.name] = future.result()
+        return status
+
+    def _run_stage(self, stage, state, force):
+        up_to_date, key = self.is_up_to_date(stage, state)
+        if up_to_date and stage.name not in force:
+            self.log(f"[{stage.name}] up to date, skipped")
+            return "skipped"
+
+        self.log(f"[{stage.name}] running")
+        start = time.perf_counter()
+        for command in stage.commands:
+            result = subprocess.run(command, capture_output=True, text=True)
+            output = (result.stdout + result.stderr).strip()
+            if output and (self.show_output or result.returncode != 0):
+                self.log("\n".join(f"[{stage.name}] {line}" for line in output.splitlines()))
+            if result.returncode != 0:
+                self.log(f"[{stage.name}] failed: {' '.join(command)} exited with {result.returncode}")
+                with self._lock:
+                    state.pop(stage.name, None)
+                    self._save_state(state)
+                return "failed"
+        elapsed = time.perf_counter() - start
+
+        with self._lock:
+            state[stage.name] = {"key": key, "seconds": round(elapsed, 3)}
+            self._save_state(state)
+        self.log(f"[{stage.name}] done in {elapsed:.1f}s")
+        return "ran"
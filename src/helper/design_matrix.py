@@ -0,0 +1,47 @@
+from sklearn.compose import ColumnTransformer
+from sklearn.linear_model import Lasso, Ridge
+from sklearn.pipeline import Pipeline
+
+from .load_survey_data import WIDE_CATEGORICAL_FEATURES
+
+
+def is_sparse_design(preprocessor):
+    """Return whether a fitted ColumnTransformer outputs a sparse matrix."""
+    return bool(getattr(preprocessor, "sparse_output_", False))
+
+
+def linear_models(sparse_input=False):
+    """
+    Return the Ridge and Lasso models, with solvers suited to the design matrix.
+
+    On a sparse design matrix Ridge uses the conjugate gradient solver
+    (`sparse_cg`) and Lasso coordinate descent without a precomputed Gram
+    matrix, which both work on the CSR matrix directly, intercept included,
+    instead of densifying it.
+
+    Parameters
+    ----------
+    sparse_input : bool, optional
+        Whether the models are fitted on a sparse matrix. Defaults to False.
+
+    Returns
+    -------
+    tuple of (Ridge, Lasso)
+        The unfitted models.
+    """
+    if sparse_input:
+        return Ridge(solver="sparse_cg"), Lasso(precompute=False)
+    return Ridge(), Lasso()
+
+
+def uses_wide_categoricals(estimator):
+    """Return whether a preprocessor or pipeline reads any of the wide categorical features."""
+    if isinstance(estimator, Pipeline):
+        return any(uses_wide_categoricals(step) for _, step in estimator.steps)
+    if isinstance(estimator, ColumnTransformer):
+        transformers = getattr(estimator, "transformers_", estimator.transformers)
+        return any(
+            isinstance(columns, list) and set(columns) & set(WIDE_CATEGORICAL_FEATURES)
+            for _, _, columns in transformers
+        )
+    return False
@@ -0,0 +1,208 @@
+import http.client
+import os
+import shutil
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+
+from .columnar_cache import file_sha256
+
+
+def download_dataset(
+    url, destination, sha256=None, chunk_size=1024 * 1024, retries=3, timeout=60
+):
+    """
+    Stream a dataset to a local file, resuming partial downloads and verifying it.
+
+    Bytes are written to `destination + ".part"` in chunks, so memory use does
+    not depend on the file size. If a `.part` file is left over from an earlier
+    attempt, the download continues from its end. For remote URLs the ETag (or
+    Last-Modified date) of the first reply is saved next to the `.part` file
+    and sent as `If-Range` with the Range request, so a file changed on the
+    server is downloaded again from the start instead of being appended to the
+    old bytes. The finished file is checked against `sha256`, when given, and
+    only then renamed to `destination`.
+
+    Parameters
+    ----------
+    url : str
+        An http(s) or file:// URL, or a local file path.
+    destination : str
+        Path of the local file to write.
+    sha256 : str, optional
+        Expected SHA-256 hex digest of the file. Defaults to None, in which case
+        the download is not verified.
+    chunk_size : int, optional
+        Number of bytes read per chunk. Defaults to 1 MB.
+    retries : int, optional
+        Number of times a dropped connection or server error (5xx) is retried,
+        resuming from the bytes already written, before giving up. Client
+        errors such as 404 are raised at once. Defaults to 3.
+    timeout : float, optional
+        Socket timeout in seconds for remote downloads. Defaults to 60.
+
+    Returns
+    -------
+    str
+        The path of the downloaded file.
+
+    Raises
+    ------
+    ValueError
+        If the downloaded file does not match `sha256`.
+    urllib.error.HTTPError
+        If the server answers with a client error, or a server error on the
+        last attempt.
+
+    Examples
+    --------
+    >>> download_dataset("https://osf.io/download/g72pq/", "data/raw/full_dataset.csv")
+    'data/raw/full_dataset.csv'
+    """
+    if sha256 is not None and os.path.exists(destination):
+        if file_sha256(destination) == sha256.lower():
+            return destination
+
+    part_path = destination + ".part"
+    for attempt in range(retries + 1):
+        try:
+            _download_to(url, part_path, chunk_size, timeout)
+            break
+        except (http.client.HTTPException, OSError) as error:
+            if attempt == retries or not _is_transient(error):
+                raise
+            time.sleep(2**attempt)
+
+    if sha256 is not None:
+        digest = file_sha256(part_path)
+        if digest != sha256.lower():
+            _remove_part(part_path)
+            raise ValueError(
+                f"Checksum mismatch for {url}: expected {sha256}, got {digest}"
+            )
+
+    os.replace(part_path, destination)
+    _remove_part(part_path)
+    return destination
+
+
+def read_checksum_file(path, name):
+    """
+    Return the SHA-256 digest pinned for `name` in a checksum file, or None.
+
+    The file uses the `sha256sum` format, one `<digest>  <name>` line per
+    pinned file, where `name` is the dataset URL.
+    """
+    try:
+        with open(path) as f:
+            lines = [line.split(maxsplit=1) for line in f if line.strip()]
+    except FileNotFoundError:
+        return None
+    for digest, pinned_name in lines:
+        if pinned_name.strip() == name:
+            return digest.lower()
+    return None
+
+
+def write_checksum_file(path, name, digest):
+    """Pin `digest` as the SHA-256 of `name` in a checksum file, keeping the other lines."""
+    lines = []
+    if os.path.exists(path):
+        with open(path) as f:
+            lines = [line for line in f if line.strip() and line.split(maxsplit=1)[1].strip() != name]
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, "w") as f:
+        f.writelines(lines + [f"{digest}  {name}\n"])
+
+
+def _download_to(url, part_path, chunk_size, timeout):
+    """Append the bytes of `url` after the current end of `part_path`."""
+    offset = os.path.getsize(part_path) if os.path.exists(part_path) else 0
+    source_path = _local_path(url)
+
+    if source_path is not None:
+        with open(source_path, "rb") as source, open(part_path, "ab") as target:
+            source.seek(offset)
+            shutil.copyfileobj(source, target, chunk_size)
+        return
+
+    request = urllib.request.Request(url)
+    validator = _read_validator(part_path) if offset else None
+    # Without the validator of the partial bytes there is no telling whether
+    # the remote file changed since, so the download starts over
+    if validator is not None:
+        request.add_header("Range", f"bytes={offset}-")
+        request.add_header("If-Range", validator)
+    try:
+        response = urllib.request.urlopen(request, timeout=timeout)
+    except urllib.error.HTTPError as error:
+        # 416 means the partial file already holds the whole resource
+        if error.code == 416 and validator is not None:
+            return
+        raise
+
+    with response:
+        # A 200 reply to a Range request means the file changed on the server
+        # (or ranges are not supported) and is sent whole
+        if validator is not None and response.status == 206:
+            mode = "ab"
+        else:
+            mode = "wb"
+            _write_validator(part_path, response.headers)
+        with open(part_path, mode) as target:
+            shutil.copyfileobj(response, target, chunk_size)
+        # read() returns early instead of raising when the connection drops
+        if response.length:
+            raise http.client.IncompleteRead(b"", response.length)
+
+
+def _validator_path(part_path):
+    """Return the file holding the ETag or Last-Modified date of a `.part` file."""
+    return part_path + ".validator"
+
+
+def _read_validator(part_path):
+    """Return the saved If-Range validator of `part_path`, or None."""
+    try:
+        with open(_validator_path(part_path)) as f:
+            return f.read().strip() or None
+    except FileNotFoundError:
+        return None
+
+
+def _write_validator(part_path, headers):
+    """Save the strong ETag, else the Last-Modified date, of a reply starting `part_path`."""
+    etag = headers.get("ETag")
+    # A weak ETag cannot be used in If-Range
+    validator = etag if etag and not etag.startswith("W/") else headers.get("Last-Modified")
+    if validator:
+        with open(_validator_path(part_path), "w") as f:
+            f.write(validator)
+    elif os.path.exists(_validator_path(part_path)):
+        os.remove(_validator_path(part_path))
+
+
+def _remove_part(part_path):
+    """Remove a `.part` file and its validator, if present."""
+    for path in (part_path, _validator_path(part_path)):
+        if os.path.exists(path):
+            os.remove(path)
+
+
+def _is_transient(error):
+    """Return True for errors worth retrying: dropped connections, timeouts and 5xx replies."""
+    if isinstance(error, urllib.error.HTTPError):
+        return error.code >= 500 or error.code in (408, 429)
+    # A missing or unreadable local source will not appear on a retry
+    return not isinstance(error, (FileNotFoundError, IsADirectoryError, PermissionError))
+
+
+def _local_path(url):
+    """Return the filesystem path for file:// URLs and plain paths, else None."""
+    parsed = urllib.parse.urlparse(url)
+    if parsed.scheme == "file":
+        return urllib.request.url2pathname(parsed.path)
+    if parsed.scheme in ("http", "https", "ftp"):
+        return None
+    return url
@@ -0,0 +1,178 @@
+import altair as alt
+import dataframe_image as dfi
+import matplotlib.pyplot as plt
+import numpy as np
+import pandas as pd
+
+from .bin_counts import BinCounts
+from .correlation_matrix import pearson_correlation_matrix
+from .figure_renderer import FigureTask
+from .load_survey_data import CATEGORICAL_FEATURES, NUMERIC_FEATURES
+from .plot_histogram_with_exclusions import plot_histogram_with_exclusions
+
+# Columns left out of the numeric histograms
+DROP_FEATURES = [
+    "id", "date", "time", "Unnamed: 0", "tests", "elogit", "dyslexia",
+    "dictionary", "already_participated", "natlangs", "primelangs",
+    "Can_region", "Ir_region", "US_region", "UK_region", "UK_constituency",
+    "gender", "type", "currcountry", "countries",
+]
+
+# Columns left out of the correlation matrix
+CORRELATION_EXCLUDED = ["Unnamed: 0", "date", "time", "id"]
+
+
+def eda_figure_tasks(train_df, plot_to, tables_to=None):
+    """
+    Return the EDA figures of the training data as independent rendering tasks.
+
+    The data each figure needs is computed here, once: the histograms and
+    pairwise plots get bin counts and the Altair charts category counts
+    rather than the raw rows, and the correlation matrix is computed before
+    styling. When `tables_to` is given the correlation matrix
+    is also written there as CSV.
+
+    Parameters
+    ----------
+    train_df : pandas.DataFrame
+        The training data, without the q* item columns.
+    plot_to : str
+        Directory the figures are written to, ex: "results/figures/".
+    tables_to : str, optional
+        Directory of the correlation matrix CSV, ex: "results/tables/".
+
+    Returns
+    -------
+    list of FigureTask
+        The numeric histograms, education and categorical bar charts,
+        correlation matrix and pairwise plots.
+    """
+    numeric = train_df.select_dtypes(include="number")
+    numeric = numeric[[column for column in numeric.columns if column not in DROP_FEATURES]]
+
+    correlation_columns = [
+        column for column in train_df.columns if column not in CORRELATION_EXCLUDED
+    ]
+    correlation = pearson_correlation_matrix(train_df[correlation_columns], "viridis").data
+    if tables_to is not None:
+        correlation.to_csv(tables_to + "correlation-matrix.csv")
+
+    return [
+        FigureTask(
+            "numeric_plots",
+            plot_numeric_histograms,
+            plot_to + "feat-numeric-figs.png",
+            BinCounts.from_frame(numeric, bins=50),
+        ),
+        FigureTask(
+            "education_plot",
+            plot_education_levels,
+            plot_to + "education-level-fig.png",
+            category_counts(train_df["education"]),
+        ),
+        FigureTask(
+            "categorical_plot",
+            plot_categorical_counts,
+            plot_to + "feat-categoric-figs.png",
+            {column: category_counts(train_df[column]) for column in CATEGORICAL_FEATURES},
+        ),
+        FigureTask(
+            "correlation",
+            plot_correlation_matrix,
+            plot_to + "feat-correlation-matrix.png",
+            correlation,
+            {"colormap": "viridis"},
+        ),
+        FigureTask(
+            "pairwise_plots",
+            plot_pairwise,
+            plot_to + "pairwise-correlation-plots.png",
+            BinCounts.from_frame(train_df, NUMERIC_FEATURES, bins=30, pairs=True),
+        ),
+    ]
+
+
+def category_counts(series):
+    """Return a frame of the values of a column and their counts, missing values included."""
+    counts = series.value_counts(dropna=False, sort=False)
+    counts = counts[counts > 0]
+    return pd.DataFrame({series.name: counts.index.astype(object), "count": counts.to_numpy()})
+
+
+def plot_numeric_histograms(counts, output):
+    """Save the grid of histograms of the numeric features from their bin counts."""
+    plot_1 = plot_histogram_with_exclusions(counts)
+
+    # Specify the grid layout
+    rows = 3
+    cols = plot_1.size // rows
+    for i, plot in enumerate(np.ravel(plot_1)):
+        plt.subplot(rows, cols, i + 1)
+
+    plt.suptitle("Distribution of Numeric Features")
+    plt.savefig(output)
+
+
+def plot_education_levels(counts, output):
+    """Save the bar chart of the education level counts."""
+    education_level_plot = (
+        alt.Chart(counts)
+        .mark_bar()
+        .encode(
+            x=alt.X("education:N", title="Education Level"),
+            y=alt.Y("count:Q", title="Count"),
+            tooltip=["count"],
+        )
+        .properties(title="Distribution of Education Levels")
+    )
+    education_level_plot.save(output, format="png")
+
+
+def plot_categorical_counts(counts, output):
+    """Save the bar charts of the categorical feature counts, one per row."""
+    charts = [
+        alt.Chart(column_counts)
+        .mark_bar()
+        .encode(
+            x=alt.X(f"{column}:N"),
+            y=alt.Y("count:Q", title="Count of Records"),
+        )
+        .properties(height=200, width=800)
+        for column, column_counts in counts.items()
+    ]
+    categorical_plot = alt.vconcat(*charts, title="Distribution of the Categorical features")
+    categorical_plot.save(output, format="png")
+
+
+def plot_correlation_matrix(correlation, output, colormap="viridis"):
+    """Save the styled correlation matrix as an image."""
+    dfi.export(correlation.style.background_gradient(cmap=colormap), output)
+
+
+def plot_pairwise(counts, output):
+    """Save the grid of histograms (diagonal) and 2D histograms of the numeric features from their bin counts."""
+    numeric_feats = counts.columns
+    fig, axs = plt.subplots(len(numeric_feats), len(numeric_feats), figsize=(15, 15))
+
+    for i in range(len(numeric_feats)):
+        for j in range(len(numeric_feats)):
+            if i == j:
+                hist, edges = counts.histogram(numeric_feats[i])
+                axs[i, j].hist(edges[:-1], bins=edges, weights=hist, color='skyblue', edgecolor='black')
+            else:
+                grid, x_edges, y_edges = counts.histogram2d(numeric_feats[j], numeric_feats[i])
+                axs[i, j].pcolormesh(x_edges, y_edges, grid.T, cmap='Blues')
+
+            if i < len(numeric_feats) - 1:
+                axs[i, j].xaxis.set_visible(False)
+            if j > 0:
+                axs[i, j].yaxis.set_visible(False)
+
+            if j == 0:
+                axs[i, j].set_ylabel(numeric_feats[i])
+            if i == len(numeric_feats) - 1:
+                axs[i, j].set_xlabel(numeric_feats[j])
+
+    plt.tight_layout()
+    plt.suptitle('Pairwise Correlation Plots of Numeric Features', y=1.02)
+    plt.savefig(output, format="png")
@@ -0,0 +1,107 @@
+import numpy as np
+import pandas as pd
+from sklearn.base import BaseEstimator, OneToOneFeatureMixin, TransformerMixin
+from sklearn.utils import check_array
+
+# The large education groups, in the order used by the OrdinalEncoder. All
+# other (rare or missing) education levels are grouped into "Others".
+EDUCATION_LEVELS = [
+    "Graduate Degree",
+    "Some Graduate School",
+    "Undergraduate Degree (3-5 years higher ed)",
+    "Some Undergrad (higher ed)",
+    "High School Degree (12-13 years)",
+    "Haven't Finished High School (less than 13 years ed)",
+    "Didn't Finish High School (less than 13 years ed)",
+]
+OTHER_LEVEL = "Others"
+
+
+class EducationBucketer(OneToOneFeatureMixin, TransformerMixin, BaseEstimator):
+    """
+    Map education levels to integer codes, grouping the other levels into "Others".
+
+    A level listed in `categories` is coded by its position in the list; every
+    other value, including missing ones, gets the code `len(categories)`. The
+    lookup is a vectorized hash recode: categorical input only looks up its
+    (few) categories and then takes their codes, so no Python code runs per row.
+    The transformer is stateless and picklable, so saved preprocessors do not
+    depend on functions defined in the script that built them.
+
+    Parameters
+    ----------
+    categories : list of str, optional
+        The levels kept as their own group, in code order. Defaults to
+        `EDUCATION_LEVELS`.
+
+    Examples
+    --------
+    >>> education_transformer = make_pipeline(
+    ...     EducationBucketer(),
+    ...     OrdinalEncoder(categories=[education_codes()]),
+    ... )
+    >>> education_transformer.fit_transform(train_df[["education"]])
+    """
+
+    def __init__(self, categories=EDUCATION_LEVELS):
+        self.categories = categories
+
+    def fit(self, X, y=None):
+        """Record the input columns; there is nothing to learn."""
+        X = _check_input(X)
+        self.n_features_in_ = X.shape[1]
+        if hasattr(X, "columns"):
+            self.feature_names_in_ = np.asarray(X.columns, dtype=object)
+        elif hasattr(self, "feature_names_in_"):
+            del self.feature_names_in_
+        return self
+
+    def transform(self, X):
+        """
+        Return the education codes as an integer array of shape (n_samples, 1).
+
+        Parameters
+        ----------
+        X : pandas.DataFrame or array-like of shape (n_samples, 1)
+            The education column.
+
+        Returns
+        -------
+        numpy.ndarray
+            Codes between 0 and `len(categories)` (the "Others" group).
+        """
+        X = _check_input(X)
+        if X.shape[1] != self.n_features_in_:
+            raise ValueError(
+                f"X has {X.shape[1]} features, but EducationBucketer is expecting "
+                f"{self.n_features_in_} features as input"
+            )
+        if hasattr(self, "feature_names_in_") and hasattr(X, "columns"):
+            if list(X.columns) != list(self.feature_names_in_):
+                raise ValueError("The feature names differ from those seen in fit")
+        values = X.iloc[:, 0] if hasattr(X, "iloc") else pd.Series(X[:, 0])
+        levels = pd.Index(self.categories)
+        other = len(levels)
+
+        if isinstance(values.dtype, pd.CategoricalDtype):
+            # Recode the categories once, then map the per-row category codes
+            category_codes = levels.get_indexer(values.cat.categories)
+            category_codes = np.append(np.where(category_codes < 0, other, category_codes), other)
+            codes = category_codes[values.cat.codes.to_numpy()]
+        else:
+            codes = levels.get_indexer(values.to_numpy(dtype=object))
+            codes[codes < 0] = other
+        return codes.astype(np.int8).reshape(-1, 1)
+
+
+def _check_input(X):
+    """Return `X` as a DataFrame, unchanged, or as a checked 2D object array."""
+    if isinstance(X, pd.DataFrame):
+        # Kept as is, so categorical columns are recoded by category
+        return X
+    return check_array(X, dtype=None, force_all_finite=False)
+
+
+def education_codes(categories=EDUCATION_LEVELS):
+    """Return every code `EducationBucketer` can output, for the OrdinalEncoder categories."""
+    return list(range(len(categories) + 1))
@@ -0,0 +1,505 @@
+import multiprocessing
+import os
+import pickle
+import threading
+import time
+import traceback
+import uuid
+from concurrent.futures import Future
+
+import cloudpickle
+from joblib import cpu_count, parallel_config, register_parallel_backend
+from joblib.parallel import ParallelBackendBase, SequentialBackend
+
+# Name of the file work queue backend registered with joblib
+QUEUE_BACKEND = "file-queue"
+
+
+class ExecutionBackend:
+    """
+    Where the joblib-parallel work of a search runs, as a reusable context manager.
+
+    Inside the context every joblib `Parallel` call, those of the sklearn
+    searches, `fit_searches_concurrently` and the path and racing searches
+    included, runs its tasks on the chosen backend. Each task is independent
+    and joblib returns the results in submission order, so for a fixed
+    `random_state` the scores and fitted models do not depend on the backend;
+    only the recorded fit and score times do.
+
+    Parameters
+    ----------
+    name : str, optional
+        "local" for a process pool on this machine, "file-queue" for a
+        `FileQueueBackend` served by `run_worker` processes on any machine
+        sharing its directory, or the name of another registered joblib
+        backend such as "dask" or "ray" (once their joblib integration is
+        installed). Defaults to "local".
+    **options
+        Options of the backend, ex: `queue_dir` and `n_workers` for "file-queue".
+
+    Examples
+    --------
+    >>> backend = ExecutionBackend("file-queue", queue_dir="/shared/queue", n_workers=64)
+    >>> fit_and_return_top_models(ridge_search, 5, X_train, y_train, backend=backend)
+    """
+
+    def __init__(self, name="local", **options):
+        self.name = name
+        self.options = options
+        self._configs = []
+        # joblib checks the backend name and options when building the config,
+        # which takes effect at once: undo it, the backend is used on enter
+        try:
+            parallel_config(backend=self._backend, **options).unregister()
+        except ValueError as e:
+            raise ValueError(f"Unknown execution backend {name!r}: {e}") from e
+
+    def __repr__(self):
+        return f"ExecutionBackend({self.name!r})"
+
+    @property
+    def _backend(self):
+        return "loky" if self.name == "local" else self.name
+
+    def __enter__(self):
+        # parallel_config takes effect when built and is undone on exit
+        self._configs.append(parallel_config(backend=self._backend, **self.options))
+        return self
+
+    def __exit__(self, *exc_info):
+        self._configs.pop().__exit__(*exc_info)
+
+
+class WorkQueue:
+    """
+    A directory of pickled tasks and results shared by a coordinator and workers.
+
+    Tasks are written to `tasks/`, moved to `claimed/` by the worker that runs
+    them (an atomic rename, so each task runs once) and answered in
+    `results/`. Files are written under a temporary name and renamed, so no
+    process ever reads a partial file. A `STOP` file tells the workers to exit.
+
+    A claimed task is named after the `WorkQueue` of the worker holding it,
+    and its modification time is its lease: the worker sets it on claiming
+    the task and keeps refreshing it (`heartbeat`) while the task runs, so a
+    claim whose time stops moving belongs to a dead worker and can be put
+    back with `requeue`. A worker only answers a task whose claim it still
+    holds; a worker that lost its claim (requeued while it was too slow to
+    renew it) drops its result, and never touches the claim of the worker
+    that ran the task again.
+
+    Parameters
+    ----------
+    directory : str
+        The queue directory, created if needed. On a filesystem shared by
+        several machines, their workers serve the same queue.
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+        # Names the claims of this queue's worker
+        self.worker_id = uuid.uuid4().hex
+        for name in ("tasks", "claimed", "results"):
+            os.makedirs(os.path.join(directory, name), exist_ok=True)
+
+    def put(self, task_id, func):
+        """Queue the callable `func` under `task_id`."""
+        self._write("tasks", task_id, cloudpickle.dumps(func))
+
+    def claim(self):
+        """Return (task_id, pickled callable) of an unclaimed task, or None if there is none."""
+        for name in sorted(os.listdir(os.path.join(self.directory, "tasks"))):
+            if not name.endswith(".pkl"):
+                # Still being written
+                continue
+            task_id = os.path.splitext(name)[0]
+            claimed = self._claimed_path(task_id)
+            try:
+                os.rename(os.path.join(self.directory, "tasks", name), claimed)
+            except FileNotFoundError:
+                # Claimed by another worker first
+                continue
+            # The rename keeps the time the task was queued; start the lease now
+            os.utime(claimed)
+            with open(claimed, "rb") as f:
+                return task_id, f.read()
+        return None
+
+    def heartbeat(self, task_id):
+        """Renew the lease of a task claimed by this queue's worker."""
+        try:
+            os.utime(self._claimed_path(task_id))
+        except FileNotFoundError:
+            pass
+
+    def claims(self):
+        """Return the last lease renewal time of every claimed task, by task id."""
+        claims = {}
+        for name in os.listdir(os.path.join(self.directory, "claimed")):
+            parts = name.split(".")
+            if len(parts) != 3 or parts[2] != "pkl":
+                continue
+            task_id = parts[0]
+            try:
+                claims[task_id] = os.path.getmtime(os.path.join(self.directory, "claimed", name))
+            except FileNotFoundError:
+                pass
+        return claims
+
+    def claimed_at(self, task_id):
+        """Return the time the lease of a task was last renewed, or None if it is not claimed."""
+        return self.claims().get(task_id)
+
+    def is_claimed(self, task_id):
+        """Return whether a worker holds the task, running or answering it."""
+        return any(
+            name.startswith(task_id + ".")
+            for name in os.listdir(os.path.join(self.directory, "claimed"))
+        )
+
+    def requeue(self, task_id):
+        """Take a task back from the worker holding its claim, and queue it again."""
+        for name in os.listdir(os.path.join(self.directory, "claimed")):
+            if name.startswith(task_id + ".") and name.endswith(".pkl"):
+                try:
+                    os.rename(
+                        os.path.join(self.directory, "claimed", name),
+                        os.path.join(self.directory, "tasks", task_id + ".pkl"),
+                    )
+                except FileNotFoundError:
+                    # Being answered in the meantime
+                    pass
+
+    def finish(self, task_id, outcome):
+        """
+        Store the ("ok", value) or ("error", exception) outcome of a task this queue's worker claimed.
+
+        Returns False, dropping the outcome, if the claim was taken back in the
+        meantime (requeued or cancelled), else True.
+        """
+        # Renaming the claim commits the answer: it can no longer be requeued
+        answering = self._claimed_path(task_id)[: -len(".pkl")] + ".answering"
+        try:
+            os.rename(self._claimed_path(task_id), answering)
+        except FileNotFoundError:
+            return False
+        try:
+            data = pickle.dumps(outcome)
+        except Exception:
+            data = pickle.dumps(("error", RuntimeError(traceback.format_exc())))
+        self._write("results", task_id, data)
+        # Removed only once the result is written, so a task that is not
+        # claimed any more either has its result stored or never will
+        os.remove(answering)
+        return True
+
+    def pop_result(self, task_id):
+        """Return and remove the outcome of a task, or None if it has not finished."""
+        path = os.path.join(self.directory, "results", task_id + ".pkl")
+        try:
+            with open(path, "rb") as f:
+                outcome = pickle.load(f)
+        except FileNotFoundError:
+            return None
+        os.remove(path)
+        return outcome
+
+    def cancel(self, task_id):
+        """Remove a task that no worker has claimed yet, returning False if one has."""
+        try:
+            os.remove(os.path.join(self.directory, "tasks", task_id + ".pkl"))
+        except FileNotFoundError:
+            return False
+        return True
+
+    def stop(self):
+        """Tell the workers to exit."""
+        open(os.path.join(self.directory, "STOP"), "w").close()
+
+    @property
+    def stopped(self):
+        return os.path.exists(os.path.join(self.directory, "STOP"))
+
+    def _claimed_path(self, task_id):
+        return os.path.join(self.directory, "claimed", f"{task_id}.{self.worker_id}.pkl")
+
+    def _write(self, folder, task_id, data):
+        tmp = os.path.join(self.directory, folder, f".{task_id}.tmp")
+        with open(tmp, "wb") as f:
+            f.write(data)
+        os.replace(tmp, os.path.join(self.directory, folder, task_id + ".pkl"))
+
+
+class FileQueueBackend(ParallelBackendBase):
+    """
+    A joblib backend running the tasks through a `WorkQueue` served by `run_worker`.
+
+    Each batch of tasks is pickled (with cloudpickle) to the queue directory
+    and a background thread collects the results as the workers write them.
+    Nested joblib calls inside a task run sequentially on its worker.
+
+    The same thread puts back the tasks whose worker stopped renewing its
+    lease for `lease` seconds (a crashed worker or machine), so another worker
+    runs them. If no worker claims, renews or finishes any of the pending
+    tasks for `timeout` seconds (no workers at all, or all of them dead), the
+    pending tasks fail with a `TimeoutError` instead of waiting forever.
+    Tasks that are no longer pending (aborted or timed out) while a worker
+    runs them are taken back from it, or their late result is discarded, so
+    nothing is left behind in the queue.
+
+    Parameters
+    ----------
+    queue_dir : str
+        The queue directory.
+    n_workers : int, optional
+        The number of workers expected to serve the queue; joblib keeps about
+        twice as many tasks queued. Defaults to None, the number of CPUs here.
+    poll_interval : float, optional
+        Seconds between checks for finished tasks. Defaults to 0.05.
+    lease : float, optional
+        Seconds after its last heartbeat before a claimed task is requeued.
+        Keep it well above the workers' `heartbeat_interval`, and above the
+        clock skew between the machines. Defaults to 60.
+    timeout : float, optional
+        Seconds without any worker activity on the pending tasks before they
+        fail. None waits forever. Defaults to 600.
+    """
+
+    supports_retrieve_callback = True
+
+    def __init__(
+        self, queue_dir, n_workers=None, poll_interval=0.05, lease=60, timeout=600, **kwargs
+    ):
+        super().__init__(**kwargs)
+        self.queue = WorkQueue(queue_dir)
+        self.n_workers = n_workers
+        self.poll_interval = poll_interval
+        self.lease = lease
+        self.timeout = timeout
+        self._pending = {}
+        # Tasks given up while a worker held them, whose late results are discarded
+        self._abandoned = set()
+        self._last_activity = time.time()
+        self._lock = threading.Lock()
+        self._collector = None
+
+    def __reduce__(self):
+        # Tasks pickle the backend of their Parallel call: on a worker their
+        # nested calls run sequentially instead of queueing more tasks
+        return SequentialBackend, ()
+
+    def effective_n_jobs(self, n_jobs):
+        # At least 2, or joblib would run the tasks in this process
+        return max(self.n_workers or cpu_count(), 2)
+
+    def configure(self, n_jobs=1, parallel=None, **backend_kwargs):
+        self.parallel = parallel
+        return self.effective_n_jobs(n_jobs)
+
+    def submit(self, func, callback=None):
+        """Queue a batch of tasks and return the future of its result."""
+        # Workers claim tasks in name order, so the oldest first
+        task_id = f"{time.time_ns()}-{uuid.uuid4().hex}"
+        future = Future()
+        if callback is not None:
+            future.add_done_callback(callback)
+        with self._lock:
+            self._pending[task_id] = future
+            self.queue.put(task_id, func)
+            self._last_activity = time.time()
+            if self._collector is None:
+                self._collector = threading.Thread(target=self._collect, daemon=True)
+                self._collector.start()
+        return future
+
+    def retrieve_result_callback(self, future):
+        return future.result()
+
+    def abort_everything(self, ensure_ready=True):
+        """Cancel the tasks not claimed yet; running ones finish and are ignored."""
+        with self._lock:
+            for task_id, future in self._pending.items():
+                if not self.queue.cancel(task_id):
+                    self._abandoned.add(task_id)
+                future.cancel()
+            self._pending.clear()
+
+    def terminate(self):
+        self.abort_everything()
+
+    def _collect(self):
+        """Resolve the futures of finished tasks until none are pending, requeueing stale claims."""
+        while True:
+            with self._lock:
+                if not self._pending and not self._abandoned:
+                    self._collector = None
+                    return
+                pending = list(self._pending.items())
+                abandoned = list(self._abandoned)
+            claims = self.queue.claims()
+            for task_id in abandoned:
+                self._discard(task_id, claims.get(task_id))
+            for task_id, future in pending:
+                outcome = self.queue.pop_result(task_id)
+                if outcome is None:
+                    self._check_lease(task_id, claims.get(task_id))
+                    continue
+                with self._lock:
+                    self._pending.pop(task_id, None)
+                    self._last_activity = time.time()
+                status, value = outcome
+                if status == "ok":
+                    future.set_result(value)
+                else:
+                    future.set_exception(value)
+            if self.timeout is not None and time.time() - self._last_activity > self.timeout:
+                self._fail_pending(
+                    TimeoutError(
+                        f"No worker served the queue {self.queue.directory} for "
+                        f"{self.timeout} s; start workers with run_worker"
+                    )
+                )
+            time.sleep(self.poll_interval)
+
+    def _check_lease(self, task_id, claimed_at):
+        """Requeue a claimed task whose lease expired, else count its heartbeat as activity."""
+        if claimed_at is None:
+            return
+        if time.time() - claimed_at > self.lease:
+            self.queue.requeue(task_id)
+        else:
+            with self._lock:
+                self._last_activity = max(self._last_activity, claimed_at)
+
+    def _discard(self, task_id, claimed_at):
+        """Take an abandoned task back from its worker, or drop its result once written."""
+        if claimed_at is not None:
+            # The worker then drops its result instead of storing it
+            self.queue.requeue(task_id)
+            self.queue.cancel(task_id)
+            return
+        if self.queue.is_claimed(task_id):
+            # The worker is writing its result
+            return
+        self.queue.cancel(task_id)
+        self.queue.pop_result(task_id)
+        with self._lock:
+            self._abandoned.discard(task_id)
+
+    def _fail_pending(self, error):
+        """Cancel the pending tasks and fail their futures with `error`."""
+        with self._lock:
+            pending = list(self._pending.items())
+            for task_id in self._pending:
+                if not self.queue.cancel(task_id):
+                    self._abandoned.add(task_id)
+            self._pending.clear()
+        for task_id, future in pending:
+            future.set_exception(error)
+
+
+register_parallel_backend(QUEUE_BACKEND, FileQueueBackend)
+
+
+def run_worker(queue_dir, poll_interval=0.05, max_idle=None, heartbeat_interval=5):
+    """
+    Run the tasks of a `WorkQueue` until it is stopped or idle for `max_idle` seconds.
+
+    While a task runs, a background thread renews its lease every
+    `heartbeat_interval` seconds, so the coordinator does not requeue it.
+
+    Parameters
+    ----------
+    queue_dir : str
+        The queue directory.
+    poll_interval : float, optional
+        Seconds between checks for new tasks. Defaults to 0.05.
+    max_idle : float, optional
+        Exit after this many seconds without a task. Defaults to None (only
+        exit when the queue is stopped).
+    heartbeat_interval : float, optional
+        Seconds between lease renewals of the running task. Defaults to 5.
+
+    Returns
+    -------
+    int
+        The number of tasks run.
+    """
+    queue = WorkQueue(queue_dir)
+    n_tasks, idle_since = 0, time.time()
+    while not queue.stopped:
+        task = queue.claim()
+        if task is None:
+            if max_idle is not None and time.time() - idle_since > max_idle:
+                break
+            time.sleep(poll_interval)
+            continue
+        task_id, data = task
+        done = threading.Event()
+        heartbeat = threading.Thread(
+            target=_renew_lease, args=(queue, task_id, heartbeat_interval, done), daemon=True
+        )
+        heartbeat.start()
+        try:
+            outcome = ("ok", pickle.loads(data)())
+        except Exception as e:
+            outcome = ("error", e)
+        finally:
+            done.set()
+            heartbeat.join()
+        queue.finish(task_id, outcome)
+        n_tasks += 1
+        idle_since = time.time()
+    return n_tasks
+
+
+def _renew_lease(queue, task_id, interval, done):
+    """Renew the lease of a running task every `interval` seconds until `done` is set."""
+    while not done.wait(interval):
+        queue.heartbeat(task_id)
+
+
+class LocalQueueCluster:
+    """
+    A stand-in for a cluster: `run_worker` processes on this machine serving a queue.
+
+    Parameters
+    ----------
+    queue_dir : str
+        The queue directory.
+    n_workers : int, optional
+        The number of worker processes. Defaults to 2.
+
+    Examples
+    --------
+    >>> with LocalQueueCluster("results/queue", n_workers=4):
+    ...     with ExecutionBackend("file-queue", queue_dir="results/queue", n_workers=4):
+    ...         search.fit(X_train, y_train)
+    """
+
+    def __init__(self, queue_dir, n_workers=2):
+        self.queue_dir = queue_dir
+        self.n_workers = n_workers
+        self._processes = []
+
+    def __enter__(self):
+        queue = WorkQueue(self.queue_dir)
+        if queue.stopped:
+            os.remove(os.path.join(self.queue_dir, "STOP"))
+        # Fresh interpreters, like workers started on other machines
+        context = multiprocessing.get_context("spawn")
+        self._processes = [
+            context.Process(target=run_worker, args=(self.queue_dir,), daemon=True)
+            for _ in range(self.n_workers)
+        ]
+        for process in self._processes:
+            process.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        WorkQueue(self.queue_dir).stop()
+        for process in self._processes:
+            process.join(timeout=10)
+            if process.is_alive():
+                process.terminate()
+        self._processes = []
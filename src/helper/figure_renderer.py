@@ -0,0 +1,160 @@
+import inspect
+import json
+import os
+import time
+
+import joblib
+from joblib import Parallel, delayed
+
+from .columnar_cache import file_sha256
+from .dag_runner import script_sources
+
+
+class FigureTask:
+    """
+    One figure to render: a function, the data it draws and the file it writes.
+
+    Parameters
+    ----------
+    name : str
+        Name of the figure, used in progress messages.
+    render : callable
+        A module-level function called as `render(data, output, **params)`
+        that draws the figure and saves it to `output`. It runs in a worker
+        process with the non-interactive Agg backend.
+    output : str
+        Path of the figure file.
+    data : object
+        The (ideally pre-aggregated) data the figure is drawn from. It is
+        hashed to detect changes and sent to the worker, so keep it small.
+    params : dict, optional
+        Extra keyword arguments of `render`, also part of the hash.
+
+    The hash covers the source of `render`'s module and of the local modules
+    it imports, directly or indirectly (see `dag_runner.script_sources`), so
+    editing a plotting helper re-renders the figures drawn with it.
+    """
+
+    def __init__(self, name, render, output, data, params=None):
+        self.name = name
+        self.render = render
+        self.output = output
+        self.data = data
+        self.params = params or {}
+
+    def key(self):
+        """Return the hash of the task's data, parameters and rendering code."""
+        return joblib.hash(
+            (
+                self.render.__module__,
+                self.render.__qualname__,
+                _code_hashes(self.render),
+                self.output,
+                self.data,
+                self.params,
+            )
+        )
+
+
+def _code_hashes(render):
+    """Return the hashes of the module of `render` and the local modules it imports."""
+    source = inspect.getsourcefile(render)
+    if source is None:
+        return None
+    if render.__module__ == "__main__":
+        # Scripts import the helpers from src/, as in `sys.path.append("src")`
+        src_dir = "src"
+    else:
+        # The directory holding the top-level package of the module
+        src_dir = source
+        for _ in render.__module__.split("."):
+            src_dir = os.path.dirname(src_dir)
+    return {
+        os.path.relpath(path, src_dir): file_sha256(path)
+        for path in script_sources(source, src_dir)
+    }
+
+
+def render_figures(tasks, cache_path=None, n_jobs=-1, force=False, log=None):
+    """
+    Render figures in parallel worker processes, skipping unchanged ones.
+
+    Each task runs as its own job in a joblib process pool, with matplotlib's
+    non-interactive Agg backend, so nothing is shown or blocks on a display.
+    When `cache_path` is given, the key of each rendered figure is saved
+    there, and a later call skips the figures whose key is unchanged and whose
+    file still exists.
+
+    Parameters
+    ----------
+    tasks : list of FigureTask
+        The figures to render.
+    cache_path : str, optional
+        JSON file of the keys of the figures already rendered. Defaults to
+        None, in which case every figure is rendered.
+    n_jobs : int, optional
+        Number of worker processes, -1 for one per CPU. Defaults to -1.
+    force : bool, optional
+        Whether to render every figure even if unchanged. Defaults to False.
+    log : callable, optional
+        Called with a progress message per figure. Defaults to None.
+
+    Returns
+    -------
+    dict
+        For each task name, "skipped" or the rendering time in seconds.
+
+    Examples
+    --------
+    >>> tasks = [FigureTask("education", plot_education, "results/figures/education.png", counts)]
+    >>> render_figures(tasks, cache_path="results/figures/.figure-cache.json")
+    {'education': 0.41}
+    """
+    cache = {}
+    if cache_path and os.path.exists(cache_path):
+        with open(cache_path) as f:
+            cache = json.load(f)
+
+    keys = {task.name: task.key() for task in tasks}
+    todo = [
+        task
+        for task in tasks
+        if force or cache.get(task.output) != keys[task.name] or not os.path.exists(task.output)
+    ]
+    report = {task.name: "skipped" for task in tasks if task not in todo}
+    if log:
+        for name in report:
+            log(f"{name}: unchanged, skipped")
+
+    n_jobs = min(joblib.cpu_count() if n_jobs == -1 else n_jobs, len(todo)) or 1
+    seconds = Parallel(n_jobs=n_jobs)(
+        delayed(_render_task)(task.render, task.data, task.output, task.params)
+        for task in todo
+    )
+    for task, elapsed in zip(todo, seconds):
+        report[task.name] = elapsed
+        cache[task.output] = keys[task.name]
+        if log:
+            log(f"{task.name}: rendered in {elapsed:.1f}s")
+
+    if cache_path:
+        tmp_path = f"{cache_path}.tmp-{os.getpid()}"
+        with open(tmp_path, "w") as f:
+            json.dump(cache, f, indent=1, sort_keys=True)
+        os.replace(tmp_path, cache_path)
+    return {task.name: report[task.name] for task in tasks}
+
+
+def _render_task(render, data, output, params):
+    """Render one figure headlessly and return the time it took."""
+    import matplotlib
+
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+
+    start = time.perf_counter()
+    try:
+        render(data, output, **params)
+    finally:
+        plt.close("all")
+    return time.perf_counter() - start
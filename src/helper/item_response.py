@@ -0,0 +1,182 @@
+import re
+
+import numpy as np
+from sklearn.base import BaseEstimator, TransformerMixin
+from sklearn.compose import ColumnTransformer
+from sklearn.pipeline import Pipeline
+
+# Item columns are named q<block>_<item>, ex: q12_3 is the third item of block 12
+ITEM_PATTERN = r"^q\d+_\d+$"
+ITEM_NAME = re.compile(r"^q(\d+)_\d+$")
+
+
+def item_blocks(columns):
+    """
+    Return the item columns grouped by question block, in order of appearance.
+
+    Parameters
+    ----------
+    columns : list of str
+        The item column names. A name not of the form `q<block>_<item>` is a
+        block of its own.
+
+    Returns
+    -------
+    dict
+        The block name (ex: "q12") mapped to its item columns.
+
+    Examples
+    --------
+    >>> item_blocks(["q1_1", "q1_2", "q2_1"])
+    {'q1': ['q1_1', 'q1_2'], 'q2': ['q2_1']}
+    """
+    blocks = {}
+    for column in columns:
+        match = ITEM_NAME.match(column)
+        blocks.setdefault(f"q{match.group(1)}" if match else column, []).append(column)
+    return blocks
+
+
+class ItemResponseFeatures(TransformerMixin, BaseEstimator):
+    """
+    Summarise the `q*` item responses into per-block and overall scores.
+
+    For each respondent the output has the accuracy (share of answered items
+    that are correct) of each question block, then the overall accuracy, the
+    difficulty-weighted score and the number of unanswered items. An item's
+    difficulty is its share of wrong answers in the training data, so the
+    weighted score counts hard items more. Accuracies of respondents who
+    answered nothing are imputed with the training accuracy.
+
+    The rows are processed `chunksize` at a time as uint8 arrays, and the
+    per-block sums are a matrix product with the block indicator matrix, so
+    memory stays bounded whatever the number of rows. The input is the item
+    columns of a DataFrame, as selected in a ColumnTransformer; they are
+    loaded as nullable Int8 (see `load_survey_data`).
+
+    Parameters
+    ----------
+    chunksize : int, optional
+        The number of rows processed at a time. Defaults to 50000.
+
+    Examples
+    --------
+    >>> preprocessor = make_column_transformer(
+    ...     (make_pipeline(ItemResponseFeatures(), StandardScaler()), make_column_selector(ITEM_PATTERN)),
+    ... )
+    """
+
+    def __init__(self, chunksize=50_000):
+        self.chunksize = chunksize
+
+    def fit(self, X, y=None):
+        """Learn the item blocks, the item difficulties and the training accuracies."""
+        columns = list(X.columns)
+        self.feature_names_in_ = np.asarray(columns, dtype=object)
+        self.n_features_in_ = len(columns)
+        blocks = item_blocks(columns)
+        self.blocks_ = list(blocks)
+        block_of = {item: i for i, items in enumerate(blocks.values()) for item in items}
+        self.block_index_ = np.array([block_of[column] for column in columns], dtype=np.intp)
+
+        answered = np.zeros(len(columns))
+        correct = np.zeros(len(columns))
+        for answered_bits, correct_bits in self._chunks(X):
+            answered += answered_bits.sum(axis=0)
+            correct += correct_bits.sum(axis=0)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            self.difficulty_ = np.where(answered > 0, 1 - correct / answered, 0.5)
+        indicator = self._indicator()
+        with np.errstate(invalid="ignore", divide="ignore"):
+            self.block_accuracy_ = np.nan_to_num(
+                (correct @ indicator) / (answered @ indicator), nan=0.0
+            )
+            self.accuracy_ = np.nan_to_num(correct.sum() / answered.sum(), nan=0.0)
+            self.weighted_score_ = np.nan_to_num(
+                (correct @ self.difficulty_) / (answered @ self.difficulty_), nan=0.0
+            )
+        return self
+
+    def transform(self, X):
+        """
+        Return the item features as a float array of shape (n_samples, n_blocks + 3).
+
+        Parameters
+        ----------
+        X : pandas.DataFrame
+            The item responses, with the columns seen in `fit`.
+
+        Returns
+        -------
+        numpy.ndarray
+            The block accuracies, overall accuracy, weighted score and number
+            of unanswered items.
+        """
+        columns = list(X.columns)
+        if columns != list(self.feature_names_in_):
+            raise ValueError("The item columns differ from those seen in fit")
+        indicator = self._indicator().astype(np.float32)
+        difficulty = self.difficulty_.astype(np.float32)
+
+        output = np.empty((len(X), len(self.blocks_) + 3))
+        start = 0
+        for answered_bits, correct_bits in self._chunks(X):
+            answered = answered_bits.astype(np.float32)
+            correct = correct_bits.astype(np.float32)
+            stop = start + len(answered)
+            block_answered = answered @ indicator
+            n_answered = answered.sum(axis=1)
+            weight = answered @ difficulty
+            with np.errstate(invalid="ignore", divide="ignore"):
+                output[start:stop, :-3] = np.where(
+                    block_answered > 0, (correct @ indicator) / block_answered, self.block_accuracy_
+                )
+                output[start:stop, -3] = np.where(
+                    n_answered > 0, correct.sum(axis=1) / n_answered, self.accuracy_
+                )
+                output[start:stop, -2] = np.where(
+                    weight > 0, (correct @ difficulty) / weight, self.weighted_score_
+                )
+            output[start:stop, -1] = len(columns) - n_answered
+            start = stop
+        return output
+
+    def get_feature_names_out(self, input_features=None):
+        """Return the names of the block accuracies and overall scores."""
+        return np.asarray(
+            [f"{block}_accuracy" for block in self.blocks_]
+            + ["item_accuracy", "item_weighted_score", "item_missing"],
+            dtype=object,
+        )
+
+    def _indicator(self):
+        """Return the (n_items, n_blocks) 0/1 matrix of the block of each item."""
+        indicator = np.zeros((len(self.block_index_), len(self.blocks_)))
+        indicator[np.arange(len(self.block_index_)), self.block_index_] = 1
+        return indicator
+
+    def _chunks(self, X):
+        """Yield the "answered" and "correct" uint8 arrays of the rows, a chunk at a time."""
+        for start in range(0, len(X), self.chunksize):
+            yield _response_bits(X.iloc[start:start + self.chunksize])
+
+
+def uses_item_responses(estimator):
+    """Return whether a preprocessor or pipeline contains an `ItemResponseFeatures` step."""
+    if isinstance(estimator, ItemResponseFeatures):
+        return True
+    if isinstance(estimator, Pipeline):
+        return any(uses_item_responses(step) for _, step in estimator.steps)
+    if isinstance(estimator, ColumnTransformer):
+        transformers = getattr(estimator, "transformers_", estimator.transformers)
+        return any(uses_item_responses(transformer) for _, transformer, _ in transformers)
+    return False
+
+
+def _response_bits(df):
+    """Return the "answered" and "correct" (value > 0) uint8 arrays of item columns."""
+    values = df.to_numpy(dtype=np.float32, na_value=np.nan)
+    answered = ~np.isnan(values)
+    with np.errstate(invalid="ignore"):
+        correct = values > 0
+    return answered.astype(np.uint8), correct.astype(np.uint8)
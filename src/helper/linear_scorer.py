@@ -0,0 +1,216 @@
+import csv
+import json
+
+import numpy as np
+
+SCORER_FORMAT = "linear-scorer/1"
+
+
+class LinearScorer:
+    """
+    Score raw survey rows with a compiled linear pipeline, using NumPy only.
+
+    The prediction is the intercept plus one additive contribution per input
+    column: `weight * value` for numeric columns (missing values replaced by a
+    fill value), or a table lookup for categorical columns (with separate
+    contributions for missing and unseen values). Scorers are produced by
+    `helper.compile_linear_scorer.compile_linear_pipeline` and saved as JSON, so
+    scoring needs neither scikit-learn nor pandas.
+
+    Parameters
+    ----------
+    intercept : float
+        The constant term, with the scaler offsets folded in.
+    numeric : list of dict
+        One dict per numeric column with "column", "weight" and "fill" (None
+        keeps missing values, giving a NaN prediction).
+    lookup : list of dict
+        One dict per categorical column with "column", "key_type" ("str" or
+        "float"), sorted "keys", their "values", and the "missing" and "unknown"
+        contributions (None for NaN).
+
+    Examples
+    --------
+    >>> scorer = LinearScorer.load("results/models/ridge_best_model.json")
+    >>> scorer.predict({"age": [34.0], "education": ["Graduate Degree"], ...})
+    """
+
+    def __init__(self, intercept, numeric, lookup):
+        self.intercept = float(intercept)
+        self.numeric = [
+            {
+                "column": spec["column"],
+                "weight": float(spec["weight"]),
+                "fill": _as_float(spec["fill"]),
+            }
+            for spec in numeric
+        ]
+        self.lookup = [_prepare_lookup(spec) for spec in lookup]
+
+    @property
+    def columns(self):
+        """The input columns the scorer reads."""
+        names = [spec["column"] for spec in self.numeric + self.lookup]
+        return list(dict.fromkeys(names))
+
+    def predict(self, data):
+        """
+        Return the predictions for a batch of rows.
+
+        Parameters
+        ----------
+        data : mapping of str to array-like
+            The values of each input column, ex: a dict of lists or arrays, or a
+            pandas.DataFrame. Columns of the same length are required.
+
+        Returns
+        -------
+        numpy.ndarray
+            The float64 predictions.
+        """
+        n_rows = len(data[self.columns[0]])
+        prediction = np.full(n_rows, self.intercept)
+        for spec in self.numeric:
+            values = np.asarray(data[spec["column"]], dtype=np.float64)
+            if not np.isnan(spec["fill"]):
+                values = np.where(np.isnan(values), spec["fill"], values)
+            prediction += spec["weight"] * values
+        for spec in self.lookup:
+            prediction += _lookup(spec, np.asarray(data[spec["column"]]))
+        return prediction
+
+    def predict_records(self, records):
+        """Return the predictions for a list of dicts, one per row; absent fields are missing."""
+        return self.predict(
+            {column: [record.get(column) for record in records] for column in self.columns}
+        )
+
+    def to_dict(self):
+        """Return the JSON-serialisable description of the scorer."""
+        return {
+            "format": SCORER_FORMAT,
+            "intercept": self.intercept,
+            "numeric": [
+                {**spec, "fill": _as_json(spec["fill"])} for spec in self.numeric
+            ],
+            "lookup": [
+                {
+                    "column": spec["column"],
+                    "key_type": spec["key_type"],
+                    "keys": spec["keys"].tolist(),
+                    "values": spec["values"].tolist(),
+                    "missing": _as_json(spec["missing"]),
+                    "unknown": _as_json(spec["unknown"]),
+                }
+                for spec in self.lookup
+            ],
+        }
+
+    @classmethod
+    def from_dict(cls, spec):
+        """Build a scorer from `to_dict` output."""
+        if spec.get("format") != SCORER_FORMAT:
+            raise ValueError(f"Unsupported scorer format: {spec.get('format')}")
+        return cls(spec["intercept"], spec["numeric"], spec["lookup"])
+
+    def save(self, path):
+        """Write the scorer to a JSON file."""
+        with open(path, "w") as f:
+            json.dump(self.to_dict(), f, indent=1)
+
+    @classmethod
+    def load(cls, path):
+        """Read a scorer from a JSON file."""
+        with open(path) as f:
+            return cls.from_dict(json.load(f))
+
+
+def iter_records(stream, input_format="ndjson", batch_size=1000):
+    """
+    Read raw survey records from a text stream in lists of dicts, without pandas.
+
+    Empty CSV fields are read as None, so they are scored as missing values;
+    other CSV fields stay strings and numeric columns are parsed by `predict`.
+
+    Parameters
+    ----------
+    stream : file-like
+        A text stream, ex: `sys.stdin` or an open file.
+    input_format : {"ndjson", "csv"}, optional
+        One JSON object per line, or CSV with a header row. Defaults to "ndjson".
+    batch_size : int, optional
+        Maximum number of records per list. Defaults to 1000.
+
+    Yields
+    ------
+    list of dict
+        The records of each batch, for `LinearScorer.predict_records`.
+    """
+    if input_format == "csv":
+        rows = (
+            {key: value if value != "" else None for key, value in row.items()}
+            for row in csv.DictReader(stream)
+        )
+    elif input_format == "ndjson":
+        rows = (json.loads(line) for line in stream if line.strip())
+    else:
+        raise ValueError(f"Unknown input format: {input_format}")
+
+    records = []
+    for record in rows:
+        records.append(record)
+        if len(records) == batch_size:
+            yield records
+            records = []
+    if records:
+        yield records
+
+
+def _prepare_lookup(spec):
+    key_type = spec["key_type"]
+    keys = np.asarray(spec["keys"], dtype=str if key_type == "str" else np.float64)
+    order = np.argsort(keys)
+    return {
+        "column": spec["column"],
+        "key_type": key_type,
+        "keys": keys[order],
+        "values": np.asarray(spec["values"], dtype=np.float64)[order],
+        "missing": _as_float(spec["missing"]),
+        "unknown": _as_float(spec["unknown"]),
+    }
+
+
+def _lookup(spec, values):
+    """Return the contribution of each value of a categorical column."""
+    if spec["key_type"] == "str":
+        # Only real None/NaN values are missing, not strings such as "None"
+        missing = np.equal(values, None) | _unequal_to_self(values)
+        values = values.astype(str)
+    else:
+        values = values.astype(np.float64)
+        missing = np.isnan(values)
+    keys = spec["keys"]
+    if len(keys) == 0:
+        return np.where(missing, spec["missing"], spec["unknown"])
+    index = np.minimum(np.searchsorted(keys, values), len(keys) - 1)
+    found = keys[index] == values
+    contribution = np.where(found, spec["values"][index], spec["unknown"])
+    return np.where(missing, spec["missing"], contribution)
+
+
+def _unequal_to_self(values):
+    """Return which values of an object array differ from themselves: NaN and pandas.NA."""
+    try:
+        return values != values
+    except TypeError:
+        # pandas.NA compares to NA, which has no truth value, so compare as
+        # objects (True, False or NA) and keep everything but False
+        return np.not_equal(values, values, dtype=object).astype(str) != "False"
+
+
+def _as_float(value):
+    return np.nan if value is None else float(value)
+
+
+def _as_json(value):
+    return None if np.isnan(value) else value
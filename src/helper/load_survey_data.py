@@ -0,0 +1,181 @@
+import os
+import resource
+import sys
+
+import pandas as pd
+
+# Features used by the preprocessor built in `english_score_eda.py`
+NUMERIC_FEATURES = ["age", "Eng_start", "Eng_country_yrs", "Lived_Eng_per"]
+CATEGORICAL_FEATURES = ["Eng_little", "speaker_cat"]
+BINARY_FEATURES = ["psychiatric"]
+BINARY_NA_FEATURES = ["house_Eng", "nat_Eng", "prime_Eng"]
+EDUCATION_FEATURES = ["education"]
+TARGET = "correct"
+
+# High-cardinality features only one-hot encoded on demand, into a sparse
+# design matrix (`english_score_eda.py --wide-categoricals`)
+WIDE_CATEGORICAL_FEATURES = ["currcountry", "natlangs", "primelangs", "UK_region"]
+
+MODEL_COLUMNS = (
+    NUMERIC_FEATURES
+    + CATEGORICAL_FEATURES
+    + BINARY_FEATURES
+    + BINARY_NA_FEATURES
+    + EDUCATION_FEATURES
+    + [TARGET]
+)
+
+# Compact dtypes for the survey columns. Numerics may contain NAs, so they are
+# read as float32 rather than small ints; the q* item columns are 0/1 answers.
+# Free-text columns are pinned to object so mostly-empty ones are not parsed as
+# float when a chunk happens to contain only NAs.
+SURVEY_DTYPES = {
+    "Unnamed: 0": "float64",
+    "id": "float64",
+    "date": "object",
+    "time": "object",
+    "natlangs": "object",
+    "primelangs": "object",
+    "currcountry": "object",
+    "countries": "object",
+    "Can_region": "object",
+    "Ir_region": "object",
+    "US_region": "object",
+    "UK_region": "object",
+    "UK_constituency": "object",
+    "education": "category",
+    "speaker_cat": "category",
+    "Eng_little": "category",
+    "gender": "category",
+    "type": "category",
+    "age": "float32",
+    "Eng_start": "float32",
+    "Eng_country_yrs": "float32",
+    "Lived_Eng_per": "float32",
+    "psychiatric": "float32",
+    "house_Eng": "float32",
+    "nat_Eng": "float32",
+    "prime_Eng": "float32",
+    "dyslexia": "float32",
+    "dictionary": "float32",
+    "already_participated": "float32",
+    "tests": "float32",
+    "correct": "float64",
+    "elogit": "float64",
+}
+ITEM_DTYPE = "Int8"
+
+
+def is_item_column(column):
+    """Return True for the per-question `q*` response columns."""
+    return column.startswith("q")
+
+
+def model_columns(item_columns=False, wide_categoricals=False):
+    """Return the `columns` of `load_survey_data` reading the model columns, and the optional ones asked for."""
+    columns = MODEL_COLUMNS + (WIDE_CATEGORICAL_FEATURES if wide_categoricals else [])
+    if not item_columns:
+        return columns
+    return lambda column: column in columns or is_item_column(column)
+
+
+def survey_dtype(column):
+    """Return the compact dtype used for a survey column, or None to let pandas infer it."""
+    if is_item_column(column):
+        return ITEM_DTYPE
+    return SURVEY_DTYPES.get(column)
+
+
+def load_survey_data(path, columns=None, chunksize=None, use_cache=True):
+    """
+    Read the survey CSV with only the requested columns and compact dtypes.
+
+    Parameters
+    ----------
+    path : str
+        Path or URL of the survey CSV file.
+    columns : list of str or callable, optional
+        The columns to read. A list keeps only the listed columns (missing ones
+        are ignored); a callable is passed each column name and keeps it when it
+        returns True. Defaults to None, in which case every column is read.
+    chunksize : int, optional
+        If given, return an iterator of DataFrames with at most `chunksize` rows
+        instead of a single DataFrame. Defaults to None.
+    use_cache : bool, optional
+        Whether to read the Parquet cache written by `write_parquet_cache` when
+        it exists and matches the CSV content. Defaults to True.
+
+    Returns
+    -------
+    pandas.DataFrame or iterator of pandas.DataFrame
+        The survey data, or an iterator over chunks of it.
+
+    Examples
+    --------
+    >>> train_df = load_survey_data("data/raw/train_data.csv", columns=MODEL_COLUMNS)
+    >>> for chunk in load_survey_data("data/raw/train_data.csv", chunksize=100_000):
+    ...     print(len(chunk))
+    """
+    if use_cache:
+        from .columnar_cache import read_parquet_cache
+
+        cached = read_parquet_cache(path, columns=columns, chunksize=chunksize)
+        if cached is not None:
+            return cached
+
+    header = pd.read_csv(path, sep=",", nrows=0).columns
+    if columns is None:
+        usecols = list(header)
+    elif callable(columns):
+        usecols = [column for column in header if columns(column)]
+    else:
+        wanted = set(columns)
+        usecols = [column for column in header if column in wanted]
+
+    dtype = {
+        column: survey_dtype(column)
+        for column in usecols
+        if survey_dtype(column) is not None
+    }
+    if chunksize is None:
+        return pd.read_csv(
+            path,
+            sep=",",
+            on_bad_lines="skip",
+            usecols=usecols,
+            dtype=dtype,
+            low_memory=False,
+        )
+    return pd.read_csv(
+        path,
+        sep=",",
+        on_bad_lines="skip",
+        usecols=usecols,
+        dtype=dtype,
+        chunksize=chunksize,
+    )
+
+
+def peak_rss_mb():
+    """Return the peak resident set size of the current process in MB."""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is reported in bytes on macOS and in kilobytes elsewhere
+    if sys.platform == "darwin":
+        return peak / 1024**2
+    return peak / 1024
+
+
+def current_rss_mb():
+    """Return the current resident set size of the process in MB, or None if unknown."""
+    try:
+        with open("/proc/self/statm") as f:
+            pages = int(f.read().split()[1])
+    except (OSError, IndexError, ValueError):
+        return None
+    return pages * os.sysconf("SC_PAGE_SIZE") / 1024**2
+
+
+def frame_memory_mb(df):
+    """Return the deep memory usage of a DataFrame in MB."""
+    return df.memory_usage(deep=True).sum() / 1024**2
+
@@ -0,0 +1,55 @@
+import os
+
+from .artifact_store import open_artifact
+from .columnar_cache import file_sha256
+
+
+class FingerprintMismatch(ValueError):
+    """Raised when a model artifact does not match the data or file it claims."""
+
+
+def verify_model_fingerprint(model_path, train_path):
+    """
+    Check that a model artifact is the one fitted on the given training CSV.
+
+    The fingerprint is the artifact manifest written by `ArtifactStore.save`,
+    which records the SHA-256 of the stored object and of its training data.
+
+    Parameters
+    ----------
+    model_path : str
+        Path of an `ArtifactStore` artifact directory, either the name
+        directory (its latest version) or a version directory.
+    train_path : str
+        Path of the training CSV the model should have been fitted on.
+
+    Returns
+    -------
+    dict
+        The artifact manifest.
+
+    Raises
+    ------
+    FingerprintMismatch
+        If the model is not a store artifact or does not record its training
+        data, the model file changed since it was stored, or the training CSV
+        differs from the one it was fitted on.
+    """
+    if not os.path.isdir(model_path):
+        raise FingerprintMismatch(
+            f"{model_path} is not an artifact directory and records no training data"
+        )
+    artifact = open_artifact(model_path)
+    manifest = artifact.manifest
+    try:
+        artifact.verify()
+    except ValueError as e:
+        raise FingerprintMismatch(str(e))
+    if manifest["data_sha256"] is None:
+        raise FingerprintMismatch(f"{model_path} does not record the data it was fitted on")
+    if file_sha256(train_path) != manifest["data_sha256"]:
+        raise FingerprintMismatch(
+            f"{train_path} differs from the training data {model_path} was fitted on "
+            f"({manifest['data_path']} at the time)"
+        )
+    return manifest
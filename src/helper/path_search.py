@@ -0,0 +1,360 @@
+import time
+
+import numpy as np
+import scipy.sparse as sp
+from joblib import Parallel, delayed
+from sklearn.base import clone
+from sklearn.linear_model import Lasso, Ridge, lasso_path
+from sklearn.metrics import mean_absolute_error, mean_squared_error, r2_score
+from sklearn.model_selection import ParameterSampler, check_cv
+from sklearn.pipeline import Pipeline
+
+from .cv_results import build_cv_results
+
+# Scorers computed from predictions, named as in scikit-learn's `scoring`
+PATH_SCORERS = {
+    "r2": r2_score,
+    "neg_mean_squared_error": lambda y, y_pred: -mean_squared_error(y, y_pred),
+    "neg_root_mean_squared_error": lambda y, y_pred: -np.sqrt(
+        mean_squared_error(y, y_pred)
+    ),
+    "neg_mean_absolute_error": lambda y, y_pred: -mean_absolute_error(y, y_pred),
+}
+
+
+class RidgePathSearchCV:
+    """
+    Search the Ridge `alpha` with one SVD per fold instead of one fit per candidate.
+
+    For each CV fold the preprocessing steps are fitted once, the centred
+    training matrix is decomposed with a thin SVD, and the predictions for every
+    sampled alpha are then obtained in closed form. Alphas are drawn with
+    `ParameterSampler` exactly as in `RandomizedSearchCV`, and `cv_results_`
+    has the same layout, so the object can be passed to
+    `fit_and_return_top_models` in place of a `RandomizedSearchCV`.
+
+    Parameters
+    ----------
+    estimator : Pipeline or Ridge
+        A Ridge model, or a pipeline of transformers ending in one.
+    param_distributions : dict
+        A single entry mapping the alpha parameter (e.g. "ridge__alpha") to a
+        distribution or a list of values.
+    n_iter : int, optional
+        Number of alphas sampled. Defaults to 10.
+    cv : int or cross-validation generator, optional
+        The CV splitting strategy, as in `RandomizedSearchCV`. Defaults to 5-fold.
+    scoring : str or dict, optional
+        A scorer name from `PATH_SCORERS`, or a dict mapping display names to
+        them. Defaults to None, which reports R squared as "score".
+    refit : bool or str, optional
+        Whether to refit the best alpha on the whole data. With several scorers,
+        the name of the scorer that picks the best alpha. Defaults to True.
+    random_state : int, optional
+        Seed for sampling the alphas. Defaults to None.
+    return_train_score : bool, optional
+        Whether to report training scores. Defaults to False.
+    n_jobs : int, optional
+        Number of folds processed in parallel. Defaults to None (one).
+
+    Examples
+    --------
+    >>> search = RidgePathSearchCV(
+    ...     make_pipeline(preprocessor, Ridge()),
+    ...     {"ridge__alpha": loguniform(1e-3, 1e3)},
+    ...     n_iter=30, cv=10, scoring=SCORING, refit="RMSE", random_state=123,
+    ... )
+    >>> fit_and_return_top_models(search, 5, X_train, y_train, scoring="RMSE")
+    """
+
+    model_class = Ridge
+    # Preprocessing is fitted once per fold here, not once per candidate
+    fits_pipeline_per_candidate = False
+
+    def __init__(
+        self,
+        estimator,
+        param_distributions,
+        n_iter=10,
+        cv=None,
+        scoring=None,
+        refit=True,
+        random_state=None,
+        return_train_score=False,
+        n_jobs=None,
+    ):
+        self.estimator = estimator
+        self.param_distributions = param_distributions
+        self.n_iter = n_iter
+        self.cv = cv
+        self.scoring = scoring
+        self.refit = refit
+        self.random_state = random_state
+        self.return_train_score = return_train_score
+        self.n_jobs = n_jobs
+
+    def fit(self, X, y):
+        """Evaluate every sampled alpha on every fold and refit the best one."""
+        param_name = self._alpha_param_name()
+        candidate_params = self._candidate_params()
+        alphas = np.array([params[param_name] for params in candidate_params], dtype=float)
+        scorers = self._scorers()
+
+        cv = check_cv(self.cv, y, classifier=False)
+        splits = list(cv.split(X, y))
+        y = np.asarray(y)
+
+        fold_results = Parallel(n_jobs=self.n_jobs)(
+            delayed(self._evaluate_fold)(X, y, train, test, alphas, scorers)
+            for train, test in splits
+        )
+
+        test_scores = {
+            name: np.column_stack([fold["test"][name] for fold in fold_results])
+            for name in scorers
+        }
+        train_scores = None
+        if self.return_train_score:
+            train_scores = {
+                name: np.column_stack([fold["train"][name] for fold in fold_results])
+                for name in scorers
+            }
+        self.cv_results_ = build_cv_results(
+            candidate_params,
+            test_scores,
+            np.column_stack([fold["fit_time"] for fold in fold_results]),
+            np.column_stack([fold["score_time"] for fold in fold_results]),
+            train_scores,
+        )
+        self.n_splits_ = len(splits)
+        self.multimetric_ = isinstance(self.scoring, dict)
+
+        refit_metric = self.refit if isinstance(self.refit, str) else "score"
+        if self.refit:
+            self.best_index_ = int(
+                np.argmin(self.cv_results_["rank_test_" + refit_metric])
+            )
+            self.best_params_ = candidate_params[self.best_index_]
+            self.best_score_ = self.cv_results_["mean_test_" + refit_metric][
+                self.best_index_
+            ]
+            refit_start = time.time()
+            self.best_estimator_ = (
+                clone(self.estimator).set_params(**self.best_params_).fit(X, y)
+            )
+            self.refit_time_ = time.time() - refit_start
+        return self
+
+    def _evaluate_fold(self, X, y, train, test, alphas, scorers):
+        """Fit the preprocessing once and score every alpha on one fold."""
+        start = time.time()
+        transformer, model = self._split_estimator()
+        X_train, X_test = _take_rows(X, train), _take_rows(X, test)
+        y_train, y_test = y[train], y[test]
+        if transformer is not None:
+            X_train = transformer.fit_transform(X_train, y_train)
+            X_test = transformer.transform(X_test)
+        X_train, X_test = _to_dense(X_train), _to_dense(X_test)
+        fit_intercept = model.get_params()["fit_intercept"]
+        if fit_intercept:
+            X_offset, y_offset = X_train.mean(axis=0), y_train.mean()
+        else:
+            X_offset, y_offset = np.zeros(X_train.shape[1]), 0.0
+
+        path = self._solve_path(X_train - X_offset, y_train - y_offset, alphas, model)
+        shared_time = (time.time() - start) / len(alphas)
+
+        fold = {
+            "test": {name: np.empty(len(alphas)) for name in scorers},
+            "train": {name: np.empty(len(alphas)) for name in scorers},
+            "fit_time": np.empty(len(alphas)),
+            "score_time": np.empty(len(alphas)),
+        }
+        for i, alpha in enumerate(alphas):
+            fit_start = time.time()
+            coef = path.coef(i)
+            intercept = y_offset - X_offset @ coef
+            fold["fit_time"][i] = shared_time + time.time() - fit_start
+
+            score_start = time.time()
+            y_pred = X_test @ coef + intercept
+            for name, scorer in scorers.items():
+                fold["test"][name][i] = scorer(y_test, y_pred)
+            fold["score_time"][i] = time.time() - score_start
+            if self.return_train_score:
+                y_fit = X_train @ coef + intercept
+                for name, scorer in scorers.items():
+                    fold["train"][name][i] = scorer(y_train, y_fit)
+        return fold
+
+    def _solve_path(self, X_centered, y_centered, alphas, model):
+        """Decompose the centred training matrix once for all alphas."""
+        return _RidgeSVDPath(X_centered, y_centered, alphas)
+
+    def _split_estimator(self):
+        """Return fresh copies of the preprocessing steps and the final model."""
+        estimator = clone(self.estimator)
+        if isinstance(estimator, Pipeline):
+            model = estimator.steps[-1][1]
+            transformer = estimator[:-1] if len(estimator.steps) > 1 else None
+        else:
+            model, transformer = estimator, None
+        if not isinstance(model, self.model_class):
+            raise TypeError(
+                f"{type(self).__name__} requires a {self.model_class.__name__} "
+                f"as the final estimator, got {type(model).__name__}"
+            )
+        return transformer, model
+
+    def _alpha_param_name(self):
+        names = list(self.param_distributions)
+        if len(names) != 1 or not (names[0] == "alpha" or names[0].endswith("__alpha")):
+            raise ValueError(
+                f"{type(self).__name__} searches a single alpha parameter, got {names}"
+            )
+        return names[0]
+
+    def _candidate_params(self):
+        return list(
+            ParameterSampler(
+                self.param_distributions, self.n_iter, random_state=self.random_state
+            )
+        )
+
+    def _scorers(self):
+        if self.scoring is None:
+            return {"score": PATH_SCORERS["r2"]}
+        if isinstance(self.scoring, str):
+            return {"score": _path_scorer(self.scoring)}
+        return {name: _path_scorer(scoring) for name, scoring in self.scoring.items()}
+
+
+class _RidgeSVDPath:
+    """Ridge coefficients for many alphas from one thin SVD of the design matrix."""
+
+    def __init__(self, X, y, alphas):
+        U, self.s, self.Vt = np.linalg.svd(X, full_matrices=False)
+        self.Uty = U.T @ y
+        self.alphas = alphas
+
+    def coef(self, i):
+        d = self.s / (self.s**2 + self.alphas[i])
+        return self.Vt.T @ (d * self.Uty)
+
+
+class LassoPathSearchCV(RidgePathSearchCV):
+    """
+    Search the Lasso `alpha` with warm-started coordinate descent along the path.
+
+    For each CV fold the preprocessing steps are fitted once and `lasso_path`
+    solves the alphas from the largest to the smallest, starting each solve from
+    the previous solution instead of from zero. Apart from the final estimator
+    and `alpha_grid`, the parameters and results are those of
+    `RidgePathSearchCV`; the Lasso `max_iter` and `tol` of the estimator are
+    used for every alpha.
+
+    Parameters
+    ----------
+    estimator : Pipeline or Lasso
+        A Lasso model, or a pipeline of transformers ending in one.
+    param_distributions : dict
+        A single entry mapping the alpha parameter (e.g. "lasso__alpha") to a
+        distribution or a list of values.
+    alpha_grid : int, optional
+        If given, search this many log-spaced alphas spanning the distribution
+        (or list) instead of `n_iter` random ones. Since the path is warm
+        started, a fine grid costs little more than a few cold fits. Defaults
+        to None.
+    **kwargs
+        The remaining parameters of `RidgePathSearchCV`.
+
+    Examples
+    --------
+    >>> search = LassoPathSearchCV(
+    ...     make_pipeline(preprocessor, Lasso()),
+    ...     {"lasso__alpha": loguniform(1e-3, 1e3)},
+    ...     alpha_grid=100, cv=10, scoring=SCORING, refit="RMSE",
+    ... )
+    >>> fit_and_return_top_models(search, 5, X_train, y_train, scoring="RMSE")
+    """
+
+    model_class = Lasso
+
+    def __init__(
+        self,
+        estimator,
+        param_distributions,
+        n_iter=10,
+        cv=None,
+        scoring=None,
+        refit=True,
+        random_state=None,
+        return_train_score=False,
+        n_jobs=None,
+        alpha_grid=None,
+    ):
+        super().__init__(
+            estimator,
+            param_distributions,
+            n_iter=n_iter,
+            cv=cv,
+            scoring=scoring,
+            refit=refit,
+            random_state=random_state,
+            return_train_score=return_train_score,
+            n_jobs=n_jobs,
+        )
+        self.alpha_grid = alpha_grid
+
+    def _solve_path(self, X_centered, y_centered, alphas, model):
+        return _LassoWarmPath(X_centered, y_centered, alphas, model)
+
+    def _candidate_params(self):
+        if self.alpha_grid is None:
+            return super()._candidate_params()
+        name = self._alpha_param_name()
+        values = self.param_distributions[name]
+        if hasattr(values, "support"):
+            low, high = values.support()
+        else:
+            low, high = min(values), max(values)
+        return [{name: alpha} for alpha in np.geomspace(low, high, self.alpha_grid)]
+
+
+class _LassoWarmPath:
+    """Lasso coefficients for many alphas, solved from the largest alpha down."""
+
+    def __init__(self, X, y, alphas, model):
+        params = model.get_params()
+        order = np.argsort(-alphas, kind="stable")
+        _, coefs, _ = lasso_path(
+            X,
+            y,
+            alphas=alphas[order],
+            max_iter=params["max_iter"],
+            tol=params["tol"],
+            positive=params["positive"],
+        )
+        # Put the solutions back in the order of the candidates
+        self.coefs = np.empty_like(coefs)
+        self.coefs[:, order] = coefs
+
+    def coef(self, i):
+        return self.coefs[:, i]
+
+
+def _path_scorer(scoring):
+    if scoring not in PATH_SCORERS:
+        raise ValueError(
+            f"Unsupported scoring {scoring!r} for a path search; "
+            f"choose from {sorted(PATH_SCORERS)}"
+        )
+    return PATH_SCORERS[scoring]
+
+
+def _take_rows(X, indices):
+    return X.iloc[indices] if hasattr(X, "iloc") else X[indices]
+
+
+def _to_dense(X):
+    return X.toarray() if sp.issparse(X) else np.asarray(X, dtype=float)
@@ -1,22 +1,28 @@
+import matplotlib.pyplot as plt
 import pandas as pd
 
+from .bin_counts import BinCounts
+
+
 def plot_histogram_with_exclusions(df, columns_to_exclude=None, bin=50, fig_size=(20, 15)):
     """
     Plots histograms for numeric columns in the provided DataFrame, with an option to exclude specific columns.
 
     This function filters the numeric columns in the DataFrame and generates a histogram for each one,
-    except for those specified to be excluded. It is designed to handle larger datasets by enabling
-    Altair's 'vegafusion' data transformer.
+    except for those specified to be excluded. The histograms are drawn from bin counts computed in one
+    vectorized pass over the data (see `BinCounts`), or from counts computed beforehand, so large
+    datasets are read once and never handed to matplotlib row by row.
 
     Parameters
     ----------
-    df : pandas.DataFrame
-        The DataFrame containing the data to plot.
+    df : pandas.DataFrame or BinCounts
+        The DataFrame containing the data to plot, or the bin counts of its columns.
     columns_to_exclude : list of str, optional
         A list of column names to exclude from the histogram plots. If a column name specified does not exist,
         it will be ignored. Defaults to None, in which case no columns are excluded.
     bin : int, optional
-        The number of bins to use for the histograms. Defaults to 50.
+        The number of bins to use for the histograms. Defaults to 50. Ignored for `BinCounts`,
+        which carry their own bins.
     fig_size : tuple of int, optional
         The size of the figure for each histogram, specified as (width, height). Defaults to (20, 15).
 
@@ -29,7 +35,7 @@ def plot_histogram_with_exclusions(df, columns_to_exclude=None, bin=50, fig_size
     Raises
     ------
     TypeError
-        If the input `df` is not a pandas DataFrame.
+        If the input `df` is not a pandas DataFrame or BinCounts.
 
     Examples
     --------
@@ -43,14 +49,41 @@ def plot_histogram_with_exclusions(df, columns_to_exclude=None, bin=50, fig_size
     The histograms will be displayed immediately if running in a Jupyter notebook. In a script,
     you may need to call `plt.show()` to display the figures.
     """
-    
-    if not isinstance(df, pd.DataFrame):
-        raise TypeError("Input must be a pandas DataFrame")
+
+    if isinstance(df, BinCounts):
+        counts = df
+    elif isinstance(df, pd.DataFrame):
+        counts = None
+    else:
+        raise TypeError("Input must be a pandas DataFrame or BinCounts")
 
     # Select numeric columns and exclude specified columns
-    numeric_cols = df.select_dtypes(include='number').columns.tolist()
+    numeric_cols = counts.columns if counts is not None else df.select_dtypes(include='number').columns.tolist()
     if columns_to_exclude:
         numeric_cols = [col for col in numeric_cols if col not in columns_to_exclude]
+    if counts is None:
+        counts = BinCounts.from_frame(df, numeric_cols, bins=bin)
+
+    # Same grid as DataFrame.hist
+    rows, cols = _grid_layout(len(numeric_cols))
+    fig, axes = plt.subplots(rows, cols, figsize=fig_size, squeeze=False)
+    for ax in axes.flat[len(numeric_cols):]:
+        ax.set_visible(False)
+    for ax, col in zip(axes.flat, numeric_cols):
+        hist, edges = counts.histogram(col)
+        ax.hist(edges[:-1], bins=edges, weights=hist)
+        ax.set_title(col)
+        ax.grid(True)
+    fig.subplots_adjust(wspace=0.3, hspace=0.3)
+    return axes
 
 
-    return df[numeric_cols].hist(bins=bin, figsize=fig_size)
\ No newline at end of file
+def _grid_layout(n_plots):
+    """Return the (rows, columns) of the grid of `n_plots` histograms, as pandas lays it out."""
+    layouts = {1: (1, 1), 2: (1, 2), 3: (2, 2), 4: (2, 2)}
+    if n_plots in layouts:
+        return layouts[n_plots]
+    k = 1
+    while k ** 2 < n_plots:
+        k += 1
+    return (k, k - 1) if (k - 1) * k >= n_plots else (k, k)
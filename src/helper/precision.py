@@ -0,0 +1,179 @@
+import numpy as np
+import pandas as pd
+import scipy.sparse as sp
+from sklearn.base import BaseEstimator, OneToOneFeatureMixin, TransformerMixin, clone
+from sklearn.compose import ColumnTransformer
+from sklearn.metrics import mean_squared_error, r2_score
+from sklearn.pipeline import Pipeline, make_pipeline
+from sklearn.preprocessing import OneHotEncoder, OrdinalEncoder
+from sklearn.utils import check_array
+
+# Encoders whose output dtype is set by their `dtype` parameter
+ENCODERS = (OneHotEncoder, OrdinalEncoder)
+
+
+class Float32(OneToOneFeatureMixin, TransformerMixin, BaseEstimator):
+    """
+    Cast a block of features to float32, keeping sparse blocks sparse.
+
+    Appended to every block of a ColumnTransformer by `float32_preprocessor`,
+    so the stacked design matrix is float32 too. With `to_sparse`, dense blocks
+    are converted to float32 CSR matrices as well: appended to the dense blocks
+    of a ColumnTransformer (scaled numerics, ordinal codes, passed-through
+    columns), it makes every block sparse float32, so with
+    `sparse_threshold=1.0` the stacked design matrix is a float32 CSR matrix
+    whatever the density of the blocks. The transformer is stateless and does
+    not change the values.
+
+    Parameters
+    ----------
+    to_sparse : bool, optional
+        Whether to return a CSR matrix for every input. Defaults to False, in
+        which case dense input stays dense.
+
+    Examples
+    --------
+    >>> numeric_transformer = make_pipeline(SimpleImputer(), StandardScaler(), Float32(to_sparse=True))
+    """
+
+    def __init__(self, to_sparse=False):
+        self.to_sparse = to_sparse
+
+    def fit(self, X, y=None):
+        """Record the number and names of the input features; there is nothing to learn."""
+        X_checked = check_array(X, accept_sparse=True, dtype=None, force_all_finite=False)
+        self.n_features_in_ = X_checked.shape[1]
+        if hasattr(X, "columns"):
+            self.feature_names_in_ = np.asarray(X.columns, dtype=object)
+        elif hasattr(self, "feature_names_in_"):
+            del self.feature_names_in_
+        return self
+
+    def transform(self, X):
+        """Return `X` as a float32 array, or float32 sparse matrix if it is sparse or `to_sparse` is set."""
+        if hasattr(X, "columns") and hasattr(self, "feature_names_in_"):
+            if list(X.columns) != list(self.feature_names_in_):
+                raise ValueError("The feature names differ from those seen in fit")
+        X = check_array(X, accept_sparse=True, dtype=np.float32, force_all_finite=False)
+        if X.shape[1] != self.n_features_in_:
+            raise ValueError(
+                f"X has {X.shape[1]} features, but Float32 is expecting "
+                f"{self.n_features_in_} features as input"
+            )
+        return sp.csr_matrix(X) if self.to_sparse else X
+
+
+def float32_preprocessor(preprocessor):
+    """
+    Return an unfitted copy of a ColumnTransformer whose output is float32.
+
+    The encoders output float32 instead of their float64 (or int) default,
+    and every block ends in a `Float32` cast, so the blocks are never
+    upcast when stacked; the blocks computing in float64 internally (such as
+    `ItemResponseFeatures`) are cast once at the end.
+
+    Parameters
+    ----------
+    preprocessor : ColumnTransformer
+        The preprocessor built in `english_score_eda.py`.
+
+    Returns
+    -------
+    ColumnTransformer
+        The float32 preprocessor.
+
+    Examples
+    --------
+    >>> pipe = make_pipeline(float32_preprocessor(preprocessor), Ridge())
+    """
+    if not isinstance(preprocessor, ColumnTransformer):
+        raise ValueError(f"Cannot convert preprocessor {type(preprocessor).__name__} to float32")
+    preprocessor = clone(preprocessor)
+    transformers = []
+    for name, transformer, columns in preprocessor.transformers:
+        if transformer == "drop":
+            transformers.append((name, transformer, columns))
+            continue
+        if transformer == "passthrough":
+            transformer = make_pipeline(Float32())
+        elif isinstance(transformer, Pipeline):
+            transformer = Pipeline(list(transformer.steps) + [("float32", Float32())])
+        else:
+            transformer = make_pipeline(transformer, Float32())
+        for step in transformer.named_steps.values():
+            if isinstance(step, ENCODERS):
+                step.set_params(dtype=np.float32)
+        transformers.append((name, transformer, columns))
+    preprocessor.transformers = transformers
+    return preprocessor
+
+
+def is_float32_pipeline(estimator):
+    """
+    Return whether a preprocessor or pipeline was converted by `float32_preprocessor`.
+
+    That is, whether it contains a `Float32` step without `to_sparse`; the
+    `to_sparse` casts belong to the sparse design matrix itself.
+    """
+    if isinstance(estimator, Float32):
+        return not estimator.to_sparse
+    if isinstance(estimator, Pipeline):
+        return any(is_float32_pipeline(step) for _, step in estimator.steps)
+    if isinstance(estimator, ColumnTransformer):
+        transformers = getattr(estimator, "transformers_", estimator.transformers)
+        return any(is_float32_pipeline(transformer) for _, transformer, _ in transformers)
+    return False
+
+
+def float32_pipeline(pipe):
+    """Return an unfitted copy of a preprocessor and model pipeline, with its preprocessor converted to float32."""
+    pipe = clone(pipe)
+    name, preprocessor = pipe.steps[0]
+    pipe.steps[0] = (name, float32_preprocessor(preprocessor))
+    return pipe
+
+
+def precision_parity(float32_pipe, float64_pipe, X_test, y_test):
+    """
+    Compare the test scores of a fitted float32 pipeline with its float64 counterpart.
+
+    Parameters
+    ----------
+    float32_pipe : Pipeline
+        The fitted float32 pipeline.
+    float64_pipe : Pipeline
+        The same preprocessor and model parameters, fitted in float64 on the
+        same training data.
+    X_test : pandas.DataFrame
+        The test features.
+    y_test : pandas.Series
+        The test target.
+
+    Returns
+    -------
+    pandas.DataFrame
+        One row per dtype with the test RMSE and R squared, and a row of their
+        absolute differences, which also has the largest absolute difference
+        of the predictions.
+
+    Examples
+    --------
+    >>> precision_parity(ridge_float32, ridge_float64, X_test, y_test)
+    """
+    y_test = np.asarray(y_test, dtype=np.float64)
+    rows, predictions = {}, {}
+    for dtype, pipe in (("float32", float32_pipe), ("float64", float64_pipe)):
+        predictions[dtype] = np.asarray(pipe.predict(X_test), dtype=np.float64)
+        rows[dtype] = {
+            "RMSE": np.sqrt(mean_squared_error(y_test, predictions[dtype])),
+            "R squared": r2_score(y_test, predictions[dtype]),
+            "max prediction difference": np.nan,
+        }
+    rows["difference"] = {
+        "RMSE": abs(rows["float32"]["RMSE"] - rows["float64"]["RMSE"]),
+        "R squared": abs(rows["float32"]["R squared"] - rows["float64"]["R squared"]),
+        "max prediction difference": float(
+            np.max(np.abs(predictions["float32"] - predictions["float64"]), initial=0.0)
+        ),
+    }
+    return pd.DataFrame.from_dict(rows, orient="index")
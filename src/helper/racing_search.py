@@ -0,0 +1,186 @@
+import time
+
+import numpy as np
+from joblib import Parallel, delayed
+from sklearn.base import clone
+from sklearn.model_selection import ParameterSampler, check_cv
+
+from .cv_results import build_cv_results, fit_and_score, resolve_scorers
+
+
+class RacingSearchCV:
+    """
+    Randomized search that stops evaluating clearly losing candidates early.
+
+    Candidates are sampled as in `RandomizedSearchCV` and evaluated one CV fold
+    at a time. Once `min_folds` folds are done, after every fold each candidate
+    is compared with the current leader on the folds both have seen; candidates
+    whose mean score deficit exceeds `threshold` standard errors of the paired
+    differences are dropped and not fitted on the remaining folds. Survivors run
+    on every fold, so the best candidate is scored exactly as it would be by
+    `RandomizedSearchCV`.
+
+    `cv_results_` has the usual layout. Splits a dropped candidate was not
+    evaluated on are NaN, its means cover the evaluated splits only, and it
+    ranks below every survivor. The extra "n_splits_evaluated" entry records
+    how many splits each candidate ran.
+
+    Parameters
+    ----------
+    estimator : estimator object
+        The estimator or pipeline to tune.
+    param_distributions : dict
+        Parameter names mapped to distributions or lists, as in `RandomizedSearchCV`.
+    n_iter : int, optional
+        Number of candidates sampled. Defaults to 10.
+    cv : int or cross-validation generator, optional
+        The CV splitting strategy. Defaults to 5-fold.
+    scoring : str or dict, optional
+        A scorer name or a dict mapping display names to scorer names. Defaults
+        to None, which uses the estimator's `score` method.
+    refit : bool or str, optional
+        Whether to refit the best candidate on the whole data. With several
+        scorers, the name of the scorer used for racing and refitting.
+        Defaults to True.
+    random_state : int, optional
+        Seed for sampling the candidates. Defaults to None.
+    return_train_score : bool, optional
+        Whether to report training scores. Defaults to False.
+    n_jobs : int, optional
+        Number of candidates fitted in parallel within a fold. Defaults to None.
+    min_folds : int, optional
+        Number of folds every candidate runs before any is dropped. Defaults to 3.
+    threshold : float, optional
+        Number of standard errors a candidate must trail the leader by to be
+        dropped. Defaults to 2.0.
+
+    Examples
+    --------
+    >>> search = RacingSearchCV(
+    ...     make_pipeline(preprocessor, Ridge()),
+    ...     {"ridge__alpha": loguniform(1e-3, 1e3)},
+    ...     n_iter=30, cv=10, scoring=SCORING, refit="RMSE", random_state=123,
+    ... )
+    >>> fit_and_return_top_models(search, 5, X_train, y_train, scoring="RMSE")
+    """
+
+    def __init__(
+        self,
+        estimator,
+        param_distributions,
+        n_iter=10,
+        cv=None,
+        scoring=None,
+        refit=True,
+        random_state=None,
+        return_train_score=False,
+        n_jobs=None,
+        min_folds=3,
+        threshold=2.0,
+    ):
+        self.estimator = estimator
+        self.param_distributions = param_distributions
+        self.n_iter = n_iter
+        self.cv = cv
+        self.scoring = scoring
+        self.refit = refit
+        self.random_state = random_state
+        self.return_train_score = return_train_score
+        self.n_jobs = n_jobs
+        self.min_folds = min_folds
+        self.threshold = threshold
+
+    def fit(self, X, y):
+        """Race the sampled candidates across the CV folds and refit the best one."""
+        candidate_params = list(
+            ParameterSampler(
+                self.param_distributions, self.n_iter, random_state=self.random_state
+            )
+        )
+        scorers = resolve_scorers(self.scoring)
+        race_metric = self.refit if isinstance(self.refit, str) else "score"
+        splits = list(check_cv(self.cv, y, classifier=False).split(X, y))
+
+        n_candidates, n_splits = len(candidate_params), len(splits)
+        test_scores = {name: np.full((n_candidates, n_splits), np.nan) for name in scorers}
+        train_scores = {name: np.full((n_candidates, n_splits), np.nan) for name in scorers}
+        fit_times = np.full((n_candidates, n_splits), np.nan)
+        score_times = np.full((n_candidates, n_splits), np.nan)
+        alive = np.ones(n_candidates, dtype=bool)
+
+        with Parallel(n_jobs=self.n_jobs) as parallel:
+            for k, (train, test) in enumerate(splits):
+                racing = np.flatnonzero(alive)
+                results = parallel(
+                    delayed(fit_and_score)(
+                        self.estimator,
+                        X,
+                        y,
+                        train,
+                        test,
+                        candidate_params[i],
+                        scorers,
+                        self.return_train_score,
+                    )
+                    for i in racing
+                )
+                for i, result in zip(racing, results):
+                    for name in scorers:
+                        test_scores[name][i, k] = result["test"][name]
+                        if self.return_train_score:
+                            train_scores[name][i, k] = result["train"][name]
+                    fit_times[i, k] = result["fit_time"]
+                    score_times[i, k] = result["score_time"]
+
+                if k + 1 >= self.min_folds and k + 1 < n_splits:
+                    alive[racing] = self._survivors(test_scores[race_metric][racing, : k + 1])
+
+        self.n_splits_evaluated_ = (~np.isnan(fit_times)).sum(axis=1)
+        self.n_candidate_fits_ = int(self.n_splits_evaluated_.sum())
+        self.cv_results_ = build_cv_results(
+            candidate_params,
+            test_scores,
+            fit_times,
+            score_times,
+            train_scores if self.return_train_score else None,
+        )
+        self.cv_results_["n_splits_evaluated"] = self.n_splits_evaluated_
+        for name in scorers:
+            self.cv_results_["rank_test_" + name] = self._rank(
+                self.cv_results_["mean_test_" + name]
+            )
+        self.n_splits_ = n_splits
+        self.multimetric_ = isinstance(self.scoring, dict)
+
+        if self.refit:
+            self.best_index_ = int(np.argmin(self.cv_results_["rank_test_" + race_metric]))
+            self.best_params_ = candidate_params[self.best_index_]
+            self.best_score_ = self.cv_results_["mean_test_" + race_metric][self.best_index_]
+            refit_start = time.time()
+            self.best_estimator_ = (
+                clone(self.estimator).set_params(**self.best_params_).fit(X, y)
+            )
+            self.refit_time_ = time.time() - refit_start
+        return self
+
+    def _survivors(self, scores):
+        """Return which of the racing candidates are not clearly worse than the leader."""
+        leader = np.argmax(scores.mean(axis=1))
+        deficit = scores[leader] - scores
+        mean = deficit.mean(axis=1)
+        sem = deficit.std(axis=1, ddof=1) / np.sqrt(scores.shape[1])
+        return mean <= self.threshold * sem
+
+    def _rank(self, means):
+        """Rank candidates that ran more folds first, then by mean score; ties share the best rank."""
+        keys = np.column_stack(
+            [-self.n_splits_evaluated_, -np.nan_to_num(means, nan=-np.inf)]
+        )
+        order = np.lexsort((keys[:, 1], keys[:, 0]))
+        sorted_keys = keys[order]
+        # As rankdata(method="min"): a candidate tied with the previous one keeps its rank
+        new_key = np.r_[True, (sorted_keys[1:] != sorted_keys[:-1]).any(axis=1)]
+        positions = np.arange(1, len(means) + 1)
+        ranks = np.empty(len(means), dtype=np.int32)
+        ranks[order] = np.maximum.accumulate(np.where(new_key, positions, 0))
+        return ranks
@@ -0,0 +1,36 @@
+import threading
+
+
+class ScoringStats:
+    """
+    Thread-safe latency and throughput counters of a scorer.
+
+    Each scored batch is recorded with its number of rows and the seconds it
+    took; `as_dict` summarises the batches so far.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.batches = 0
+        self.rows = 0
+        self.seconds = 0.0
+        self.max_latency_s = 0.0
+
+    def record(self, rows, seconds):
+        """Record one batch of `rows` rows scored in `seconds`."""
+        with self._lock:
+            self.batches += 1
+            self.rows += rows
+            self.seconds += seconds
+            self.max_latency_s = max(self.max_latency_s, seconds)
+
+    def as_dict(self):
+        """Return the batch count, rows, mean and max batch latency and rows per second."""
+        with self._lock:
+            return {
+                "batches": self.batches,
+                "rows": self.rows,
+                "mean_latency_s": self.seconds / self.batches if self.batches else 0.0,
+                "max_latency_s": self.max_latency_s,
+                "rows_per_s": self.rows / self.seconds if self.seconds else 0.0,
+            }
@@ -1,3 +1,5 @@
+from contextlib import nullcontext
+
 from sklearn.model_selection import RandomizedSearchCV
 from sklearn.model_selection import GridSearchCV
 import pandas as pd
@@ -18,14 +20,16 @@ def fit_and_return_top_models(
     additional_columns=[],
     return_train_score=True,
     scoring="score",
+    backend=None,
 ):
     """
     Fits a SearchCV object and returns the top N models as a DataFrame.
 
     Parameters
     ----------
-    search : RandomizedSearchCV or GridSearchCV
-        A RandomizedSearchCV or GridSearchCV object.
+    search : RandomizedSearchCV, GridSearchCV or RidgePathSearchCV
+        A RandomizedSearchCV or GridSearchCV object, or any search object with the
+        same `fit`/`cv_results_` interface such as those in `helper.path_search`.
         This model will be fitted once this function is called.
     N : int
         The number of top models to return.
@@ -40,6 +44,10 @@ def fit_and_return_top_models(
     scoring : str, optional
         The scoring metric to use. Defaults to "score".
         Can be any other name if a dictionary was passed to scoring in RandomizedSearchCV/GridSearchCV.
+    backend : helper.execution_backend.ExecutionBackend, optional
+        Where the CV fits of the search run, ex: a file work queue served by
+        workers on other machines. Defaults to None, the default joblib
+        backend with the search's own `n_jobs`.
 
     Returns
     -------
@@ -53,8 +61,49 @@ def fit_and_return_top_models(
     """
     # fit the search
     search.return_train_score = return_train_score
-    search.fit(X_train, y_train)
+    with backend or nullcontext():
+        search.fit(X_train, y_train)
+
+    return top_models_table(
+        search, N, additional_columns, return_train_score, scoring
+    )
+
+
+def top_models_table(
+    search,
+    N,
+    additional_columns=[],
+    return_train_score=True,
+    scoring="score",
+):
+    """
+    Returns the top N models of an already fitted SearchCV object as a DataFrame.
 
+    The table has the same layout as the one returned by `fit_and_return_top_models`.
+    Use it for searches fitted elsewhere, e.g. by `helper.concurrent_search`.
+
+    Parameters
+    ----------
+    search : RandomizedSearchCV, GridSearchCV or RidgePathSearchCV
+        A fitted search object with a `cv_results_` attribute.
+    N : int
+        The number of top models to return.
+    additional_columns : list, optional
+        A list of additional columns to display. Defaults to [].
+    return_train_score : bool, optional
+        Whether to show the training scores. Defaults to True.
+    scoring : str, optional
+        The scoring metric to use. Defaults to "score".
+
+    Returns
+    -------
+    pandas.DataFrame
+        A DataFrame containing the top N models.
+
+    Examples
+    --------
+    >>> top_models_table(ridge_search, 5, ["param_ridge__alpha"], scoring="RMSE")
+    """
     # Set the columns to display
     columns = [
         "rank_test_" + scoring,
@@ -0,0 +1,164 @@
+import os
+import shutil
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+# The data attached in this process, by directory, so the tasks a worker runs
+# on the same data (ex: both X and y of a search) map the files once
+_ATTACHED = {}
+
+
+class SharedFrame:
+    """
+    A DataFrame, Series or array stored once as memory-mapped `.npy` files.
+
+    `dump` encodes every column to a plain NumPy array: numeric columns as
+    they are, categorical and object columns as integer codes (their
+    categories are kept in the handle), nullable integer columns as values
+    and a mask. The handle itself only holds the directory and this small
+    schema, so sending it to worker processes costs a few bytes whatever the
+    number of rows; `load` attaches to the files read-only, so every process
+    shares one copy of the data in the page cache instead of unpickling its
+    own. Put the directory on a RAM-backed filesystem such as `/dev/shm` to
+    keep the data out of the disk entirely.
+
+    Object columns come back as categorical columns with the same values, and
+    the index as a RangeIndex.
+
+    Parameters
+    ----------
+    directory : str
+        The directory holding the `.npy` files.
+    kind : {"frame", "series", "array"}
+        The type `load` returns.
+    columns : list of dict
+        The name, encoding and categories or dtype of each column.
+    n_rows : int
+        The number of rows.
+
+    Examples
+    --------
+    >>> with SharedFrame.dump(X_train, "/dev/shm") as shared_X:
+    ...     results = Parallel(n_jobs=8)(delayed(fit_fold)(shared_X, train, test) for train, test in splits)
+    """
+
+    def __init__(self, directory, kind, columns, n_rows):
+        self.directory = directory
+        self.kind = kind
+        self.columns = columns
+        self.n_rows = n_rows
+
+    @classmethod
+    def dump(cls, data, directory=None):
+        """
+        Write `data` to memory-mapped files in a new subdirectory of `directory`.
+
+        Parameters
+        ----------
+        data : pandas.DataFrame, pandas.Series or numpy.ndarray
+            The data to share.
+        directory : str, optional
+            Where the subdirectory of the files is created. Defaults to None,
+            the system temporary directory.
+
+        Returns
+        -------
+        SharedFrame
+            The handle of the stored data.
+        """
+        if directory is not None:
+            os.makedirs(directory, exist_ok=True)
+        if isinstance(data, pd.DataFrame):
+            kind, series = "frame", [data.iloc[:, j] for j in range(data.shape[1])]
+        elif isinstance(data, pd.Series):
+            kind, series = "series", [data]
+        else:
+            data = np.asarray(data)
+            if data.ndim != 1:
+                raise ValueError("Only DataFrames, Series and 1-dimensional arrays can be shared")
+            kind, series = "array", [pd.Series(data)]
+        path = tempfile.mkdtemp(prefix="shared-frame-", dir=directory)
+        columns = [_dump_column(column, os.path.join(path, str(j))) for j, column in enumerate(series)]
+        return cls(path, kind, columns, len(data))
+
+    def load(self):
+        """Return the data, with its arrays memory-mapped read-only."""
+        if self.directory not in _ATTACHED:
+            arrays = [
+                _load_column(column, os.path.join(self.directory, str(j)))
+                for j, column in enumerate(self.columns)
+            ]
+            if self.kind == "frame":
+                data = pd.DataFrame(
+                    {column["name"]: array for column, array in zip(self.columns, arrays)},
+                    copy=False,
+                )
+            elif self.kind == "series":
+                data = pd.Series(arrays[0], name=self.columns[0]["name"], copy=False)
+            else:
+                data = arrays[0]
+            # Workers never see `remove`, so drop the data removed since
+            for directory in [d for d in _ATTACHED if not os.path.isdir(d)]:
+                del _ATTACHED[directory]
+            _ATTACHED[self.directory] = data
+        return _ATTACHED[self.directory]
+
+    def __len__(self):
+        return self.n_rows
+
+    @property
+    def nbytes(self):
+        """The size of the stored arrays, in bytes."""
+        return sum(
+            os.path.getsize(os.path.join(self.directory, name))
+            for name in os.listdir(self.directory)
+        )
+
+    def remove(self):
+        """Delete the files and forget the attached data; it cannot be loaded afterwards."""
+        _ATTACHED.pop(self.directory, None)
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.remove()
+
+
+def _dump_column(series, path):
+    """Save one column to `path`.*.npy and return its schema."""
+    dtype = series.dtype
+    if isinstance(dtype, pd.CategoricalDtype) or dtype == object:
+        values = series.astype("category") if dtype == object else series
+        np.save(path + ".codes.npy", values.cat.codes.to_numpy())
+        return {
+            "name": series.name,
+            "encoding": "category",
+            "categories": values.cat.categories,
+            "ordered": values.cat.ordered,
+        }
+    if isinstance(dtype, pd.api.extensions.ExtensionDtype):
+        # Nullable integer, float and boolean columns: values and missing mask
+        if not hasattr(dtype, "numpy_dtype"):
+            raise ValueError(f"Cannot share column {series.name!r} of dtype {dtype}")
+        np.save(path + ".values.npy", series.to_numpy(dtype=dtype.numpy_dtype, na_value=0))
+        np.save(path + ".mask.npy", series.isna().to_numpy())
+        return {"name": series.name, "encoding": "masked", "dtype": dtype}
+    np.save(path + ".npy", series.to_numpy())
+    return {"name": series.name, "encoding": "numeric"}
+
+
+def _load_column(column, path):
+    """Return the column saved at `path`, with memory-mapped arrays."""
+    if column["encoding"] == "category":
+        codes = np.load(path + ".codes.npy", mmap_mode="r")
+        dtype = pd.CategoricalDtype(column["categories"], ordered=column["ordered"])
+        return pd.Categorical.from_codes(codes, dtype=dtype)
+    if column["encoding"] == "masked":
+        values = np.load(path + ".values.npy", mmap_mode="r")
+        mask = np.load(path + ".mask.npy", mmap_mode="r")
+        return column["dtype"].construct_array_type()(values, mask)
+    return np.load(path + ".npy", mmap_mode="r")
@@ -0,0 +1,187 @@
+import cProfile
+import csv
+import json
+import os
+import platform
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+
+from .load_survey_data import current_rss_mb
+
+REPORT_FIELDS = [
+    "run_started",
+    "script",
+    "stage",
+    "wall_s",
+    "cpu_s",
+    "rss_delta_mb",
+    "stage_peak_rss_mb",
+    "rows",
+]
+
+
+class StageProfiler:
+    """
+    Record the wall time, CPU time, memory and row count of named stages.
+
+    Wrap each logical step of a script in `stage`; `write` then saves the stages
+    of the run as `<script>.json` and appends them to `stages.csv` in the output
+    directory, so runs can be compared over time. Selected stages can also be
+    run under cProfile, dumping `<script>-<stage>.prof` next to the report.
+    A disabled profiler records nothing, so scripts can always use it.
+
+    CPU time and memory are those of the script's own process; fits run in
+    joblib workers show up as wall time only. `rss_delta_mb` is the change in
+    resident set size from the start to the end of the stage, and
+    `stage_peak_rss_mb` the highest RSS sampled every `sample_interval` seconds
+    while it ran, so short spikes between samples can be missed. Both are None
+    where the current RSS cannot be read (outside Linux).
+
+    Parameters
+    ----------
+    script : str
+        Name of the script, used in the report and file names.
+    output_dir : str, optional
+        Directory of the reports. Defaults to "results/profile/".
+    enabled : bool, optional
+        Whether to record anything. Defaults to True.
+    cprofile_stages : iterable of str, optional
+        Names of the stages to run under cProfile. Defaults to none.
+    sample_interval : float, optional
+        Seconds between RSS samples during a stage. Defaults to 0.01.
+
+    Examples
+    --------
+    >>> profiler = StageProfiler("english_score_tuning", enabled=profile)
+    >>> with profiler.stage("load") as stage:
+    ...     train_df = load_survey_data("data/raw/train_data.csv")
+    ...     stage["rows"] = len(train_df)
+    >>> profiler.write()
+    """
+
+    def __init__(
+        self,
+        script,
+        output_dir="results/profile/",
+        enabled=True,
+        cprofile_stages=(),
+        sample_interval=0.01,
+    ):
+        self.script = script
+        self.output_dir = output_dir
+        self.enabled = enabled
+        self.cprofile_stages = set(cprofile_stages)
+        self.sample_interval = sample_interval
+        self.run_started = datetime.now(timezone.utc).isoformat(timespec="seconds")
+        self.stages = []
+
+    @contextmanager
+    def stage(self, name, rows=None):
+        """
+        Profile the enclosed block as the stage `name`.
+
+        Yields the stage record; set its "rows" entry inside the block when the
+        row count is only known there.
+        """
+        record = {"stage": name, "rows": rows}
+        if not self.enabled:
+            yield record
+            return
+
+        profile = cProfile.Profile() if name in self.cprofile_stages else None
+        sampler = _RssSampler(self.sample_interval)
+        wall_start, cpu_start = time.perf_counter(), time.process_time()
+        if profile is not None:
+            profile.enable()
+        try:
+            yield record
+        finally:
+            if profile is not None:
+                profile.disable()
+                os.makedirs(self.output_dir, exist_ok=True)
+                profile.dump_stats(self._path(f"{self.script}-{name}.prof"))
+            wall_s = time.perf_counter() - wall_start
+            cpu_s = time.process_time() - cpu_start
+            rss_start, rss_end, rss_peak = sampler.stop()
+            record.update(
+                wall_s=round(wall_s, 6),
+                cpu_s=round(cpu_s, 6),
+                rss_delta_mb=None if rss_start is None else round(rss_end - rss_start, 1),
+                stage_peak_rss_mb=None if rss_peak is None else round(rss_peak, 1),
+            )
+            self.stages.append(record)
+
+    def write(self):
+        """
+        Save the recorded stages and return the paths of the JSON and CSV reports.
+
+        Returns None when the profiler is disabled.
+        """
+        if not self.enabled:
+            return None
+        os.makedirs(self.output_dir, exist_ok=True)
+        rows = [
+            {"run_started": self.run_started, "script": self.script, **record}
+            for record in self.stages
+        ]
+
+        json_path = self._path(f"{self.script}.json")
+        with open(json_path, "w") as f:
+            json.dump(
+                {
+                    "script": self.script,
+                    "run_started": self.run_started,
+                    "python": platform.python_version(),
+                    "machine": platform.machine(),
+                    "cpu_count": os.cpu_count(),
+                    "stages": [{field: row[field] for field in REPORT_FIELDS[2:]} for row in rows],
+                },
+                f,
+                indent=2,
+            )
+
+        csv_path = self._path("stages.csv")
+        new_file = not os.path.exists(csv_path)
+        with open(csv_path, "a", newline="") as f:
+            writer = csv.DictWriter(f, fieldnames=REPORT_FIELDS)
+            if new_file:
+                writer.writeheader()
+            writer.writerows({field: row[field] for field in REPORT_FIELDS} for row in rows)
+        return json_path, csv_path
+
+    def _path(self, filename):
+        return os.path.join(self.output_dir, filename)
+
+
+class _RssSampler:
+    """Sample the current RSS in a background thread from creation until `stop`."""
+
+    def __init__(self, interval):
+        self.interval = interval
+        self.start = self.peak = current_rss_mb()
+        self._done = threading.Event()
+        self._thread = None
+        if self.start is not None:
+            self._thread = threading.Thread(target=self._run, daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        while not self._done.wait(self.interval):
+            self._sample()
+
+    def _sample(self):
+        rss = current_rss_mb()
+        if rss is not None:
+            self.peak = max(self.peak, rss)
+        return rss
+
+    def stop(self):
+        """Return the RSS at the start, at the end and at the peak, in MB."""
+        if self._thread is None:
+            return None, None, None
+        self._done.set()
+        self._thread.join()
+        end = self._sample()
+        return self.start, self.start if end is None else end, self.peak
@@ -0,0 +1,224 @@
+import io
+import zipfile
+
+import numpy as np
+import pandas as pd
+
+
+def stream_sample_split(
+    chunks,
+    train_path,
+    test_path,
+    sample_size=0.3,
+    test_size=0.3,
+    method="bernoulli",
+    stratify=None,
+    stratify_bins=None,
+    random_state=123,
+    sample_path=None,
+):
+    """
+    Sample rows from a stream of DataFrame chunks and split them into train/test files.
+
+    Each chunk is seen once. With `method="bernoulli"` every row is kept with
+    probability `sample_size` and the sampled rows are written out as soon as
+    their chunk is processed, so memory stays bounded by the chunk size. With
+    `method="reservoir"` exactly `sample_size` rows are kept in a reservoir and
+    written at the end, so memory is bounded by the sample size.
+
+    Sampled rows go to the test file with probability `test_size`. When
+    `stratify` is given, rows are assigned by systematic sampling with a random
+    start within each stratum, so every stratum is split in the `test_size`
+    proportion (to within one row).
+
+    Parameters
+    ----------
+    chunks : iterable of pandas.DataFrame
+        The input data, e.g. from `load_survey_data(path, chunksize=...)`.
+    train_path : str
+        Path of the training CSV to write.
+    test_path : str
+        Path of the test CSV to write.
+    sample_size : float or int, optional
+        Fraction of rows to keep for "bernoulli", or number of rows to keep
+        for "reservoir". Defaults to 0.3.
+    test_size : float, optional
+        Fraction of the sampled rows allocated to the test set. Defaults to 0.3.
+    method : {"bernoulli", "reservoir"}, optional
+        The sampling method. Defaults to "bernoulli".
+    stratify : str, optional
+        Column used to stratify the train/test split. Defaults to None.
+    stratify_bins : sequence of float, optional
+        Bin edges applied to a numeric `stratify` column (e.g. `correct`).
+        Defaults to None, in which case each distinct value is a stratum.
+    random_state : int, optional
+        Seed for the random number generator. Defaults to 123.
+    sample_path : str, optional
+        If given, the whole sample is also written to this ZIP file as
+        `sampled_data.csv`. Defaults to None.
+
+    Returns
+    -------
+    dict
+        The number of rows read, sampled, and written to train and test.
+
+    Raises
+    ------
+    ValueError
+        If `method` is not supported or `sample_size` does not suit it.
+
+    Examples
+    --------
+    >>> chunks = load_survey_data("data/raw/full_dataset.csv", chunksize=100_000)
+    >>> stream_sample_split(chunks, "train_data.csv", "test_data.csv", stratify="speaker_cat")
+    {'read': 680333, 'sampled': 204112, 'train': 142878, 'test': 61234}
+    """
+    if method == "bernoulli":
+        if not 0 < sample_size <= 1:
+            raise ValueError("sample_size must be a fraction in (0, 1] for bernoulli sampling")
+    elif method == "reservoir":
+        if int(sample_size) != sample_size or sample_size < 1:
+            raise ValueError("sample_size must be a positive row count for reservoir sampling")
+        sample_size = int(sample_size)
+    else:
+        raise ValueError(f"Unknown sampling method: {method}")
+
+    rng = np.random.default_rng(random_state)
+    splitter = _StreamSplitter(test_size, stratify, stratify_bins, rng)
+    counts = {"read": 0, "sampled": 0, "train": 0, "test": 0}
+
+    with _CsvSink(train_path) as train_sink, _CsvSink(test_path) as test_sink, _CsvSink(
+        sample_path, zipped=True
+    ) as sample_sink:
+
+        def write(sample):
+            is_test = splitter.assign(sample)
+            sample_sink.write(sample)
+            train_sink.write(sample[~is_test])
+            test_sink.write(sample[is_test])
+            counts["sampled"] += len(sample)
+            counts["test"] += int(is_test.sum())
+            counts["train"] += int((~is_test).sum())
+
+        if method == "bernoulli":
+            for chunk in chunks:
+                counts["read"] += len(chunk)
+                write(chunk[rng.random(len(chunk)) < sample_size])
+        else:
+            reservoir = _Reservoir(sample_size, rng)
+            for chunk in chunks:
+                counts["read"] += len(chunk)
+                reservoir.update(chunk)
+            write(reservoir.sample())
+
+    return counts
+
+
+class _Reservoir:
+    """Algorithm R reservoir over DataFrame chunks, vectorized per chunk."""
+
+    def __init__(self, size, rng):
+        self.size = size
+        self.rng = rng
+        self.seen = 0
+        # Global row number held by each reservoir slot
+        self.slots = np.empty(0, dtype=np.int64)
+        self.rows = None
+
+    def update(self, chunk):
+        n_rows = len(chunk)
+        row_ids = np.arange(self.seen, self.seen + n_rows)
+        chunk = chunk.set_axis(row_ids)
+
+        # The first `size` rows fill the reservoir directly
+        n_fill = max(0, min(self.size - len(self.slots), n_rows))
+        self.slots = np.concatenate([self.slots, row_ids[:n_fill]])
+
+        # Row i replaces a random slot with probability size / (i + 1)
+        candidates = row_ids[n_fill:]
+        targets = (self.rng.random(len(candidates)) * (candidates + 1)).astype(np.int64)
+        accepted = targets < self.size
+        for slot, row_id in zip(targets[accepted], candidates[accepted]):
+            self.slots[slot] = row_id
+
+        kept = [chunk.loc[chunk.index.isin(self.slots)]]
+        if self.rows is not None:
+            kept.insert(0, self.rows.loc[self.rows.index.isin(self.slots)])
+        self.rows = pd.concat(kept)
+        self.seen += n_rows
+
+    def sample(self):
+        if self.rows is None:
+            return pd.DataFrame()
+        return self.rows.reset_index(drop=True)
+
+
+class _StreamSplitter:
+    """Assigns streamed rows to train/test, optionally stratified."""
+
+    def __init__(self, test_size, stratify, stratify_bins, rng):
+        self.test_size = test_size
+        self.stratify = stratify
+        self.stratify_bins = stratify_bins
+        self.rng = rng
+        # Per-stratum [rows seen, random start]
+        self.strata = {}
+
+    def assign(self, sample):
+        """Return a boolean array marking the rows of `sample` that go to test."""
+        if self.stratify is None:
+            return self.rng.random(len(sample)) < self.test_size
+
+        values = sample[self.stratify]
+        if self.stratify_bins is not None:
+            keys = np.digitize(values.to_numpy(dtype=float), self.stratify_bins)
+            keys = np.where(values.isna(), -1, keys)
+        else:
+            keys = values.astype(object).where(values.notna(), "NA").to_numpy()
+
+        # Shuffle within the chunk, then take every 1/test_size-th row of each stratum
+        is_test = np.zeros(len(sample), dtype=bool)
+        order = self.rng.permutation(len(sample))
+        for key, positions in pd.Series(order).groupby(keys[order]).groups.items():
+            rows = order[positions]
+            seen, start = self.strata.setdefault(key, [0, self.rng.random()])
+            rank = np.arange(seen + 1, seen + len(rows) + 1)
+            is_test[rows] = np.floor(rank * self.test_size + start) > np.floor(
+                (rank - 1) * self.test_size + start
+            )
+            self.strata[key][0] += len(rows)
+        return is_test
+
+
+class _CsvSink:
+    """Appends DataFrames to a CSV (optionally inside a ZIP), writing the header once."""
+
+    def __init__(self, path, zipped=False):
+        self.path = path
+        self.zipped = zipped
+        self.header = True
+        self.archive = None
+        self.handle = None
+
+    def __enter__(self):
+        if self.path is None:
+            return self
+        if self.zipped:
+            self.archive = zipfile.ZipFile(self.path, "w", zipfile.ZIP_DEFLATED)
+            raw = self.archive.open("sampled_data.csv", "w", force_zip64=True)
+            self.handle = io.TextIOWrapper(raw, encoding="utf-8", newline="")
+        else:
+            self.handle = open(self.path, "w", encoding="utf-8", newline="")
+        return self
+
+    def write(self, df):
+        if self.handle is None or (df.empty and not self.header):
+            return
+        df.to_csv(self.handle, index=False, header=self.header)
+        self.header = False
+
+    def __exit__(self, *exc_info):
+        if self.handle is not None:
+            self.handle.close()
+        if self.archive is not None:
+            self.archive.close()
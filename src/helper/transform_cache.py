@@ -0,0 +1,153 @@
+import functools
+import os
+import shutil
+import tempfile
+
+from joblib import Memory
+from sklearn.pipeline import make_pipeline
+
+
+class TransformCache(Memory):
+    """
+    A joblib Memory that counts how many of its cached calls were hits.
+
+    Each call of a function cached through it is recorded in a counts
+    directory of this instance inside the cache, and so is each time the
+    function actually runs because its result was not cached: the hits are
+    the difference. Calls made in worker processes are therefore counted too,
+    and runs sharing the cache keep separate counts.
+
+    Parameters
+    ----------
+    location : str, optional
+        Directory for the joblib cache. Defaults to None, no caching (and no counts).
+    verbose : int, optional
+        The joblib verbosity. Defaults to 0.
+    **kwargs
+        Other `joblib.Memory` parameters.
+
+    Examples
+    --------
+    >>> cache = TransformCache("results/cache/")
+    >>> search = GridSearchCV(make_cached_pipeline(preprocessor, Ridge(), cache), grid).fit(X, y)
+    >>> cache.hit_rate()
+    0.6
+    """
+
+    def __init__(self, location=None, verbose=0, **kwargs):
+        super().__init__(location=location, verbose=verbose, **kwargs)
+        self.counts_dir = None
+        if location is not None:
+            os.makedirs(os.path.join(location, "counts"), exist_ok=True)
+            self.counts_dir = tempfile.mkdtemp(dir=os.path.join(location, "counts"))
+
+    def cache(self, func=None, **kwargs):
+        if func is None:
+            return functools.partial(self.cache, **kwargs)
+        if self.counts_dir is None:
+            return super().cache(func, **kwargs)
+        # The runner is cached instead of `func`, which becomes part of the key
+        ignore = ["counts_dir"] + list(kwargs.pop("ignore", None) or [])
+        return _CountedCall(super().cache(_run_uncached, ignore=ignore, **kwargs), func, self.counts_dir)
+
+    def counts(self):
+        """Return the number of cached calls that were hits and misses so far, as a dict."""
+        if self.counts_dir is None:
+            return {"hits": 0, "misses": 0}
+        n_calls = _file_size(os.path.join(self.counts_dir, "calls"))
+        misses = _file_size(os.path.join(self.counts_dir, "misses"))
+        return {"hits": n_calls - misses, "misses": misses}
+
+    def hit_rate(self):
+        """Return the fraction of cached calls served from the cache (0 when there were none)."""
+        counts = self.counts()
+        n_calls = counts["hits"] + counts["misses"]
+        return counts["hits"] / n_calls if n_calls else 0.0
+
+    def clear_counts(self):
+        """Delete the counts of this instance; the cached results are kept."""
+        if self.counts_dir is not None:
+            shutil.rmtree(self.counts_dir, ignore_errors=True)
+
+
+class _CountedCall:
+    """A cached function that records each of its calls."""
+
+    def __init__(self, cached, func, counts_dir):
+        self.cached = cached
+        self.func = func
+        self.counts_dir = counts_dir
+
+    def __call__(self, *args, **kwargs):
+        _record(self.counts_dir, "calls")
+        return self.cached(self.counts_dir, self.func, *args, **kwargs)
+
+
+def _run_uncached(counts_dir, func, *args, **kwargs):
+    """Run `func`, recording a miss; only called when the result was not cached."""
+    _record(counts_dir, "misses")
+    return func(*args, **kwargs)
+
+
+def _record(counts_dir, name):
+    # One byte appended per event, so concurrent processes do not lose counts
+    with open(os.path.join(counts_dir, name), "ab") as f:
+        f.write(b".")
+
+
+def _file_size(path):
+    return os.path.getsize(path) if os.path.exists(path) else 0
+
+
+def make_cached_pipeline(preprocessor, estimator, cache_dir):
+    """
+    Build a pipeline whose preprocessing fits are cached on disk.
+
+    The fitted preprocessor and its transformed training matrix are cached by
+    joblib, keyed on the preprocessor parameters and the training rows. Within a
+    search every candidate of a fold reuses the same cached result, and pipelines
+    with different final estimators (e.g. Ridge and Lasso) that share the cache
+    directory and preprocessor reuse each other's fits.
+
+    Parameters
+    ----------
+    preprocessor : ColumnTransformer
+        The preprocessing step.
+    estimator : estimator object
+        The final regression model.
+    cache_dir : str or TransformCache
+        Directory for the joblib cache, or a `TransformCache` to count the hits
+        of several pipelines together. It is shared across processes and runs.
+
+    Returns
+    -------
+    Pipeline
+        A pipeline equivalent to `make_pipeline(preprocessor, estimator)`.
+
+    Examples
+    --------
+    >>> cache = TransformCache("results/cache/")
+    >>> ridge_pipe = make_cached_pipeline(preprocessor, Ridge(), cache)
+    >>> lasso_pipe = make_cached_pipeline(preprocessor, Lasso(), cache)
+    """
+    memory = cache_dir if isinstance(cache_dir, Memory) else TransformCache(cache_dir)
+    return make_pipeline(preprocessor, estimator, memory=memory)
+
+
+def search_transform_calls(search):
+    """
+    Return the number of preprocessing fits a fitted search requested.
+
+    Each candidate is fitted once per CV split, plus one final refit. Searches
+    that fit the preprocessing themselves (`fits_pipeline_per_candidate = False`, as
+    in the path searches) only go through the cache for the refit, and searches
+    that drop candidates early report their fits in `n_candidate_fits_`.
+    """
+    n_calls = 0
+    if hasattr(search, "n_candidate_fits_"):
+        n_calls = search.n_candidate_fits_
+    elif getattr(search, "fits_pipeline_per_candidate", True):
+        n_calls = len(search.cv_results_["params"]) * search.n_splits_
+    if search.refit:
+        n_calls += 1
+    return n_calls
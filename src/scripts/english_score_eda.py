@@ -1,26 +1,36 @@
 import sys
 import os
-import pandas as pd
 import numpy as np
 import click
-import matplotlib.pyplot as plt
-import altair as alt
-import dataframe_image as dfi
 from sklearn.preprocessing import (
     OneHotEncoder,
     OrdinalEncoder,
     StandardScaler,
-    FunctionTransformer,
 )
-import pickle
 from sklearn.impute import SimpleImputer
-from sklearn.compose import make_column_transformer
-from sklearn.pipeline import Pipeline, make_pipeline
+from sklearn.compose import make_column_selector, make_column_transformer
+from sklearn.pipeline import make_pipeline
 
 sys.path.append('src')
 
-from helper.correlation_matrix import pearson_correlation_matrix
-from helper.plot_histogram_with_exclusions import plot_histogram_with_exclusions
+from helper.eda_figures import eda_figure_tasks
+from helper.figure_renderer import render_figures
+from helper.stage_profiler import StageProfiler
+from helper.artifact_store import ArtifactStore
+from helper.education_bucketer import EducationBucketer, education_codes
+from helper.item_response import ITEM_PATTERN, ItemResponseFeatures
+from helper.precision import Float32
+from helper.load_survey_data import (
+    load_survey_data,
+    is_item_column,
+    NUMERIC_FEATURES,
+    CATEGORICAL_FEATURES,
+    BINARY_FEATURES,
+    BINARY_NA_FEATURES,
+    EDUCATION_FEATURES,
+    WIDE_CATEGORICAL_FEATURES,
+    frame_memory_mb,
+)
 
 
 @click.command()
@@ -38,7 +48,7 @@ from helper.plot_histogram_with_exclusions import plot_histogram_with_exclusions
     "--pickle-to",
     type=str,
     default="results/models/preprocessor/",
-    help="Path to where preprocessor should be written ex: results/models/preprocessor",
+    help="Artifact directory the preprocessor is stored in ex: results/models/preprocessor/",
 )
 @click.option(
     "--tables-to",
@@ -46,215 +56,193 @@ from helper.plot_histogram_with_exclusions import plot_histogram_with_exclusions
     default="results/tables/",
     help="Path to where tables should be written ex: results/tables/",
 )
-def main(verbose,training_data, plot_to, pickle_to, tables_to):
+@click.option(
+    "--only",
+    type=click.Choice(["figures", "preprocessor"]),
+    default=None,
+    help="Only render the figures and tables, or only store the preprocessor (default: both)",
+)
+@click.option(
+    "--n-jobs",
+    type=int,
+    default=-1,
+    help="Worker processes rendering the figures, -1 for one per CPU (default: -1)",
+)
+@click.option(
+    "--item-features",
+    is_flag=True,
+    help="Add the per-block accuracy, weighted score and missing count of the q* items to the preprocessor.",
+)
+@click.option(
+    "--wide-categoricals",
+    is_flag=True,
+    help="One-hot encode the high-cardinality currcountry, natlangs, primelangs and UK_region (implies --sparse).",
+)
+@click.option(
+    "--sparse",
+    is_flag=True,
+    help="Build a preprocessor whose output is a float32 CSR matrix.",
+)
+@click.option("--profile", is_flag=True, help="Record the time and memory of each stage.")
+@click.option(
+    "--profile-stage",
+    multiple=True,
+    help="With --profile, also dump a cProfile of this stage (repeatable), ex: aggregate",
+)
+@click.option(
+    "--profile-to",
+    type=str,
+    default="results/profile/",
+    help="Path to where profile reports should be written ex: results/profile/",
+)
+def main(verbose, training_data, plot_to, pickle_to, tables_to, only, n_jobs,
+         item_features, wide_categoricals, sparse, profile, profile_stage, profile_to):
     """
     Main function for data preprocessing and visualization.
 
     Args:
         training_data (str): Path to the training data CSV file.
         plot_to (str): Path to save the generated plots.
-        pickle_to (str): Path to save the preprocessor object.
+        pickle_to (str): Artifact directory to store the preprocessor object in.
         tables_to (str): Path to save the tables.
+        only (str): "figures" or "preprocessor" to run only that part; None runs both.
+        n_jobs (int): Number of worker processes rendering the figures.
+        item_features (bool): Whether the preprocessor also summarises the q* item responses.
+        wide_categoricals (bool): Whether the preprocessor also one-hot encodes the wide categorical features.
+        sparse (bool): Whether the preprocessor outputs a float32 CSR matrix.
+        profile (bool): Whether to write a stage timing and memory report.
+        profile_stage (tuple): Stages to also run under cProfile.
+        profile_to (str): Path to save the profile reports.
 
     Returns:
         None
     """
-    # Read the training data
-    train_df = pd.read_csv(
-        training_data, sep=",", on_bad_lines="skip", low_memory=False
+    profiler = StageProfiler(
+        "english_score_eda",
+        output_dir=profile_to,
+        enabled=profile,
+        cprofile_stages=profile_stage,
     )
-    if verbose:
-        click.echo("Loaded Training Dataset...")
-    
-
-    # Columns to be dropped
-    drop_feats = [
-        "id", "date", "time", "Unnamed: 0", "tests", "elogit", "dyslexia",
-        "dictionary", "already_participated", "natlangs", "primelangs",
-        "Can_region", "Ir_region", "US_region", "UK_region", "UK_constituency",
-        "gender", "type", "currcountry", "countries",
-    ]
-
-    # Additional columns related to questions to be dropped
-    question_columns_to_drop = [col for col in train_df.columns if col.startswith("q")]
-    drop_feats += question_columns_to_drop
-
-    if verbose:
-        click.echo("Creating Numeric Feature Plots...")
 
-    # Create the plots for numeric figures plotting
-    plot_1 = plot_histogram_with_exclusions(train_df, columns_to_exclude=drop_feats)
+    if only != "preprocessor":
+        make_figures(training_data, plot_to, tables_to, profiler, verbose, n_jobs)
 
-    # Specify the grid layout
-    rows = 3
-    cols = plot_1.size // rows
+    if only != "figures":
+        if verbose:
+            click.echo("Creating preprocessor...")
+        preprocessor = build_preprocessor(item_features, wide_categoricals, sparse)
 
+        with profiler.stage("save"):
+            # Store a new version of the preprocessor; an unchanged one reuses its version
+            models_to, name = os.path.split(pickle_to.rstrip("/"))
+            artifact = ArtifactStore(models_to).save(name, preprocessor)
 
-    # Create subplots
-    for i, plot in enumerate(np.ravel(plot_1)):
-        plt.subplot(rows, cols, i + 1)
-        #plt.axis("off")  # Turn off axis for each subplot
+        if verbose:
+            click.echo(f"Stored the preprocessor as {artifact.path}")
 
-    # Save the numeric plots as a single figure
-    # Add a title to your plot
-    plt.suptitle('Distribution of Numeric Features')
-    plt.savefig(plot_to + "feat-numeric-figs.png")
+    if profiler.write() and verbose:
+        click.echo(f"Wrote profile report to {profile_to}")
 
-    # Categorical features for plotting
-    categorical_education = ["education"]
-    categorical_feats = ["Eng_little", "speaker_cat"]
 
-    # Education Level Plot
-    education_level_plot = (
-        alt.Chart(train_df)
-        .mark_bar()
-        .encode(
-            x=alt.X("education:N", title="Education Level"),
-            y=alt.Y("count():Q", title="Count"),
-            tooltip=["count()"],
+def make_figures(training_data, plot_to, tables_to, profiler, verbose, n_jobs=-1):
+    """Renders the EDA figures and correlation table of the training data"""
+    # Read the training data, skipping the q* item columns which are never used
+    with profiler.stage("load") as stage:
+        train_df = load_survey_data(
+            training_data, columns=lambda column: not is_item_column(column)
         )
-        .properties(title="Distribution of Education Levels")
-    )
-
-    # Save the education level plot
-    education_level_plot.save(plot_to + "/education-level-fig.png", format="png")
-
+        stage["rows"] = len(train_df)
     if verbose:
-        click.echo("Creating Categorical Feature PLots...")
-
-    # Categorical Feature Plot
-    categorical_plot = (
-        alt.Chart(train_df, title="Distribution of the Categorical features")
-        .mark_bar()
-        .encode(
-            x=alt.X(alt.repeat()),
-            y="count()",
-        )
-        .properties(height=200, width=800)
-        .repeat(categorical_feats, columns=1)
-    )
+        click.echo("Loaded Training Dataset...")
+        click.echo(f"Training frame uses {frame_memory_mb(train_df):.1f} MB")
 
-    # Save the categorical plots
-    plt.suptitle('Distribution of Categorical Features')
-    categorical_plot.save(plot_to + "/feat-categoric-figs.png", format="png")
-    
+    # Aggregate the data of each figure once, in this process
+    with profiler.stage("aggregate", rows=len(train_df)):
+        tasks = eda_figure_tasks(train_df, plot_to, tables_to)
 
-    # Columns for the correlation matrix
-    normal_cols = list(
-        set(train_df.columns.tolist())
-        - set(
-            [col for col in train_df.columns if col.startswith("q")]
-            + ["Unnamed: 0", "date", "time", "id"]
-        )
-    )
     if verbose:
-        click.echo("Creating Correlation Matrix...")
-
-    # Generate and save the Pearson correlation matrix
-    cm = pearson_correlation_matrix(train_df[normal_cols], "viridis")
-    dfi.export(cm, plot_to + "feat-correlation-matrix.png")
-
-    cm.data.to_csv(tables_to+"correlation-matrix.csv")
-
-    # Final additional feature definitions
-    numeric_feats = ["age", "Eng_start", "Eng_country_yrs", "Lived_Eng_per"]
-
-    binary_feats = ["psychiatric"]
-    target = ["correct"]
-
-    binary_withNA = [
-        "house_Eng", "nat_Eng", "prime_Eng",
-    ]
-
-    # Pairwise Correlation Plot 
-    # Generate pairwise correlation plots for numeric features
-    fig, axs = plt.subplots(len(numeric_feats), len(numeric_feats), figsize=(15, 15))
-
-    for i in range(len(numeric_feats)):
-        for j in range(len(numeric_feats)):
-            if i == j:
-                axs[i, j].hist(train_df[numeric_feats[i]].dropna(), bins=30, color='skyblue', edgecolor='black')
-            else:
-                axs[i, j].hexbin(train_df[numeric_feats[j]], train_df[numeric_feats[i]], gridsize=30, cmap='Blues')
+        click.echo("Rendering the figures...")
+
+    # Each figure renders in its own worker process; unchanged ones are skipped
+    with profiler.stage("render"):
+        render_figures(
+            tasks,
+            cache_path=plot_to + ".figure-cache.json",
+            n_jobs=n_jobs,
+            log=click.echo if verbose else None,
+        )
 
-            if i < len(numeric_feats) - 1:
-                axs[i, j].xaxis.set_visible(False)
-            if j > 0:
-                axs[i, j].yaxis.set_visible(False)
 
-            if j == 0:
-                axs[i, j].set_ylabel(numeric_feats[i])
-            if i == len(numeric_feats) - 1:
-                axs[i, j].set_xlabel(numeric_feats[j])
+def build_preprocessor(item_features=False, wide_categoricals=False, sparse=False):
+    """
+    Returns the (unfitted) preprocessor of the model features.
 
-    plt.tight_layout()
-    plt.suptitle('Pairwise Correlation Plots of Numeric Features', y=1.02)
-    plt.savefig(plot_to + "/pairwise-correlation-plots.png", format="png")
-    plt.show()
+    With `item_features` it also summarises the q* item responses, and with
+    `wide_categoricals` it also one-hot encodes the high-cardinality features.
+    With `sparse`, implied by `wide_categoricals` since their one-hot columns
+    would not fit in memory densely, every block is a float32 sparse matrix,
+    so the output is a float32 CSR matrix.
+    """
+    sparse = sparse or wide_categoricals
+    # In sparse mode the dense blocks are converted by a final sparse Float32 cast
+    to_sparse = [Float32(to_sparse=True)] if sparse else []
+    float_dtype = np.float32 if sparse else np.float64
 
     numeric_transformer = make_pipeline(
-        SimpleImputer(strategy="median"), StandardScaler()
+        SimpleImputer(strategy="median"), StandardScaler(), *to_sparse
     )
 
     categorical_transformer = make_pipeline(
         SimpleImputer(strategy="constant", fill_value="little"),
-        OneHotEncoder(handle_unknown="ignore"),
+        OneHotEncoder(handle_unknown="ignore", dtype=float_dtype),
     )
 
     binary_NA_transformer = make_pipeline(
         SimpleImputer(strategy="constant", fill_value=0),
-        OneHotEncoder(handle_unknown="ignore", drop="if_binary", dtype=int),
+        OneHotEncoder(handle_unknown="ignore", drop="if_binary", dtype=np.float32 if sparse else int),
     )
 
-    # Get value counts for the 'education' column
-    education_counts = train_df["education"].value_counts()
-
-    # Filter to include only counts greater than 1
-    education_counts_greater_than_one = education_counts[education_counts > 100]
-
-    categories_list = education_counts_greater_than_one.index.tolist()
-
-    # Defines the order for Education to be used in the OrdinalEncoder
-    education_order = [
-        "Graduate Degree", "Some Graduate School", "Undergraduate Degree (3-5 years higher ed)",
-        "Some Undergrad (higher ed)", "High School Degree (12-13 years)",
-        "Haven't Finished High School (less than 13 years ed)",
-        "Didn't Finish High School (less than 13 years ed)", "Others",
-    ]
-
-    # Create a transformer using FunctionTransformer
+    # Map the large education groups to ordered codes and every other
+    # (rare or missing) level to "Others", the last code
     categorical_education_tranformer = make_pipeline(
-        FunctionTransformer(map_to_other, feature_names_out="one-to-one"),
-        OrdinalEncoder(categories=[education_order]),
+        EducationBucketer(),
+        OrdinalEncoder(categories=[education_codes()], dtype=float_dtype),
+        *to_sparse,
     )
 
-    if verbose:
-        click.echo("Creating preprocessor...")
-
-    preprocessor = make_column_transformer(
-        ("drop", drop_feats),
-        (numeric_transformer, numeric_feats),
-        (categorical_transformer, categorical_feats),
-        ("passthrough", binary_feats),
+    transformers = [
+        (numeric_transformer, NUMERIC_FEATURES),
+        (categorical_transformer, CATEGORICAL_FEATURES),
+        (Float32(to_sparse=True) if sparse else "passthrough", BINARY_FEATURES),
         # ("passthrough", target),# for now it is pass through but later most likely log transformation will be applied hence added like this
-        (binary_NA_transformer, binary_withNA),
-        (categorical_education_tranformer, categorical_education),
-    )
-
-    # Save the preprocessor object using pickle
-    with open(pickle_to + "preprocessor.pkl", "wb") as file:
-         pickle.dump(preprocessor, file)
-    if verbose:
-        click.echo("Finished Pickling the preprocessor...")
-
-
-
-# Define the custom function to map values to 'Other'
-def map_to_other(df, categories_list):
-    return (
-        df["education"].apply(lambda x: x if x in categories_list else "Others")
-    ).to_frame()
+        (binary_NA_transformer, BINARY_NA_FEATURES),
+        (categorical_education_tranformer, EDUCATION_FEATURES),
+    ]
+    if item_features:
+        # Per-block accuracies, weighted score and missing count of the q* items
+        transformers.append(
+            (
+                make_pipeline(ItemResponseFeatures(), StandardScaler(), *to_sparse),
+                make_column_selector(pattern=ITEM_PATTERN),
+            )
+        )
+    if wide_categoricals:
+        # One column per country, language (combination) and UK region seen in training
+        transformers.append(
+            (
+                make_pipeline(
+                    SimpleImputer(strategy="constant", fill_value="missing"),
+                    OneHotEncoder(handle_unknown="ignore", dtype=np.float32),
+                ),
+                WIDE_CATEGORICAL_FEATURES,
+            )
+        )
 
+    # Columns not listed above (drop_feats, and the q* items unless
+    # item_features) are dropped by the default remainder, so the
+    # preprocessor also works on column-pruned data. In sparse mode every
+    # block is sparse, so a threshold of 1 always stacks them as CSR.
+    return make_column_transformer(*transformers, sparse_threshold=1.0 if sparse else 0.3)
 
 if __name__ == "__main__":
     main()
@@ -1,20 +1,40 @@
 import sys
 import os
-import pandas as pd
-from sklearn.model_selection import train_test_split
 import click
 
 # Add the src directory to the system path
 root_dir = os.path.dirname(os.path.abspath(__file__))  # Get the absolute path of the script
 src_dir = os.path.join(root_dir, 'src')                # Define the src directory path
 sys.path.append(src_dir)                               # Add src directory to the system path
+sys.path.append("src")
+
+from helper.load_survey_data import load_survey_data, peak_rss_mb
+from helper.columnar_cache import file_sha256, write_parquet_cache
+from helper.download_dataset import download_dataset, read_checksum_file, write_checksum_file
+from helper.stream_sample import stream_sample_split
+from helper.stage_profiler import StageProfiler
 
 @click.command()
+@click.option("--verbose", "-v", is_flag=True, help="Will print verbose messages.")
 @click.option(
     "--url", required=True,
     default="https://osf.io/download/g72pq/",
     type=str,
-    help="URL of the dataset to download.")
+    help="URL (http(s):// or file://) or local path of the dataset to download.")
+@click.option(
+    "--sha256",
+    type=str,
+    default=None,
+    help="Expected SHA-256 of the downloaded dataset; the download fails if it differs.",
+)
+@click.option(
+    "--sha256-file",
+    type=str,
+    default=None,
+    help="Checksum file pinning the SHA-256 of each dataset URL, ex: data/dataset.sha256. "
+    "Without --sha256, the download is checked against the pinned digest, or pins it on the "
+    "first download.",
+)
 @click.option(
     "--output_folder_path",
     required=True,
@@ -22,54 +42,169 @@ sys.path.append(src_dir)                               # Add src directory to th
     default="./data/raw",
     help="Path to the output folder where files will be saved.",
 )
-
-def main(url, output_folder_path, sample_size=0.3, test_size=0.3):
+@click.option(
+    "--sampling",
+    type=click.Choice(["bernoulli", "reservoir"]),
+    default="bernoulli",
+    help="Streaming sampler: keep each row with probability --sample-size (bernoulli) "
+    "or keep exactly --sample-size rows (reservoir).",
+)
+@click.option(
+    "--sample-size",
+    type=float,
+    default=0.3,
+    help="Fraction of rows (bernoulli) or number of rows (reservoir) to sample.",
+)
+@click.option(
+    "--test-size",
+    type=float,
+    default=0.3,
+    help="Fraction of the sampled rows to allocate to the test set.",
+)
+@click.option(
+    "--stratify",
+    type=str,
+    default=None,
+    help="Column to stratify the train/test split on, ex: speaker_cat or correct.",
+)
+@click.option(
+    "--stratify-bins",
+    type=str,
+    default=None,
+    help="Comma-separated bin edges for a numeric --stratify column, ex: 0.6,0.8,0.9,0.95",
+)
+@click.option("--chunksize", type=int, default=100_000, help="Rows read per chunk.")
+@click.option("--random-state", type=int, default=123, help="Seed for sampling and splitting.")
+@click.option("--profile", is_flag=True, help="Record the time and memory of each stage.")
+@click.option(
+    "--profile-stage",
+    multiple=True,
+    help="With --profile, also dump a cProfile of this stage (repeatable), ex: sample_split",
+)
+@click.option(
+    "--profile-to",
+    type=str,
+    default="results/profile/",
+    help="Path to where profile reports should be written ex: results/profile/",
+)
+def main(
+    verbose,
+    url,
+    sha256,
+    sha256_file,
+    output_folder_path,
+    sampling,
+    sample_size,
+    test_size,
+    stratify,
+    stratify_bins,
+    chunksize,
+    random_state,
+    profile,
+    profile_stage,
+    profile_to,
+):
     """
     Downloads, samples, splits, and saves a dataset.
 
-    This function downloads a dataset from a specified URL using pandas.
-    It samples a fraction of the dataset (default: 30%) and saves this sampled dataset
-    to a ZIP file. It then splits the sampled dataset into training and testing subsets
-    (default test size: 30%), and saves these subsets to separate CSV files in the specified
-    directory. The directory is created if it does not exist.
+    This function streams a dataset from a specified URL to a local file, resuming
+    an interrupted download and verifying its checksum. It then reads the file in chunks,
+    samples a fraction of the rows (default: 30%) and splits the sample into training and
+    testing subsets (default test size: 30%, optionally stratified) in a single pass. The
+    sample is written to a ZIP file and the subsets to separate CSV files in the specified
+    directory as each chunk is processed, along with typed Parquet caches of both subsets.
+    The directory is created if it does not exist.
 
     Parameters:
+    verbose (bool): Whether to print verbose messages.
     url (str): URL of the dataset to download.
+    sha256 (str): Expected SHA-256 of the dataset, or None to use the pinned one.
+    sha256_file (str): Checksum file of the pinned dataset digests, or None to skip verification
+                       when no sha256 is given.
     output_folder_path (str): Path to the output folder where files will be saved.
-    sample_size (float, optional): Fraction of the original dataset to sample.
-                                   Defaults to 0.3.
-    test_size (float, optional): Fraction of the sampled dataset to allocate
-                                 for the test set. Defaults to 0.3.
+    sampling (str): Streaming sampler, "bernoulli" or "reservoir".
+    sample_size (float): Fraction of the original dataset to sample (bernoulli), or
+                         number of rows to sample (reservoir). Defaults to 0.3.
+    test_size (float): Fraction of the sampled dataset to allocate
+                       for the test set. Defaults to 0.3.
+    stratify (str): Column to stratify the train/test split on, or None.
+    stratify_bins (str): Comma-separated bin edges for a numeric stratify column.
+    chunksize (int): Number of rows read per chunk.
+    random_state (int): Seed for sampling and splitting. Defaults to 123.
+    profile (bool): Whether to write a stage timing and memory report.
+    profile_stage (tuple): Stages to also run under cProfile.
+    profile_to (str): Path to save the profile reports.
 
     Returns:
     None: This function does not return anything but saves the sampled, training,
           and testing datasets as CSV files.
     """
 
+    profiler = StageProfiler(
+        "english_score_get_data",
+        output_dir=profile_to,
+        enabled=profile,
+        cprofile_stages=profile_stage,
+    )
+
     # Ensure the directory exists
     directory = os.path.abspath(output_folder_path)
     if not os.path.exists(directory):
         os.makedirs(directory)
 
-    # Download and sample the dataset
-    dataset = pd.read_csv(url, sep=",", on_bad_lines="skip", low_memory=False)
-    sampled_dataset = dataset.sample(frac=sample_size, random_state=123)
-
-    # Splitting the DataFrame
-    train_df, test_df = train_test_split(
-        sampled_dataset, test_size=test_size, random_state=123
-    )
+    # Download the dataset to disk before parsing it, checked against its pinned digest
+    if sha256 is None and sha256_file:
+        sha256 = read_checksum_file(sha256_file, url)
+    with profiler.stage("download"):
+        try:
+            dataset_path = download_dataset(
+                url, os.path.join(directory, "full_dataset.csv"), sha256=sha256
+            )
+        except ValueError as e:
+            raise click.ClickException(str(e))
+    if verbose:
+        click.echo(f"Downloaded dataset to {dataset_path}")
+    if sha256 is None and sha256_file:
+        write_checksum_file(sha256_file, url, file_sha256(dataset_path))
+        click.echo(f"Pinned the SHA-256 of {url} in {sha256_file}; commit it to check later downloads")
 
-    # Save the training and testing datasets
+    # Sample and split in one pass, writing each chunk's rows as they are drawn
     train_file_path = os.path.join(directory, "train_data.csv")
     test_file_path = os.path.join(directory, "test_data.csv")
-    train_df.to_csv(train_file_path, index=False)
-    test_df.to_csv(test_file_path, index=False)
-
-    # Save the sampled dataset directly to a ZIP file
     zip_file_path = os.path.join(directory, "sampled_data.zip")
-    compression_opts = dict(method="zip", archive_name="sampled_data.csv")
-    sampled_dataset.to_csv(zip_file_path, index=False, compression=compression_opts)
+    with profiler.stage("sample_split") as stage:
+        counts = stream_sample_split(
+            load_survey_data(dataset_path, chunksize=chunksize, use_cache=False),
+            train_file_path,
+            test_file_path,
+            sample_size=sample_size,
+            test_size=test_size,
+            method=sampling,
+            stratify=stratify,
+            stratify_bins=(
+                [float(edge) for edge in stratify_bins.split(",")] if stratify_bins else None
+            ),
+            random_state=random_state,
+            sample_path=zip_file_path,
+        )
+        stage["rows"] = counts["read"]
+    if verbose:
+        click.echo(
+            f"Sampled {counts['sampled']} of {counts['read']} rows "
+            f"({counts['train']} train, {counts['test']} test)"
+        )
+        click.echo(f"Peak RSS after sampling: {peak_rss_mb():.1f} MB")
+
+    # Save typed Parquet copies that later stages read instead of the CSVs
+    with profiler.stage("parquet_cache", rows=counts["sampled"]):
+        for file_path in [train_file_path, test_file_path]:
+            cache_path = write_parquet_cache(file_path)
+            if verbose:
+                click.echo(f"Wrote Parquet cache {cache_path}")
+
+    if profiler.write() and verbose:
+        click.echo(f"Wrote profile report to {profile_to}")
+
 
 
 if __name__ == "__main__":
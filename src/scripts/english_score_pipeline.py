@@ -0,0 +1,174 @@
+import sys
+import urllib.parse
+import urllib.request
+
+import click
+
+sys.path.append("src")
+from helper.dag_runner import DagRunner, Stage, script_sources
+from helper.download_dataset import read_checksum_file
+
+SCRIPTS = "src/scripts/"
+DATASET_SHA256_FILE = "data/dataset.sha256"
+TRAIN = "data/raw/train_data.csv"
+TEST = "data/raw/test_data.csv"
+PREPROCESSOR = "results/models/preprocessor/"
+RIDGE = "results/models/ridge_best_model/"
+LASSO = "results/models/lasso_best_model/"
+FIGURES = [
+    "results/figures/feat-numeric-figs.png",
+    "results/figures/education-level-fig.png",
+    "results/figures/feat-categoric-figs.png",
+    "results/figures/feat-correlation-matrix.png",
+    "results/figures/pairwise-correlation-plots.png",
+]
+BOOK_SOURCES = [
+    "notebooks/_config.yml",
+    "notebooks/_toc.yml",
+    "notebooks/english_language_learning_ability_prediction_analysis.ipynb",
+    "notebooks/references.bib",
+]
+
+
+def dataset_inputs(url):
+    """Returns the local dataset file as a stage input, or nothing for a remote URL"""
+    parsed = urllib.parse.urlparse(url)
+    if parsed.scheme in ("http", "https", "ftp"):
+        return []
+    return [urllib.request.url2pathname(parsed.path) if parsed.scheme == "file" else url]
+
+
+def build_stages(url, sha256=None, sha256_file=DATASET_SHA256_FILE):
+    """Returns the stages of the analysis, the same steps as the Makefile"""
+    python = sys.executable
+    eda = SCRIPTS + "english_score_eda.py"
+    get_data = [python, SCRIPTS + "english_score_get_data.py", f"--url={url}",
+                "--output_folder_path=./data/raw"]
+    if sha256:
+        get_data.append(f"--sha256={sha256}")
+    elif sha256_file:
+        get_data.append(f"--sha256-file={sha256_file}")
+        sha256 = read_checksum_file(sha256_file, url)
+    return [
+        # A remote dataset is keyed on its URL and checksum (the content is only
+        # known after downloading it), a local one on its content
+        Stage(
+            "get_data",
+            [get_data],
+            inputs=dataset_inputs(url),
+            outputs=[TRAIN, TEST],
+            code=script_sources(SCRIPTS + "english_score_get_data.py"),
+            params={"url": url, "sha256": sha256},
+        ),
+        # The preprocessor is built from the feature lists alone, so it does
+        # not wait for the data
+        Stage(
+            "preprocessor",
+            [[python, eda, "--only=preprocessor", f"--pickle-to={PREPROCESSOR}"]],
+            outputs=[PREPROCESSOR + "LATEST"],
+            code=script_sources(eda),
+        ),
+        # The figures only feed the book, so they render alongside the tuning
+        Stage(
+            "eda_figures",
+            [[python, eda, "--only=figures", f"--training-data={TRAIN}",
+              "--plot-to=results/figures/", "--tables-to=results/tables/"]],
+            inputs=[TRAIN],
+            outputs=FIGURES + ["results/tables/correlation-matrix.csv"],
+            deps=["get_data"],
+            code=script_sources(eda),
+        ),
+        Stage(
+            "tuning",
+            [[python, SCRIPTS + "english_score_tuning.py", f"--train={TRAIN}",
+              f"--test={TEST}", "--output_dir=results/", f"--preprocessor_path={PREPROCESSOR}"]],
+            inputs=[TRAIN, TEST, PREPROCESSOR + "LATEST"],
+            outputs=[RIDGE + "LATEST", LASSO + "LATEST",
+                     "results/tables/ridge_top_models.csv", "results/tables/lasso_top_models.csv"],
+            deps=["get_data", "preprocessor"],
+            code=script_sources(SCRIPTS + "english_score_tuning.py"),
+        ),
+        Stage(
+            "results",
+            [[python, SCRIPTS + "english_score_results.py", f"--train={TRAIN}",
+              f"--test={TEST}", "--plot_to=results/figures/", "--tables_to=results/tables/",
+              f"--preprocessor_path={PREPROCESSOR}", f"--best_model_path={RIDGE}"]],
+            inputs=[TRAIN, TEST, RIDGE + "LATEST"],
+            outputs=["results/figures/act-vs-pred.png", "results/figures/feat-coefs.png",
+                     "results/tables/test-score.csv"],
+            deps=["tuning"],
+            code=script_sources(SCRIPTS + "english_score_results.py"),
+        ),
+        Stage(
+            "book",
+            [
+                ["jupyter-book", "build", "notebooks"],
+                [python, "-c", "import shutil; shutil.copytree("
+                 "'notebooks/_build/html', 'docs', dirs_exist_ok=True); "
+                 "open('docs/.nojekyll', 'a').close()"],
+            ],
+            inputs=BOOK_SOURCES + ["results/figures/", "results/tables/"],
+            outputs=["docs/index.html"],
+            deps=["eda_figures", "results"],
+        ),
+    ]
+
+
+@click.command()
+@click.option("--verbose", "-v", is_flag=True, help="Will print the output of each stage.")
+@click.option(
+    "--url",
+    default="https://osf.io/download/g72pq/",
+    help="URL or local path of the dataset (default: https://osf.io/download/g72pq/)",
+)
+@click.option(
+    "--sha256",
+    default=None,
+    help="Expected SHA-256 of the dataset; changing it reruns the download (default: the pinned one)",
+)
+@click.option(
+    "--sha256-file",
+    default=DATASET_SHA256_FILE,
+    help=f"Checksum file pinning the SHA-256 of each dataset URL (default: {DATASET_SHA256_FILE})",
+)
+@click.option(
+    "--target",
+    "targets",
+    multiple=True,
+    help="Stage to bring up to date with its dependencies (repeatable; default: all)",
+)
+@click.option("--force", multiple=True, help="Stage to rerun even if up to date (repeatable).")
+@click.option("--jobs", "-j", type=int, default=2, help="Stages run at the same time (default: 2)")
+@click.option("--dry-run", is_flag=True, help="Only report which stages would run.")
+@click.option(
+    "--state",
+    default="results/.pipeline-state.json",
+    help="File of the stage hashes of the last runs (default: results/.pipeline-state.json)",
+)
+def main(verbose, url, sha256, sha256_file, targets, force, jobs, dry_run, state):
+    """
+    Runs the analysis as a DAG of stages, skipping those whose inputs are unchanged.
+
+    Each stage is keyed on the content of its input files, its code (the script
+    and the helper modules it imports) and its command line. The download is
+    keyed on the dataset URL and its SHA-256, given with --sha256 or pinned in --sha256-file
+    (the first download pins it); a local dataset file on its content. Stages whose key
+    matches their last successful run are skipped, so touching or re-downloading
+    identical data reruns nothing. Independent stages run in parallel, ex: the
+    EDA figures render while the models are tuned.
+    """
+    runner = DagRunner(
+        build_stages(url, sha256, sha256_file), state_path=state, jobs=jobs, log=click.echo, show_output=verbose
+    )
+    try:
+        status = runner.run(targets=list(targets) or None, force=force, dry_run=dry_run)
+    except ValueError as e:
+        raise click.UsageError(str(e))
+
+    click.echo(", ".join(f"{name}: {result}" for name, result in status.items()))
+    if any(result in ("failed", "blocked") for result in status.values()):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
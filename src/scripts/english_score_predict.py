@@ -0,0 +1,188 @@
+import csv
+import json
+import sys
+import time
+
+import click
+
+sys.path.append("src")
+# scikit-learn and pandas are imported only where needed, so scoring with a
+# compiled .json scorer (`batch --model_path ....json`) starts without them
+from helper.linear_scorer import LinearScorer, iter_records
+from helper.scoring_stats import ScoringStats
+
+
+@click.group()
+def main():
+    """Scores respondents with the best model, as a service or in batches."""
+
+
+@main.command()
+@click.option("--verbose", "-v", is_flag=True, help="Will print verbose messages.")
+@click.option(
+    "--model_path",
+    default="results/models/ridge_best_model/",
+    help="Path to the model artifact, pickle or compiled .json scorer (default: results/models/ridge_best_model/)",
+)
+@click.option("--host", default="127.0.0.1", help="Interface to listen on (default: 127.0.0.1)")
+@click.option("--port", type=int, default=8000, help="Port to listen on (default: 8000)")
+@click.option(
+    "--max-batch-size",
+    type=int,
+    default=256,
+    help="Maximum number of respondents scored in one model call (default: 256)",
+)
+@click.option(
+    "--max-wait-ms",
+    type=float,
+    default=5.0,
+    help="How long a request waits for others to batch with, in ms (default: 5)",
+)
+def serve(verbose, model_path, host, port, max_batch_size, max_wait_ms):
+    """
+    Serves predictions over HTTP, loading the model once.
+
+    POST a JSON record or list of records to /predict; GET /stats for the
+    batch latency and throughput so far.
+    """
+    from helper.batch_scoring import MicroBatcher, make_scoring_server
+
+    model = load_model(model_path)
+    with MicroBatcher(model, max_batch_size, max_wait_ms) as batcher:
+        server = make_scoring_server(batcher, host, port)
+        if verbose:
+            click.echo(f"Serving {model_path} on http://{host}:{server.server_port}/predict")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
+            click.echo(f"Scoring stats: {json.dumps(batcher.stats.as_dict())}", err=True)
+
+
+@main.command()
+@click.option("--verbose", "-v", is_flag=True, help="Will print per-batch latency and throughput.")
+@click.option(
+    "--model_path",
+    default="results/models/ridge_best_model/",
+    help="Path to the model artifact, pickle or compiled .json scorer (default: results/models/ridge_best_model/)",
+)
+@click.option(
+    "--input",
+    "input_file",
+    type=click.File("r"),
+    default="-",
+    help="File of records to score, `-` for stdin (default: -)",
+)
+@click.option(
+    "--output",
+    "output_file",
+    type=click.File("w"),
+    default="-",
+    help="File to write the predictions to, `-` for stdout (default: -)",
+)
+@click.option(
+    "--format",
+    "input_format",
+    type=click.Choice(["ndjson", "csv"]),
+    default="ndjson",
+    help="Input format: one JSON record per line, or CSV with a header (default: ndjson)",
+)
+@click.option("--batch-size", type=int, default=10_000, help="Records scored per batch.")
+def batch(verbose, model_path, input_file, output_file, input_format, batch_size):
+    """
+    Scores a stream of records, writing one prediction per input record.
+
+    Predictions are written as they are computed, in the input format, with the
+    record `id` when the input has one. Latency and throughput go to stderr.
+    """
+    model = load_model(model_path)
+    stats = ScoringStats()
+    writer = None
+    for records in read_batches(model, input_file, input_format, batch_size):
+        predictions, seconds = score(model, records, stats)
+        if isinstance(records, list):
+            ids = [record.get("id") for record in records]
+        else:
+            ids = records["id"].tolist() if "id" in records else [None] * len(predictions)
+        if input_format == "csv":
+            if writer is None:
+                writer = csv.writer(output_file)
+                writer.writerow(["id", "prediction"])
+            writer.writerows(zip(ids, predictions.tolist()))
+        else:
+            for record_id, prediction in zip(ids, predictions.tolist()):
+                output_file.write(json.dumps({"id": record_id, "prediction": prediction}) + "\n")
+        output_file.flush()
+        if verbose:
+            click.echo(
+                f"Scored {len(predictions)} rows in {seconds * 1000:.1f} ms "
+                f"({len(predictions) / seconds:.0f} rows/s)",
+                err=True,
+            )
+    click.echo(f"Scoring stats: {json.dumps(stats.as_dict())}", err=True)
+
+
+@main.command()
+@click.option("--verbose", "-v", is_flag=True, help="Will print verbose messages.")
+@click.option(
+    "--model_path",
+    default="results/models/ridge_best_model/",
+    help="Path to the model artifact or pickle (default: results/models/ridge_best_model/)",
+)
+@click.option(
+    "--output",
+    "output_path",
+    default="results/models/ridge_best_model.json",
+    help="Path to write the compiled scorer to (default: results/models/ridge_best_model.json)",
+)
+def compile(verbose, model_path, output_path):
+    """
+    Compiles the fitted pipeline to a NumPy-only linear scorer (JSON).
+
+    The compiled scorer gives the same predictions without scikit-learn or
+    pandas transforms; pass its path as --model_path to `serve` or `batch`.
+    """
+    from helper.compile_linear_scorer import compile_linear_pipeline
+
+    scorer = compile_linear_pipeline(load_model(model_path))
+    scorer.save(output_path)
+    if verbose:
+        click.echo(f"Compiled {model_path} to {output_path} ({len(scorer.columns)} input columns)")
+
+
+def load_model(path):
+    """Returns the fitted model from the path (artifact directory, pickle file or compiled scorer .json)"""
+    if path.endswith(".json"):
+        return LinearScorer.load(path)
+    from helper.artifact_store import load_model as load_artifact
+
+    # Artifacts are memory-mapped, so several servers share one copy of the arrays
+    return load_artifact(path)
+
+
+def read_batches(model, stream, input_format, batch_size):
+    """Returns the record batches of the stream: lists of dicts for a compiled scorer, else DataFrames"""
+    if isinstance(model, LinearScorer):
+        return iter_records(stream, input_format, batch_size)
+    from helper.batch_scoring import iter_record_batches
+
+    return iter_record_batches(stream, input_format, batch_size)
+
+
+def score(model, records, stats):
+    """Returns the predictions of one batch of records and the seconds taken"""
+    if not isinstance(model, LinearScorer):
+        from helper.batch_scoring import score_batch
+
+        return score_batch(model, records, stats)
+    start = time.perf_counter()
+    predictions = model.predict_records(records)
+    seconds = time.perf_counter() - start
+    stats.record(len(predictions), seconds)
+    return predictions, seconds
+
+
+if __name__ == "__main__":
+    main()
@@ -1,13 +1,24 @@
 import click
 import pandas as pd
 import numpy as np
-import pickle
 import sys
 import dataframe_image as dfi
 from sklearn.metrics import mean_squared_error, mean_absolute_percentage_error,mean_absolute_error
 sys.path.append("src")
 from helper.show_feat_coeff import show_feat_coeff
 from helper.plt_regr_pred import plt_regr_pred
+from helper.stage_profiler import StageProfiler
+from helper.model_fingerprint import FingerprintMismatch, verify_model_fingerprint
+from helper.artifact_store import load_model
+from helper.item_response import uses_item_responses
+from helper.design_matrix import uses_wide_categoricals
+from helper.precision import float32_pipeline, is_float32_pipeline, precision_parity
+from helper.load_survey_data import (
+    load_survey_data,
+    model_columns,
+    TARGET,
+    peak_rss_mb,
+)
 
 
 
@@ -16,7 +27,7 @@ from helper.plt_regr_pred import plt_regr_pred
 @click.option(
     "--train",
     default="data/raw/train_data.csv",
-    help="Path to the training data.",
+    help="Path to the training data (only read with --refit; otherwise checked against the model fingerprint).",
 )
 @click.option(
     "--test",
@@ -37,19 +48,46 @@ from helper.plt_regr_pred import plt_regr_pred
 )
 @click.option(
     "--preprocessor_path",
-    default="results/models/preprocessor/preprocessor.pkl",
-    help="Path to the preprocessor object (default: results/models/preprocessor/preprocessor.pkl)",
+    default="results/models/preprocessor/",
+    help="Path to the preprocessor artifact or pickle (default: results/models/preprocessor/)",
+)
+@click.option(
+    "--best_model_path",
+    default="results/models/ridge_best_model/",
+    help="Path to the best model artifact or pickle (default: results/models/ridge_best_model/)",
+)
+@click.option(
+    "--refit",
+    is_flag=True,
+    help="Refit the preprocessor and model on the training data instead of scoring the saved model.",
+)
+@click.option(
+    "--dtype",
+    type=click.Choice(["float64", "float32"]),
+    default=None,
+    help="With --refit, the precision the model is refitted in; float32 also writes "
+    "dtype_parity.csv comparing the test scores with float64 (default: that of the saved model)",
 )
+@click.option("--profile", is_flag=True, help="Record the time and memory of each stage.")
 @click.option(
-        "--best_model_path",
-    default="results/models/ridge_best_model.pkl",
-    help="Path to the preprocessor object (default: results/models/ridge_best_model.pkl)",
+    "--profile-stage",
+    multiple=True,
+    help="With --profile, also dump a cProfile of this stage (repeatable), ex: model_fit",
+)
+@click.option(
+    "--profile-to",
+    type=str,
+    default="results/profile/",
+    help="Path to where profile reports should be written ex: results/profile/",
 )
 
-def main(verbose, train, test, plot_to, tables_to, preprocessor_path, best_model_path):
+def main(verbose, train, test, plot_to, tables_to, preprocessor_path, best_model_path,
+         refit, dtype, profile, profile_stage, profile_to):
     '''
         Main function for discussion and results of final model. 
-        Includes reporting test score, showing feature coefficients, and plotting actual vs. predicted values
+        Includes reporting test score, showing feature coefficients, and plotting actual vs. predicted values.
+        By default the fitted model saved by tuning is scored as is, after checking its fingerprint
+        against the training data; only the test data is loaded.
         Args:
             verbose (str): flag to print verbose messages.
             train (str): Path to the train data CSV file.
@@ -57,77 +95,136 @@ def main(verbose, train, test, plot_to, tables_to, preprocessor_path, best_model
             plot_to (str): Path to save the generated plots.
             tables_to (str): Path to save the tables.
             preprocessor_path (str): Path to preprocessor object.
-            pipeline_path (str): Path to pipeline object.
+            best_model_path (str): Path to the fitted best model.
+            refit (bool): Whether to refit the preprocessor and model on the training data.
+            dtype (str): "float32" or "float64" to refit the model in that precision; None keeps the saved model's.
+            profile (bool): Whether to write a stage timing and memory report.
+            profile_stage (tuple): Stages to also run under cProfile.
+            profile_to (str): Path to save the profile reports.
     Returns:
         None
     '''
-    if verbose:
-        click.echo("Getting the train and test data...")
-    # Get train data
-    train_df = pd.read_csv(train, sep=",", on_bad_lines="skip", low_memory=False)
-    X_train = train_df.drop(columns="correct")
-    y_train = train_df["correct"]
-    # Get test data
-    test_df = pd.read_csv(test, sep=",", on_bad_lines="skip", low_memory=False)
-    X_test = test_df.drop(columns="correct")
-    y_test = test_df["correct"]
+    profiler = StageProfiler(
+        "english_score_results",
+        output_dir=profile_to,
+        enabled=profile,
+        cprofile_stages=profile_stage,
+    )
 
-    if verbose:
-        click.echo("Getting and fitting the preprocessor...")
-    with open(preprocessor_path, "rb") as f:
-        preprocessor = pickle.load(f)
-    preprocessor.fit(X_train, y_train)
+    float64_model = None
+    if refit:
+        best_model, preprocessor, float64_model = refit_best_model(
+            train, preprocessor_path, best_model_path, profiler, verbose, dtype
+        )
+    else:
+        if verbose:
+            click.echo("Checking the best model fingerprint...")
+        with profiler.stage("verify_fingerprint"):
+            try:
+                verify_model_fingerprint(best_model_path, train)
+            except FingerprintMismatch as e:
+                raise click.ClickException(f"{e}. Rerun the tuning or pass --refit.")
+        best_model = load_model(best_model_path)
+        if dtype is not None and (dtype == "float32") != is_float32_pipeline(best_model):
+            raise click.ClickException(
+                f"The saved model was not tuned in {dtype}. Rerun the tuning with "
+                f"--dtype {dtype} or pass --refit."
+            )
+        # The pipeline's own fitted preprocessor gives the feature names
+        preprocessor = best_model[0]
 
     if verbose:
-        click.echo("Getting and fitting the pipeline...")
-    with open(best_model_path, "rb") as f:
-        best_model = pickle.load(f)
-    best_model.fit(X_train, y_train)
+        click.echo("Getting the test data...")
+    with profiler.stage("load") as stage:
+        columns = model_columns(uses_item_responses(best_model), uses_wide_categoricals(best_model))
+        test_df = load_survey_data(test, columns=columns)
+        X_test = test_df.drop(columns=TARGET)
+        y_test = test_df[TARGET]
+        stage["rows"] = len(test_df)
+    if verbose:
+        click.echo(f"Peak RSS after loading: {peak_rss_mb():.1f} MB")
 
     if verbose:
         click.echo("Getting Best Test Score...")
     # Get the test score of the best model
-    y_pred = best_model.predict(X_test)
-    
-    r2 = best_model.score(X_test, y_test)
-    mape = mean_absolute_percentage_error(y_test, y_pred)
-    mse = mean_squared_error(y_test, y_pred)
-    rmse = np.sqrt(mse)
-    score = pd.DataFrame([[r2, mape, mse, rmse]], columns=["r2", "mape", "mse", "rmse"])
-    score.to_csv(tables_to + "test-score.csv")
+    with profiler.stage("score", rows=len(X_test)):
+        y_pred = best_model.predict(X_test)
+
+        r2 = best_model.score(X_test, y_test)
+        mape = mean_absolute_percentage_error(y_test, y_pred)
+        mse = mean_squared_error(y_test, y_pred)
+        rmse = np.sqrt(mse)
+        score = pd.DataFrame([[r2, mape, mse, rmse]], columns=["r2", "mape", "mse", "rmse"])
+        score.to_csv(tables_to + "test-score.csv")
+
+    if float64_model is not None:
+        # The model refitted in float32 against the same model refitted in float64
+        with profiler.stage("precision_parity", rows=len(X_test)):
+            parity = precision_parity(best_model, float64_model, X_test, y_test)
+            parity.to_csv(tables_to + "dtype_parity.csv")
+        click.echo(parity.to_string())
 
     if verbose:
         click.echo("Running the feature coefficient section...")
     # Get the feature coefficient values
-    sfc = show_feat_coeff(best_model, "ridge", preprocessor)
-    dfi.export(sfc, plot_to + "feat-coefs.png")
+    with profiler.stage("feature_coefficients"):
+        sfc = show_feat_coeff(best_model, "ridge", preprocessor)
+        dfi.export(sfc, plot_to + "feat-coefs.png")
         
     if verbose:
         click.echo("Plotting the actual vs predicted...")
     # Plot actual vs predicted
-    fig, ax = plt_regr_pred(
-        X_test, y_test, best_model)
-    fig.savefig(plot_to + "act-vs-pred.png")
+    with profiler.stage("act_vs_pred_plot", rows=len(X_test)):
+        fig, ax = plt_regr_pred(
+            X_test, y_test, best_model)
+        fig.savefig(plot_to + "act-vs-pred.png")
+
+    if profiler.write() and verbose:
+        click.echo(f"Wrote profile report to {profile_to}")
 
     if verbose:
         click.echo("Done!")
 
-def map_to_other(df):
-    """helper function to map categories to others, used in the preprocessor"""
-    categories_list = [
-        "Graduate Degree",
-        "Some Graduate School",
-        "Undergraduate Degree (3-5 years higher ed)",
-        "Some Undergrad (higher ed)",
-        "High School Degree (12-13 years)",
-        "Haven't Finished High School (less than 13 years ed)",
-        "Didn't Finish High School (less than 13 years ed)",
-        "Others",
-    ]
-
-    return (
-        df["education"].apply(lambda x: x if x in categories_list else "Others")
-    ).to_frame()
+
+def refit_best_model(train, preprocessor_path, best_model_path, profiler, verbose, dtype=None):
+    """
+    Returns the best model and preprocessor refitted on the training data, and the
+    float64 model also refitted when a float64 model is converted to float32 (else None)
+    """
+    best_model = load_model(best_model_path, mmap_mode=None)
+    preprocessor = load_model(preprocessor_path, mmap_mode=None)
+    float64_model = None
+    if dtype == "float64" and is_float32_pipeline(best_model):
+        raise click.ClickException("The saved model was tuned in float32. Rerun the tuning in float64.")
+    if dtype == "float32" and not is_float32_pipeline(best_model):
+        float64_model, best_model = best_model, float32_pipeline(best_model)
+
+    if verbose:
+        click.echo("Getting the train data...")
+    with profiler.stage("load_train") as stage:
+        columns = model_columns(uses_item_responses(best_model), uses_wide_categoricals(best_model))
+        train_df = load_survey_data(train, columns=columns)
+        X_train = train_df.drop(columns=TARGET)
+        y_train = train_df[TARGET]
+        stage["rows"] = len(train_df)
+
+    if verbose:
+        click.echo("Fitting the preprocessor...")
+    with profiler.stage("preprocessor_fit", rows=len(X_train)):
+        preprocessor.fit(X_train, y_train)
+
+    if verbose:
+        click.echo("Fitting the pipeline...")
+    with profiler.stage("model_fit", rows=len(X_train)):
+        if is_float32_pipeline(best_model):
+            best_model.fit(X_train, y_train.astype("float32"))
+        else:
+            best_model.fit(X_train, y_train)
+        if float64_model is not None:
+            float64_model.fit(X_train, y_train)
+
+    return best_model, preprocessor, float64_model
+
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -1,8 +1,9 @@
 import click
 import dataframe_image as dfi
 import pandas as pd
-import pickle
 import sys
+from contextlib import nullcontext
+from sklearn.base import clone
 from sklearn.compose import make_column_transformer
 from sklearn.impute import SimpleImputer
 from sklearn.pipeline import make_pipeline
@@ -10,17 +11,32 @@ from sklearn.preprocessing import (
     OneHotEncoder,
     OrdinalEncoder,
     StandardScaler,
-    FunctionTransformer,
 )
-from sklearn.linear_model import Ridge, Lasso
 from sklearn.model_selection import RandomizedSearchCV
 from scipy.stats import loguniform
 from sklearn.metrics import PredictionErrorDisplay
 from sklearn.model_selection import train_test_split
 
 sys.path.append("src")
-from helper.search_top_models import fit_and_return_top_models
+from helper.search_top_models import fit_and_return_top_models, top_models_table
+from helper.concurrent_search import fit_searches_concurrently
+from helper.shared_frame import SharedFrame
+from helper.execution_backend import QUEUE_BACKEND, ExecutionBackend, LocalQueueCluster
+from helper.stage_profiler import StageProfiler
 from helper.show_feat_coeff import show_feat_coeff
+from helper.path_search import RidgePathSearchCV, LassoPathSearchCV
+from helper.racing_search import RacingSearchCV
+from helper.artifact_store import ArtifactStore, load_model
+from helper.transform_cache import TransformCache, make_cached_pipeline
+from helper.item_response import uses_item_responses
+from helper.design_matrix import is_sparse_design, linear_models, uses_wide_categoricals
+from helper.precision import float32_preprocessor, precision_parity
+from helper.load_survey_data import (
+    load_survey_data,
+    model_columns,
+    TARGET,
+    frame_memory_mb,
+)
 
 SCORING = {"RMSE": "neg_root_mean_squared_error", "R squared": "r2"}
 
@@ -44,175 +60,418 @@ SCORING = {"RMSE": "neg_root_mean_squared_error", "R squared": "r2"}
 )
 @click.option(
     "--preprocessor_path",
-    default="results/models/preprocessor/preprocessor.pkl",
-    help="Path to the preprocessor object (default: results/models/preprocessor/preprocessor.pkl)",
+    default="results/models/preprocessor/",
+    help="Path to the preprocessor artifact or pickle (default: results/models/preprocessor/)",
+)
+@click.option(
+    "--transform-cache",
+    default=None,
+    help="Directory for caching fitted preprocessing per CV fold, shared by the "
+    "Ridge and Lasso searches (default: no caching), ex: results/cache/",
+)
+@click.option(
+    "--search-strategy",
+    type=click.Choice(["random", "path", "racing"]),
+    default="random",
+    help="How alphas are searched: `random` fits every candidate with "
+    "RandomizedSearchCV, `path` solves all Ridge alphas of a fold from one SVD "
+    "and warm-starts Lasso from the largest alpha down, `racing` stops fitting "
+    "alphas that are clearly worse than the best after 3 folds (default: random)",
+)
+@click.option(
+    "--lasso-grid-size",
+    type=int,
+    default=None,
+    help="With --search-strategy=path, search this many log-spaced Lasso alphas "
+    "instead of 30 random ones (default: random alphas)",
+)
+@click.option(
+    "--concurrent",
+    is_flag=True,
+    help="Run the Ridge and Lasso CV fits together in one shared worker pool "
+    "(only with --search-strategy=random)",
+)
+@click.option(
+    "--n-jobs",
+    type=int,
+    default=-1,
+    help="Number of worker processes, -1 for all cores (default: -1)",
+)
+@click.option(
+    "--max-memory-gb",
+    type=float,
+    default=None,
+    help="With --concurrent, lower the number of workers so their estimated "
+    "memory stays within this budget (default: no limit)",
+)
+@click.option(
+    "--shared-data",
+    default=None,
+    help="Directory the training data is written to once as memory-mapped arrays "
+    "that the CV workers attach to, instead of pickling it to every fit "
+    "(only with --search-strategy=random; default: no sharing), ex: /dev/shm",
+)
+@click.option(
+    "--backend",
+    default="local",
+    help="Where the CV fits run: `local` worker processes, `file-queue` workers "
+    "serving --queue-dir (started on any machine with english_score_worker.py), "
+    "or another joblib backend such as `dask` or `ray` once installed (default: local)",
+)
+@click.option(
+    "--queue-dir",
+    default=None,
+    help="With --backend=file-queue, the work queue directory, on a filesystem "
+    "shared by all the workers, ex: /shared/queue/",
+)
+@click.option(
+    "--local-workers",
+    type=int,
+    default=0,
+    help="With --backend=file-queue, also start this many workers on this machine "
+    "for the run (default: 0, the workers are started separately)",
+)
+@click.option(
+    "--queue-timeout",
+    type=float,
+    default=600,
+    help="With --backend=file-queue, fail after this many seconds without any worker "
+    "claiming, running or finishing a fit (default: 600)",
 )
-def main(verbose, train, test, output_dir, preprocessor_path):
+@click.option(
+    "--dtype",
+    type=click.Choice(["float64", "float32"]),
+    default="float64",
+    help="Precision the preprocessing and models run in; float32 also writes "
+    "tables/dtype_parity.csv comparing the test scores with float64 (default: float64)",
+)
+@click.option("--profile", is_flag=True, help="Record the time and memory of each stage.")
+@click.option(
+    "--profile-stage",
+    multiple=True,
+    help="With --profile, also dump a cProfile of this stage (repeatable), ex: ridge_search",
+)
+@click.option(
+    "--profile-to",
+    type=str,
+    default="results/profile/",
+    help="Path to where profile reports should be written ex: results/profile/",
+)
+def main(
+    verbose,
+    train,
+    test,
+    output_dir,
+    preprocessor_path,
+    transform_cache,
+    search_strategy,
+    lasso_grid_size,
+    concurrent,
+    n_jobs,
+    max_memory_gb,
+    shared_data,
+    backend,
+    queue_dir,
+    local_workers,
+    queue_timeout,
+    dtype,
+    profile,
+    profile_stage,
+    profile_to,
+):
     """Runs the analysis of the English Score Tuning."""
+    if concurrent and search_strategy != "random":
+        raise click.UsageError("--concurrent only supports --search-strategy=random")
+    if shared_data and search_strategy != "random":
+        raise click.UsageError("--shared-data only supports --search-strategy=random")
+    backend = get_backend(backend, queue_dir, local_workers, n_jobs, queue_timeout)
+    profiler = StageProfiler(
+        "english_score_tuning",
+        output_dir=profile_to,
+        enabled=profile,
+        cprofile_stages=profile_stage,
+    )
+
+    # The q* items and wide categoricals are only read when the preprocessor uses them
+    preprocessor = get_preprocessor(preprocessor_path)
+    item_columns = uses_item_responses(preprocessor)
+    wide_categoricals = uses_wide_categoricals(preprocessor)
+    # In float32 mode the float64 preprocessor is kept for the parity report
+    float64_preprocessor = preprocessor
+    if dtype == "float32":
+        preprocessor = float32_preprocessor(preprocessor)
 
     if verbose:
         click.echo("Getting the train and test data...")
-    X_train, y_train = get_train_data(train)
-    X_test, y_test = get_test_data(test)
-
+    with profiler.stage("load") as stage:
+        X_train, y_train = get_train_data(train, item_columns, wide_categoricals, dtype)
+        X_test, y_test = get_test_data(test, item_columns, wide_categoricals, dtype)
+        stage["rows"] = len(X_train) + len(X_test)
     if verbose:
-        click.echo("Getting and fitting the preprocessor...")
-    preprocessor = get_preprocessor(preprocessor_path)
-    preprocessor.fit(X_train)
+        click.echo(
+            f"Train and test frames use "
+            f"{frame_memory_mb(X_train) + frame_memory_mb(X_test):.1f} MB"
+        )
 
-    # Ridge Regression
     if verbose:
-        click.echo("Running the Ridge Regression...")
-    ridge_pipe = make_pipeline(preprocessor, Ridge())
-
-    param_grid = {
-        "ridge__alpha": loguniform(1e-3, 1e3),
-    }
-
-    ridge_search = RandomizedSearchCV(
-        ridge_pipe,
-        param_distributions=param_grid,
-        n_jobs=-1,
-        n_iter=30,
-        cv=10,
-        return_train_score=True,
-        random_state=123,
-        scoring=SCORING,
-        refit="RMSE",
+        click.echo("Fitting the preprocessor...")
+    with profiler.stage("preprocessor_fit", rows=len(X_train)):
+        preprocessor.fit(X_train)
+
+    # A sparse design matrix gets solvers that keep it sparse
+    sparse_input = is_sparse_design(preprocessor)
+    if sparse_input and search_strategy == "path":
+        click.echo("Warning: the path search densifies the sparse design matrix of each fold.")
+    ridge, lasso = linear_models(sparse_input)
+
+    # One cache for both searches, so the Lasso fits reuse the Ridge fold fits
+    cache = None
+    if transform_cache:
+        cache = TransformCache(transform_cache)
+        click.get_current_context().call_on_close(cache.clear_counts)
+
+    store = ArtifactStore(output_dir + "models/")
+    ridge_pipe = build_pipeline(preprocessor, ridge, cache)
+    ridge_search = build_search(ridge_pipe, "ridge__alpha", search_strategy, n_jobs=n_jobs)
+    lasso_pipe = build_pipeline(preprocessor, lasso, cache)
+    lasso_search = build_search(
+        lasso_pipe,
+        "lasso__alpha",
+        search_strategy,
+        alpha_grid=lasso_grid_size,
+        n_jobs=n_jobs,
     )
 
-    ridge_top_models = fit_and_return_top_models(
-        ridge_search,
-        5,
-        X_train,
-        y_train,
-        [
-            "param_ridge__alpha",
-            "mean_train_R squared",
-            "mean_test_R squared",
-        ],
-        scoring="RMSE",
-    )
+    # The searches read the training data from memory-mapped files with --shared-data
+    search_X, search_y = X_train, y_train
+    if shared_data:
+        with profiler.stage("share_data", rows=len(X_train)):
+            search_X = SharedFrame.dump(X_train, shared_data)
+            search_y = SharedFrame.dump(y_train, shared_data)
+        # The files are removed on exit, even if a search fails
+        click.get_current_context().call_on_close(search_X.remove)
+        click.get_current_context().call_on_close(search_y.remove)
+        if verbose:
+            click.echo(
+                f"Shared {search_X.nbytes / 1024**2:.1f} MB of training data in {search_X.directory}"
+            )
+
+    if concurrent:
+        if verbose:
+            click.echo("Running the Ridge and Lasso Regressions concurrently...")
+        with profiler.stage("concurrent_search", rows=len(X_train)), backend:
+            fit_searches_concurrently(
+                [ridge_search, lasso_search],
+                search_X,
+                search_y,
+                n_jobs=n_jobs,
+                max_memory_gb=max_memory_gb,
+            )
+
+    # Ridge Regression
+    if verbose and not concurrent:
+        click.echo("Running the Ridge Regression...")
+    with profiler.stage("ridge_search", rows=len(X_train)):
+        ridge_top_models = get_top_models(
+            ridge_search, search_X, search_y, "param_ridge__alpha", backend, fitted=concurrent
+        )
 
     # Saves the top models to a csv file
     ridge_filename = output_dir + "tables/ridge_top_models.csv"
     if verbose:
         click.echo(f"Saving the top models to {ridge_filename}")
-    ridge_top_models.to_csv(ridge_filename)
-
-    # Saves the top models to a png file
-    ridge_image_filename = output_dir + "figures/ridge_top_models.png"
-    if verbose:
-        click.echo(f"Saving the top models (as png) to {ridge_image_filename}")
-    dfi.export(ridge_top_models, ridge_image_filename)
-
-    # Saves the best model to a pickle file
-    ridge_best_model = ridge_search.best_estimator_
-    ridge_best_model_filename = output_dir + "models/ridge_best_model.pkl"
+    with profiler.stage("ridge_export"):
+        ridge_top_models.to_csv(ridge_filename)
+
+        # Saves the top models to a png file
+        ridge_image_filename = output_dir + "figures/ridge_top_models.png"
+        if verbose:
+            click.echo(f"Saving the top models (as png) to {ridge_image_filename}")
+        dfi.export(ridge_top_models, ridge_image_filename)
+
+    # Stores the best model as a new artifact version
+    # Drop the cache reference so the stored model does not depend on it
+    ridge_search.best_estimator_.set_params(memory=None)
+    with profiler.stage("ridge_save"):
+        ridge_artifact = save_best_model(store, "ridge_best_model", ridge_search, train)
     if verbose:
-        click.echo(f"Saving the best model to {ridge_best_model_filename}")
-    with open(ridge_best_model_filename, "wb") as f:
-        pickle.dump(ridge_best_model, f)
+        click.echo(f"Stored the best model as {ridge_artifact.path}")
 
     # Lasso Regression
-    if verbose:
+    if verbose and not concurrent:
         click.echo("Running the Lasso Regression...")
-    lasso_dist = {"lasso__alpha": loguniform(1e-3, 1e3)}
-
-    lasso_pipe = make_pipeline(preprocessor, Lasso())
-    lasso_search = RandomizedSearchCV(
-        lasso_pipe,
-        param_distributions=lasso_dist,
-        n_jobs=-1,
-        n_iter=30,
-        cv=10,
-        return_train_score=True,
-        random_state=123,
-        scoring=SCORING,
-        refit="RMSE",
-    )
-
-    lasso_top_models = fit_and_return_top_models(
-        lasso_search,
-        5,
-        X_train,
-        y_train,
-        [
-            "param_lasso__alpha",
-            "mean_train_R squared",
-            "mean_test_R squared",
-        ],
-        scoring="RMSE",
-    )
+    with profiler.stage("lasso_search", rows=len(X_train)):
+        lasso_top_models = get_top_models(
+            lasso_search, search_X, search_y, "param_lasso__alpha", backend, fitted=concurrent
+        )
 
     # Saves the top models to a csv file
     lasso_filename = output_dir + "tables/lasso_top_models.csv"
     if verbose:
         click.echo(f"Saving the top models to {lasso_filename}")
-    lasso_top_models.to_csv(lasso_filename)
-
-    # Saves the top models to a png file
-    lasso_image_filename = output_dir + "figures/lasso_top_models.png"
+    with profiler.stage("lasso_export"):
+        lasso_top_models.to_csv(lasso_filename)
+
+        # Saves the top models to a png file
+        lasso_image_filename = output_dir + "figures/lasso_top_models.png"
+        if verbose:
+            click.echo(f"Saving the top models (as png) to {lasso_image_filename}")
+        dfi.export(lasso_top_models, lasso_image_filename)
+
+    # Stores the best model as a new artifact version
+    # Drop the cache reference so the stored model does not depend on it
+    lasso_search.best_estimator_.set_params(memory=None)
+    with profiler.stage("lasso_save"):
+        lasso_artifact = save_best_model(store, "lasso_best_model", lasso_search, train)
     if verbose:
-        click.echo(f"Saving the top models (as png) to {lasso_image_filename}")
-    dfi.export(lasso_top_models, lasso_image_filename)
-
-    # Saves the best model to a pickle file
-    lasso_best_model = lasso_search.best_estimator_
-    lasso_best_model_filename = output_dir + "models/lasso_best_model.pkl"
-    if verbose:
-        click.echo(f"Saving the best model to {lasso_best_model_filename}")
-    with open(lasso_best_model_filename, "wb") as f:
-        pickle.dump(lasso_best_model, f)
+        click.echo(f"Stored the best model as {lasso_artifact.path}")
+
+    if dtype == "float32":
+        if verbose:
+            click.echo("Comparing the float32 models with float64...")
+        with profiler.stage("precision_parity", rows=len(X_train)):
+            parity = precision_parity_table(
+                [("ridge", ridge_search), ("lasso", lasso_search)],
+                float64_preprocessor,
+                X_train,
+                y_train,
+                X_test,
+                y_test,
+            )
+            parity.to_csv(output_dir + "tables/dtype_parity.csv")
+        if verbose:
+            click.echo(parity.to_string())
+
+    if cache is not None and verbose:
+        counts = cache.counts()
+        click.echo(
+            f"Preprocessing cache hit rate: {cache.hit_rate():.1%} of "
+            f"{counts['hits'] + counts['misses']} fits"
+        )
+
+    if profiler.write() and verbose:
+        click.echo(f"Wrote profile report to {profile_to}")
 
     if verbose:
         click.echo("Done!")
 
 
-def get_train_data(train):
-    """Returns the training data as a tuple of X_train and y_train"""
+def get_train_data(train, item_columns=False, wide_categoricals=False, dtype="float64"):
+    """Returns the training data as a tuple of X_train and y_train (of `dtype`), with the optional columns asked for"""
 
-    train_df = pd.read_csv(train, sep=",", on_bad_lines="skip", low_memory=False)
-    X_train = train_df.drop(columns="correct")
-    y_train = train_df["correct"]
+    train_df = load_survey_data(train, columns=model_columns(item_columns, wide_categoricals))
+    X_train = train_df.drop(columns=TARGET)
+    y_train = train_df[TARGET].astype(dtype)
 
     return X_train, y_train
 
 
-def get_test_data(test):
-    """Returns the test data as a tuple of X_test and y_test"""
+def get_test_data(test, item_columns=False, wide_categoricals=False, dtype="float64"):
+    """Returns the test data as a tuple of X_test and y_test (of `dtype`), with the optional columns asked for"""
 
-    test_df = pd.read_csv(test, sep=",", on_bad_lines="skip", low_memory=False)
-    X_test = test_df.drop(columns="correct")
-    y_test = test_df["correct"]
+    test_df = load_survey_data(test, columns=model_columns(item_columns, wide_categoricals))
+    X_test = test_df.drop(columns=TARGET)
+    y_test = test_df[TARGET].astype(dtype)
 
     return X_test, y_test
 
 
+def build_pipeline(preprocessor, model, cache=None):
+    """Returns a pipeline of the preprocessor and model, cached if a TransformCache is given"""
+    if cache is not None:
+        return make_cached_pipeline(preprocessor, model, cache)
+    return make_pipeline(preprocessor, model)
+
+
+def build_search(pipe, param_name, search_strategy, alpha_grid=None, n_jobs=-1):
+    """Returns the search object over `param_name` for the chosen strategy"""
+    param_distributions = {param_name: loguniform(1e-3, 1e3)}
+    search_params = dict(
+        n_jobs=n_jobs,
+        n_iter=30,
+        cv=10,
+        return_train_score=True,
+        random_state=123,
+        scoring=SCORING,
+        refit="RMSE",
+    )
+    if search_strategy == "path" and param_name == "ridge__alpha":
+        return RidgePathSearchCV(pipe, param_distributions, **search_params)
+    if search_strategy == "path" and param_name == "lasso__alpha":
+        return LassoPathSearchCV(
+            pipe, param_distributions, alpha_grid=alpha_grid, **search_params
+        )
+    if search_strategy == "racing":
+        return RacingSearchCV(pipe, param_distributions, **search_params)
+    return RandomizedSearchCV(
+        pipe, param_distributions=param_distributions, **search_params
+    )
+
+
+def get_backend(name, queue_dir, local_workers, n_jobs, queue_timeout=600):
+    """Returns the execution backend of the searches, starting the local queue workers asked for"""
+    if name != QUEUE_BACKEND:
+        if queue_dir or local_workers:
+            raise click.UsageError("--queue-dir and --local-workers need --backend=file-queue")
+        try:
+            return ExecutionBackend(name)
+        except ValueError as e:
+            raise click.UsageError(str(e))
+    if not queue_dir:
+        raise click.UsageError("--backend=file-queue needs --queue-dir")
+    if local_workers:
+        # The workers are stopped when the command exits, even if a search fails
+        click.get_current_context().with_resource(LocalQueueCluster(queue_dir, local_workers))
+    n_workers = local_workers or (n_jobs if n_jobs > 0 else None)
+    return ExecutionBackend(
+        name, queue_dir=queue_dir, n_workers=n_workers, timeout=queue_timeout
+    )
+
+
+def get_top_models(search, X_train, y_train, param_column, backend=None, fitted=False):
+    """Returns the top 5 models of the search, fitting it first on `backend` unless already fitted"""
+    columns = [param_column, "mean_train_R squared", "mean_test_R squared"]
+    if isinstance(X_train, SharedFrame) and not fitted:
+        # Only the shared pool sends the workers handles to the shared data
+        with backend or nullcontext():
+            fit_searches_concurrently([search], X_train, y_train, n_jobs=search.n_jobs)
+        fitted = True
+    if fitted:
+        return top_models_table(search, 5, columns, scoring="RMSE")
+    return fit_and_return_top_models(
+        search, 5, X_train, y_train, columns, scoring="RMSE", backend=backend
+    )
+
+
+def precision_parity_table(searches, float64_preprocessor, X_train, y_train, X_test, y_test):
+    """Returns the test scores of the best float32 model of each search next to the same model fitted in float64"""
+    tables = {}
+    for name, search in searches:
+        float64_pipe = make_pipeline(
+            clone(float64_preprocessor), clone(search.best_estimator_[-1])
+        ).fit(X_train, y_train.astype("float64"))
+        tables[name] = precision_parity(search.best_estimator_, float64_pipe, X_test, y_test)
+    return pd.concat(tables)
+
+
 def get_preprocessor(path):
-    """Returns the preprocessor object from the path (pickle file)"""
-    with open(path, "rb") as f:
-        preprocessor = pickle.load(f)
-
-    return preprocessor
-
-
-def map_to_other(df):
-    """helper function to map categories to others, used in the preprocessor"""
-    categories_list = [
-        "Graduate Degree",
-        "Some Graduate School",
-        "Undergraduate Degree (3-5 years higher ed)",
-        "Some Undergrad (higher ed)",
-        "High School Degree (12-13 years)",
-        "Haven't Finished High School (less than 13 years ed)",
-        "Didn't Finish High School (less than 13 years ed)",
-        "Others",
-    ]
-
-    return (
-        df["education"].apply(lambda x: x if x in categories_list else "Others")
-    ).to_frame()
+    """Returns the preprocessor object from the path (artifact directory or pickle file)"""
+    return load_model(path, mmap_mode=None)
+
+
+def save_best_model(store, name, search, train):
+    """Stores the refitted best estimator of the search with its CV scores"""
+    best = search.best_index_
+    metrics = {
+        f"cv_{metric}": float(search.cv_results_[f"mean_test_{metric}"][best])
+        for metric in SCORING
+    }
+    return store.save(
+        name,
+        search.best_estimator_,
+        data_path=train,
+        metrics=metrics,
+    )
 
 
 if __name__ == "__main__":
@@ -0,0 +1,58 @@
+import sys
+
+import click
+
+sys.path.append("src")
+from helper.execution_backend import run_worker
+
+
+@click.command()
+@click.option("--verbose", "-v", is_flag=True, help="Will print verbose messages.")
+@click.option(
+    "--queue-dir",
+    required=True,
+    help="The work queue directory passed to the tuning with --queue-dir, ex: /shared/queue/",
+)
+@click.option(
+    "--poll-interval",
+    type=float,
+    default=0.05,
+    help="Seconds between checks for new tasks (default: 0.05)",
+)
+@click.option(
+    "--max-idle",
+    type=float,
+    default=None,
+    help="Exit after this many seconds without a task (default: run until the queue is stopped)",
+)
+@click.option(
+    "--heartbeat-interval",
+    type=float,
+    default=5.0,
+    help="Seconds between lease renewals of the running task, so the tuning does "
+    "not hand it to another worker (default: 5)",
+)
+def main(verbose, queue_dir, poll_interval, max_idle, heartbeat_interval):
+    """
+    Runs the CV fits that english_score_tuning.py queues with --backend=file-queue.
+
+    Start one worker per core on every machine sharing the queue directory,
+    from the root of the repository so the tasks find the helper modules.
+    Args:
+        verbose (str): flag to print verbose messages.
+        queue_dir (str): Path to the work queue directory.
+        poll_interval (float): Seconds between checks for new tasks.
+        max_idle (float): Seconds without a task before exiting, or None.
+        heartbeat_interval (float): Seconds between lease renewals of the running task.
+    Returns:
+        None
+    """
+    if verbose:
+        click.echo(f"Serving the work queue in {queue_dir}...")
+    n_tasks = run_worker(queue_dir, poll_interval, max_idle, heartbeat_interval)
+    if verbose:
+        click.echo(f"Done! Ran {n_tasks} tasks.")
+
+
+if __name__ == "__main__":
+    main()
@@ -17,18 +17,16 @@ from sklearn.impute import SimpleImputer
 from sklearn.compose import make_column_transformer
 from sklearn.pipeline import Pipeline, make_pipeline
 
-from correlation_matrix import pearson_correlation_matrix
-from plot_histogram_with_exclusions import plot_histogram_with_exclusions
+sys.path.append("src")
+from helper.correlation_matrix import pearson_correlation_matrix
+from helper.plot_histogram_with_exclusions import plot_histogram_with_exclusions
+# The preprocessor's education step; `helper` must be importable to load it
+from helper.education_bucketer import EducationBucketer
+from helper.artifact_store import load_model
 
 @click.command()
 @click.option('--training-data', type=str, help="Path to training data ex: data/raw/")
-@click.option('--pickle-file', type=str, help="Path to where preprocessor should be written ex: results/models/preprocessor" )
-
-def map_to_other(df, categories_list):
-    return (
-        df["education"].apply(
-            lambda x: x if x in categories_list else "Others")
-    ).to_frame()
+@click.option('--pickle-file', type=str, help="Path to the preprocessor artifact or pickle ex: results/models/preprocessor/" )
 
 def main(training_data, pickle_file):
     train_df = pd.read_csv(
@@ -41,5 +39,4 @@ def main(training_data, pickle_file):
     education_counts_greater_than_one = education_counts[education_counts > 100]
 
     categories_list = education_counts_greater_than_one.index.tolist()
-    with open(pickle_file, 'rb') as file:
-        preprocessor = pickle.load(file)
\ No newline at end of file
+    preprocessor = load_model(pickle_file)
\ No newline at end of file
@@ -0,0 +1,154 @@
+import json
+import os
+import pickle
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+import numpy as np
+import pandas as pd
+from sklearn.linear_model import Ridge
+from sklearn.pipeline import make_pipeline
+from sklearn.preprocessing import StandardScaler
+
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+
+from src.helper.artifact_store import (
+    ArtifactStore,
+    LATEST_NAME,
+    load_model,
+    open_artifact,
+)
+from src.helper.model_fingerprint import FingerprintMismatch, verify_model_fingerprint
+
+
+class TestArtifactStore(unittest.TestCase):
+    def setUp(self):
+        # A store in a temporary directory, a training CSV and two fitted models
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.store = ArtifactStore(os.path.join(self.tmp_dir.name, "models"))
+        self.train_path = os.path.join(self.tmp_dir.name, "train_data.csv")
+        rng = np.random.default_rng(0)
+        self.X = pd.DataFrame(rng.normal(size=(50, 3)), columns=["a", "b", "c"])
+        self.y = self.X["a"] * 2 + rng.normal(size=50)
+        pd.concat([self.X, self.y.rename("correct")], axis=1).to_csv(self.train_path, index=False)
+        self.model = make_pipeline(StandardScaler(), Ridge(alpha=1.0)).fit(self.X, self.y)
+        self.other = make_pipeline(StandardScaler(), Ridge(alpha=10.0)).fit(self.X, self.y)
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_save_and_load(self):
+        print("Running unit tests for artifact_store.py")
+
+        # A stored model loads back with the same predictions and a full manifest
+        artifact = self.store.save(
+            "ridge_best_model", self.model, data_path=self.train_path, metrics={"cv_RMSE": -1.0}
+        )
+        loaded = self.store.load("ridge_best_model")
+        np.testing.assert_array_equal(loaded.predict(self.X), self.model.predict(self.X))
+        manifest = artifact.manifest
+        self.assertEqual(manifest["name"], "ridge_best_model")
+        self.assertEqual(manifest["params"]["ridge__alpha"], 1.0)
+        self.assertEqual(manifest["metrics"], {"cv_RMSE": -1.0})
+        self.assertEqual(len(manifest["data_sha256"]), 64)
+        self.assertIn("sklearn_version", manifest)
+
+    def test_content_addressed_versions(self):
+        # Identical objects share a version; a new model becomes the latest
+        first = self.store.save("ridge_best_model", self.model)
+        again = self.store.save("ridge_best_model", pickle.loads(pickle.dumps(self.model)))
+        self.assertEqual(first.version, again.version)
+        newer = self.store.save("ridge_best_model", self.other)
+        self.assertNotEqual(first.version, newer.version)
+        self.assertEqual(len(self.store.versions("ridge_best_model")), 2)
+        self.assertEqual(self.store.get("ridge_best_model").version, newer.version)
+        old = self.store.load("ridge_best_model", version=first.version)
+        self.assertEqual(old[-1].alpha, 1.0)
+
+    def test_same_model_new_data(self):
+        # An identical model fitted on other data gets a version recording that data
+        first = self.store.save(
+            "ridge_best_model", self.model, data_path=self.train_path, metrics={"cv_RMSE": -1.0}
+        )
+        other_path = os.path.join(self.tmp_dir.name, "other_train_data.csv")
+        with open(self.train_path) as f, open(other_path, "w") as out:
+            out.write(f.read() + "0,0,0,0\n")
+        second = self.store.save(
+            "ridge_best_model", self.model, data_path=other_path, metrics={"cv_RMSE": -2.0}
+        )
+        self.assertNotEqual(first.version, second.version)
+        self.assertEqual(second.manifest["data_path"], other_path)
+        self.assertEqual(second.manifest["metrics"], {"cv_RMSE": -2.0})
+        name_dir = os.path.join(self.store.root, "ridge_best_model")
+        verify_model_fingerprint(name_dir, other_path)
+        with self.assertRaises(FingerprintMismatch):
+            verify_model_fingerprint(name_dir, self.train_path)
+
+    def test_permissions(self):
+        # Version directories get the umask permissions, like the files in them
+        umask = os.umask(0o022)
+        try:
+            artifact = self.store.save("ridge_best_model", self.model)
+        finally:
+            os.umask(umask)
+        self.assertEqual(os.stat(artifact.path).st_mode & 0o777, 0o755)
+        self.assertEqual(os.stat(artifact.object_path).st_mode & 0o777, 0o644)
+
+    def test_no_partial_writes(self):
+        # A failed save leaves neither a version directory nor a LATEST pointer
+        with mock.patch("src.helper.artifact_store.joblib.dump", side_effect=OSError("disk full")):
+            with self.assertRaises(OSError):
+                self.store.save("broken", self.model)
+        name_dir = os.path.join(self.store.root, "broken")
+        self.assertEqual(os.listdir(name_dir), [])
+        self.assertEqual(self.store.versions("broken"), [])
+
+    def test_lazy_memory_mapped_load(self):
+        # The manifest is read without loading the object; arrays are memory-mapped
+        artifact = self.store.save("scaler", StandardScaler().fit(np.arange(20.0).reshape(10, 2)))
+        reopened = open_artifact(os.path.join(self.store.root, "scaler"))
+        self.assertEqual(reopened.version, artifact.version)
+        self.assertIsNone(reopened._object)
+        self.assertIsInstance(reopened.load().mean_, np.memmap)
+        self.assertIs(reopened.load(), reopened.load())
+
+    def test_compressed(self):
+        # Compressed artifacts load fully into memory
+        artifact = self.store.save("ridge_best_model", self.model, compress=3)
+        self.assertEqual(artifact.manifest["compress"], 3)
+        loaded = load_model(artifact.path)
+        self.assertNotIsInstance(loaded[0].mean_, np.memmap)
+
+    def test_legacy_pickle(self):
+        # Plain pickle files still load
+        path = os.path.join(self.tmp_dir.name, "ridge_best_model.pkl")
+        with open(path, "wb") as f:
+            pickle.dump(self.model, f)
+        np.testing.assert_array_equal(load_model(path).predict(self.X), self.model.predict(self.X))
+
+    def test_fingerprint(self):
+        # The manifest is the fingerprint of the artifact and its training data
+        artifact = self.store.save("ridge_best_model", self.model, data_path=self.train_path)
+        name_dir = os.path.join(self.store.root, "ridge_best_model")
+        manifest = verify_model_fingerprint(name_dir, self.train_path)
+        self.assertEqual(manifest["version"], artifact.version)
+        with open(self.train_path, "a") as f:
+            f.write("0,0,0,0\n")
+        with self.assertRaises(FingerprintMismatch):
+            verify_model_fingerprint(name_dir, self.train_path)
+        with open(os.path.join(name_dir, LATEST_NAME)) as f:
+            self.assertEqual(f.read(), artifact.version)
+
+    def test_missing_artifact(self):
+        # Unknown versions are reported
+        self.store.save("ridge_best_model", self.model)
+        with self.assertRaises(FileNotFoundError):
+            self.store.get("ridge_best_model", version="0" * 32)
+        with open(os.path.join(self.store.get("ridge_best_model").path, "manifest.json")) as f:
+            self.assertEqual(json.load(f)["format"], "artifact/1")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,225 @@
+import io
+import json
+import os
+import sys
+import threading
+import unittest
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+from sklearn.compose import make_column_transformer
+from sklearn.impute import SimpleImputer
+from sklearn.linear_model import Ridge
+from sklearn.pipeline import make_pipeline
+from sklearn.preprocessing import OneHotEncoder
+
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+
+from src.helper.batch_scoring import (
+    FEATURE_COLUMNS,
+    MicroBatcher,
+    ScoringStats,
+    iter_record_batches,
+    make_scoring_server,
+    records_to_frame,
+    score_batch,
+)
+
+
+class CountingModel:
+    """Wraps a pipeline and records the size of every predict call"""
+
+    def __init__(self, model):
+        self.model = model
+        self.calls = []
+
+    def predict(self, X):
+        self.calls.append(len(X))
+        return self.model.predict(X)
+
+
+class NegativeAgeModel(CountingModel):
+    """Fails to predict any frame with a negative age"""
+
+    def predict(self, X):
+        self.calls.append(len(X))
+        if (X["age"] < 0).any():
+            raise ValueError("negative age")
+        return self.model.predict(X)
+
+
+class BrokenModel:
+    """Fails every predict call"""
+
+    def predict(self, X):
+        raise RuntimeError("model unavailable")
+
+
+def make_records(n):
+    """Raw survey records with the model features"""
+    rng = np.random.default_rng(0)
+    return [
+        {
+            "id": i,
+            "age": int(rng.integers(10, 80)),
+            "Eng_start": int(rng.integers(0, 20)),
+            "speaker_cat": str(rng.choice(["monoeng", "bieng"])),
+            "nat_Eng": int(rng.integers(0, 2)),
+        }
+        for i in range(n)
+    ]
+
+
+class TestBatchScoring(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        """
+        Fit a small pipeline on raw records
+        """
+        cls.records = make_records(60)
+        X = records_to_frame(cls.records)
+        y = X["age"].to_numpy() * 0.01 + X["nat_Eng"].to_numpy()
+        preprocessor = make_column_transformer(
+            (SimpleImputer(strategy="median"), ["age", "Eng_start", "nat_Eng"]),
+            (
+                make_pipeline(
+                    SimpleImputer(strategy="constant", fill_value="little"),
+                    OneHotEncoder(handle_unknown="ignore"),
+                ),
+                ["speaker_cat"],
+            ),
+        )
+        cls.model = make_pipeline(preprocessor, Ridge()).fit(X, y)
+        cls.expected = cls.model.predict(X)
+
+    def test_records_to_frame(self):
+        print("Running unit tests for batch_scoring.py")
+
+        # Missing features are added as NA and extra fields are dropped
+        frame = records_to_frame([{"age": 30, "id": 1, "comment": "hi"}])
+        self.assertEqual(list(frame.columns), FEATURE_COLUMNS)
+        self.assertEqual(frame["age"].dtype, np.float32)
+        self.assertTrue(frame["Eng_start"].isna().all())
+
+    def test_ndjson_batches(self):
+        # NDJSON lines are grouped into batches of at most batch_size records
+        stream = io.StringIO("\n".join(json.dumps(r) for r in self.records[:25]) + "\n\n")
+        batches = list(iter_record_batches(stream, "ndjson", batch_size=10))
+        self.assertEqual([len(b) for b in batches], [10, 10, 5])
+        self.assertEqual(batches[2]["id"].tolist(), [20, 21, 22, 23, 24])
+
+    def test_csv_batches(self):
+        # CSV input is read in chunks of batch_size rows
+        stream = io.StringIO(pd.DataFrame(self.records[:25]).to_csv(index=False))
+        batches = list(iter_record_batches(stream, "csv", batch_size=10))
+        self.assertEqual([len(b) for b in batches], [10, 10, 5])
+
+    def test_unknown_format(self):
+        # Only ndjson and csv are supported
+        with self.assertRaises(ValueError):
+            list(iter_record_batches(io.StringIO(""), "xml"))
+
+    def test_score_batch_stats(self):
+        # Scoring records the batch latency and throughput
+        stats = ScoringStats()
+        predictions, seconds = score_batch(self.model, pd.DataFrame(self.records), stats)
+        np.testing.assert_allclose(predictions, self.expected)
+        summary = stats.as_dict()
+        self.assertEqual(summary["batches"], 1)
+        self.assertEqual(summary["rows"], 60)
+        self.assertAlmostEqual(summary["mean_latency_s"], seconds)
+        self.assertGreater(summary["rows_per_s"], 0)
+
+    def test_micro_batching(self):
+        # Concurrent requests are coalesced into fewer predict calls
+        model = CountingModel(self.model)
+        with MicroBatcher(model, max_batch_size=64, max_wait_ms=200) as batcher:
+            with ThreadPoolExecutor(max_workers=20) as pool:
+                futures = [
+                    pool.submit(lambda i=i: batcher.submit(self.records[i * 3 : i * 3 + 3]).result())
+                    for i in range(20)
+                ]
+                results = [future.result() for future in futures]
+        np.testing.assert_allclose(np.concatenate(results), self.expected)
+        self.assertEqual(sum(model.calls), 60)
+        self.assertLess(len(model.calls), 20)
+        self.assertTrue(all(size <= 64 for size in model.calls))
+
+    def test_micro_batching_errors(self):
+        # Records that cannot be converted fail on submit without being queued
+        model = CountingModel(self.model)
+        with MicroBatcher(model) as batcher:
+            future = batcher.submit([{"age": "not a number"}])
+            self.assertTrue(future.done())
+            with self.assertRaises(ValueError):
+                future.result()
+            self.assertEqual(batcher.submit([]).result().shape, (0,))
+        self.assertEqual(model.calls, [])
+
+    def test_bad_request_in_batch(self):
+        # A request failing in a batch does not fail the others batched with it
+        model = NegativeAgeModel(self.model)
+        bad = dict(self.records[0], age=-5)
+        with MicroBatcher(model, max_wait_ms=500) as batcher:
+            good_future = batcher.submit(self.records[:3])
+            bad_future = batcher.submit([bad])
+            np.testing.assert_allclose(good_future.result(), self.expected[:3])
+            with self.assertRaisesRegex(ValueError, "negative age"):
+                bad_future.result()
+        self.assertEqual(model.calls, [4, 3, 1])
+
+    def test_http_server(self):
+        # The server scores single records and lists, and reports its stats
+        with MicroBatcher(self.model) as batcher:
+            server = make_scoring_server(batcher, port=0)
+            thread = threading.Thread(target=server.serve_forever, daemon=True)
+            thread.start()
+            url = f"http://127.0.0.1:{server.server_port}"
+            try:
+                one = self.post(url + "/predict", self.records[0])
+                many = self.post(url + "/predict", self.records[:5])
+                with urllib.request.urlopen(url + "/stats") as response:
+                    stats = json.load(response)
+                with self.assertRaises(urllib.error.HTTPError) as error:
+                    self.post(url + "/predict", [{"age": "not a number"}])
+                self.assertEqual(error.exception.code, 400)
+            finally:
+                server.shutdown()
+                server.server_close()
+        np.testing.assert_allclose(one["predictions"], self.expected[:1])
+        np.testing.assert_allclose(many["predictions"], self.expected[:5])
+        self.assertEqual(stats["rows"], 6)
+
+    def test_http_error_status(self):
+        # Invalid records are a 400, a failing model a 500
+        with MicroBatcher(BrokenModel()) as batcher:
+            server = make_scoring_server(batcher, port=0)
+            threading.Thread(target=server.serve_forever, daemon=True).start()
+            url = f"http://127.0.0.1:{server.server_port}/predict"
+            codes = []
+            try:
+                for payload in ([1, 2], [{"age": "not a number"}], self.records[:2]):
+                    with self.assertRaises(urllib.error.HTTPError) as error:
+                        self.post(url, payload)
+                    codes.append(error.exception.code)
+            finally:
+                server.shutdown()
+                server.server_close()
+        self.assertEqual(codes, [400, 400, 500])
+
+    @staticmethod
+    def post(url, payload):
+        request = urllib.request.Request(
+            url,
+            data=json.dumps(payload).encode(),
+            headers={"Content-Type": "application/json"},
+        )
+        with urllib.request.urlopen(request) as response:
+            return json.load(response)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,90 @@
+import os
+import sys
+import unittest
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+
+from src.helper.bin_counts import BinCounts
+
+
+class TestBinCounts(unittest.TestCase):
+    def setUp(self):
+        # Integer, float and constant columns with missing values
+        rng = np.random.default_rng(0)
+        n = 5000
+        self.df = pd.DataFrame(
+            {
+                "age": rng.integers(10, 80, n).astype(float),
+                "share": rng.random(n),
+                "constant": np.full(n, 3.0),
+                "label": rng.choice(["a", "b"], n),
+            }
+        )
+        self.df.loc[rng.choice(n, 200, replace=False), "share"] = np.nan
+
+    def test_matches_numpy_histogram(self):
+        print("Running unit tests for bin_counts.py")
+
+        # The 1D counts and edges are those of numpy.histogram on the non-missing values
+        counts = BinCounts.from_frame(self.df, bins=30)
+        self.assertEqual(counts.columns, ["age", "share", "constant"])
+        for column in counts.columns:
+            expected, expected_edges = np.histogram(self.df[column].dropna(), bins=30)
+            hist, edges = counts.histogram(column)
+            np.testing.assert_array_equal(hist, expected)
+            np.testing.assert_allclose(edges, expected_edges)
+
+    def test_matches_numpy_histogram2d(self):
+        # The 2D counts are those of numpy.histogram2d, whichever order the pair is asked in
+        counts = BinCounts.from_frame(self.df, ["age", "share"], bins=50, bins_2d=20, pairs=True)
+        both = self.df[["age", "share"]].dropna()
+        expected, x_edges, y_edges = np.histogram2d(
+            both["age"], both["share"], bins=20,
+            range=[self.df["age"].agg(["min", "max"]), self.df["share"].agg(["min", "max"])],
+        )
+        grid, x, y = counts.histogram2d("age", "share")
+        np.testing.assert_array_equal(grid, expected)
+        np.testing.assert_allclose(x, x_edges)
+        np.testing.assert_array_equal(counts.histogram2d("share", "age")[0], expected.T)
+        with self.assertRaises(KeyError):
+            BinCounts.from_frame(self.df, ["age", "share"]).histogram2d("age", "share")
+
+    def test_chunks_merge(self):
+        # Counting in chunks or merging partial counts gives the counts of the whole frame
+        whole = BinCounts.from_frame(self.df, bins=25, pairs=True)
+        chunked = BinCounts.from_frame(self.df, bins=25, pairs=True, chunksize=777)
+        ranges = {column: (self.df[column].min(), self.df[column].max()) for column in whole.columns}
+        first = BinCounts(ranges, bins=25, pairs=True).update(self.df.iloc[:1000])
+        second = BinCounts(ranges, bins=25, pairs=True).update(self.df.iloc[1000:])
+        merged = first.merge(second)
+        for counts in (chunked, merged):
+            np.testing.assert_array_equal(counts.counts, whole.counts)
+            np.testing.assert_array_equal(counts.counts_2d, whole.counts_2d)
+        with self.assertRaises(ValueError):
+            first.merge(BinCounts(ranges, bins=10))
+
+    def test_nullable_integers(self):
+        # Nullable Int8 columns with NA, as loaded for the q* items, count like floats
+        items = pd.Series([0, 1, pd.NA, 1, 1, pd.NA], dtype="Int8")
+        counts = BinCounts.from_frame(pd.DataFrame({"q1_1": items}), bins=2, pairs=[])
+        hist, _ = counts.histogram("q1_1")
+        np.testing.assert_array_equal(hist, [1, 3])
+
+    def test_out_of_range(self):
+        # Values outside the given range are not counted
+        counts = BinCounts({"age": (20, 30)}, bins=10).update(self.df)
+        self.assertEqual(counts.counts.sum(), self.df["age"].between(20, 30).sum())
+
+    def test_validation(self):
+        # Non-DataFrames and pairs of unknown columns are rejected
+        with self.assertRaises(TypeError):
+            BinCounts.from_frame("not a dataframe")
+        with self.assertRaises(ValueError):
+            BinCounts({"age": (0, 1)}, pairs=[("age", "share")])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,120 @@
+import os
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+
+from src.helper.columnar_cache import (
+    write_parquet_cache,
+    read_parquet_cache,
+    cache_path_for,
+)
+from src.helper.load_survey_data import load_survey_data, MODEL_COLUMNS
+
+
+class TestColumnarCache(unittest.TestCase):
+    def setUp(self):
+        # Create a small survey-shaped CSV whose text column is empty in the first rows
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp_dir.name, "train_data.csv")
+        self.df = pd.DataFrame(
+            {
+                "id": [1.0, 2.0, 3.0, 4.0, 5.0],
+                "age": [31, 30, np.nan, 20, 44],
+                "education": ["Graduate Degree", None, "Others", "Graduate Degree", None],
+                "UK_region": [None, None, None, "London", None],
+                "q1_1": [1, 0, 1, 1, np.nan],
+                "correct": [0.9, 0.8, 1.0, 0.95, 0.7],
+            }
+        )
+        self.df.to_csv(self.path, index=False)
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_round_trip(self):
+        print("Running unit tests for columnar_cache.py")
+
+        # The cache holds the same data and dtypes as the CSV
+        write_parquet_cache(self.path, chunksize=2)
+        cached = read_parquet_cache(self.path)
+        expected = load_survey_data(self.path, use_cache=False)
+        pd.testing.assert_frame_equal(expected, cached, check_categorical=False)
+        self.assertEqual("London", cached["UK_region"].iloc[3])
+        self.assertEqual("category", cached["education"].dtype.name)
+        self.assertEqual("Int8", cached["q1_1"].dtype.name)
+
+    def test_column_selection(self):
+        # Only the requested columns are read from the cache
+        write_parquet_cache(self.path)
+        cached = read_parquet_cache(self.path, columns=MODEL_COLUMNS)
+        self.assertEqual(["age", "education", "correct"], cached.columns.tolist())
+
+    def test_stale_cache_is_ignored(self):
+        # Changing the CSV invalidates the cache
+        write_parquet_cache(self.path)
+        self.df.iloc[:2].to_csv(self.path, index=False)
+        self.assertIsNone(read_parquet_cache(self.path))
+        self.assertEqual(2, len(load_survey_data(self.path)))
+
+    def test_unchanged_csv_is_not_read(self):
+        # A cached read compares the size and modification time, not the content
+        write_parquet_cache(self.path)
+        with mock.patch("src.helper.columnar_cache.file_sha256", side_effect=AssertionError):
+            self.assertEqual(5, len(read_parquet_cache(self.path)))
+
+        # Same content with a new modification time is hashed and still valid
+        stat = os.stat(self.path)
+        os.utime(self.path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+        self.assertEqual(5, len(read_parquet_cache(self.path)))
+
+        # An edit that keeps the size and modification time is only seen with verify
+        with open(self.path, "r+b") as f:
+            f.seek(-4, os.SEEK_END)
+            f.write(b"0.6\n")
+        os.utime(self.path, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+        self.assertIsNotNone(read_parquet_cache(self.path))
+        self.assertIsNone(read_parquet_cache(self.path, verify=True))
+
+    def test_inferred_dtypes(self):
+        # Columns without a survey dtype come back as pandas infers them from the CSV,
+        # even when a later chunk adds NAs, fractions or text
+        pd.DataFrame(
+            {
+                "attempts": [1, 2, 3, 4, 5],
+                "late_na": [1, 2, 3, 4, np.nan],
+                "late_fraction": [1, 2, 3, 4, 4.5],
+                "late_text": [np.nan, np.nan, np.nan, "pilot", np.nan],
+                "consent": [True, False, True, True, False],
+                "note": ["a", "b", np.nan, "c", "d"],
+            }
+        ).to_csv(self.path, index=False)
+        write_parquet_cache(self.path, chunksize=2)
+        cached = read_parquet_cache(self.path)
+        expected = load_survey_data(self.path, use_cache=False)
+        pd.testing.assert_frame_equal(expected, cached)
+        self.assertEqual(
+            ["int64", "float64", "float64", "object", "bool", "object"],
+            [dtype.name for dtype in cached.dtypes],
+        )
+
+    def test_missing_cache(self):
+        # Without a cache the loader falls back to the CSV
+        self.assertFalse(os.path.exists(cache_path_for(self.path)))
+        self.assertIsNone(read_parquet_cache(self.path))
+        self.assertEqual(5, len(load_survey_data(self.path)))
+
+    def test_chunked_cache_read(self):
+        # The cache can also be streamed in chunks
+        write_parquet_cache(self.path)
+        chunks = list(load_survey_data(self.path, chunksize=2))
+        self.assertEqual([2, 2, 1], [len(chunk) for chunk in chunks])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,221 @@
+import io
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+
+import numpy as np
+import pandas as pd
+from sklearn.compose import make_column_transformer
+from sklearn.impute import SimpleImputer
+from sklearn.linear_model import Lasso, Ridge
+from sklearn.pipeline import make_pipeline
+from sklearn.preprocessing import (
+    MinMaxScaler,
+    OneHotEncoder,
+    OrdinalEncoder,
+    StandardScaler,
+)
+
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+
+from src.helper.compile_linear_scorer import compile_linear_pipeline
+from src.helper.education_bucketer import (
+    EDUCATION_LEVELS,
+    EducationBucketer,
+    education_codes,
+)
+from src.helper.linear_scorer import LinearScorer, iter_records
+
+
+def make_survey_frame(n, seed):
+    """A frame with the model columns, including missing and unseen values"""
+    rng = np.random.default_rng(seed)
+
+    def with_missing(values, fraction=0.1):
+        values = values.astype(object) if values.dtype.kind in "OU" else values.astype(float)
+        values[rng.random(n) < fraction] = np.nan
+        return values
+
+    return pd.DataFrame(
+        {
+            "age": with_missing(rng.integers(7, 90, n)),
+            "Eng_start": with_missing(rng.integers(0, 30, n)),
+            "Eng_country_yrs": with_missing(rng.random(n) * 40),
+            "Lived_Eng_per": with_missing(rng.random(n)),
+            "Eng_little": with_missing(rng.choice(["little", "lot", "none"], n)),
+            "speaker_cat": rng.choice(["monoeng", "bieng", "noneng"], n),
+            "psychiatric": rng.integers(0, 2, n).astype(float),
+            "house_Eng": with_missing(rng.integers(0, 2, n)),
+            "nat_Eng": rng.integers(0, 2, n).astype(float),
+            "prime_Eng": rng.integers(0, 2, n).astype(float),
+            "education": with_missing(
+                rng.choice(EDUCATION_LEVELS + ["Middle School"], n), 0.05
+            ),
+        }
+    )
+
+
+def make_preprocessor():
+    """The preprocessor built by english_score_eda.py"""
+    return make_column_transformer(
+        (
+            make_pipeline(SimpleImputer(strategy="median"), StandardScaler()),
+            ["age", "Eng_start", "Eng_country_yrs", "Lived_Eng_per"],
+        ),
+        (
+            make_pipeline(
+                SimpleImputer(strategy="constant", fill_value="little"),
+                OneHotEncoder(handle_unknown="ignore"),
+            ),
+            ["Eng_little", "speaker_cat"],
+        ),
+        ("passthrough", ["psychiatric"]),
+        (
+            make_pipeline(
+                SimpleImputer(strategy="constant", fill_value=0),
+                OneHotEncoder(handle_unknown="ignore", drop="if_binary", dtype=int),
+            ),
+            ["house_Eng", "nat_Eng", "prime_Eng"],
+        ),
+        (
+            make_pipeline(EducationBucketer(), OrdinalEncoder(categories=[education_codes()])),
+            ["education"],
+        ),
+    )
+
+
+class TestCompileLinearPipeline(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        """
+        Fit Ridge and Lasso pipelines on survey-like data
+        """
+        cls.X = make_survey_frame(500, 0)
+        cls.y = 0.7 + 0.001 * cls.X["age"].fillna(30) + 0.05 * cls.X["nat_Eng"]
+        cls.X_new = make_survey_frame(200, 1)
+        # Unseen categories score like sklearn's handle_unknown="ignore"
+        cls.X_new.loc[:4, "speaker_cat"] = "multieng"
+        cls.X_new.loc[5:9, "house_Eng"] = 2.0
+        cls.ridge = make_pipeline(make_preprocessor(), Ridge(alpha=1.0)).fit(cls.X, cls.y)
+        cls.lasso = make_pipeline(make_preprocessor(), Lasso(alpha=1e-4)).fit(cls.X, cls.y)
+
+    def test_ridge_parity(self):
+        print("Running unit tests for compile_linear_scorer.py")
+
+        # The compiled scorer predicts what the pipeline predicts
+        scorer = compile_linear_pipeline(self.ridge)
+        np.testing.assert_allclose(
+            scorer.predict(self.X_new), self.ridge.predict(self.X_new), rtol=1e-10
+        )
+
+    def test_lasso_parity(self):
+        # Lasso pipelines compile the same way
+        scorer = compile_linear_pipeline(self.lasso)
+        np.testing.assert_allclose(
+            scorer.predict(self.X_new), self.lasso.predict(self.X_new), rtol=1e-10
+        )
+
+    def test_categorical_and_float32_input(self):
+        # Input as loaded by load_survey_data (categories, float32) also matches
+        X = self.X_new.astype(
+            {"education": "category", "Eng_little": "category", "age": "float32"}
+        )
+        scorer = compile_linear_pipeline(self.ridge)
+        np.testing.assert_allclose(scorer.predict(X), self.ridge.predict(X), rtol=1e-6)
+
+    def test_records(self):
+        # Records with absent fields are scored as missing values
+        scorer = compile_linear_pipeline(self.ridge)
+        records = [
+            {"age": 30.0, "psychiatric": 0.0, "education": "Graduate Degree"},
+            {"speaker_cat": "bieng", "psychiatric": 1.0},
+        ]
+        expected = self.ridge.predict(pd.DataFrame(records).reindex(columns=self.X.columns))
+        np.testing.assert_allclose(scorer.predict_records(records), expected, rtol=1e-10)
+
+    def test_missing_values(self):
+        # Only None and NaN are missing; the strings "None", "nan" and "" are unseen values
+        scorer = LinearScorer(
+            0.0,
+            [],
+            [
+                {
+                    "column": "speaker_cat",
+                    "key_type": "str",
+                    "keys": ["bieng", "monoeng"],
+                    "values": [1.0, 2.0],
+                    "missing": 5.0,
+                    "unknown": 9.0,
+                }
+            ],
+        )
+        values = ["monoeng", None, np.nan, pd.NA, "None", "nan", "", "bieng"]
+        np.testing.assert_array_equal(
+            scorer.predict({"speaker_cat": np.array(values, dtype=object)}),
+            [2.0, 5.0, 5.0, 5.0, 9.0, 9.0, 9.0, 1.0],
+        )
+        without_na = np.array([value for value in values if value is not pd.NA], dtype=object)
+        np.testing.assert_array_equal(
+            scorer.predict({"speaker_cat": without_na}), [2.0, 5.0, 5.0, 9.0, 9.0, 9.0, 1.0]
+        )
+        categories = pd.Series(["bieng", None, "None"], dtype="category")
+        np.testing.assert_array_equal(scorer.predict({"speaker_cat": categories}), [1.0, 5.0, 9.0])
+
+    def test_iter_records(self):
+        # CSV and NDJSON streams are read in lists of records, empty CSV fields as None
+        scorer = compile_linear_pipeline(self.ridge)
+        records = [
+            {"age": 30.0, "psychiatric": 0.0, "education": "Graduate Degree"},
+            {"speaker_cat": "bieng", "psychiatric": 1.0},
+            {"age": 45.0, "Eng_little": "little"},
+        ]
+        csv_batches = list(
+            iter_records(io.StringIO(pd.DataFrame(records).to_csv(index=False)), "csv", 2)
+        )
+        self.assertEqual([len(batch) for batch in csv_batches], [2, 1])
+        self.assertIsNone(csv_batches[0][1]["age"])
+        ndjson = pd.DataFrame(records).to_json(orient="records", lines=True) + "\n\n"
+        ndjson_batches = list(iter_records(io.StringIO(ndjson), "ndjson", 2))
+        expected = scorer.predict_records(records)
+        for batches in (csv_batches, ndjson_batches):
+            predictions = np.concatenate([scorer.predict_records(batch) for batch in batches])
+            np.testing.assert_allclose(predictions, expected, rtol=1e-10)
+        with self.assertRaises(ValueError):
+            list(iter_records(io.StringIO(""), "xml"))
+
+    def test_json_round_trip(self):
+        # A saved scorer loads and predicts identically
+        scorer = compile_linear_pipeline(self.ridge)
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "scorer.json")
+            scorer.save(path)
+            loaded = LinearScorer.load(path)
+        np.testing.assert_array_equal(loaded.predict(self.X_new), scorer.predict(self.X_new))
+        self.assertEqual(loaded.columns, scorer.columns)
+
+    def test_unsupported_steps(self):
+        # Steps that cannot be folded are rejected
+        scaled = make_column_transformer((MinMaxScaler(), ["age", "Eng_start"]))
+        X = self.X[["age", "Eng_start"]].fillna(0)
+        with self.assertRaises(ValueError):
+            compile_linear_pipeline(make_pipeline(scaled, Ridge()).fit(X, self.y))
+        with self.assertRaises(ValueError):
+            compile_linear_pipeline(Ridge().fit(X, self.y))
+
+    def test_runtime_imports_numpy_only(self):
+        # Scoring with a saved scorer does not import scikit-learn or pandas
+        code = (
+            "import sys; sys.path.insert(0, 'src/helper'); import linear_scorer, scoring_stats; "
+            "print(sorted(m for m in ('sklearn', 'pandas') if m in sys.modules))"
+        )
+        root = os.path.join(os.path.dirname(__file__), "..")
+        output = subprocess.run(
+            [sys.executable, "-c", code], cwd=root, capture_output=True, text=True, check=True
+        )
+        self.assertEqual(output.stdout.strip(), "[]")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,143 @@
+import os
+import sys
+import unittest
+from unittest import mock
+
+import numpy as np
+import pandas as pd
+from scipy.stats import loguniform
+from sklearn.datasets import make_regression
+from sklearn.linear_model import Lasso, Ridge
+from sklearn.model_selection import GridSearchCV, RandomizedSearchCV
+from sklearn.pipeline import make_pipeline
+from sklearn.preprocessing import StandardScaler
+
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+
+from src.helper.concurrent_search import (
+    fit_searches_concurrently,
+    memory_limited_n_jobs,
+)
+from src.helper.search_top_models import fit_and_return_top_models, top_models_table
+
+SCORING = {"RMSE": "neg_root_mean_squared_error", "R squared": "r2"}
+
+
+def make_searches():
+    """Build a Ridge and a Lasso search with the settings of the tuning script"""
+    search_params = dict(
+        n_iter=6,
+        cv=4,
+        scoring=SCORING,
+        refit="RMSE",
+        random_state=123,
+        return_train_score=True,
+    )
+    ridge = RandomizedSearchCV(
+        make_pipeline(StandardScaler(), Ridge()),
+        {"ridge__alpha": loguniform(1e-3, 1e3)},
+        **search_params,
+    )
+    lasso = RandomizedSearchCV(
+        make_pipeline(StandardScaler(), Lasso()),
+        {"lasso__alpha": loguniform(1e-3, 1e3)},
+        **search_params,
+    )
+    return ridge, lasso
+
+
+class TestFitSearchesConcurrently(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        """
+        Fit the searches one after the other and with the shared pool
+        """
+        X, y = make_regression(n_samples=150, n_features=6, noise=5, random_state=123)
+        cls.X, cls.y = pd.DataFrame(X), pd.Series(y)
+        cls.sequential = [search.fit(cls.X, cls.y) for search in make_searches()]
+        cls.concurrent = fit_searches_concurrently(
+            list(make_searches()), cls.X, cls.y, n_jobs=2
+        )
+
+    def test_same_cv_results(self):
+        print("Running unit tests for concurrent_search.py")
+
+        # Every search gets the scores its own fit would produce
+        for sequential, concurrent in zip(self.sequential, self.concurrent):
+            for key in ["mean_test_RMSE", "split3_test_R squared", "mean_train_RMSE"]:
+                np.testing.assert_allclose(
+                    sequential.cv_results_[key], concurrent.cv_results_[key]
+                )
+            np.testing.assert_array_equal(
+                sequential.cv_results_["rank_test_RMSE"],
+                concurrent.cv_results_["rank_test_RMSE"],
+            )
+
+    def test_same_best_models(self):
+        # The results are demultiplexed back into the right search
+        for sequential, concurrent in zip(self.sequential, self.concurrent):
+            self.assertEqual(sequential.best_params_, concurrent.best_params_)
+            self.assertAlmostEqual(sequential.best_score_, concurrent.best_score_)
+            np.testing.assert_allclose(
+                sequential.best_estimator_.predict(self.X),
+                concurrent.best_estimator_.predict(self.X),
+            )
+
+    def test_top_models_table(self):
+        # The top-N table of a concurrently fitted search has the usual layout
+        ridge, _ = make_searches()
+        columns = ["param_ridge__alpha", "mean_test_R squared"]
+        expected = fit_and_return_top_models(
+            ridge, 3, self.X, self.y, columns, scoring="RMSE"
+        )
+        table = top_models_table(self.concurrent[0], 3, columns, scoring="RMSE")
+        pd.testing.assert_frame_equal(
+            table.drop(index="mean_fit_time"), expected.drop(index="mean_fit_time")
+        )
+
+    def test_grid_search(self):
+        # Grid searches are expanded like GridSearchCV does
+        grid = GridSearchCV(Ridge(), {"alpha": [0.1, 1.0, 10.0]}, cv=3)
+        (fitted,) = fit_searches_concurrently([grid], self.X, self.y, n_jobs=1)
+        expected = GridSearchCV(Ridge(), {"alpha": [0.1, 1.0, 10.0]}, cv=3).fit(
+            self.X, self.y
+        )
+        np.testing.assert_allclose(
+            fitted.cv_results_["mean_test_score"],
+            expected.cv_results_["mean_test_score"],
+        )
+        self.assertEqual(fitted.best_params_, expected.best_params_)
+
+
+class TestMemoryLimitedNJobs(unittest.TestCase):
+    def setUp(self):
+        # Plenty of free memory, whatever the test machine has
+        patcher = mock.patch(
+            "src.helper.concurrent_search.available_memory_mb", return_value=10**6
+        )
+        self.available_memory_mb = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_budget_caps_workers(self):
+        # The budget allows only as many workers as fits that fit in it
+        self.assertEqual(memory_limited_n_jobs(8, 100, 350), 3)
+
+    def test_available_memory_caps_budget(self):
+        # Less free memory than the budget lowers the number of workers
+        self.available_memory_mb.return_value = 250
+        self.assertEqual(memory_limited_n_jobs(8, 100, 350), 2)
+        # Unknown free memory leaves the budget as is
+        self.available_memory_mb.return_value = None
+        self.assertEqual(memory_limited_n_jobs(8, 100, 350), 3)
+
+    def test_never_below_one(self):
+        # A budget smaller than one fit still runs one worker
+        self.assertEqual(memory_limited_n_jobs(8, 1000, 10), 1)
+
+    def test_never_above_request(self):
+        # A large budget does not add workers
+        self.assertEqual(memory_limited_n_jobs(2, 1, 1000), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
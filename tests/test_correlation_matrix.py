@@ -10,7 +10,7 @@ import unittest
 
 sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
 
-from src.helper.correlation_matrix import pearson_correlation_matrix
+from src.helper.correlation_matrix import CorrelationAccumulator, pearson_correlation_matrix
 
 
 class TestPearsonCorrelationMatrix(unittest.TestCase):
@@ -89,5 +89,67 @@ class TestPearsonCorrelationMatrix(unittest.TestCase):
         self.assertEqual(custom_colormap, cmap_paras)
 
 
+class TestCorrelationAccumulator(unittest.TestCase):
+    def setUp(self):
+        # Correlated columns with a large offset, missing values and a constant column
+        rng = np.random.default_rng(0)
+        n = 3000
+        x = rng.normal(size=n)
+        self.df = pd.DataFrame(
+            {
+                "x": 1e8 + x,
+                "y": 2 * x + rng.normal(size=n),
+                "z": rng.integers(0, 5, n).astype(float),
+                "w": np.full(n, 7.0),
+                "label": rng.choice(["a", "b"], n),
+            }
+        )
+        self.df.loc[rng.choice(n, 300, replace=False), "z"] = np.nan
+
+    def test_matches_pandas(self):
+        # The matrix matches DataFrame.corr, with or without pairwise-complete rows
+        complete = pearson_correlation_matrix(self.df, chunksize=700).data
+        expected = self.df[["x", "y"]].corr()
+        pd.testing.assert_frame_equal(complete, expected, rtol=1e-9)
+
+        pairwise = pearson_correlation_matrix(self.df, pairwise=True, chunksize=700).data
+        expected = self.df[["x", "y", "z"]].corr()
+        pd.testing.assert_frame_equal(pairwise, expected, rtol=1e-9)
+
+    def test_merge(self):
+        # Accumulators of separate chunks merge into the accumulator of all rows
+        whole = CorrelationAccumulator().update(self.df)
+        parts = [CorrelationAccumulator().update(self.df.iloc[i:i + 1000]) for i in range(0, 3000, 1000)]
+        merged = CorrelationAccumulator()
+        for part in parts:
+            merged.merge(part)
+        self.assertEqual(merged.n_rows, whole.n_rows)
+        np.testing.assert_array_equal(merged.count, whole.count)
+        for pairwise in (False, True):
+            pd.testing.assert_frame_equal(merged.correlation(pairwise), whole.correlation(pairwise), rtol=1e-9)
+        with self.assertRaises(ValueError):
+            merged.merge(CorrelationAccumulator(["x"]).update(self.df))
+
+    def test_nullable_integers(self):
+        # Nullable Int8 columns with NA, as loaded for the q* items, match float columns
+        items = self.df[["z"]].assign(q1_1=(self.df["y"] > 0).astype(float))
+        items.loc[::7, "q1_1"] = np.nan
+        nullable = items.astype("Int8")
+        self.assertTrue(nullable["q1_1"].isna().any())
+        pd.testing.assert_frame_equal(
+            CorrelationAccumulator().update(nullable).correlation(pairwise=True),
+            items.corr(),
+            rtol=1e-9,
+        )
+
+    def test_chunks_and_accumulator_input(self):
+        # An iterable of chunks or a filled accumulator give the same matrix
+        chunks = (self.df.iloc[i:i + 500] for i in range(0, 3000, 500))
+        from_chunks = pearson_correlation_matrix(chunks).data
+        accumulator = CorrelationAccumulator().update(self.df)
+        pd.testing.assert_frame_equal(from_chunks, pearson_correlation_matrix(accumulator).data)
+        self.assertEqual(accumulator.constant_columns(), ["w"])
+
+
 if __name__ == "__main__":
     unittest.main()
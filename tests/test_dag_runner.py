@@ -0,0 +1,196 @@
+import json
+import os
+import sys
+import tempfile
+import time
+import unittest
+
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+
+from src.helper.dag_runner import (
+    DagRunner,
+    Stage,
+    content_hash,
+    plan_stages,
+    script_sources,
+)
+
+# Appends the stage name and its start and end times to runs.log, then copies
+# the input file to the output file with a suffix
+STEP = """
+import sys, time
+name, src, dst, sleep = sys.argv[1:5]
+start = time.time()
+time.sleep(float(sleep))
+with open(src) as f:
+    text = f.read()
+with open(dst, "w") as f:
+    f.write(text + name)
+with open("runs.log", "a") as f:
+    f.write(f"{name} {start} {time.time()}\\n")
+"""
+
+
+class TestDagRunner(unittest.TestCase):
+    def setUp(self):
+        # A diamond of stages in a temporary directory: a -> (b, c) -> d
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.cwd = os.getcwd()
+        os.chdir(self.tmp_dir.name)
+        with open("step.py", "w") as f:
+            f.write(STEP)
+        with open("raw.txt", "w") as f:
+            f.write("raw")
+        self.messages = []
+
+    def tearDown(self):
+        os.chdir(self.cwd)
+        self.tmp_dir.cleanup()
+
+    def stage(self, name, src, deps=(), sleep=0.0):
+        return Stage(
+            name,
+            [[sys.executable, "step.py", name, src, f"{name}.txt", str(sleep)]],
+            inputs=[src],
+            outputs=[f"{name}.txt"],
+            deps=deps,
+            code=["step.py"],
+        )
+
+    def stages(self, sleep=0.0):
+        return [
+            self.stage("a", "raw.txt"),
+            self.stage("b", "a.txt", ["a"], sleep),
+            self.stage("c", "a.txt", ["a"], sleep),
+            self.stage("d", "b.txt", ["b", "c"]),
+        ]
+
+    def runner(self, stages=None, jobs=1):
+        return DagRunner(
+            stages or self.stages(), state_path="state.json", jobs=jobs, log=self.messages.append
+        )
+
+    def runs(self):
+        if not os.path.exists("runs.log"):
+            return []
+        with open("runs.log") as f:
+            return [line.split()[0] for line in f]
+
+    def test_runs_then_skips(self):
+        print("Running unit tests for dag_runner.py")
+
+        # The first run runs every stage in order; the second skips them all
+        status = self.runner().run()
+        self.assertEqual(status, {"a": "ran", "b": "ran", "c": "ran", "d": "ran"})
+        with open("d.txt") as f:
+            self.assertEqual(f.read(), "rawabd")
+        os.remove("runs.log")
+        status = self.runner().run()
+        self.assertEqual(set(status.values()), {"skipped"})
+        self.assertEqual(self.runs(), [])
+
+    def test_touch_does_not_rerun(self):
+        # Rewriting a file with the same content reruns nothing
+        self.runner().run()
+        os.remove("runs.log")
+        time.sleep(0.01)
+        with open("raw.txt", "w") as f:
+            f.write("raw")
+        self.assertEqual(set(self.runner().run().values()), {"skipped"})
+
+    def test_content_change_reruns_downstream(self):
+        # Changing an input reruns the stages that read it
+        self.runner().run()
+        os.remove("runs.log")
+        with open("a.txt", "w") as f:
+            f.write("edited")
+        status = self.runner().run()
+        self.assertEqual(status, {"a": "skipped", "b": "ran", "c": "ran", "d": "ran"})
+
+    def test_code_change_and_missing_output(self):
+        # Editing the code or deleting an output reruns the stage
+        self.runner().run()
+        os.remove("c.txt")
+        self.assertEqual(self.runner().run()["c"], "ran")
+        with open("step.py", "a") as f:
+            f.write("\n# edited\n")
+        self.assertEqual(set(self.runner().run().values()), {"ran"})
+
+    def test_targets_and_force(self):
+        # Targets limit the run to their dependencies; forced stages rerun
+        status = self.runner().run(targets=["b"])
+        self.assertEqual(status, {"a": "ran", "b": "ran"})
+        status = self.runner().run(targets=["b"], force=["b"])
+        self.assertEqual(status, {"a": "skipped", "b": "ran"})
+
+    def test_dry_run(self):
+        # A dry run reports what would run and runs nothing
+        self.runner().run(targets=["a"])
+        os.remove("runs.log")
+        status = self.runner().run(dry_run=True)
+        self.assertEqual(status, {"a": "skipped", "b": "outdated", "c": "outdated", "d": "pending"})
+        self.assertEqual(self.runs(), [])
+
+    def test_parallel_stages(self):
+        # Independent stages overlap when jobs > 1
+        self.runner(self.stages(sleep=0.5), jobs=2).run()
+        with open("runs.log") as f:
+            times = {name: (float(start), float(end)) for name, start, end in map(str.split, f)}
+        self.assertLess(times["b"][0], times["c"][1])
+        self.assertLess(times["c"][0], times["b"][1])
+        self.assertGreaterEqual(times["d"][0], max(times["b"][1], times["c"][1]))
+
+    def test_failure_blocks_dependents(self):
+        # A failing stage blocks the stages after it and is not recorded
+        stages = self.stages()
+        stages[1].commands = [[sys.executable, "-c", "import sys; print('boom'); sys.exit(3)"]]
+        status = self.runner(stages).run()
+        self.assertEqual(status, {"a": "ran", "b": "failed", "c": "ran", "d": "blocked"})
+        self.assertTrue(any("boom" in message for message in self.messages))
+        with open("state.json") as f:
+            self.assertEqual(sorted(json.load(f)), ["a", "c"])
+
+    def test_invalid_graphs(self):
+        # Unknown dependencies, unknown targets and cycles are rejected
+        with self.assertRaises(ValueError):
+            plan_stages([self.stage("a", "raw.txt", ["z"])])
+        with self.assertRaises(ValueError):
+            plan_stages(self.stages(), targets=["z"])
+        with self.assertRaisesRegex(ValueError, "cycle"):
+            plan_stages([self.stage("a", "b.txt", ["b"]), self.stage("b", "a.txt", ["a"])])
+
+    def test_content_hash(self):
+        # Directories hash their files; missing paths hash to "missing"
+        os.makedirs("folder/__pycache__")
+        with open("folder/x.txt", "w") as f:
+            f.write("x")
+        before = content_hash("folder")
+        with open("folder/__pycache__/x.pyc", "w") as f:
+            f.write("ignored")
+        self.assertEqual(content_hash("folder"), before)
+        with open("folder/x.txt", "w") as f:
+            f.write("y")
+        self.assertNotEqual(content_hash("folder"), before)
+        self.assertEqual(content_hash("nothing"), "missing")
+
+
+class TestScriptSources(unittest.TestCase):
+    def test_script_sources(self):
+        # A script's sources include the helper modules it imports, transitively
+        root = os.path.join(os.path.dirname(__file__), "..")
+        cwd = os.getcwd()
+        os.chdir(root)
+        try:
+            sources = script_sources("src/scripts/english_score_results.py")
+        finally:
+            os.chdir(cwd)
+        self.assertIn("src/scripts/english_score_results.py", sources)
+        self.assertIn("src/helper/plt_regr_pred.py", sources)
+        # artifact_store is imported by model_fingerprint, columnar_cache by artifact_store
+        self.assertIn("src/helper/artifact_store.py", sources)
+        self.assertIn("src/helper/columnar_cache.py", sources)
+        self.assertNotIn("src/helper/racing_search.py", sources)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,105 @@
+import os
+import sys
+import unittest
+
+import numpy as np
+import pandas as pd
+import scipy.sparse as sp
+from sklearn.compose import make_column_transformer
+from sklearn.impute import SimpleImputer
+from sklearn.pipeline import make_pipeline
+from sklearn.preprocessing import OneHotEncoder, StandardScaler
+
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+
+from src.helper.compile_linear_scorer import compile_linear_pipeline
+from src.helper.design_matrix import (
+    is_sparse_design,
+    linear_models,
+    uses_wide_categoricals,
+)
+from src.helper.precision import Float32, is_float32_pipeline
+
+
+def make_preprocessor(sparse):
+    # A numeric block, a passthrough column and a wide one-hot block
+    to_sparse = [Float32(to_sparse=True)] if sparse else []
+    return make_column_transformer(
+        (make_pipeline(SimpleImputer(strategy="median"), StandardScaler(), *to_sparse), ["age"]),
+        (Float32(to_sparse=True) if sparse else "passthrough", ["psychiatric"]),
+        (
+            make_pipeline(
+                SimpleImputer(strategy="constant", fill_value="missing"),
+                OneHotEncoder(handle_unknown="ignore", dtype=np.float32 if sparse else np.float64),
+            ),
+            ["currcountry"],
+        ),
+        sparse_threshold=1.0 if sparse else 0.0,
+    )
+
+
+class TestDesignMatrix(unittest.TestCase):
+    def setUp(self):
+        # Respondents from many countries, with missing values
+        rng = np.random.default_rng(0)
+        n = 400
+        country = rng.integers(0, 60, n)
+        self.X = pd.DataFrame(
+            {
+                "age": rng.integers(10, 80, n).astype(np.float32),
+                "psychiatric": rng.integers(0, 2, n).astype(np.float32),
+                "currcountry": np.array([f"country {c}" for c in country], dtype=object),
+            }
+        )
+        self.X.loc[::17, "age"] = np.nan
+        self.X.loc[::13, "currcountry"] = np.nan
+        self.y = 0.7 + 0.001 * self.X["age"].fillna(40) + 0.002 * (country % 5) + rng.normal(0, 0.01, n)
+
+    def test_sparse_preprocessor(self):
+        print("Running unit tests for design_matrix.py")
+
+        # The sparse preprocessor outputs the dense one's values as a float32 CSR matrix
+        sparse_pre = make_preprocessor(sparse=True).fit(self.X)
+        dense_pre = make_preprocessor(sparse=False).fit(self.X)
+        output = sparse_pre.transform(self.X)
+        self.assertTrue(is_sparse_design(sparse_pre))
+        self.assertFalse(is_sparse_design(dense_pre))
+        # Its sparse casts do not make it a --dtype float32 preprocessor
+        self.assertFalse(is_float32_pipeline(sparse_pre))
+        self.assertTrue(sp.isspmatrix_csr(output))
+        self.assertEqual(output.dtype, np.float32)
+        np.testing.assert_allclose(output.toarray(), dense_pre.transform(self.X), rtol=1e-6, atol=1e-6)
+        # Only the transformer prefixes, which show_feat_coeff strips, differ
+        self.assertEqual(
+            [name.split("__")[-1] for name in sparse_pre.get_feature_names_out()],
+            [name.split("__")[-1] for name in dense_pre.get_feature_names_out()],
+        )
+
+    def test_sparse_models(self):
+        # The sparse solvers fit on the CSR matrix and match the dense fits, to
+        # the tolerance of the conjugate gradient
+        sparse_ridge, sparse_lasso = linear_models(sparse_input=True)
+        dense_ridge, dense_lasso = linear_models()
+        self.assertEqual(sparse_ridge.solver, "sparse_cg")
+        self.assertFalse(sparse_lasso.precompute)
+        sparse_lasso.set_params(alpha=1e-4)
+        dense_lasso.set_params(alpha=1e-4)
+        for sparse_model, dense_model in ((sparse_ridge, dense_ridge), (sparse_lasso, dense_lasso)):
+            sparse_pipe = make_pipeline(make_preprocessor(sparse=True), sparse_model).fit(self.X, self.y)
+            dense_pipe = make_pipeline(make_preprocessor(sparse=False), dense_model).fit(self.X, self.y)
+            np.testing.assert_allclose(sparse_pipe.predict(self.X), dense_pipe.predict(self.X), atol=5e-4)
+
+        # The sparse Float32 casts do not stop the pipeline from being compiled
+        scorer = compile_linear_pipeline(sparse_pipe)
+        np.testing.assert_allclose(scorer.predict(self.X), sparse_pipe.predict(self.X), atol=1e-5)
+
+    def test_uses_wide_categoricals(self):
+        # Preprocessors reading a wide categorical feature are recognised
+        self.assertTrue(uses_wide_categoricals(make_pipeline(make_preprocessor(sparse=True))))
+        self.assertFalse(
+            uses_wide_categoricals(make_column_transformer((StandardScaler(), ["age"])))
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
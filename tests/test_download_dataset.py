@@ -0,0 +1,174 @@
+import hashlib
+import http.server
+import os
+import pathlib
+import sys
+import tempfile
+import threading
+import unittest
+import urllib.error
+from unittest import mock
+
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+
+from src.helper.download_dataset import download_dataset, read_checksum_file, write_checksum_file
+
+
+class FlakyHandler(http.server.BaseHTTPRequestHandler):
+    """Serves `content` with Range and If-Range support, dropping the first connection halfway."""
+
+    content = b""
+    etag = '"v1"'
+    # (content, etag) the file is replaced with once the first connection drops
+    changed = None
+    requests = []
+
+    def do_GET(self):
+        handler = type(self)
+        handler.requests.append((self.headers.get("Range"), self.headers.get("If-Range")))
+        if self.path != "/data.csv":
+            self.send_error(404)
+            return
+        start = 0
+        # A Range is ignored when If-Range does not match the current file
+        if self.headers.get("Range") and self.headers.get("If-Range", self.etag) == self.etag:
+            start = int(self.headers["Range"].split("=")[1].rstrip("-"))
+        body = self.content[start:]
+        self.send_response(206 if start else 200)
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("ETag", self.etag)
+        if start:
+            self.send_header("Content-Range", f"bytes {start}-{len(self.content) - 1}/{len(self.content)}")
+        self.end_headers()
+        if len(handler.requests) == 1:
+            # The connection drops before the whole body is sent
+            body = body[: len(body) // 2]
+            self.close_connection = True
+            if handler.changed:
+                handler.content, handler.etag = handler.changed
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class TestDownloadDataset(unittest.TestCase):
+    def setUp(self):
+        # Create a local fixture to download from
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.source = os.path.join(self.tmp_dir.name, "source.csv")
+        self.content = b"".join(b"%d,%d\n" % (i, i * i) for i in range(5000))
+        with open(self.source, "wb") as f:
+            f.write(self.content)
+        self.sha256 = hashlib.sha256(self.content).hexdigest()
+        self.destination = os.path.join(self.tmp_dir.name, "downloaded.csv")
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def read_destination(self):
+        with open(self.destination, "rb") as f:
+            return f.read()
+
+    def test_file_url(self):
+        print("Running unit tests for download_dataset.py")
+
+        # A file:// URL is streamed to the destination in small chunks
+        url = pathlib.Path(self.source).as_uri()
+        path = download_dataset(url, self.destination, self.sha256, chunk_size=1024)
+        self.assertEqual(self.destination, path)
+        self.assertEqual(self.content, self.read_destination())
+        self.assertFalse(os.path.exists(self.destination + ".part"))
+
+    def test_local_path(self):
+        # A plain path works like a file:// URL
+        download_dataset(self.source, self.destination)
+        self.assertEqual(self.content, self.read_destination())
+
+    def test_resume_partial_download(self):
+        # A leftover .part file is continued rather than restarted
+        with open(self.destination + ".part", "wb") as f:
+            f.write(self.content[:1000])
+        download_dataset(self.source, self.destination, self.sha256)
+        self.assertEqual(self.content, self.read_destination())
+
+    def test_checksum_mismatch(self):
+        # A corrupt download raises and leaves no file behind
+        with self.assertRaises(ValueError):
+            download_dataset(self.source, self.destination, "0" * 64)
+        self.assertFalse(os.path.exists(self.destination))
+        self.assertFalse(os.path.exists(self.destination + ".part"))
+
+    def test_verified_file_is_reused(self):
+        # An existing file with the right checksum is not downloaded again
+        with open(self.destination, "wb") as f:
+            f.write(self.content)
+        os.remove(self.source)
+        path = download_dataset(self.source, self.destination, self.sha256)
+        self.assertEqual(self.destination, path)
+
+    def serve(self):
+        # A local HTTP server for the content, stopped after the test
+        FlakyHandler.content = self.content
+        FlakyHandler.etag = '"v1"'
+        FlakyHandler.changed = None
+        FlakyHandler.requests = []
+        server = http.server.HTTPServer(("127.0.0.1", 0), FlakyHandler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        self.addCleanup(server.server_close)
+        self.addCleanup(server.shutdown)
+        return f"http://127.0.0.1:{server.server_port}"
+
+    def test_http_resume_after_drop(self):
+        # A connection dropped mid-body is resumed with a Range request, if the file is unchanged
+        url = self.serve() + "/data.csv"
+        with mock.patch("src.helper.download_dataset.time.sleep"):
+            download_dataset(url, self.destination, self.sha256, chunk_size=1024)
+        self.assertEqual(self.content, self.read_destination())
+        half = len(self.content) // 2
+        self.assertEqual([(None, None), (f"bytes={half}-", '"v1"')], FlakyHandler.requests)
+        self.assertFalse(os.path.exists(self.destination + ".part.validator"))
+
+    def test_http_changed_file_restarts(self):
+        # A file changed on the server since the drop is downloaded whole, not spliced
+        url = self.serve() + "/data.csv"
+        changed = self.content.replace(b",", b";")
+        FlakyHandler.changed = (changed, '"v2"')
+        with mock.patch("src.helper.download_dataset.time.sleep"):
+            download_dataset(url, self.destination, hashlib.sha256(changed).hexdigest())
+        self.assertEqual(changed, self.read_destination())
+
+    def test_http_part_without_validator_restarts(self):
+        # A leftover .part file of unknown origin is not resumed
+        url = self.serve() + "/data.csv"
+        # Counted as the dropped request, so the download is served whole
+        FlakyHandler.requests = [(None, None)]
+        with open(self.destination + ".part", "wb") as f:
+            f.write(b"stale bytes")
+        download_dataset(url, self.destination, self.sha256)
+        self.assertEqual(self.content, self.read_destination())
+        self.assertEqual([(None, None), (None, None)], FlakyHandler.requests)
+
+    def test_checksum_file(self):
+        # Digests are pinned per name, replacing the previous digest of the same name
+        path = os.path.join(self.tmp_dir.name, "pins", "dataset.sha256")
+        self.assertIsNone(read_checksum_file(path, "https://a"))
+        write_checksum_file(path, "https://a", "AB" * 32)
+        write_checksum_file(path, "https://b", "cd" * 32)
+        write_checksum_file(path, "https://a", "ef" * 32)
+        self.assertEqual(read_checksum_file(path, "https://a"), "ef" * 32)
+        self.assertEqual(read_checksum_file(path, "https://b"), "cd" * 32)
+        self.assertIsNone(read_checksum_file(path, "https://c"))
+
+    def test_http_client_error_not_retried(self):
+        # A 404 is raised at once instead of being retried
+        url = self.serve() + "/missing.csv"
+        with mock.patch("src.helper.download_dataset.time.sleep") as sleep:
+            with self.assertRaises(urllib.error.HTTPError):
+                download_dataset(url, self.destination)
+        sleep.assert_not_called()
+        self.assertEqual(1, len(FlakyHandler.requests))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,94 @@
+import os
+import pickle
+import sys
+import unittest
+
+import numpy as np
+import pandas as pd
+from sklearn.pipeline import make_pipeline
+from sklearn.preprocessing import OrdinalEncoder
+
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+
+from src.helper.education_bucketer import (
+    EDUCATION_LEVELS,
+    OTHER_LEVEL,
+    EducationBucketer,
+    education_codes,
+)
+
+
+def map_to_other(df):
+    """The per-row mapping the scripts used before EducationBucketer"""
+    return (
+        df["education"]
+        .astype(object)
+        .apply(lambda x: x if x in EDUCATION_LEVELS else OTHER_LEVEL)
+    ).to_frame()
+
+
+class TestEducationBucketer(unittest.TestCase):
+    def setUp(self):
+        values = EDUCATION_LEVELS + ["Middle School", np.nan, "Graduate Degree", None]
+        self.df = pd.DataFrame({"education": values})
+        self.expected = np.array([0, 1, 2, 3, 4, 5, 6, 7, 7, 0, 7]).reshape(-1, 1)
+
+    def test_object_codes(self):
+        print("Running unit tests for education_bucketer.py")
+
+        # Large groups are coded by position, everything else is "Others"
+        codes = EducationBucketer().fit_transform(self.df)
+        np.testing.assert_array_equal(codes, self.expected)
+        self.assertEqual(codes.dtype, np.int8)
+
+    def test_categorical_codes(self):
+        # Categorical input (as loaded by load_survey_data) gives the same codes
+        df = self.df.astype({"education": "category"})
+        np.testing.assert_array_equal(EducationBucketer().fit_transform(df), self.expected)
+
+    def test_array_input(self):
+        # A plain 2D array of one column is accepted
+        codes = EducationBucketer().fit_transform(self.df.to_numpy())
+        np.testing.assert_array_equal(codes, self.expected)
+
+    def test_matches_map_to_other(self):
+        # The pipeline encodes exactly like map_to_other + OrdinalEncoder did
+        old = make_pipeline(
+            OrdinalEncoder(categories=[EDUCATION_LEVELS + [OTHER_LEVEL]])
+        ).fit_transform(map_to_other(self.df))
+        new = make_pipeline(
+            EducationBucketer(), OrdinalEncoder(categories=[education_codes()])
+        ).fit_transform(self.df.astype({"education": "category"}))
+        np.testing.assert_array_equal(old, new)
+
+    def test_feature_names(self):
+        # The output keeps the input column name
+        bucketer = EducationBucketer().fit(self.df)
+        self.assertEqual(list(bucketer.get_feature_names_out()), ["education"])
+
+    def test_input_checks(self):
+        # The fitted columns are recorded and checked on transform
+        bucketer = EducationBucketer().fit(self.df)
+        self.assertEqual(bucketer.n_features_in_, 1)
+        self.assertEqual(list(bucketer.feature_names_in_), ["education"])
+        with self.assertRaisesRegex(ValueError, "feature names"):
+            bucketer.transform(self.df.rename(columns={"education": "degree"}))
+        with self.assertRaisesRegex(ValueError, "2 features"):
+            bucketer.transform(self.df.assign(age=1))
+        self.assertFalse(hasattr(EducationBucketer().fit(self.df.to_numpy()), "feature_names_in_"))
+
+    def test_custom_categories(self):
+        # Other category lists code "Others" after their last level
+        bucketer = EducationBucketer(categories=["Graduate Degree"])
+        np.testing.assert_array_equal(
+            bucketer.fit_transform(self.df[:3]).ravel(), [0, 1, 1]
+        )
+
+    def test_pickle(self):
+        # A pickled bucketer works without any __main__ definitions
+        bucketer = pickle.loads(pickle.dumps(EducationBucketer().fit(self.df)))
+        np.testing.assert_array_equal(bucketer.transform(self.df), self.expected)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,225 @@
+import os
+import pickle
+import shutil
+import sys
+import tempfile
+import threading
+import time
+import unittest
+
+import numpy as np
+import pandas as pd
+from joblib import Parallel, delayed
+from scipy.stats import loguniform
+from sklearn.compose import make_column_transformer
+from sklearn.impute import SimpleImputer
+from sklearn.linear_model import Ridge
+from sklearn.model_selection import RandomizedSearchCV
+from sklearn.pipeline import make_pipeline
+from sklearn.preprocessing import OneHotEncoder, StandardScaler
+
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+
+from src.helper.execution_backend import (
+    ExecutionBackend,
+    FileQueueBackend,
+    LocalQueueCluster,
+    WorkQueue,
+    run_worker,
+)
+from src.helper.search_top_models import fit_and_return_top_models
+
+
+def fail(x):
+    raise ArithmeticError(f"cannot score {x}")
+
+
+class TestExecutionBackend(unittest.TestCase):
+    def setUp(self):
+        # Respondents with a numeric and a categorical column and a Ridge search
+        rng = np.random.default_rng(0)
+        n = 200
+        self.X = pd.DataFrame(
+            {
+                "age": rng.integers(10, 80, n).astype(float),
+                "currcountry": rng.choice(["Finland", "Germany", "Japan"], n).astype(object),
+            }
+        )
+        self.X.loc[::9, "age"] = np.nan
+        self.X.loc[::7, "currcountry"] = np.nan
+        self.y = pd.Series(
+            0.7 + 0.001 * self.X["age"].fillna(40) + rng.normal(0, 0.01, n), name="correct"
+        )
+        self.queue_dir = tempfile.mkdtemp(prefix="work-queue-")
+
+    def tearDown(self):
+        shutil.rmtree(self.queue_dir, ignore_errors=True)
+
+    def make_search(self):
+        preprocessor = make_column_transformer(
+            (make_pipeline(SimpleImputer(strategy="median"), StandardScaler()), ["age"]),
+            (
+                make_pipeline(
+                    SimpleImputer(strategy="constant", fill_value="missing"),
+                    OneHotEncoder(handle_unknown="ignore"),
+                ),
+                ["currcountry"],
+            ),
+        )
+        return RandomizedSearchCV(
+            make_pipeline(preprocessor, Ridge()),
+            {"ridge__alpha": loguniform(1e-3, 1e3)},
+            n_iter=6,
+            cv=4,
+            random_state=123,
+            scoring="neg_root_mean_squared_error",
+            n_jobs=2,
+        )
+
+    def test_queue_matches_local(self):
+        print("Running unit tests for execution_backend.py")
+
+        # Two worker processes serving the queue give the local results bit for bit
+        local = self.make_search()
+        local_top = fit_and_return_top_models(
+            local, 3, self.X, self.y, backend=ExecutionBackend("local")
+        )
+        queued = self.make_search()
+        backend = ExecutionBackend("file-queue", queue_dir=self.queue_dir, n_workers=2)
+        with LocalQueueCluster(self.queue_dir, n_workers=2):
+            queued_top = fit_and_return_top_models(queued, 3, self.X, self.y, backend=backend)
+
+        for key, values in local.cv_results_.items():
+            if key.endswith("_time"):
+                continue
+            self.assertEqual(pickle.dumps(queued.cv_results_[key]), pickle.dumps(values), key)
+        self.assertEqual(queued.best_params_, local.best_params_)
+        self.assertEqual(
+            queued.best_estimator_.predict(self.X).tobytes(),
+            local.best_estimator_.predict(self.X).tobytes(),
+        )
+        pd.testing.assert_frame_equal(
+            queued_top.drop(index="mean_fit_time"), local_top.drop(index="mean_fit_time")
+        )
+        # Every task was answered
+        for name in ("tasks", "claimed", "results"):
+            self.assertEqual(os.listdir(os.path.join(self.queue_dir, name)), [])
+
+    def test_worker_errors(self):
+        # A task that raises on a worker raises the same error in the caller
+        with LocalQueueCluster(self.queue_dir, n_workers=2):
+            with ExecutionBackend("file-queue", queue_dir=self.queue_dir, n_workers=2):
+                self.assertEqual(Parallel()(delayed(abs)(i) for i in (-1, 2, -3)), [1, 2, 3])
+                # Both tasks fail on the two workers, whichever is collected first raises
+                with self.assertRaisesRegex(ArithmeticError, "cannot score [23]"):
+                    Parallel()(delayed(fail)(i) for i in (2, 3))
+
+    def test_dead_worker_requeued(self):
+        # A task claimed by a worker that died is run again once its lease expires
+        backend = FileQueueBackend(self.queue_dir, lease=0.3, timeout=30, poll_interval=0.01)
+        future = backend.submit(lambda: 6 * 7)
+        queue = WorkQueue(self.queue_dir)
+        task_id, _ = queue.claim()
+        self.assertIsNotNone(queue.claimed_at(task_id))
+        self.assertEqual(run_worker(self.queue_dir, poll_interval=0.01, max_idle=2), 1)
+        self.assertEqual(future.result(timeout=5), 42)
+        for name in ("tasks", "claimed", "results"):
+            self.assertEqual(os.listdir(os.path.join(self.queue_dir, name)), [])
+
+    def test_heartbeat_keeps_lease(self):
+        # A running task renews its lease, so a slow task is not run a second time
+        log = os.path.join(self.queue_dir, "runs.log")
+
+        def slow_task():
+            with open(log, "a") as f:
+                f.write("run\n")
+            time.sleep(1.5)
+            return "slow"
+
+        backend = FileQueueBackend(self.queue_dir, lease=0.5, timeout=30, poll_interval=0.01)
+        future = backend.submit(slow_task)
+        workers = [
+            threading.Thread(
+                target=run_worker,
+                args=(self.queue_dir,),
+                kwargs={"poll_interval": 0.01, "max_idle": 1, "heartbeat_interval": 0.1},
+            )
+            for _ in range(2)
+        ]
+        for worker in workers:
+            worker.start()
+        self.assertEqual(future.result(timeout=10), "slow")
+        for worker in workers:
+            worker.join()
+        with open(log) as f:
+            self.assertEqual(f.read(), "run\n")
+
+    def test_lost_claim(self):
+        # A worker whose claim was requeued drops its result and leaves the new claim alone
+        queue_a, queue_b = WorkQueue(self.queue_dir), WorkQueue(self.queue_dir)
+        queue_a.put("t", lambda: 1)
+        task_id, _ = queue_a.claim()
+        queue_a.requeue(task_id)
+        self.assertEqual(queue_b.claim()[0], task_id)
+        self.assertFalse(queue_a.finish(task_id, ("ok", "late")))
+        self.assertIsNone(queue_a.pop_result(task_id))
+        self.assertIsNotNone(queue_b.claimed_at(task_id))
+        self.assertTrue(queue_b.finish(task_id, ("ok", 1)))
+        self.assertEqual(queue_b.pop_result(task_id), ("ok", 1))
+        self.assertEqual(os.listdir(os.path.join(self.queue_dir, "claimed")), [])
+
+    def test_abandoned_task_discarded(self):
+        # A task aborted while it runs leaves neither a claim nor a result behind
+        started = os.path.join(self.queue_dir, "started")
+
+        def slow_task():
+            open(started, "w").close()
+            time.sleep(0.5)
+            return "late"
+
+        backend = FileQueueBackend(self.queue_dir, timeout=30, poll_interval=0.01)
+        future = backend.submit(slow_task)
+        worker = threading.Thread(
+            target=run_worker, args=(self.queue_dir,), kwargs={"poll_interval": 0.01, "max_idle": 1}
+        )
+        worker.start()
+        while not os.path.exists(started):
+            time.sleep(0.01)
+        backend.abort_everything()
+        worker.join()
+        self.assertTrue(future.cancelled())
+        deadline = time.time() + 5
+        while backend._collector is not None and time.time() < deadline:
+            time.sleep(0.01)
+        for name in ("tasks", "claimed", "results"):
+            self.assertEqual(os.listdir(os.path.join(self.queue_dir, name)), [])
+
+    def test_no_workers_timeout(self):
+        # Without any worker the pending tasks fail instead of waiting forever
+        with ExecutionBackend("file-queue", queue_dir=self.queue_dir, n_workers=2, timeout=0.3):
+            with self.assertRaisesRegex(TimeoutError, "No worker served the queue"):
+                Parallel()(delayed(abs)(i) for i in (-1, 2, -3))
+        self.assertEqual(os.listdir(os.path.join(self.queue_dir, "tasks")), [])
+
+    def test_run_worker(self):
+        # A worker runs the queued tasks and exits once the queue is idle or stopped
+        queue = WorkQueue(self.queue_dir)
+        queue.put("a", lambda: 6 * 7)
+        queue.put("b", lambda: fail(1))
+        # A task still being written is left alone
+        open(os.path.join(self.queue_dir, "tasks", ".c.tmp"), "w").close()
+        self.assertEqual(run_worker(self.queue_dir, max_idle=0.1), 2)
+        self.assertEqual(queue.pop_result("a"), ("ok", 42))
+        status, error = queue.pop_result("b")
+        self.assertEqual((status, type(error)), ("error", ArithmeticError))
+        self.assertEqual(os.listdir(os.path.join(self.queue_dir, "tasks")), [".c.tmp"])
+        self.assertIsNone(queue.pop_result("a"))
+        queue.stop()
+        self.assertEqual(run_worker(self.queue_dir), 0)
+
+        with self.assertRaises(ValueError):
+            ExecutionBackend("carrier-pigeon")
+
+
+if __name__ == "__main__":
+    unittest.main()
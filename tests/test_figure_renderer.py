@@ -0,0 +1,134 @@
+import importlib
+import json
+import os
+import sys
+import tempfile
+import unittest
+
+import matplotlib.pyplot as plt
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+
+from src.helper.eda_figures import category_counts, eda_figure_tasks
+from src.helper.figure_renderer import FigureTask, render_figures
+
+
+def plot_line(data, output, color="black"):
+    plt.plot(data, color=color)
+    plt.savefig(output)
+
+
+class TestFigureRenderer(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.output = os.path.join(self.tmp_dir.name, "line.png")
+        self.cache = os.path.join(self.tmp_dir.name, ".figure-cache.json")
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def render(self, data=(1, 2, 3), **kwargs):
+        task = FigureTask("line", plot_line, self.output, list(data))
+        return render_figures([task], cache_path=self.cache, n_jobs=1, **kwargs)["line"]
+
+    def test_render_then_skip(self):
+        print("Running unit tests for figure_renderer.py")
+
+        # The first call renders the figure, the second skips it
+        self.assertIsInstance(self.render(), float)
+        self.assertTrue(os.path.exists(self.output))
+        self.assertEqual(self.render(), "skipped")
+        with open(self.cache) as f:
+            self.assertEqual(list(json.load(f)), [self.output])
+
+    def test_changes_rerender(self):
+        # New data, a forced call or a deleted file render the figure again
+        self.render()
+        self.assertIsInstance(self.render(data=(3, 2, 1)), float)
+        self.assertIsInstance(self.render(data=(3, 2, 1), force=True), float)
+        os.remove(self.output)
+        self.assertIsInstance(self.render(data=(3, 2, 1)), float)
+
+    def test_params_change_key(self):
+        # The parameters are part of the task key
+        task = FigureTask("line", plot_line, self.output, [1, 2])
+        other = FigureTask("line", plot_line, self.output, [1, 2], {"color": "red"})
+        self.assertEqual(task.key(), FigureTask("line", plot_line, self.output, [1, 2]).key())
+        self.assertNotEqual(task.key(), other.key())
+
+    def test_imported_code_changes_key(self):
+        # Editing a module the render function imports changes the task key
+        package = os.path.join(self.tmp_dir.name, "figpkg")
+        os.makedirs(package)
+        files = {
+            "__init__.py": "",
+            "plots.py": "from .style import COLOR\n\n\ndef plot(data, output):\n    pass\n",
+            "style.py": "COLOR = 'black'\n",
+        }
+        for name, code in files.items():
+            with open(os.path.join(package, name), "w") as f:
+                f.write(code)
+        sys.path.insert(0, self.tmp_dir.name)
+        self.addCleanup(sys.path.remove, self.tmp_dir.name)
+        for module in ("figpkg", "figpkg.plots", "figpkg.style"):
+            self.addCleanup(sys.modules.pop, module, None)
+        plot = importlib.import_module("figpkg.plots").plot
+
+        key = FigureTask("line", plot, self.output, [1, 2]).key()
+        self.assertEqual(key, FigureTask("line", plot, self.output, [1, 2]).key())
+        with open(os.path.join(package, "style.py"), "w") as f:
+            f.write("COLOR = 'red'\n")
+        self.assertNotEqual(key, FigureTask("line", plot, self.output, [1, 2]).key())
+
+    def test_no_cache(self):
+        # Without a cache file every call renders
+        task = FigureTask("line", plot_line, self.output, [1, 2])
+        render_figures([task], n_jobs=1)
+        self.assertIsInstance(render_figures([task], n_jobs=1)["line"], float)
+        self.assertFalse(os.path.exists(self.cache))
+
+
+class TestEdaFigures(unittest.TestCase):
+    def test_category_counts(self):
+        # Missing values are counted, unused categories are not
+        series = pd.Series(["a", "b", None, "a"], name="letter", dtype="category")
+        series = series.cat.add_categories(["unused"])
+        counts = category_counts(series)
+        self.assertEqual(list(counts.columns), ["letter", "count"])
+        self.assertEqual(dict(zip(counts["letter"].astype(str), counts["count"])), {"a": 2, "b": 1, "nan": 1})
+
+    def test_eda_figure_tasks(self):
+        # The tasks carry aggregated data and the correlation matrix is saved
+        rng = np.random.default_rng(0)
+        n = 20
+        train_df = pd.DataFrame(
+            {
+                "id": np.arange(n),
+                "age": rng.integers(10, 70, n),
+                "Eng_start": rng.integers(0, 10, n),
+                "Eng_country_yrs": rng.integers(0, 30, n),
+                "Lived_Eng_per": rng.random(n),
+                "house_Eng": rng.integers(0, 2, n),
+                "education": rng.choice(["High School", "Graduate"], n),
+                "Eng_little": rng.choice(["little", "lot"], n),
+                "speaker_cat": rng.choice(["monoeng", "bieng"], n),
+                "correct": rng.random(n),
+            }
+        )
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            tasks = eda_figure_tasks(train_df, tmp_dir + "/", tables_to=tmp_dir + "/")
+            correlation = pd.read_csv(os.path.join(tmp_dir, "correlation-matrix.csv"), index_col=0)
+        names = [task.name for task in tasks]
+        self.assertEqual(
+            names, ["numeric_plots", "education_plot", "categorical_plot", "correlation", "pairwise_plots"]
+        )
+        self.assertNotIn("id", correlation.columns)
+        self.assertNotIn("id", tasks[0].data.columns)
+        self.assertEqual(tasks[1].data["count"].sum(), n)
+        self.assertEqual(sorted(tasks[2].data), ["Eng_little", "speaker_cat"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,80 @@
+import os
+import sys
+import unittest
+
+import numpy as np
+import pandas as pd
+from sklearn.compose import make_column_selector, make_column_transformer
+from sklearn.pipeline import make_pipeline
+from sklearn.preprocessing import StandardScaler
+
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+
+from src.helper.item_response import (
+    ITEM_PATTERN,
+    ItemResponseFeatures,
+    item_blocks,
+    uses_item_responses,
+)
+
+
+class TestItemResponse(unittest.TestCase):
+    def setUp(self):
+        # Three respondents answering two blocks of items, with missing answers
+        self.items = pd.DataFrame(
+            {
+                "q1_1": [1, 0, None],
+                "q1_2": [1, 1, None],
+                "q2_1": [0, None, None],
+                "q2_2": [1, 0, None],
+                "q2_3": [0, 0, 1],
+            },
+            dtype="Int8",
+        )
+
+    def test_item_blocks(self):
+        print("Running unit tests for item_response.py")
+
+        # Items are grouped by the block number of their name
+        self.assertEqual(
+            item_blocks(["q1_1", "q1_2", "q10_1", "q2_1", "other"]),
+            {"q1": ["q1_1", "q1_2"], "q10": ["q10_1"], "q2": ["q2_1"], "other": ["other"]},
+        )
+
+    def test_features(self):
+        # Block accuracies, accuracy, weighted score and missing counts per respondent
+        features = ItemResponseFeatures(chunksize=2).fit(self.items)
+        # Share of wrong answers per item
+        np.testing.assert_allclose(features.difficulty_, [0.5, 0, 1, 0.5, 2 / 3])
+        output = features.transform(self.items)
+        self.assertEqual(
+            list(features.get_feature_names_out()),
+            ["q1_accuracy", "q2_accuracy", "item_accuracy", "item_weighted_score", "item_missing"],
+        )
+        weighted = (0.5 + 0.5) / (0.5 + 0 + 1 + 0.5 + 2 / 3)
+        np.testing.assert_allclose(output[0], [1, 1 / 3, 3 / 5, weighted, 0])
+        np.testing.assert_allclose(output[1], [0.5, 0, 1 / 4, 0, 1])
+        # The third respondent answered no q1 item: its accuracy is the training one
+        np.testing.assert_allclose(output[2], [3 / 4, 1, 1, 1, 4])
+
+    def test_column_transformer(self):
+        # The features plug into a ColumnTransformer next to other columns
+        df = self.items.assign(age=[20.0, 30.0, 40.0])
+        preprocessor = make_column_transformer(
+            (StandardScaler(), ["age"]),
+            (
+                make_pipeline(ItemResponseFeatures(), StandardScaler()),
+                make_column_selector(pattern=ITEM_PATTERN),
+            ),
+        )
+        self.assertTrue(uses_item_responses(make_pipeline(preprocessor)))
+        self.assertFalse(uses_item_responses(make_column_transformer((StandardScaler(), ["age"]))))
+        output = preprocessor.fit_transform(df)
+        self.assertEqual(output.shape, (3, 6))
+        self.assertIn("pipeline__item_missing", preprocessor.get_feature_names_out())
+        with self.assertRaises(ValueError):
+            ItemResponseFeatures().fit(self.items).transform(self.items[["q1_1", "q1_2"]])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,80 @@
+import os
+import sys
+import tempfile
+import unittest
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+
+from src.helper.load_survey_data import (
+    load_survey_data,
+    is_item_column,
+    current_rss_mb,
+    peak_rss_mb,
+    MODEL_COLUMNS,
+)
+
+
+class TestLoadSurveyData(unittest.TestCase):
+    def setUp(self):
+        # Create a small survey-shaped CSV for testing
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp_dir.name, "survey.csv")
+        pd.DataFrame(
+            {
+                "id": [1.0, 2.0, 3.0, 4.0],
+                "age": [31, 30, np.nan, 20],
+                "education": ["Graduate Degree", None, "Others", "Graduate Degree"],
+                "speaker_cat": ["monoeng", "bieng", "monoeng", "noneng"],
+                "house_Eng": [1, np.nan, 0, 1],
+                "q1_1": [1, 0, 1, 1],
+                "q1_2": [0, 0, 1, np.nan],
+                "correct": [0.9, 0.8, 1.0, 0.95],
+            }
+        ).to_csv(self.path, index=False)
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_column_pruning(self):
+        print("Running unit tests for load_survey_data.py")
+
+        # Only the model columns present in the file should be read
+        df = load_survey_data(self.path, columns=MODEL_COLUMNS)
+        self.assertEqual(
+            ["age", "education", "speaker_cat", "house_Eng", "correct"],
+            df.columns.tolist(),
+        )
+
+    def test_callable_columns(self):
+        # A callable selects columns by name
+        df = load_survey_data(self.path, columns=lambda c: not is_item_column(c))
+        self.assertNotIn("q1_1", df.columns)
+        self.assertIn("id", df.columns)
+
+    def test_compact_dtypes(self):
+        # Categoricals, float32 numerics and nullable int8 items
+        df = load_survey_data(self.path)
+        self.assertEqual("category", df["education"].dtype.name)
+        self.assertEqual(np.float32, df["age"].dtype)
+        self.assertEqual(np.float32, df["house_Eng"].dtype)
+        self.assertEqual("Int8", df["q1_2"].dtype.name)
+        self.assertEqual(np.float64, df["correct"].dtype)
+        self.assertTrue(pd.isna(df["q1_2"].iloc[3]))
+
+    def test_chunked_read(self):
+        # Chunked reads return an iterator with the same rows
+        chunks = list(load_survey_data(self.path, columns=MODEL_COLUMNS, chunksize=3))
+        self.assertEqual([3, 1], [len(chunk) for chunk in chunks])
+        self.assertEqual(np.float32, chunks[1]["age"].dtype)
+
+    def test_peak_rss(self):
+        # Peak and current RSS are positive numbers of MB
+        self.assertGreater(peak_rss_mb(), 0)
+        self.assertGreater(current_rss_mb(), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,29 @@
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", "benchmarks"))
+
+from memory_load import LOADS, measure_loads
+from synthetic_survey import write_survey_csv
+
+
+class TestMemoryLoad(unittest.TestCase):
+    def test_measure_loads(self):
+        print("Running unit tests for memory_load.py")
+
+        # Every load is measured, and the compact frames are smaller than the read_csv one
+        with tempfile.TemporaryDirectory() as tmp:
+            path = write_survey_csv(os.path.join(tmp, "survey.csv"), 2000)
+            measures = measure_loads(path)
+        self.assertEqual(list(measures), list(LOADS))
+        for frame_mb, peak_mb in measures.values():
+            self.assertGreater(frame_mb, 0)
+            self.assertGreater(peak_mb, 0)
+        for name in ("eda", "tuning", "tuning --item-columns"):
+            self.assertLess(measures[name][0], measures["read_csv"][0])
+
+
+if __name__ == "__main__":
+    unittest.main()
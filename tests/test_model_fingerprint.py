@@ -0,0 +1,69 @@
+import os
+import pickle
+import sys
+import tempfile
+import unittest
+
+import pandas as pd
+from sklearn.linear_model import Ridge
+
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+
+from src.helper.artifact_store import ArtifactStore
+from src.helper.model_fingerprint import FingerprintMismatch, verify_model_fingerprint
+
+
+class TestModelFingerprint(unittest.TestCase):
+    def setUp(self):
+        # Store a fitted model with the training CSV it was fitted on
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.train_path = os.path.join(self.tmp_dir.name, "train_data.csv")
+        df = pd.DataFrame({"age": [31.0, 30.0, 20.0, 44.0], "correct": [0.9, 0.8, 1.0, 0.7]})
+        df.to_csv(self.train_path, index=False)
+        self.model = Ridge().fit(df[["age"]], df["correct"])
+        self.store = ArtifactStore(os.path.join(self.tmp_dir.name, "models"))
+        self.artifact = self.store.save("ridge_best_model", self.model, data_path=self.train_path)
+        self.model_path = os.path.join(self.store.root, "ridge_best_model")
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_round_trip(self):
+        print("Running unit tests for model_fingerprint.py")
+
+        # A stored artifact verifies against the same CSV, by name or version directory
+        manifest = verify_model_fingerprint(self.model_path, self.train_path)
+        self.assertEqual(manifest["data_path"], self.train_path)
+        self.assertEqual(manifest, verify_model_fingerprint(self.artifact.path, self.train_path))
+
+    def test_legacy_pickle(self):
+        # Plain pickles record no training data and are rejected
+        pickle_path = os.path.join(self.tmp_dir.name, "ridge_best_model.pkl")
+        with open(pickle_path, "wb") as f:
+            pickle.dump(self.model, f)
+        with self.assertRaisesRegex(FingerprintMismatch, "not an artifact directory"):
+            verify_model_fingerprint(pickle_path, self.train_path)
+
+    def test_without_data(self):
+        # Artifacts stored without their training data are rejected
+        self.store.save("no_data", self.model)
+        with self.assertRaisesRegex(FingerprintMismatch, "does not record"):
+            verify_model_fingerprint(os.path.join(self.store.root, "no_data"), self.train_path)
+
+    def test_changed_training_data(self):
+        # A model is rejected once the training CSV changes
+        with open(self.train_path, "a") as f:
+            f.write("25.0,0.85\n")
+        with self.assertRaisesRegex(FingerprintMismatch, "differs from the training data"):
+            verify_model_fingerprint(self.model_path, self.train_path)
+
+    def test_changed_model(self):
+        # A model file replaced after it was stored is rejected
+        with open(self.artifact.object_path, "wb") as f:
+            pickle.dump(Ridge(alpha=10.0), f)
+        with self.assertRaisesRegex(FingerprintMismatch, "does not match its manifest"):
+            verify_model_fingerprint(self.model_path, self.train_path)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,154 @@
+import os
+import sys
+import unittest
+
+import numpy as np
+import pandas as pd
+from scipy.stats import loguniform
+from sklearn.datasets import make_regression
+from sklearn.linear_model import Lasso, Ridge
+from sklearn.model_selection import RandomizedSearchCV
+from sklearn.pipeline import make_pipeline
+from sklearn.preprocessing import StandardScaler
+
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+
+from src.helper.path_search import RidgePathSearchCV, LassoPathSearchCV
+from src.helper.search_top_models import fit_and_return_top_models
+
+SCORING = {"RMSE": "neg_root_mean_squared_error", "R squared": "r2"}
+
+
+class TestRidgePathSearchCV(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        """
+        Fit a RandomizedSearchCV and a RidgePathSearchCV with the same settings
+        """
+        X, y = make_regression(n_samples=200, n_features=8, noise=5, random_state=123)
+        cls.X, cls.y = pd.DataFrame(X), pd.Series(y)
+        cls.search_params = dict(
+            n_iter=8,
+            cv=5,
+            scoring=SCORING,
+            refit="RMSE",
+            random_state=123,
+            return_train_score=True,
+        )
+        pipe = make_pipeline(StandardScaler(), Ridge())
+        distributions = {"ridge__alpha": loguniform(1e-3, 1e3)}
+        cls.random_search = RandomizedSearchCV(
+            pipe, distributions, **cls.search_params
+        ).fit(cls.X, cls.y)
+        cls.path_search = RidgePathSearchCV(
+            pipe, distributions, **cls.search_params
+        ).fit(cls.X, cls.y)
+
+    def test_same_alphas(self):
+        print("Running unit tests for path_search.py")
+
+        # Alphas are sampled exactly as in RandomizedSearchCV
+        self.assertEqual(
+            list(self.random_search.cv_results_["param_ridge__alpha"]),
+            list(self.path_search.cv_results_["param_ridge__alpha"]),
+        )
+
+    def test_same_scores(self):
+        # The closed-form path matches the per-candidate fits
+        for key in [
+            "mean_test_RMSE",
+            "mean_train_RMSE",
+            "mean_test_R squared",
+            "split3_test_R squared",
+        ]:
+            np.testing.assert_allclose(
+                self.random_search.cv_results_[key],
+                self.path_search.cv_results_[key],
+                rtol=1e-8,
+            )
+        np.testing.assert_array_equal(
+            self.random_search.cv_results_["rank_test_RMSE"],
+            self.path_search.cv_results_["rank_test_RMSE"],
+        )
+
+    def test_same_best_model(self):
+        # The refitted best model is the same
+        self.assertEqual(self.random_search.best_params_, self.path_search.best_params_)
+        np.testing.assert_allclose(
+            self.random_search.best_estimator_.predict(self.X),
+            self.path_search.best_estimator_.predict(self.X),
+        )
+
+    def test_top_models_table(self):
+        # fit_and_return_top_models accepts the path search
+        search = RidgePathSearchCV(
+            make_pipeline(StandardScaler(), Ridge()),
+            {"ridge__alpha": [0.1, 1, 10]},
+            n_iter=3,
+            scoring=SCORING,
+            refit="RMSE",
+        )
+        result = fit_and_return_top_models(
+            search, 2, self.X, self.y, ["param_ridge__alpha"], scoring="RMSE"
+        ).T
+        self.assertEqual("rank_test_RMSE", result.index.name)
+        self.assertEqual(
+            ["mean_test_RMSE", "mean_fit_time", "mean_train_RMSE", "param_ridge__alpha"],
+            result.columns.tolist(),
+        )
+
+    def test_invalid_estimator(self):
+        # Only Ridge models and a single alpha parameter are supported
+        with self.assertRaises(TypeError):
+            RidgePathSearchCV(Lasso(), {"alpha": [1, 2]}, n_iter=2).fit(self.X, self.y)
+        with self.assertRaises(ValueError):
+            RidgePathSearchCV(Ridge(), {"tol": [1, 2]}, n_iter=2).fit(self.X, self.y)
+
+
+
+class TestLassoPathSearchCV(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        """
+        Fit a RandomizedSearchCV and a LassoPathSearchCV with the same settings
+        """
+        X, y = make_regression(n_samples=200, n_features=8, noise=5, random_state=123)
+        cls.X, cls.y = pd.DataFrame(X), pd.Series(y)
+        cls.pipe = make_pipeline(StandardScaler(), Lasso())
+        cls.distributions = {"lasso__alpha": loguniform(1e-3, 1e2)}
+        search_params = dict(
+            n_iter=8, cv=5, scoring=SCORING, refit="RMSE", random_state=123
+        )
+        cls.random_search = RandomizedSearchCV(
+            cls.pipe, cls.distributions, **search_params
+        ).fit(cls.X, cls.y)
+        cls.path_search = LassoPathSearchCV(
+            cls.pipe, cls.distributions, **search_params
+        ).fit(cls.X, cls.y)
+
+    def test_same_scores(self):
+        # Warm starts converge to the same solutions within the Lasso tolerance
+        np.testing.assert_allclose(
+            self.random_search.cv_results_["mean_test_RMSE"],
+            self.path_search.cv_results_["mean_test_RMSE"],
+            rtol=1e-4,
+        )
+        self.assertEqual(self.random_search.best_params_, self.path_search.best_params_)
+
+    def test_alpha_grid(self):
+        # A log-spaced grid spanning the distribution replaces the sampled alphas
+        search = LassoPathSearchCV(
+            self.pipe, self.distributions, alpha_grid=20, cv=3
+        ).fit(self.X, self.y)
+        alphas = np.array(list(search.cv_results_["param_lasso__alpha"]), dtype=float)
+        self.assertEqual(20, len(alphas))
+        np.testing.assert_allclose([1e-3, 1e2], [alphas.min(), alphas.max()])
+
+    def test_invalid_estimator(self):
+        # Only Lasso models are supported
+        with self.assertRaises(TypeError):
+            LassoPathSearchCV(Ridge(), {"alpha": [1, 2]}, n_iter=2).fit(self.X, self.y)
+
+
+if __name__ == "__main__":
+    unittest.main()
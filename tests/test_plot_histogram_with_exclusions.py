@@ -26,8 +26,8 @@ class TestPlotHistogramWithExclusions(unittest.TestCase):
     def test_dataframe_validation(self):
         print("Running unit tests for plot_histogram_with_exclusions.py...")
 
-        # Test that a TypeError is raised when a non-dataframe is passed
-        with self.assertRaises(TypeError):
+        # Test that a TypeError naming both accepted inputs is raised when a non-dataframe is passed
+        with self.assertRaisesRegex(TypeError, "DataFrame or BinCounts"):
             plot_histogram_with_exclusions("not a dataframe")
 
     def test_excluded_columns(self):
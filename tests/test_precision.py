@@ -0,0 +1,128 @@
+import os
+import sys
+import unittest
+
+import numpy as np
+import pandas as pd
+import scipy.sparse as sp
+from sklearn.compose import make_column_selector, make_column_transformer
+from sklearn.impute import SimpleImputer
+from sklearn.linear_model import Lasso, Ridge
+from sklearn.pipeline import make_pipeline
+from sklearn.preprocessing import OneHotEncoder, StandardScaler
+
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+
+from src.helper.compile_linear_scorer import compile_linear_pipeline
+from src.helper.item_response import ITEM_PATTERN, ItemResponseFeatures
+from src.helper.precision import (
+    Float32,
+    float32_pipeline,
+    float32_preprocessor,
+    is_float32_pipeline,
+    precision_parity,
+)
+
+
+def make_preprocessor(item_features=True):
+    # The blocks of the EDA preprocessor that output float64 or int by default
+    transformers = [
+        (make_pipeline(SimpleImputer(strategy="median"), StandardScaler()), ["age"]),
+        ("passthrough", ["psychiatric"]),
+        (
+            make_pipeline(
+                SimpleImputer(strategy="constant", fill_value=0),
+                OneHotEncoder(handle_unknown="ignore", drop="if_binary", dtype=int),
+            ),
+            ["nat_Eng"],
+        ),
+    ]
+    if item_features:
+        transformers.append(
+            (make_pipeline(ItemResponseFeatures(), StandardScaler()), make_column_selector(pattern=ITEM_PATTERN))
+        )
+    return make_column_transformer(*transformers)
+
+
+class TestPrecision(unittest.TestCase):
+    def setUp(self):
+        # Respondents with float32 numerics, 0/1 items and a float64 target
+        rng = np.random.default_rng(0)
+        n = 300
+        self.X = pd.DataFrame(
+            {
+                "age": rng.integers(10, 80, n).astype(np.float32),
+                "psychiatric": rng.integers(0, 2, n).astype(np.float32),
+                "nat_Eng": rng.integers(0, 2, n).astype(np.float32),
+                "q1_1": rng.integers(0, 2, n),
+                "q1_2": rng.integers(0, 2, n),
+            }
+        )
+        self.X.loc[::11, "age"] = np.nan
+        self.X.loc[::7, "nat_Eng"] = np.nan
+        self.y = 0.7 + 0.001 * self.X["age"].fillna(40) + 0.05 * self.X["q1_1"] + rng.normal(0, 0.01, n)
+
+    def test_float32_transformer(self):
+        print("Running unit tests for precision.py")
+
+        # Dense blocks become float32 arrays and sparse blocks stay sparse
+        output = Float32().fit_transform(self.X[["age", "psychiatric"]])
+        self.assertIsInstance(output, np.ndarray)
+        self.assertEqual(output.dtype, np.float32)
+        output = Float32().fit_transform(sp.csr_matrix(np.eye(3)))
+        self.assertTrue(sp.issparse(output))
+        self.assertEqual(output.dtype, np.float32)
+
+        # With to_sparse, dense and sparse blocks become float32 CSR matrices with their feature names
+        transformer = Float32(to_sparse=True).fit(self.X[["age", "psychiatric"]])
+        output = transformer.transform(self.X[["age", "psychiatric"]])
+        self.assertTrue(sp.isspmatrix_csr(output))
+        self.assertEqual(output.dtype, np.float32)
+        self.assertEqual(list(transformer.get_feature_names_out()), ["age", "psychiatric"])
+        output = Float32(to_sparse=True).fit_transform(sp.csc_matrix(np.eye(3)))
+        self.assertTrue(sp.isspmatrix_csr(output))
+        self.assertEqual(output.dtype, np.float32)
+
+        # The input columns are checked against those seen in fit
+        with self.assertRaisesRegex(ValueError, "feature names"):
+            transformer.transform(self.X[["psychiatric", "age"]])
+        with self.assertRaisesRegex(ValueError, "3 features"):
+            Float32().fit(np.eye(2)).transform(np.eye(3))
+
+    def test_float32_preprocessor(self):
+        # The converted preprocessor outputs the same values in float32
+        preprocessor = make_preprocessor()
+        converted = float32_preprocessor(preprocessor)
+        self.assertTrue(is_float32_pipeline(converted))
+        self.assertFalse(is_float32_pipeline(preprocessor))
+        float64_output = preprocessor.fit_transform(self.X)
+        float32_output = converted.fit_transform(self.X)
+        self.assertEqual(float64_output.dtype, np.float64)
+        self.assertEqual(float32_output.dtype, np.float32)
+        np.testing.assert_allclose(float32_output, float64_output, rtol=1e-5, atol=1e-5)
+        self.assertEqual(
+            [name.split("__")[-1] for name in converted.get_feature_names_out()],
+            [name.split("__")[-1] for name in preprocessor.get_feature_names_out()],
+        )
+
+    def test_precision_parity(self):
+        # Ridge and Lasso fit in float32 and score like their float64 fits
+        for model in (Ridge(alpha=1.0), Lasso(alpha=1e-4)):
+            float64_pipe = make_pipeline(make_preprocessor(), model).fit(self.X, self.y)
+            float32_pipe = float32_pipeline(float64_pipe).fit(self.X, self.y.astype(np.float32))
+            self.assertEqual(float32_pipe[-1].coef_.dtype, np.float32)
+            parity = precision_parity(float32_pipe, float64_pipe, self.X, self.y)
+            self.assertEqual(list(parity.index), ["float32", "float64", "difference"])
+            self.assertLess(parity.loc["difference", "RMSE"], 1e-5)
+            self.assertLess(parity.loc["difference", "R squared"], 1e-4)
+            self.assertLess(parity.loc["difference", "max prediction difference"], 1e-4)
+
+        # The float32 casts do not stop the pipeline from being compiled
+        pipe = float32_pipeline(make_pipeline(make_preprocessor(item_features=False), Ridge()))
+        pipe.fit(self.X, self.y.astype(np.float32))
+        scorer = compile_linear_pipeline(pipe)
+        np.testing.assert_allclose(scorer.predict(self.X), pipe.predict(self.X), atol=1e-5)
+
+
+if __name__ == "__main__":
+    unittest.main()
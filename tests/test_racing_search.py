@@ -0,0 +1,148 @@
+import os
+import sys
+import unittest
+
+import numpy as np
+import pandas as pd
+from scipy.stats import loguniform
+from sklearn.datasets import make_regression
+from sklearn.linear_model import Ridge
+from sklearn.model_selection import RandomizedSearchCV
+from sklearn.pipeline import make_pipeline
+from sklearn.preprocessing import StandardScaler
+
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+
+from src.helper.cv_results import rank_scores
+from src.helper.racing_search import RacingSearchCV
+from src.helper.search_top_models import fit_and_return_top_models
+from src.helper.transform_cache import search_transform_calls
+
+SCORING = {"RMSE": "neg_root_mean_squared_error", "R squared": "r2"}
+
+
+class TestRacingSearchCV(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        """
+        Fit a RandomizedSearchCV and a RacingSearchCV with the same settings
+        """
+        X, y = make_regression(n_samples=200, n_features=8, noise=5, random_state=123)
+        cls.X, cls.y = pd.DataFrame(X), pd.Series(y)
+        cls.search_params = dict(
+            n_iter=12,
+            cv=8,
+            scoring=SCORING,
+            refit="RMSE",
+            random_state=123,
+            return_train_score=True,
+        )
+        cls.pipe = make_pipeline(StandardScaler(), Ridge())
+        cls.distributions = {"ridge__alpha": loguniform(1e-3, 1e3)}
+        cls.random_search = RandomizedSearchCV(
+            cls.pipe, cls.distributions, **cls.search_params
+        ).fit(cls.X, cls.y)
+        cls.racing_search = RacingSearchCV(
+            cls.pipe, cls.distributions, **cls.search_params
+        ).fit(cls.X, cls.y)
+
+    def test_same_alphas(self):
+        print("Running unit tests for racing_search.py")
+
+        # Alphas are sampled exactly as in RandomizedSearchCV
+        self.assertEqual(
+            list(self.random_search.cv_results_["param_ridge__alpha"]),
+            list(self.racing_search.cv_results_["param_ridge__alpha"]),
+        )
+
+    def test_drops_losing_candidates(self):
+        # Large alphas are clearly worse and stop before the last fold
+        evaluated = self.racing_search.n_splits_evaluated_
+        self.assertTrue((evaluated >= 3).all())
+        self.assertTrue((evaluated < 8).any())
+        self.assertLess(self.racing_search.n_candidate_fits_, 12 * 8)
+        self.assertEqual(
+            search_transform_calls(self.racing_search),
+            self.racing_search.n_candidate_fits_ + 1,
+        )
+
+    def test_same_best_candidate(self):
+        # The winner and its scores match the full search
+        self.assertEqual(self.random_search.best_params_, self.racing_search.best_params_)
+        self.assertAlmostEqual(
+            self.random_search.best_score_, self.racing_search.best_score_
+        )
+        np.testing.assert_allclose(
+            self.random_search.best_estimator_.predict(self.X),
+            self.racing_search.best_estimator_.predict(self.X),
+        )
+
+    def test_survivors_match_full_search(self):
+        # Candidates that ran every fold have the same scores as in the full search
+        full = self.racing_search.n_splits_evaluated_ == 8
+        for key in ["mean_test_RMSE", "mean_train_R squared"]:
+            np.testing.assert_allclose(
+                self.random_search.cv_results_[key][full],
+                self.racing_search.cv_results_[key][full],
+            )
+
+    def test_dropped_candidates_rank_last(self):
+        # Every survivor ranks above every dropped candidate
+        ranks = self.racing_search.cv_results_["rank_test_RMSE"]
+        full = self.racing_search.n_splits_evaluated_ == 8
+        self.assertLess(ranks[full].max(), ranks[~full].min())
+        self.assertEqual(sorted(ranks), list(range(1, 13)))
+
+    def test_tied_scores_share_rank(self):
+        # Tied candidates get the same (lowest) rank, as in RandomizedSearchCV
+        search = RacingSearchCV(Ridge(), {"alpha": [1.0]})
+        search.n_splits_evaluated_ = np.array([8, 8, 8, 3, 3, 3])
+        ranks = search._rank(np.array([0.5, 0.4, 0.5, 0.9, 0.9, np.nan]))
+        np.testing.assert_array_equal(ranks, [1, 3, 1, 4, 4, 6])
+        np.testing.assert_array_equal(ranks[:3], rank_scores([0.5, 0.4, 0.5]))
+
+    def test_dropped_splits_are_nan(self):
+        # Splits a candidate did not run on are NaN
+        results = self.racing_search.cv_results_
+        last = results["split7_test_RMSE"]
+        self.assertTrue(
+            np.array_equal(np.isnan(last), self.racing_search.n_splits_evaluated_ < 8)
+        )
+
+    def test_top_models_table(self):
+        # The top-N table has the same layout as for RandomizedSearchCV
+        columns = ["param_ridge__alpha", "mean_train_R squared", "mean_test_R squared"]
+        racing_table = fit_and_return_top_models(
+            RacingSearchCV(self.pipe, self.distributions, **self.search_params),
+            3,
+            self.X,
+            self.y,
+            columns,
+            scoring="RMSE",
+        )
+        random_table = fit_and_return_top_models(
+            RandomizedSearchCV(self.pipe, self.distributions, **self.search_params),
+            3,
+            self.X,
+            self.y,
+            columns,
+            scoring="RMSE",
+        )
+        # Fit times differ between runs, everything else is identical
+        pd.testing.assert_frame_equal(
+            racing_table.drop(index="mean_fit_time"),
+            random_table.drop(index="mean_fit_time"),
+            check_dtype=False,
+        )
+
+    def test_single_scorer(self):
+        # A single scorer is reported as "score" and refit=True races on it
+        search = RacingSearchCV(
+            self.pipe, self.distributions, n_iter=4, cv=4, random_state=0
+        ).fit(self.X, self.y)
+        self.assertIn("rank_test_score", search.cv_results_)
+        self.assertEqual(search.best_index_, np.argmin(search.cv_results_["rank_test_score"]))
+
+
+if __name__ == "__main__":
+    unittest.main()
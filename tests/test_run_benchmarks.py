@@ -0,0 +1,95 @@
+import json
+import os
+import sys
+import tempfile
+import unittest
+
+from click.testing import CliRunner
+
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", "benchmarks"))
+
+from run_benchmarks import compare_to_baseline, machine_key, main, missing_baselines
+
+
+class TestRunBenchmarks(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.baseline = os.path.join(self.tmp.name, "baselines.json")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def run_main(self, *args):
+        """Run the fastest benchmark on a small frame against the temporary baseline"""
+        return CliRunner().invoke(
+            main,
+            [
+                "--rows", "500", "--only", "show_feat_coeff", "--repeat", "1",
+                "--baseline", self.baseline, *args,
+            ],
+        )
+
+    def test_compare_to_baseline(self):
+        print("Running unit tests for run_benchmarks.py")
+
+        # Only timings slower than the baseline plus the tolerance are regressions
+        timings = {"a[10]": 1.2, "b[10]": 1.3, "c[10]": 5.0, "d[10]": 0.5}
+        baseline = {"a[10]": 1.0, "b[10]": 1.0, "d[10]": 1.0}
+        self.assertEqual(compare_to_baseline(timings, baseline, 0.25), [("b[10]", 1.3, 1.0)])
+        self.assertEqual(
+            compare_to_baseline(timings, baseline, 0.1),
+            [("a[10]", 1.2, 1.0), ("b[10]", 1.3, 1.0)],
+        )
+        self.assertEqual(missing_baselines(timings, baseline), ["c[10]"])
+
+    def test_missing_baseline_fails(self):
+        # A benchmark without a baseline fails unless --allow-missing is given
+        result = self.run_main()
+        self.assertEqual(result.exit_code, 1)
+        self.assertIn("No baseline for: show_feat_coeff[500]", result.output)
+        self.assertEqual(self.run_main("--allow-missing").exit_code, 0)
+
+    def test_save_and_compare(self):
+        # Saved timings become the baseline; a slower run is a regression
+        self.assertEqual(self.run_main("--save-baseline").exit_code, 0)
+        self.assertEqual(self.run_main("--tolerance", "1000").exit_code, 0)
+        with open(self.baseline) as f:
+            stored = json.load(f)
+        stored["machines"][machine_key()]["timings"]["show_feat_coeff[500]"] = 1e-9
+        with open(self.baseline, "w") as f:
+            json.dump(stored, f)
+        result = self.run_main()
+        self.assertEqual(result.exit_code, 1)
+        self.assertIn("Regression: show_feat_coeff[500]", result.output)
+
+    def test_other_machine_skipped(self):
+        # Baselines of other hardware are not compared against
+        self.assertEqual(self.run_main("--save-baseline").exit_code, 0)
+        with open(self.baseline) as f:
+            stored = json.load(f)
+        entry = stored["machines"].pop(machine_key())
+        entry["timings"]["show_feat_coeff[500]"] = 1e-9
+        stored["machines"]["other-64cpu-py3.12.0"] = entry
+        with open(self.baseline, "w") as f:
+            json.dump(stored, f)
+        result = self.run_main()
+        self.assertEqual(result.exit_code, 0)
+        self.assertIn("skipping the comparison", result.output)
+        self.assertNotIn("Regression", result.output)
+
+    def test_committed_baselines(self):
+        # The committed baselines cover every benchmark at the sizes `make bench` runs
+        from bench_helpers import BENCHMARKS
+
+        path = os.path.join(os.path.dirname(__file__), "..", "benchmarks", "baselines.json")
+        with open(path) as f:
+            stored = json.load(f)
+        for key, entry in stored["machines"].items():
+            self.assertEqual(key, machine_key(entry["machine"]))
+            for name in BENCHMARKS:
+                for n_rows in (10_000, 100_000):
+                    self.assertGreater(entry["timings"][f"{name}[{n_rows}]"], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
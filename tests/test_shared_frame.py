@@ -0,0 +1,130 @@
+import os
+import pickle
+import sys
+import unittest
+
+import numpy as np
+import pandas as pd
+from scipy.stats import loguniform
+from sklearn.compose import make_column_transformer
+from sklearn.impute import SimpleImputer
+from sklearn.linear_model import Ridge
+from sklearn.model_selection import RandomizedSearchCV
+from sklearn.pipeline import make_pipeline
+from sklearn.preprocessing import OneHotEncoder, StandardScaler
+
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+
+from src.helper.concurrent_search import fit_searches_concurrently
+from src.helper.shared_frame import _ATTACHED, SharedFrame
+
+
+class TestSharedFrame(unittest.TestCase):
+    def setUp(self):
+        # Survey-like columns: float32 numerics, categories, strings and nullable items
+        rng = np.random.default_rng(0)
+        n = 200
+        self.X = pd.DataFrame(
+            {
+                "age": rng.integers(10, 80, n).astype(np.float32),
+                "speaker_cat": pd.Categorical(rng.choice(["monoeng", "bieng", "noneng"], n)),
+                "currcountry": rng.choice(["Finland", "Germany", "Japan"], n).astype(object),
+                "q1_1": pd.array(rng.integers(0, 2, n), dtype="Int8"),
+            }
+        )
+        self.X.loc[::9, "age"] = np.nan
+        self.X.loc[::7, "currcountry"] = np.nan
+        self.X.loc[::5, "q1_1"] = pd.NA
+        self.y = pd.Series(
+            0.7 + 0.001 * self.X["age"].fillna(40) + rng.normal(0, 0.01, n), name="correct"
+        )
+
+    def test_round_trip(self):
+        print("Running unit tests for shared_frame.py")
+
+        # The loaded frame has the same values, with object columns as categories
+        with SharedFrame.dump(self.X) as shared:
+            loaded = shared.load()
+            self.assertEqual(len(shared), len(self.X))
+            self.assertEqual(loaded["currcountry"].dtype, "category")
+            self.assertEqual(loaded["q1_1"].dtype, "Int8")
+            pd.testing.assert_frame_equal(
+                loaded.astype({"currcountry": object}), self.X, check_categorical=False
+            )
+            # Mapped read-only from the files
+            self.assertFalse(loaded["age"].to_numpy().flags.writeable)
+            directory = shared.directory
+        self.assertFalse(os.path.exists(directory))
+
+    def test_series_and_array(self):
+        # Series keep their name and arrays come back as memory-mapped arrays
+        with SharedFrame.dump(self.y) as shared:
+            pd.testing.assert_series_equal(shared.load(), self.y)
+        with SharedFrame.dump(self.y.to_numpy()) as shared:
+            np.testing.assert_array_equal(shared.load(), self.y.to_numpy())
+        with self.assertRaises(ValueError):
+            SharedFrame.dump(np.zeros((3, 2)))
+
+    def test_attached_per_directory(self):
+        # X and y stay attached together; remove() or a later load after removal evicts
+        shared_X, shared_y = SharedFrame.dump(self.X), SharedFrame.dump(self.y)
+        try:
+            X = shared_X.load()
+            self.assertIs(shared_y.load(), shared_y.load())
+            self.assertIs(shared_X.load(), X)
+            shared_X.remove()
+            self.assertNotIn(shared_X.directory, _ATTACHED)
+            self.assertIn(shared_y.directory, _ATTACHED)
+            # Workers never see remove(); their next load drops the removed data
+            _ATTACHED[shared_X.directory] = X
+            with SharedFrame.dump(self.y) as other:
+                other.load()
+                self.assertNotIn(shared_X.directory, _ATTACHED)
+                self.assertIn(shared_y.directory, _ATTACHED)
+        finally:
+            shared_X.remove()
+            shared_y.remove()
+        self.assertNotIn(shared_y.directory, _ATTACHED)
+
+    def test_small_handle(self):
+        # The pickled handle does not grow with the number of rows
+        large = pd.concat([self.X] * 50, ignore_index=True)
+        with SharedFrame.dump(large) as shared:
+            self.assertLess(len(pickle.dumps(shared)), 2000)
+            self.assertGreater(len(pickle.dumps(large)), 20 * len(pickle.dumps(shared)))
+
+    def test_concurrent_search(self):
+        # Workers attached to the shared data score the candidates like a plain search
+        preprocessor = make_column_transformer(
+            (make_pipeline(SimpleImputer(strategy="median"), StandardScaler()), ["age"]),
+            (
+                make_pipeline(
+                    SimpleImputer(strategy="constant", fill_value="missing"),
+                    OneHotEncoder(handle_unknown="ignore"),
+                ),
+                ["speaker_cat", "currcountry"],
+            ),
+        )
+        search_params = dict(n_iter=4, cv=3, random_state=123, scoring="neg_root_mean_squared_error")
+
+        def make_search():
+            return RandomizedSearchCV(
+                make_pipeline(preprocessor, Ridge()),
+                {"ridge__alpha": loguniform(1e-3, 1e3)},
+                **search_params,
+            )
+
+        plain = make_search().fit(self.X, self.y)
+        with SharedFrame.dump(self.X) as shared_X, SharedFrame.dump(self.y) as shared_y:
+            (shared,) = fit_searches_concurrently([make_search()], shared_X, shared_y, n_jobs=2)
+        np.testing.assert_allclose(
+            shared.cv_results_["mean_test_score"], plain.cv_results_["mean_test_score"]
+        )
+        self.assertEqual(shared.best_params_, plain.best_params_)
+        np.testing.assert_allclose(
+            shared.best_estimator_.predict(self.X), plain.best_estimator_.predict(self.X)
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
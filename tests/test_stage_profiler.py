@@ -0,0 +1,113 @@
+import csv
+import json
+import os
+import pstats
+import sys
+import tempfile
+import time
+import unittest
+from unittest import mock
+
+import numpy as np
+
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+
+from src.helper.stage_profiler import StageProfiler
+
+
+class TestStageProfiler(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.output_dir = os.path.join(self.tmp.name, "profile")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def run_stages(self, **kwargs):
+        """Profile a load and a fit stage"""
+        profiler = StageProfiler("script", output_dir=self.output_dir, **kwargs)
+        with profiler.stage("load") as stage:
+            data = list(range(100_000))
+            stage["rows"] = len(data)
+        with profiler.stage("fit", rows=10):
+            sum(x * x for x in data)
+        return profiler
+
+    def test_records_stages(self):
+        print("Running unit tests for stage_profiler.py")
+
+        # Each stage records its timings, memory and rows in order
+        profiler = self.run_stages()
+        self.assertEqual([s["stage"] for s in profiler.stages], ["load", "fit"])
+        self.assertEqual([s["rows"] for s in profiler.stages], [100_000, 10])
+        for record in profiler.stages:
+            self.assertGreaterEqual(record["wall_s"], 0)
+            self.assertGreaterEqual(record["cpu_s"], 0)
+            self.assertGreater(record["stage_peak_rss_mb"], 0)
+            self.assertIsInstance(record["rss_delta_mb"], float)
+
+    def test_stage_memory(self):
+        # A stage that frees its memory shows a peak above its start and end RSS
+        profiler = StageProfiler("script", output_dir=self.output_dir)
+        with profiler.stage("spike"):
+            data = np.ones(100 * 1024**2 // 8)
+            time.sleep(0.1)
+            del data
+        with profiler.stage("quiet"):
+            time.sleep(0.1)
+        spike, quiet = profiler.stages
+        self.assertLess(abs(spike["rss_delta_mb"]), 50)
+        self.assertGreater(spike["stage_peak_rss_mb"], quiet["stage_peak_rss_mb"] + 50)
+
+    def test_memory_unknown(self):
+        # Without a readable current RSS the memory fields are empty
+        with mock.patch("src.helper.stage_profiler.current_rss_mb", return_value=None):
+            profiler = self.run_stages()
+        self.assertEqual(profiler.stages[0]["rss_delta_mb"], None)
+        self.assertEqual(profiler.stages[0]["stage_peak_rss_mb"], None)
+
+    def test_json_report(self):
+        # The JSON report holds the stages of the latest run
+        json_path, _ = self.run_stages().write()
+        self.assertEqual(json_path, os.path.join(self.output_dir, "script.json"))
+        with open(json_path) as f:
+            report = json.load(f)
+        self.assertEqual(report["script"], "script")
+        self.assertEqual([s["stage"] for s in report["stages"]], ["load", "fit"])
+
+    def test_csv_report_appends_runs(self):
+        # The CSV report keeps the stages of every run for comparisons
+        self.run_stages().write()
+        _, csv_path = self.run_stages().write()
+        with open(csv_path) as f:
+            rows = list(csv.DictReader(f))
+        self.assertEqual(len(rows), 4)
+        self.assertEqual(rows[0]["script"], "script")
+        self.assertEqual(rows[3]["stage"], "fit")
+
+    def test_cprofile_dump(self):
+        # Only the selected stages are dumped as cProfile stats
+        self.run_stages(cprofile_stages=["fit"])
+        fit_dump = os.path.join(self.output_dir, "script-fit.prof")
+        self.assertTrue(os.path.exists(fit_dump))
+        self.assertFalse(os.path.exists(os.path.join(self.output_dir, "script-load.prof")))
+        self.assertGreater(pstats.Stats(fit_dump).total_calls, 0)
+
+    def test_disabled(self):
+        # A disabled profiler records and writes nothing
+        profiler = self.run_stages(enabled=False)
+        self.assertEqual(profiler.stages, [])
+        self.assertIsNone(profiler.write())
+        self.assertFalse(os.path.exists(self.output_dir))
+
+    def test_records_failed_stage(self):
+        # A stage that raises is still recorded
+        profiler = StageProfiler("script", output_dir=self.output_dir)
+        with self.assertRaises(ValueError):
+            with profiler.stage("load"):
+                raise ValueError("bad file")
+        self.assertEqual(profiler.stages[0]["stage"], "load")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,121 @@
+import os
+import sys
+import tempfile
+import unittest
+import zipfile
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+
+from src.helper.stream_sample import stream_sample_split
+
+
+class TestStreamSampleSplit(unittest.TestCase):
+    def setUp(self):
+        # Create a dataset and paths for the output files
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.train_path = os.path.join(self.tmp_dir.name, "train_data.csv")
+        self.test_path = os.path.join(self.tmp_dir.name, "test_data.csv")
+        self.zip_path = os.path.join(self.tmp_dir.name, "sampled_data.zip")
+        rng = np.random.default_rng(0)
+        self.df = pd.DataFrame(
+            {
+                "id": np.arange(10_000),
+                "speaker_cat": rng.choice(["monoeng", "bieng", "noneng"], 10_000),
+                "correct": rng.random(10_000),
+            }
+        )
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def chunks(self, size=1_000):
+        return (self.df.iloc[i : i + size] for i in range(0, len(self.df), size))
+
+    def test_bernoulli_sample(self):
+        print("Running unit tests for stream_sample.py")
+
+        # Roughly sample_size of the rows are kept, split without overlap
+        counts = stream_sample_split(
+            self.chunks(), self.train_path, self.test_path, sample_path=self.zip_path
+        )
+        train = pd.read_csv(self.train_path)
+        test = pd.read_csv(self.test_path)
+        self.assertEqual(10_000, counts["read"])
+        self.assertAlmostEqual(0.3, counts["sampled"] / 10_000, delta=0.02)
+        self.assertEqual(counts["sampled"], len(train) + len(test))
+        self.assertEqual(set(), set(train["id"]) & set(test["id"]))
+        with zipfile.ZipFile(self.zip_path) as archive:
+            sampled = pd.read_csv(archive.open("sampled_data.csv"))
+        self.assertEqual(counts["sampled"], len(sampled))
+
+    def test_same_seed_same_split(self):
+        # The same random_state reproduces the same files
+        stream_sample_split(self.chunks(), self.train_path, self.test_path)
+        first = pd.read_csv(self.train_path)
+        stream_sample_split(self.chunks(), self.train_path, self.test_path)
+        pd.testing.assert_frame_equal(first, pd.read_csv(self.train_path))
+
+    def test_reservoir_sample(self):
+        # Exactly sample_size distinct rows are kept
+        counts = stream_sample_split(
+            self.chunks(),
+            self.train_path,
+            self.test_path,
+            sample_size=500,
+            method="reservoir",
+        )
+        ids = pd.concat([pd.read_csv(self.train_path), pd.read_csv(self.test_path)])["id"]
+        self.assertEqual(500, counts["sampled"])
+        self.assertEqual(500, ids.nunique())
+        # Rows from late chunks are sampled too
+        self.assertTrue((ids > 5_000).any())
+
+    def test_stratified_split(self):
+        # Each stratum is split in the test_size proportion
+        stream_sample_split(
+            self.chunks(),
+            self.train_path,
+            self.test_path,
+            sample_size=1.0,
+            stratify="speaker_cat",
+        )
+        test = pd.read_csv(self.test_path)
+        totals = self.df["speaker_cat"].value_counts()
+        for category, count in test["speaker_cat"].value_counts().items():
+            self.assertAlmostEqual(0.3 * totals[category], count, delta=1)
+
+    def test_stratified_bins(self):
+        # A numeric column is stratified on the given bin edges
+        stream_sample_split(
+            self.chunks(),
+            self.train_path,
+            self.test_path,
+            sample_size=1.0,
+            stratify="correct",
+            stratify_bins=[0.5, 0.9],
+        )
+        test = pd.read_csv(self.test_path)
+        expected = 0.3 * (self.df["correct"] >= 0.9).sum()
+        self.assertAlmostEqual(expected, (test["correct"] >= 0.9).sum(), delta=1)
+
+    def test_invalid_method(self):
+        # Unknown methods and bad sizes raise
+        with self.assertRaises(ValueError):
+            stream_sample_split(
+                self.chunks(), self.train_path, self.test_path, method="systematic"
+            )
+        with self.assertRaises(ValueError):
+            stream_sample_split(
+                self.chunks(),
+                self.train_path,
+                self.test_path,
+                sample_size=0.5,
+                method="reservoir",
+            )
+
+
+if __name__ == "__main__":
+    unittest.main()
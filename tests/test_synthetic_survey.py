@@ -0,0 +1,56 @@
+import os
+import sys
+import tempfile
+import unittest
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", "benchmarks"))
+
+from src.helper.load_survey_data import MODEL_COLUMNS, load_survey_data, survey_dtype
+from synthetic_survey import ITEM_COLUMNS, make_survey_data, write_survey_csv
+
+
+class TestSyntheticSurvey(unittest.TestCase):
+    def test_columns_and_dtypes(self):
+        print("Running unit tests for synthetic_survey.py")
+
+        # The frame has the survey columns with the dtypes of load_survey_data
+        df = make_survey_data(1000)
+        self.assertEqual(len(df), 1000)
+        self.assertEqual(len(ITEM_COLUMNS), 95)
+        self.assertTrue(set(MODEL_COLUMNS + ITEM_COLUMNS) <= set(df.columns))
+        for column in df.columns:
+            if survey_dtype(column):
+                expected = pd.Series(dtype=survey_dtype(column)).dtype
+                self.assertEqual(df[column].dtype.name, expected.name, column)
+
+    def test_values(self):
+        # Items are 0/1, `correct` is their mean and some features are missing
+        df = make_survey_data(2000)
+        items = df[ITEM_COLUMNS].to_numpy(dtype=float)
+        self.assertTrue(np.isin(items, [0, 1]).all())
+        np.testing.assert_allclose(df["correct"], items.mean(axis=1), rtol=1e-6)
+        self.assertTrue(df["correct"].between(0, 1).all())
+        for column in ["education", "Eng_little", "house_Eng", "Eng_country_yrs", "Lived_Eng_per"]:
+            self.assertTrue(0 < df[column].isna().mean() < 0.5, column)
+        self.assertFalse(df["age"].isna().any())
+
+    def test_seeded(self):
+        # The same seed gives the same frame, another seed a different one
+        pd.testing.assert_frame_equal(make_survey_data(300, 7), make_survey_data(300, 7))
+        self.assertFalse(make_survey_data(300, 7).equals(make_survey_data(300, 8)))
+
+    def test_write_csv_in_chunks(self):
+        # A CSV written in chunks has every row once and loads like the survey data
+        with tempfile.TemporaryDirectory() as tmp:
+            path = write_survey_csv(os.path.join(tmp, "survey.csv"), 250, chunksize=100)
+            df = load_survey_data(path)
+        self.assertEqual(len(df), 250)
+        self.assertEqual(list(df["id"]), list(range(250)))
+        self.assertEqual(df["age"].dtype, np.float32)
+
+
+if __name__ == "__main__":
+    unittest.main()
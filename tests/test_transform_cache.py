@@ -0,0 +1,93 @@
+import os
+import sys
+import tempfile
+import unittest
+
+import pandas as pd
+from sklearn.datasets import make_regression
+from sklearn.linear_model import Lasso, Ridge
+from sklearn.model_selection import GridSearchCV
+from sklearn.preprocessing import StandardScaler
+
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+
+from src.helper.transform_cache import (
+    TransformCache,
+    make_cached_pipeline,
+    search_transform_calls,
+)
+
+
+class TestTransformCache(unittest.TestCase):
+    def setUp(self):
+        # Create a regression dataset and an empty cache directory
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.cache_dir = self.tmp_dir.name
+        self.cache = TransformCache(self.cache_dir)
+        X, y = make_regression(n_samples=60, n_features=5, random_state=123)
+        self.X, self.y = pd.DataFrame(X), pd.Series(y)
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def fit_search(self, model, param, n_jobs=None):
+        pipe = make_cached_pipeline(StandardScaler(), model, self.cache)
+        search = GridSearchCV(pipe, {param: [0.1, 1, 10]}, cv=3, n_jobs=n_jobs)
+        return search.fit(self.X, self.y)
+
+    def test_one_fit_per_fold(self):
+        print("Running unit tests for transform_cache.py")
+
+        # Three candidates on three folds need only the three fold fits plus the refit
+        search = self.fit_search(Ridge(), "ridge__alpha")
+        self.assertEqual(10, search_transform_calls(search))
+        self.assertEqual({"hits": 6, "misses": 4}, self.cache.counts())
+
+    def test_shared_across_models(self):
+        # A second model family reuses every cached fit
+        self.fit_search(Ridge(), "ridge__alpha")
+        self.fit_search(Lasso(), "lasso__alpha")
+        self.assertEqual({"hits": 16, "misses": 4}, self.cache.counts())
+        self.assertAlmostEqual(16 / 20, self.cache.hit_rate())
+
+    def test_worker_processes(self):
+        # Calls made in worker processes are counted; a worker seeing this cache
+        # directory for the first time may refit one fold while joblib validates it
+        self.fit_search(Ridge(), "ridge__alpha")
+        self.fit_search(Lasso(), "lasso__alpha", n_jobs=2)
+        counts = self.cache.counts()
+        self.assertEqual(20, counts["hits"] + counts["misses"])
+        self.assertGreaterEqual(counts["hits"], 14)
+
+    def test_separate_counts(self):
+        # Another cache on the same directory counts only its own calls
+        self.fit_search(Ridge(), "ridge__alpha")
+        other = TransformCache(self.cache_dir)
+        make_cached_pipeline(StandardScaler(), Ridge(), other).fit(self.X, self.y)
+        self.assertEqual({"hits": 1, "misses": 0}, other.counts())
+        other.clear_counts()
+        self.assertEqual({"hits": 0, "misses": 0}, other.counts())
+
+    def test_matches_uncached_results(self):
+        # Caching does not change the scores
+        cached = self.fit_search(Ridge(), "ridge__alpha")
+        uncached = GridSearchCV(
+            make_cached_pipeline(StandardScaler(), Ridge(), None),
+            {"ridge__alpha": [0.1, 1, 10]},
+            cv=3,
+        ).fit(self.X, self.y)
+        self.assertEqual(
+            list(cached.cv_results_["mean_test_score"]),
+            list(uncached.cv_results_["mean_test_score"]),
+        )
+
+    def test_empty_cache(self):
+        # Without calls, or without a cache directory, nothing is counted
+        self.assertEqual(0.0, self.cache.hit_rate())
+        no_cache = TransformCache(None)
+        make_cached_pipeline(StandardScaler(), Ridge(), no_cache).fit(self.X, self.y)
+        self.assertEqual({"hits": 0, "misses": 0}, no_cache.counts())
+
+
+if __name__ == "__main__":
+    unittest.main()